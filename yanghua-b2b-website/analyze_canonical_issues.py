@@ -1,43 +1,47 @@
 #!/usr/bin/env python3
 """
 分析有canonical URL问题的页面，找出具体原因
+加 --resolve 时沿 canonical 目标继续抓取，检查 canonical 链、循环、指向重定向 / 404 以及是否离开 hreflang 集群
+加 --from-snapshot / --from-warc 时按期望 URL 从快照运行或 WARC 中读取页面，而不是手工保存的 *_page_source.html
+批量分析目录 / tar 包 / WARC 中的大量页面请使用 batch_analyze_pages.py
 """
 
-from bs4 import BeautifulSoup
+import argparse
 import os
 
-def analyze_page_canonical(file_path, expected_url):
-    """分析单个页面的canonical和hreflang标签"""
-    
+from seo_audit.canonical_graph import CanonicalResolver
+from seo_audit.hreflang_graph import HreflangGraph
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+from seo_audit.snapshots import add_replay_arguments, replay_from_args
+
+def read_page_source(file_path, expected_url, replay=None):
+    """页面源码：给出 replay 时从快照读取 expected_url，否则读取本地文件；找不到时返回 None"""
+    if replay is not None:
+        try:
+            return replay.get_text(expected_url, head_only=True)
+        except KeyError:
+            return None
     if not os.path.exists(file_path):
-        return {"error": f"文件不存在: {file_path}"}
-    
+        return None
     with open(file_path, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # 查找 canonical 标签
-    canonical_tag = soup.find('link', rel='canonical')
-    canonical_url = canonical_tag.get('href') if canonical_tag else None
+        return f.read()
+
+def analyze_page_canonical(file_path, expected_url, replay=None):
+    """分析单个页面的canonical和hreflang标签"""
     
-    # 查找所有 hreflang 标签
-    hreflang_tags = soup.find_all('link', rel='alternate')
-    hreflang_urls = []
+    content = read_page_source(file_path, expected_url, replay)
+    if content is None:
+        if replay is not None:
+            return {"error": f"快照运行 {replay.run_id} 中没有: {expected_url}"}
+        return {"error": f"文件不存在: {file_path}"}
     
-    for tag in hreflang_tags:
-        if tag.get('hreflang'):
-            hreflang_urls.append({
-                'hreflang': tag.get('hreflang'),
-                'href': tag.get('href')
-            })
+    page = PageSeo.parse(content) or PageSeo()
+    canonical_url = page.canonical
+    hreflang_urls = [tag for tag in page.hreflang if tag['hreflang']]
     
     # 查找英文hreflang
-    en_hreflang = None
-    for hreflang in hreflang_urls:
-        if hreflang['hreflang'] == 'en':
-            en_hreflang = hreflang['href']
-            break
+    en_hreflang = page.alternate('en')
     
     return {
         'expected_url': expected_url,
@@ -49,8 +53,41 @@ def analyze_page_canonical(file_path, expected_url):
         'hreflang_matches_expected': en_hreflang == expected_url
     }
 
+def resolve_canonicals(pages_to_analyze, replay=None):
+    """把本地保存（或快照中）的页面当作期望 URL 的内容，沿 canonical 抓取目标并解析整条链"""
+    resolver = CanonicalResolver()
+    graph = HreflangGraph()
+    for page in pages_to_analyze:
+        content = read_page_source(page['file'], page['expected_url'], replay)
+        if content is None:
+            continue
+        seo = PageSeo.parse(content, page['expected_url'])
+        resolver.add_page(page['expected_url'], seo)
+        graph.add_page(page['expected_url'], seo)
+    fetched = resolver.fetch_unknown()
+
+    print(f"=== Canonical 链解析（抓取 {fetched} 个目标）===\n")
+    findings = resolver.findings(graph)
+    for key, url in resolver.pages.items():
+        resolution = resolver.resolve(key)
+        print(f"📄 {url}")
+        print(f"   链: {' -> '.join(resolution.chain)}")
+        for finding in findings.get(url, []):
+            marker = "❌" if finding.severity == "error" else "⚠️ "
+            print(f"   {marker} {finding.message}")
+        if url not in findings:
+            print("   ✅ 无问题")
+        print()
+
 def main():
     """分析多个有问题的页面"""
+    parser = argparse.ArgumentParser(description="分析有 canonical URL 问题的页面")
+    parser.add_argument("--resolve", action="store_true", help="沿 canonical 目标抓取，检查链、循环、重定向 / 404 与 hreflang 集群")
+    add_replay_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    replay = replay_from_args(args)
     
     pages_to_analyze = [
         {
@@ -76,12 +113,14 @@ def main():
     ]
     
     print("=== 分析Canonical URL问题 ===\n")
+    if replay is not None:
+        print(f"📸 快照运行: {replay.run_id}\n")
     
     for page in pages_to_analyze:
         print(f"📄 {page['name']} ({page['file']})")
         print(f"   期望URL: {page['expected_url']}")
         
-        result = analyze_page_canonical(page['file'], page['expected_url'])
+        result = analyze_page_canonical(page['file'], page['expected_url'], replay)
         
         if 'error' in result:
             print(f"   ❌ {result['error']}")
@@ -111,5 +150,8 @@ def main():
         
         print()
 
+    if args.resolve:
+        resolve_canonicals(pages_to_analyze, replay)
+
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -1,35 +1,37 @@
 #!/usr/bin/env python3
 """
 详细分析联系页面的 canonical 和 hreflang 标签问题
+默认读取手工保存的 contact_page_source.html；--from-snapshot / --from-warc 时从快照运行或 WARC 中读取该页面
+
+用法示例：
+  python3 analyze_contact_page.py
+  python3 analyze_contact_page.py --from-snapshot latest
 """
 
-from bs4 import BeautifulSoup
+import argparse
+
+from seo_audit.checks import double_slash_issues
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+from seo_audit.snapshots import add_replay_arguments, replay_from_args
+
+CONTACT_URL = "https://www.yhflexiblebusbar.com/en/contact"
 
-def analyze_contact_page():
+def analyze_contact_page(replay=None):
     """分析联系页面的标签"""
     
-    with open('contact_page_source.html', 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # 查找 canonical 标签
-    canonical_tag = soup.find('link', rel='canonical')
-    canonical_url = canonical_tag.get('href') if canonical_tag else None
-    
-    # 查找所有 hreflang 标签
-    hreflang_tags = soup.find_all('link', rel='alternate')
-    hreflang_urls = []
+    if replay is not None:
+        content = replay.get_text(CONTACT_URL, head_only=True)
+    else:
+        with open('contact_page_source.html', 'r', encoding='utf-8') as f:
+            content = f.read()
     
-    for tag in hreflang_tags:
-        if tag.get('hreflang'):
-            hreflang_urls.append({
-                'hreflang': tag.get('hreflang'),
-                'href': tag.get('href')
-            })
+    page = PageSeo.parse(content) or PageSeo()
+    canonical_url = page.canonical
+    hreflang_urls = [tag for tag in page.hreflang if tag['hreflang']]
     
     print("=== 联系页面标签详细分析 ===")
-    print(f"页面URL: https://www.yhflexiblebusbar.com/en/contact")
+    print(f"页面URL: {CONTACT_URL}")
     print(f"Canonical URL: {canonical_url}")
     print("\nHreflang URLs:")
     
@@ -40,11 +42,7 @@ def analyze_contact_page():
     print(f"\n=== 问题分析 ===")
     
     # 检查英文 hreflang 是否与 canonical 一致
-    en_hreflang = None
-    for hreflang in hreflang_urls:
-        if hreflang['hreflang'] == 'en':
-            en_hreflang = hreflang['href']
-            break
+    en_hreflang = page.alternate('en')
     
     if canonical_url and en_hreflang:
         if canonical_url == en_hreflang:
@@ -57,14 +55,7 @@ def analyze_contact_page():
     
     # 检查双斜杠问题
     print(f"\n=== 双斜杠检查 ===")
-    issues = []
-    
-    if canonical_url and '//' in canonical_url.replace('https://', '').replace('http://', ''):
-        issues.append(f"Canonical: {canonical_url}")
-    
-    for hreflang in hreflang_urls:
-        if hreflang['href'] and '//' in hreflang['href'].replace('https://', '').replace('http://', ''):
-            issues.append(f"Hreflang ({hreflang['hreflang']}): {hreflang['href']}")
+    issues = double_slash_issues(page)
     
     if issues:
         print("❌ 发现双斜杠问题:")
@@ -73,5 +64,16 @@ def analyze_contact_page():
     else:
         print("✅ 未发现双斜杠问题")
 
+def main():
+    parser = argparse.ArgumentParser(description="分析联系页面的 canonical 和 hreflang 标签")
+    add_replay_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    replay = replay_from_args(args)
+    if replay is not None:
+        print(f"📸 快照运行: {replay.run_id}")
+    analyze_contact_page(replay)
+
 if __name__ == "__main__":
-    analyze_contact_page()
\ No newline at end of file
+    main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+离线批量分析已保存的页面
+analyze_canonical_issues.py 只分析写死的四个 HTML 文件，check_hreflang_canonical.py 只读一个文件；
+这里接受任意数量的来源（目录、通配符、tar 包、WARC、snapshot:<运行 ID>），
+在进程池中并行解析并执行与爬取检查相同的 SEO 检查，结果边分析边写入 JSON Lines 报告。
+WARC 来源按 .cdxj 索引（没有时先流式扫描建立）由各工作进程直接 seek 读取记录，大文件不会载入内存。
+
+用法示例：
+  python3 batch_analyze_pages.py saved_pages/ --base-url https://www.yhflexiblebusbar.com
+  python3 batch_analyze_pages.py '*_page_source.html' --url-map page_sources.json --check-canonical
+  python3 batch_analyze_pages.py archive.tar.gz crawl.warc.gz snapshot:latest --workers 8
+"""
+
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+from seo_audit.checks import ERROR
+from seo_audit.offline import DEFAULT_CHUNK_SIZE, analyze_pages, iter_saved_pages, load_url_map
+from seo_audit.parsers import PARSER_CHOICES
+from seo_audit.profiling import add_profile_arguments, note_report, profiler_from_args
+from seo_audit.snapshots import DEFAULT_SNAPSHOT_DIR
+
+# 每处理这么多页面输出一次进度
+PROGRESS_EVERY = 500
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='离线批量分析已保存的页面')
+    parser.add_argument('sources', nargs='+', help='目录、通配符、tar 包、WARC 文件或 snapshot:<运行 ID>')
+    parser.add_argument('--base-url', default=None, help='按相对路径推导页面 URL 时使用的站点地址（en/contact.html -> <base-url>/en/contact）')
+    parser.add_argument('--url-map', default=None, help='JSON 文件 {文件路径或文件名: URL}，优先于 --base-url')
+    parser.add_argument('--check-canonical', action='store_true', help='要求 canonical 等于页面 URL（需要已知 URL）')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='进程数（默认 CPU 核数；1 表示在当前进程中执行）')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='每个任务块的页面数')
+    parser.add_argument('--parser', choices=PARSER_CHOICES, default=None, help='HTML 解析后端（默认 auto：已安装的最快后端）')
+    parser.add_argument('--snapshot-dir', default=DEFAULT_SNAPSHOT_DIR, help=f'snapshot: 来源的快照存储目录（默认 {DEFAULT_SNAPSHOT_DIR}）')
+    parser.add_argument('--quiet', action='store_true', help='不逐条输出有错误的页面')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
+    print("🗂️  开始离线批量分析")
+    print(f"📁 来源: {', '.join(args.sources)}")
+    print(f"⚙️  进程数: {args.workers}, 任务块: {args.chunk_size} 页")
+    print(f"⏰ 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    url_map = load_url_map(args.url_map)
+    try:
+        sources = [iter_saved_pages(spec, args.base_url, url_map, args.snapshot_dir) for spec in args.sources]
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+
+    counts = {'success': 0, 'failed': 0, 'error': 0, 'skipped': 0}
+    checks = {}
+    started = time.perf_counter()
+    output_file = f"offline_batch_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    with open(output_file, 'w', encoding='utf-8') as out:
+        results = analyze_pages(itertools.chain.from_iterable(sources), workers=args.workers,
+                                chunk_size=args.chunk_size, check_canonical=args.check_canonical, parser=args.parser)
+        for i, result in enumerate(results, 1):
+            out.write(json.dumps(result, ensure_ascii=False) + '\n')
+            counts[result['status']] += 1
+            for finding in result.get('findings', []):
+                key = f"{finding['check']}:{finding['severity']}"
+                checks[key] = checks.get(key, 0) + 1
+            if not args.quiet and result['status'] in ('failed', 'error'):
+                print(f"[{i}] ❌ {result['url'] or result['source']}")
+                for finding in result.get('findings', []):
+                    if finding['severity'] == ERROR:
+                        print(f"      - {finding['message']}")
+                if result['status'] == 'error':
+                    print(f"      - {result['error']}")
+            if i % PROGRESS_EVERY == 0:
+                elapsed = time.perf_counter() - started
+                print(f"⏳ 已分析 {i} 页（{i / elapsed:.0f} 页/秒）")
+
+        elapsed = time.perf_counter() - started
+        total = sum(counts.values())
+        summary = {
+            'timestamp': datetime.now().isoformat(),
+            'sources': args.sources,
+            'workers': args.workers,
+            'pages': total,
+            **counts,
+            'findings_by_check': checks,
+            'elapsed_seconds': round(elapsed, 3),
+            'pages_per_second': round(total / elapsed, 1) if elapsed else None,
+        }
+        out.write(json.dumps({'summary': summary}, ensure_ascii=False) + '\n')
+    note_report(output_file)
+
+    print(f"\n📊 分析完成，结果已保存到: {output_file}")
+    print(f"\n📈 分析摘要:")
+    print(f"   - 总页面数: {total}")
+    print(f"   - 通过: {counts['success']}  有错误: {counts['failed']}  解析失败: {counts['error']}  跳过: {counts['skipped']}")
+    for key, count in sorted(checks.items(), key=lambda item: -item[1]):
+        print(f"   - {key}: {count}")
+    print(f"   - ⏱️  耗时 {elapsed:.2f}s（{summary['pages_per_second'] or 0} 页/秒）")
+
+    return 0 if counts['failed'] == 0 and counts['error'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+审计流水线基准测试
+在本地启动合成站点（seo_audit.fixture_site，N 个页面，Next.js 体量的 <head>、en/es/x-default hreflang 集群、
+canonical 以及按比例注入的缺陷），对它运行真实的审计脚本，报告每个阶段的 pages/sec、峰值 RSS 与 CPU，
+结果保存为 JSON，可与上一次的结果对比以发现性能回退，不需要访问生产环境。
+
+每个阶段在独立子进程中运行（峰值 RSS 互不干扰），并带 --profile 参数，按 discover/fetch/parse/validate/report
+拆分耗时（基准测试时关闭堆栈采样，避免采样线程本身影响结果）：
+- crawl：crawl_site_seo.py 从 sitemap 出发爬取全站（抓取 + 解析 + 检查 + hreflang/canonical 图）
+- offline：batch_analyze_pages.py 分析同一站点导出的 tar 包（纯解析 + 检查，多进程）
+- history：seo_history.py 把 crawl 报告导入 SQLite 历史仓库
+
+用法示例：
+  python3 benchmark_audit.py --pages 1000
+  python3 benchmark_audit.py --pages 20000 --stages crawl --concurrency 32 --latency-ms 20
+  python3 benchmark_audit.py --pages 5000 --baseline audit_benchmark_20251001_120000.json
+  python3 benchmark_audit.py --pages 500 --serve    # 只启动合成站点，手动运行其他脚本
+"""
+
+import argparse
+import glob
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from seo_audit.fixture_site import DEFAULT_BODY_KB, FixtureServer, SyntheticSite
+from seo_audit.history import HistoryStore
+from seo_audit.profiling import PROFILE_PREFIX, SAMPLE_INTERVAL_ENV
+
+MIN_PAGES = 100
+MAX_PAGES = 100000
+STAGES = ("crawl", "offline", "history")
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+# 对比基线时检查的指标：(字段, 数值越大越好)
+METRICS = (("pages_per_sec", True), ("cpu_ms_per_page", False), ("peak_rss_kb", False))
+# 子进程不应继承的环境变量：缓存、快照、WARC 与 cassette 录制 / 回放会改变被测的工作量，
+# 自适应并发只由 --adaptive 控制（写入 params，便于与基线对比）
+_INHERITED_ENV_BLOCKLIST = ("SEO_AUDIT_HTTP_CACHE", "SEO_AUDIT_SNAPSHOTS", "SEO_AUDIT_WARC",
+                            "SEO_AUDIT_RECORD_CASSETTE", "SEO_AUDIT_REPLAY_CASSETTE", "SEO_AUDIT_ADAPTIVE")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=SCRIPT_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip() or None
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def child_env() -> Dict[str, str]:
+    env = {k: v for k, v in os.environ.items() if k not in _INHERITED_ENV_BLOCKLIST}
+    env[SAMPLE_INTERVAL_ENV] = "0"
+    env["PYTHONPATH"] = os.pathsep.join(p for p in (SCRIPT_DIR, env.get("PYTHONPATH")) if p)
+    return env
+
+
+def newest(workdir: str, pattern: str) -> Optional[str]:
+    paths = glob.glob(os.path.join(workdir, pattern))
+    return max(paths, key=os.path.getmtime) if paths else None
+
+
+def run_command(name: str, command: List[str], workdir: str) -> Dict[str, Any]:
+    """运行一个阶段并用 wait4 取得子进程自己的 CPU 时间与峰值 RSS（Linux 上 ru_maxrss 单位为 KB）"""
+    log_path = os.path.join(workdir, f"{name}.log")
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log:
+        proc = subprocess.Popen(command, cwd=workdir, stdout=log, stderr=subprocess.STDOUT, env=child_env())
+        _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - started
+    proc.returncode = os.waitstatus_to_exitcode(status)
+    rss = usage.ru_maxrss // 1024 if sys.platform == "darwin" else usage.ru_maxrss
+    return {
+        "command": [os.path.basename(command[1])] + command[2:],
+        "exit_code": proc.returncode,
+        "wall_s": round(wall, 3),
+        "cpu_s": round(usage.ru_utime + usage.ru_stime, 3),
+        "peak_rss_kb": rss,
+        "log": log_path,
+    }
+
+
+def read_profile(workdir: str) -> Dict[str, Any]:
+    """阶段脚本 --profile 输出的摘要（各阶段耗时与峰值 RSS）；读取后删除，避免被下一个阶段误读"""
+    path = newest(workdir, f"{PROFILE_PREFIX}*.json")
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    os.remove(path)
+    return profile
+
+
+def script(name: str) -> List[str]:
+    return [sys.executable, os.path.join(SCRIPT_DIR, name)]
+
+
+def stage_crawl(args: argparse.Namespace, base_url: str, workdir: str) -> Tuple[List[str], Any]:
+    command = script("crawl_site_seo.py") + [
+        "--base-url", base_url, "--sitemap", f"{base_url}/sitemap.xml", "--config", "",
+        "--max-pages", str(args.pages * 2 + 10), "--max-depth", "50", "--max-time", "86400",
+        "--concurrency", str(args.concurrency), "--per-host", str(args.concurrency),
+        "--profile",
+    ] + (["--adaptive"] if args.adaptive else [])
+
+    def pages() -> Tuple[int, Optional[str], Dict[str, Any]]:
+        report = newest(workdir, "site_crawl_seo_*.json")
+        if not report:
+            return 0, None, {}
+        with open(report, "r", encoding="utf-8") as f:
+            summary = json.load(f)["summary"]
+        graph = summary.get("hreflang_graph") or {}
+        details = {
+            "hreflang_clusters": graph.get("clusters"),
+            "missing_return_links": graph.get("missing_return_links"),
+            "broken_alternates": graph.get("broken_alternates"),
+            "canonical_graph": summary.get("canonical_graph"),
+        }
+        return summary.get("pages_crawled", 0), report, details
+
+    return command, pages
+
+
+def stage_offline(args: argparse.Namespace, base_url: str, workdir: str) -> Tuple[List[str], Any]:
+    command = script("batch_analyze_pages.py") + [
+        os.path.join(workdir, "pages.tar.gz"), "--base-url", base_url,
+        "--workers", str(args.workers), "--quiet", "--profile",
+    ]
+
+    def pages() -> Tuple[int, Optional[str], Dict[str, Any]]:
+        report = newest(workdir, "offline_batch_analysis_*.jsonl")
+        if not report:
+            return 0, None, {}
+        summary: Dict[str, Any] = {}
+        with open(report, "r", encoding="utf-8") as f:
+            for line in f:
+                record = json.loads(line)
+                if "summary" in record:
+                    summary = record["summary"]
+        return summary.get("pages", 0), report, {"findings_by_check": summary.get("findings_by_check")}
+
+    return command, pages
+
+
+def stage_history(args: argparse.Namespace, base_url: str, workdir: str) -> Tuple[List[str], Any]:
+    db = os.path.join(workdir, "history.sqlite3")
+    report = newest(workdir, "site_crawl_seo_*.json")
+    command = script("seo_history.py") + ["--db", db, "--profile", "ingest"] + ([report] if report else [])
+
+    def pages() -> Tuple[int, Optional[str], Dict[str, Any]]:
+        if not report or not os.path.exists(db):
+            return 0, None, {}
+        with HistoryStore(db) as store:
+            return sum(run.page_count for run in store.runs()), db, {}
+
+    return command, pages
+
+
+STAGE_BUILDERS = {"crawl": stage_crawl, "offline": stage_offline, "history": stage_history}
+
+
+def run_stage(name: str, args: argparse.Namespace, base_url: str, workdir: str) -> Dict[str, Any]:
+    command, count_pages = STAGE_BUILDERS[name](args, base_url, workdir)
+    result = run_command(name, command, workdir)
+    pages, report, details = count_pages()
+    profile = read_profile(workdir)
+    if profile.get("max_rss_kb"):
+        # wait4 的 ru_maxrss 包含 fork 时本进程（合成站点与 tar 包数据）的内存，优先使用子进程自己测得的值
+        result["peak_rss_kb"] = profile["max_rss_kb"]
+    wall, cpu = result["wall_s"], result["cpu_s"]
+    result.update({
+        "pages": pages,
+        "pages_per_sec": round(pages / wall, 1) if pages and wall else None,
+        "cpu_ms_per_page": round(cpu * 1000 / pages, 3) if pages else None,
+        "report": os.path.basename(report) if report else None,
+        "phases": profile.get("phases"),
+        **details,
+    })
+    if not pages:
+        result["error"] = f"阶段没有产出报告，见日志 {result['log']}"
+    return result
+
+
+def compare(baseline: Dict[str, Any], stages: Dict[str, Dict[str, Any]], threshold: float) -> List[Dict[str, Any]]:
+    """与基线逐阶段对比；变差超过 threshold（比例）的指标标记为回退"""
+    rows = []
+    for name, current in stages.items():
+        previous = (baseline.get("stages") or {}).get(name)
+        if not previous:
+            continue
+        for metric, higher_is_better in METRICS:
+            before, after = previous.get(metric), current.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            rows.append({
+                "stage": name,
+                "metric": metric,
+                "before": before,
+                "after": after,
+                "change": round(change, 4),
+                "regressed": worse > threshold,
+            })
+    return rows
+
+
+def print_stage(name: str, result: Dict[str, Any]) -> None:
+    if "error" in result:
+        print(f"❌ {name:<8} {result['error']}")
+        return
+    print(f"✅ {name:<8} {result['pages']:>7} 页  {result['wall_s']:>8.2f}s  {result['pages_per_sec']:>8} 页/秒  "
+          f"CPU {result['cpu_s']:.2f}s（{result['cpu_ms_per_page']} ms/页）  "
+          f"峰值 RSS {result['peak_rss_kb'] / 1024:.1f} MB")
+    phases = result.get("phases") or {}
+    parts = [f"{phase} {stats['wall_s']:.2f}s/CPU {stats['cpu_s']:.2f}s" for phase, stats in phases.items()
+             if stats.get("calls")]
+    if parts:
+        print(f"      {', '.join(parts)}")
+
+
+def serve(site: SyntheticSite, args: argparse.Namespace) -> int:
+    with FixtureServer(site, workers=args.server_workers) as server:
+        print(f"🌐 合成站点已启动: {server.base_url}（{site.pages} 页，sitemap: {server.base_url}/sitemap.xml）")
+        print("   按 Ctrl+C 停止")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="审计流水线基准测试（合成站点上的 pages/sec、峰值 RSS 与 CPU）")
+    parser.add_argument("--pages", type=int, default=1000, help=f"合成站点页面数（{MIN_PAGES}–{MAX_PAGES}，默认 1000）")
+    parser.add_argument("--defect-rate", type=float, default=0.05, help="注入缺陷的 hreflang 集群比例（默认 0.05）")
+    parser.add_argument("--seed", type=int, default=1, help="缺陷分布的随机种子")
+    parser.add_argument("--body-kb", type=int, default=DEFAULT_BODY_KB, help=f"每页 <body> 大小（KB，默认 {DEFAULT_BODY_KB}）")
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="服务器对每个请求额外延迟的毫秒数（模拟网络往返）")
+    parser.add_argument("--server-workers", type=int, default=min(4, os.cpu_count() or 1), help="合成站点的服务进程数")
+    parser.add_argument("--concurrency", type=int, default=16, help="crawl 阶段的全局与单主机并发数（默认 16）")
+    parser.add_argument("--adaptive", action="store_true", help="crawl 阶段开启按主机自适应并发（--concurrency 为起点与上限）")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="offline 阶段的进程数（默认 CPU 核数）")
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=list(STAGES), help="要运行的阶段（默认全部）")
+    parser.add_argument("--output", default=None, help="结果 JSON 文件（默认 audit_benchmark_<时间戳>.json）")
+    parser.add_argument("--baseline", default=None, help="之前的结果 JSON；给出时对比并在回退时返回非零退出码")
+    parser.add_argument("--threshold", type=float, default=0.10, help="判定回退的变差比例（默认 0.10）")
+    parser.add_argument("--keep", action="store_true", help="保留工作目录（阶段报告与日志）")
+    parser.add_argument("--serve", action="store_true", help="只启动合成站点并打印地址，不运行阶段")
+    args = parser.parse_args()
+
+    if not MIN_PAGES <= args.pages <= MAX_PAGES:
+        print(f"❌ --pages 必须在 {MIN_PAGES} 到 {MAX_PAGES} 之间")
+        return 1
+    if "history" in args.stages and "crawl" not in args.stages:
+        print("❌ history 阶段导入 crawl 阶段的报告，需要同时运行 crawl")
+        return 1
+    stages = [name for name in STAGES if name in args.stages]
+
+    site = SyntheticSite(args.pages, defect_rate=args.defect_rate, seed=args.seed, body_kb=args.body_kb,
+                         latency=args.latency_ms / 1000)
+    if args.serve:
+        return serve(site, args)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    workdir = tempfile.mkdtemp(prefix="seo-audit-benchmark-")
+    print("🚀 审计流水线基准测试")
+    print(f"📄 合成站点: {site.pages} 页, 缺陷比例 {args.defect_rate}, <body> {args.body_kb} KB, "
+          f"额外延迟 {args.latency_ms} ms, 服务进程 {args.server_workers}")
+    print(f"🧩 阶段: {', '.join(stages)}  工作目录: {workdir}\n")
+
+    results: Dict[str, Dict[str, Any]] = {}
+    setup: Dict[str, float] = {}
+    try:
+        with FixtureServer(site, workers=args.server_workers) as server:
+            if "offline" in stages:
+                started = time.perf_counter()
+                site.write_tarball(os.path.join(workdir, "pages.tar.gz"), server.base_url)
+                setup["tarball_s"] = round(time.perf_counter() - started, 3)
+            for name in stages:
+                results[name] = run_stage(name, args, server.base_url, workdir)
+                print_stage(name, results[name])
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "timestamp": datetime.now().isoformat(),
+        "revision": git_revision(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "params": {
+            "pages": site.pages,
+            "defect_rate": args.defect_rate,
+            "seed": args.seed,
+            "body_kb": args.body_kb,
+            "latency_ms": args.latency_ms,
+            "server_workers": args.server_workers,
+            "concurrency": args.concurrency,
+            "adaptive": args.adaptive,
+            "workers": args.workers,
+        },
+        "injected_defects": site.defect_counts(),
+        "setup": setup,
+        "stages": results,
+    }
+    failed = any("error" in result for result in results.values())
+
+    regressions = []
+    if baseline is not None:
+        comparison = compare(baseline, results, args.threshold)
+        report["baseline"] = {"file": args.baseline, "revision": baseline.get("revision"),
+                              "threshold": args.threshold, "comparison": comparison}
+        if baseline.get("params") != report["params"]:
+            print("\n⚠️  基线的参数与本次不同，对比结果仅供参考")
+        print(f"\n📈 与基线对比（{args.baseline}，版本 {baseline.get('revision') or '未知'}）:")
+        for row in comparison:
+            mark = "🔴" if row["regressed"] else "  "
+            print(f"   {mark} {row['stage']:<8} {row['metric']:<16} {row['before']} -> {row['after']}"
+                  f"（{row['change']:+.1%}）")
+        regressions = [row for row in comparison if row["regressed"]]
+
+    output_file = args.output or f"audit_benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"\n📊 结果已保存到: {output_file}")
+    if args.keep:
+        print(f"📁 阶段报告与日志保留在: {workdir}")
+
+    if regressions:
+        print(f"❌ {len(regressions)} 项指标变差超过 {args.threshold:.0%}")
+        return 1
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
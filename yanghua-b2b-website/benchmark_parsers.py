@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+解析后端基准测试
+对本地保存的页面源码逐个后端测量 pages/sec 与峰值内存，用于确定 seo_audit.parsers 的 auto 优先级。
+每个后端在独立子进程中运行，峰值 RSS 互不干扰（lxml/selectolax 的 C 内存不计入 tracemalloc，
+因此同时报告 RSS 增量与 Python 堆峰值）。
+
+用法示例：
+  python3 benchmark_parsers.py
+  python3 benchmark_parsers.py --repeat 200 --head-only
+  python3 benchmark_parsers.py contact_page_source.html --output parser_benchmark.json
+"""
+
+import argparse
+import glob
+import json
+import multiprocessing
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, List
+
+from seo_audit.parsers import available_backends, get_backend
+
+DEFAULT_PATTERNS = [
+    "articles_list.html",
+    "*_page_source*.html",
+    "yanghua-b2b-website/homepage_*.html",
+]
+
+
+def head_part(html: str) -> str:
+    pos = html.lower().find('</head>')
+    return html if pos == -1 else html[:pos + len('</head>')]
+
+
+def max_rss_kb() -> int:
+    # Linux 上 ru_maxrss 单位为 KB，macOS 上为字节
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+def run_backend(name: str, pages: List[str], repeat: int) -> Dict:
+    """在子进程中执行：预热后计时，再单独测一轮内存"""
+    backend = get_backend(name)
+    rss_before = max_rss_kb()
+    for html in pages:
+        backend.extract(html)
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    for _ in range(repeat):
+        for html in pages:
+            backend.extract(html)
+    wall = time.perf_counter() - started
+    cpu = time.process_time() - cpu_started
+    rss_after = max_rss_kb()
+
+    tracemalloc.start()
+    for html in pages:
+        backend.extract(html)
+    _, heap_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    total = repeat * len(pages)
+    return {
+        "backend": name,
+        "pages": total,
+        "wall_seconds": round(wall, 4),
+        "cpu_seconds": round(cpu, 4),
+        "pages_per_sec": round(total / wall, 1) if wall else None,
+        "peak_rss_delta_kb": max(0, rss_after - rss_before),
+        "peak_rss_kb": rss_after,
+        "python_heap_peak_kb": round(heap_peak / 1024, 1),
+    }
+
+
+def _worker(name: str, pages: List[str], repeat: int, queue) -> None:
+    try:
+        queue.put(run_backend(name, pages, repeat))
+    except Exception as e:
+        queue.put({"backend": name, "error": str(e)})
+
+
+def main():
+    parser = argparse.ArgumentParser(description="解析后端基准测试（pages/sec 与峰值内存）")
+    parser.add_argument("files", nargs="*", help="页面源码文件（默认使用本地保存的页面源码）")
+    parser.add_argument("--repeat", type=int, default=50, help="每个后端重复解析语料的轮数（默认 50）")
+    parser.add_argument("--head-only", action="store_true", help="只解析 <head> 部分，模拟 head-only 抓取")
+    parser.add_argument("--backend", action="append", help="只测试指定后端（可重复），默认测试全部已安装后端")
+    parser.add_argument("--output", help="将结果另存为 JSON 文件")
+    args = parser.parse_args()
+
+    files = args.files or sorted({f for pattern in DEFAULT_PATTERNS for f in glob.glob(pattern)})
+    if not files:
+        print("❌ 未找到页面源码文件")
+        return 1
+
+    pages = []
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+        pages.append(head_part(html) if args.head_only else html)
+    corpus_kb = sum(len(p.encode('utf-8')) for p in pages) / 1024
+
+    backends = args.backend or available_backends()
+    print("🚀 解析后端基准测试")
+    print(f"📄 语料: {len(pages)} 个文件, {corpus_kb:.1f} KB{'（仅 <head>）' if args.head_only else ''}, 重复 {args.repeat} 轮")
+    print(f"🧩 后端: {', '.join(backends)}\n")
+
+    ctx = multiprocessing.get_context("spawn")
+    results = []
+    for name in backends:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_worker, args=(name, pages, args.repeat, queue))
+        proc.start()
+        result = queue.get()
+        proc.join()
+        results.append(result)
+        if "error" in result:
+            print(f"❌ {name}: {result['error']}")
+        else:
+            print(f"✅ {name:<12} {result['pages_per_sec']:>10} pages/sec   "
+                  f"CPU {result['cpu_seconds']:.2f}s   RSS +{result['peak_rss_delta_kb']} KB   "
+                  f"Python 堆峰值 {result['python_heap_peak_kb']} KB")
+
+    ranked = sorted((r for r in results if "error" not in r), key=lambda r: r["pages_per_sec"] or 0, reverse=True)
+    if ranked:
+        print(f"\n🏆 最快后端: {ranked[0]['backend']}（可通过 SEO_AUDIT_PARSER={ranked[0]['backend']} 指定）")
+
+    if args.output:
+        report = {
+            "timestamp": datetime.now().isoformat(),
+            "files": files,
+            "head_only": args.head_only,
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"📊 结果已保存到: {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
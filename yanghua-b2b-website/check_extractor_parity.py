@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+验证各解析后端（seo_audit.parsers）与 BeautifulSoup html.parser 的提取结果完全一致
+- 默认对比本地保存的页面源码（articles_list.html、*_page_source*.html、homepage_*.html）
+- 同时验证只有 <head> 部分（head-only 抓取）时结果不变
+- 未安装依赖的后端（lxml、selectolax）自动跳过
+
+用法示例：
+  python3 check_extractor_parity.py
+  python3 check_extractor_parity.py contact_page_source.html production_page_source_latest.html
+"""
+
+import argparse
+import glob
+import sys
+from typing import Dict, List
+
+from seo_audit.parsers import SEO_FIELDS, available_backends, get_backend
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+
+DEFAULT_PATTERNS = [
+    "articles_list.html",
+    "*_page_source*.html",
+    "yanghua-b2b-website/homepage_*.html",
+]
+
+
+def head_part(html: str) -> str:
+    pos = html.lower().find('</head>')
+    return html if pos == -1 else html[:pos + len('</head>')]
+
+
+def diff_fields(expected: Dict, actual: Dict) -> List[str]:
+    return [f"{field}: 期望 {expected[field]!r}, 实际 {actual[field]!r}"
+            for field in SEO_FIELDS if expected[field] != actual[field]]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="对比各解析后端与 BeautifulSoup 的 SEO 标签提取结果")
+    parser.add_argument("files", nargs="*", help="要对比的 HTML 文件（默认使用本地保存的页面源码）")
+    parser.add_argument("--backend", action="append", help="只检查指定后端（可重复），默认检查全部已安装后端")
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
+    reference = get_backend("html.parser")
+    backends = [get_backend(name) for name in (args.backend or available_backends()) if name != reference.name]
+
+    files = args.files or sorted({f for pattern in DEFAULT_PATTERNS for f in glob.glob(pattern)})
+    if not files:
+        print("❌ 未找到可对比的 HTML 文件")
+        return 1
+
+    print(f"=== 解析后端一致性检查，共 {len(files)} 个文件，后端: {', '.join(b.name for b in backends)} ===\n")
+    failed = 0
+    for path in files:
+        with open(path, 'r', encoding='utf-8') as f:
+            html = f.read()
+
+        expected = reference.extract(html)
+        problems = []
+        for backend in backends:
+            problems += [f"[{backend.name}] {p}" for p in diff_fields(expected, backend.extract(html))]
+            problems += [f"[{backend.name} head-only] {p}"
+                         for p in diff_fields(expected, backend.extract(head_part(html)))]
+
+        if problems:
+            failed += 1
+            print(f"❌ {path}")
+            for problem in problems:
+                print(f"   - {problem}")
+        else:
+            print(f"✅ {path}  (canonical={expected['canonical']}, hreflang {len(expected['hreflang'])} 条)")
+
+    print(f"\n总计: {len(files)}  一致: {len(files) - failed}  不一致: {failed}")
+    return 0 if failed == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
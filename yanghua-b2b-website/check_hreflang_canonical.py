@@ -1,33 +1,36 @@
 #!/usr/bin/env python3
 """
 检查生产环境页面的 canonical 和 hreflang 标签一致性
+默认读取手工保存的 production_page_source_latest.html；--from-snapshot / --from-warc 时从快照运行或 WARC 中读取 --url 页面
+批量分析目录 / tar 包 / WARC 中的大量页面请使用 batch_analyze_pages.py
+
+用法示例：
+  python3 check_hreflang_canonical.py
+  python3 check_hreflang_canonical.py --from-snapshot latest --url https://www.yhflexiblebusbar.com/es
 """
 
-from bs4 import BeautifulSoup
+import argparse
 import sys
 
-def analyze_canonical_hreflang(html_file):
-    """分析 canonical 和 hreflang 标签的一致性"""
-    
-    with open(html_file, 'r', encoding='utf-8') as f:
-        content = f.read()
-    
-    soup = BeautifulSoup(content, 'html.parser')
-    
-    # 查找 canonical 标签
-    canonical_tag = soup.find('link', rel='canonical')
-    canonical_url = canonical_tag.get('href') if canonical_tag else None
+from seo_audit.checks import double_slash_issues
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+from seo_audit.snapshots import add_replay_arguments, replay_from_args
+
+DEFAULT_URL = "https://www.yhflexiblebusbar.com/en"
+
+def analyze_canonical_hreflang(html_file, replay=None, url=DEFAULT_URL):
+    """分析 canonical 和 hreflang 标签的一致性；给出 replay 时从快照读取 url 页面"""
     
-    # 查找所有 hreflang 标签
-    hreflang_tags = soup.find_all('link', rel='alternate')
-    hreflang_urls = []
+    if replay is not None:
+        content = replay.get_text(url, head_only=True)
+    else:
+        with open(html_file, 'r', encoding='utf-8') as f:
+            content = f.read()
     
-    for tag in hreflang_tags:
-        if tag.get('hreflang'):
-            hreflang_urls.append({
-                'hreflang': tag.get('hreflang'),
-                'href': tag.get('href')
-            })
+    page = PageSeo.parse(content) or PageSeo()
+    canonical_url = page.canonical
+    hreflang_urls = [tag for tag in page.hreflang if tag['hreflang']]
     
     # 输出结果
     print("=== Canonical 和 Hreflang 标签分析 ===")
@@ -53,27 +56,29 @@ def analyze_canonical_hreflang(html_file):
     
     # 检查双斜杠问题
     print(f"\n=== 双斜杠问题检查 ===")
-    double_slash_issues = []
-    
-    if canonical_url and '//' in canonical_url.replace('https://', '').replace('http://', ''):
-        double_slash_issues.append(f"Canonical: {canonical_url}")
-    
-    for hreflang in hreflang_urls:
-        if hreflang['href'] and '//' in hreflang['href'].replace('https://', '').replace('http://', ''):
-            double_slash_issues.append(f"Hreflang ({hreflang['hreflang']}): {hreflang['href']}")
+    slash_issues = double_slash_issues(page)
     
-    if double_slash_issues:
+    if slash_issues:
         print("❌ 发现双斜杠问题:")
-        for issue in double_slash_issues:
+        for issue in slash_issues:
             print(f"  - {issue}")
     else:
         print("✅ 未发现双斜杠问题")
     
-    return canonical_consistent and len(double_slash_issues) == 0
+    return canonical_consistent and len(slash_issues) == 0
 
 if __name__ == "__main__":
-    html_file = "production_page_source_latest.html"
-    success = analyze_canonical_hreflang(html_file)
+    parser = argparse.ArgumentParser(description="检查页面 canonical 与 hreflang 标签一致性")
+    parser.add_argument("--file", default="production_page_source_latest.html", help="本地保存的页面源码")
+    parser.add_argument("--url", default=DEFAULT_URL, help=f"--from-snapshot / --from-warc 时读取的页面（默认 {DEFAULT_URL}）")
+    add_replay_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    replay = replay_from_args(args)
+    if replay is not None:
+        print(f"📸 快照运行: {replay.run_id}")
+    success = analyze_canonical_hreflang(args.file, replay, args.url)
     
     if success:
         print("\n🎉 所有检查通过! Hreflang 'not using canonical' 问题已修复!")
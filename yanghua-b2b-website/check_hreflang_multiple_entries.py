@@ -14,15 +14,18 @@ import json
 import os
 import re
 import sys
-import time
 from typing import Dict, List, Tuple
 
-import requests
-from bs4 import BeautifulSoup
+from seo_audit.checks import REQUIRED_LANGS, alternate_pairs, detect_duplicates
+from seo_audit.client import get_client
+from seo_audit.fetch import (DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, adaptive_from_args, add_adaptive_arguments,
+                             iter_ordered)
+from seo_audit.page import PageSeo
+from seo_audit.parsers import PARSER_CHOICES, set_default_backend
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
 
 DEFAULT_CONFIG = "seo-pages.config.json"
-EXPECTED_LANGS = ["en", "es", "x-default"]
-UA = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0 Safari/537.36"
+EXPECTED_LANGS = list(REQUIRED_LANGS)
 
 
 def load_paths_from_config(config_path: str) -> List[str]:
@@ -36,8 +39,8 @@ def load_paths_from_config(config_path: str) -> List[str]:
 
 
 def fetch(url: str) -> Tuple[int, Dict[str, str], bytes]:
-    headers = {"User-Agent": UA}
-    resp = requests.get(url, headers=headers, timeout=20)
+    # alternates 只出现在 <head> 与响应头中，无需下载正文
+    resp = get_client().get(url, head_only=True)
     code = resp.status_code
     # 将多值 header 折叠为字符串
     hdrs = {k: ", ".join(v) if isinstance(v, list) else str(v) for k, v in resp.headers.items()}
@@ -45,15 +48,7 @@ def fetch(url: str) -> Tuple[int, Dict[str, str], bytes]:
 
 
 def extract_html_alternates(html: bytes) -> List[Tuple[str, str]]:
-    soup = BeautifulSoup(html, "html.parser")
-    tags = soup.find_all("link", rel="alternate")
-    results: List[Tuple[str, str]] = []
-    for tag in tags:
-        hreflang = (tag.get("hreflang") or "").strip().lower()
-        href = (tag.get("href") or "").strip()
-        if hreflang:
-            results.append((hreflang, href))
-    return results
+    return alternate_pairs(PageSeo.parse(html) or PageSeo())
 
 
 def parse_link_header(link_value: str) -> List[Tuple[str, str]]:
@@ -65,19 +60,6 @@ def parse_link_header(link_value: str) -> List[Tuple[str, str]]:
     return [(lang.lower(), href) for href, lang in matches]
 
 
-def detect_duplicates(entries: List[Tuple[str, str]]) -> Dict[str, Dict[str, List[str]]]:
-    # 返回 {lang: {"all": [...], "unique": [...], "is_duplicate": bool}}
-    mapping: Dict[str, List[str]] = {}
-    for lang, href in entries:
-        mapping.setdefault(lang, []).append(href)
-    result: Dict[str, Dict[str, List[str]]] = {}
-    for lang, hrefs in mapping.items():
-        normalized = [h.rstrip("/") for h in hrefs if h]
-        uniq = sorted(set(normalized))
-        result[lang] = {"all": hrefs, "unique": uniq, "is_duplicate": len(hrefs) > 1 and len(uniq) > 1}
-    return result
-
-
 def check_one_url(base_url: str, path: str) -> Dict:
     url = base_url.rstrip("/") + path
     code, headers, body = fetch(url)
@@ -119,8 +101,17 @@ def main():
     parser = argparse.ArgumentParser(description="验证 hreflang multiple entries 问题是否修复")
     parser.add_argument("--base-url", required=True, help="要测试的基础域名，例如 http://localhost:3001 或 https://www.yhflexiblebusbar.com")
     parser.add_argument("--config", default=DEFAULT_CONFIG, help="页面路径配置文件，默认 seo-pages.config.json")
-    parser.add_argument("--delay", type=float, default=0.5, help="每个请求之间的延迟秒数")
+    parser.add_argument("--delay", type=float, default=0.0, help="同一主机相邻请求之间的最小间隔秒数（默认不限）")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_MAX_IN_FLIGHT, help="全局最大并发请求数")
+    parser.add_argument("--per-host", type=int, default=DEFAULT_PER_HOST, help="单个主机的最大并发请求数")
+    add_adaptive_arguments(parser)
+    parser.add_argument("--parser", choices=PARSER_CHOICES, default=None, help="HTML 解析后端（默认 auto：已安装的最快后端）")
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    profiler_from_args(args)
+    adaptive_from_args(args)
+    if args.parser:
+        set_default_backend(args.parser)
 
     paths = load_paths_from_config(args.config)
     print(f"=== 开始检查（base: {args.base_url}） 共 {len(paths)} 个路径 ===\n")
@@ -128,8 +119,15 @@ def main():
     all_passed = True
     results: List[Dict] = []
 
-    for i, path in enumerate(paths, 1):
-        res = check_one_url(args.base_url, path)
+    ordered = iter_ordered(
+        paths,
+        lambda path: check_one_url(args.base_url, path),
+        url_of=lambda path: args.base_url,
+        max_in_flight=args.concurrency,
+        per_host=args.per_host,
+        min_interval=args.delay,
+    )
+    for i, (path, res) in enumerate(ordered, 1):
         results.append(res)
 
         print(f"[{i}/{len(paths)}] {res['url']}  ->  HTTP {res['status_code']}")
@@ -147,15 +145,13 @@ def main():
         else:
             print("   ✅ 通过（无 Link 头，且无重复 hreflang 条目）")
 
-        if i < len(paths):
-            time.sleep(args.delay)
-
     # 汇总
     print("\n=== 汇总 ===")
     total = len(results)
     passed = sum(1 for r in results if r["passed"])
     failed = total - passed
     print(f"总计: {total}  通过: {passed}  失败: {failed}")
+    print(get_client().describe_stats())
 
     if failed > 0:
         print("\n失败页面列表：")
@@ -3,65 +3,35 @@
 检查本地开发环境的 canonical 和 hreflang 标签一致性
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import sys
-import time
+
+from seo_audit.checks import double_slash_issues, missing_langs
+from seo_audit.client import get_client
+from seo_audit.fetch import iter_ordered
+from seo_audit.page import PageSeo, fetch_page_seo
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
 
 def check_url_hreflang_canonical(url):
     """检查单个URL的 canonical 和 hreflang 标签一致性"""
     
     try:
-        # 获取页面内容
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        soup = BeautifulSoup(response.content, 'html.parser')
-        
-        # 查找 canonical 标签
-        canonical_tag = soup.find('link', rel='canonical')
-        canonical_url = canonical_tag.get('href') if canonical_tag else None
-        
-        # 查找所有 hreflang 标签
-        hreflang_tags = soup.find_all('link', rel='alternate')
-        hreflang_urls = []
+        # 获取页面 <head>（canonical 与 hreflang 都在其中）并解析为 PageSeo
+        _, page = fetch_page_seo(url)
+        page = page or PageSeo(url=url)
+        canonical_url = page.canonical
+        hreflang_urls = [tag for tag in page.hreflang if tag['hreflang']]
         
-        for tag in hreflang_tags:
-            if tag.get('hreflang'):
-                hreflang_urls.append({
-                    'hreflang': tag.get('hreflang'),
-                    'href': tag.get('href')
-                })
+        # 检查双斜杠问题（canonical 与 hreflang）
+        slash_issues = double_slash_issues(page)
         
-        # 检查一致性
-        canonical_consistent = True
-        double_slash_issues = []
-        
-        # 检查双斜杠问题
-        if canonical_url and '//' in canonical_url.replace('https://', '').replace('http://', ''):
-            double_slash_issues.append(f"Canonical: {canonical_url}")
-        
-        # 检查 hreflang 双斜杠问题
-        for hreflang in hreflang_urls:
-            href = hreflang['href']
-            
-            # 检查双斜杠问题
-            if '//' in href.replace('https://', '').replace('http://', ''):
-                double_slash_issues.append(f"Hreflang ({hreflang['hreflang']}): {href}")
-        
-        # 检查 hreflang 完整性 - 应该包含所有支持的语言
-        hreflang_langs = [h['hreflang'] for h in hreflang_urls]
-        expected_langs = ['en', 'es', 'x-default']
-        missing_langs = [lang for lang in expected_langs if lang not in hreflang_langs]
+        # 检查 hreflang 完整性 - 应该包含所有支持的语言（en、es、x-default）
+        missing = missing_langs(page)
         
         # 如果缺少必要的hreflang标签，标记为不一致
-        if missing_langs:
-            canonical_consistent = False
+        canonical_consistent = not missing
         
-        success = canonical_consistent and len(double_slash_issues) == 0
+        success = canonical_consistent and len(slash_issues) == 0
         
         return {
             'url': url,
@@ -69,8 +39,8 @@ def check_url_hreflang_canonical(url):
             'canonical_url': canonical_url,
             'hreflang_urls': hreflang_urls,
             'canonical_consistent': canonical_consistent,
-            'double_slash_issues': double_slash_issues,
-            'missing_hreflang_langs': missing_langs if 'missing_langs' in locals() else []
+            'double_slash_issues': slash_issues,
+            'missing_hreflang_langs': missing
         }
         
     except Exception as e:
@@ -82,6 +52,9 @@ def check_url_hreflang_canonical(url):
 
 def main():
     """批量检查本地开发环境的URL"""
+    parser = argparse.ArgumentParser(description="检查本地开发环境的 canonical 和 hreflang 标签一致性")
+    add_profile_arguments(parser)
+    profiler_from_args(parser.parse_args())
     
     # 本地开发环境的URL列表
     test_urls = [
@@ -110,10 +83,10 @@ def main():
     all_passed = True
     results = []
     
-    for i, url in enumerate(test_urls, 1):
+    # 并发抓取，按原顺序逐条输出
+    for i, (url, result) in enumerate(iter_ordered(test_urls, check_url_hreflang_canonical), 1):
         print(f"[{i}/{len(test_urls)}] 检查: {url}")
         
-        result = check_url_hreflang_canonical(url)
         results.append(result)
         
         if 'error' in result:
@@ -135,10 +108,6 @@ def main():
                     for issue in result['double_slash_issues']:
                         print(f"      {issue}")
                 all_passed = False
-        
-        # 避免请求过快
-        if i < len(test_urls):
-            time.sleep(0.5)
     
     # 输出总结
     print(f"\n=== 检查结果总结 ===")
@@ -148,6 +117,7 @@ def main():
     print(f"总计检查: {total_count} 个URL")
     print(f"通过检查: {passed_count} 个URL")
     print(f"失败检查: {total_count - passed_count} 个URL")
+    print(get_client().describe_stats())
     
     if all_passed:
         print(f"\n🎉 所有检查通过! 本地开发环境的 Canonical URL 问题已修复!")
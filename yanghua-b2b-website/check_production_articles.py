@@ -2,35 +2,40 @@
 """
 生产环境文章页面 SEO 标签验证脚本
 检查实际文章页面的 hreflang 和 canonical 标签
+每篇文章检查完即追加到 .jsonl（中途中断不丢失已完成的结果），结束时由它生成原格式的 .json 报告
 """
 
-import requests
 from bs4 import BeautifulSoup
 import json
 from datetime import datetime
 import sys
 import argparse
 
+from seo_audit.client import get_client
+from seo_audit.extract import BASIC_FIELDS
+from seo_audit.latency import add_latency_arguments, latency_report_from_args
+from seo_audit.page import PageSeo
+from seo_audit.parsers import PARSER_CHOICES, set_default_backend
+from seo_audit.profiling import add_profile_arguments, note_report, profiled, profiler_from_args
+from seo_audit.results import ResultSink, write_report
+from seo_audit.sitemap import iter_sitemap, sitemap_lastmods
+from seo_audit.state import DEFAULT_STATE_PATH, StateStore, check_revision, describe_revisions
+
 # 生产环境配置
 PRODUCTION_BASE_URL = "https://www.yhflexiblebusbar.com"
 
+@profiled('discover')
 def get_articles_from_sitemap(max_count: int = 50):
     """从 sitemap.xml 获取文章链接（可设置最大数量）"""
     try:
         sitemap_url = f"{PRODUCTION_BASE_URL}/sitemap.xml"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        res = requests.get(sitemap_url, headers=headers, timeout=30)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, 'xml')
-        locs = soup.find_all('loc')
-        urls = []
-        for loc in locs:
-            u = (loc.get_text() or '').strip()
-            if '/articles/' in u:
-                urls.append(u)
-        unique = list(dict.fromkeys(urls))[:max_count]
+        # 流式读取（含 sitemapindex 子 sitemap），凑够 max_count 篇即停止下载
+        unique = []
+        for entry in iter_sitemap(sitemap_url):
+            if '/articles/' in entry.loc and entry.loc not in unique:
+                unique.append(entry.loc)
+                if len(unique) >= max_count:
+                    break
         if unique:
             print(f"通过 sitemap.xml 获取到 {len(unique)} 篇文章链接")
         return unique
@@ -38,6 +43,7 @@ def get_articles_from_sitemap(max_count: int = 50):
         print(f"⚠️ 从 sitemap.xml 获取文章失败: {e}")
         return []
 
+@profiled('discover')
 def get_articles_from_local_data(max_count: int = 50):
     """从本地导出的 article_data.json 获取文章链接（作为兜底，可设置最大数量）"""
     try:
@@ -59,18 +65,13 @@ def get_articles_from_local_data(max_count: int = 50):
         print(f"⚠️ 从本地文章数据获取失败: {e}")
         return []
 
+@profiled('discover')
 def get_articles_list(max_count: int = 50):
     """获取文章列表（多来源兜底，可设置最大数量）"""
     # 先尝试从英文文章列表页抓取
     try:
         url = f"{PRODUCTION_BASE_URL}/en/articles"
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-
-        soup = BeautifulSoup(response.text, 'html.parser')
+        soup = BeautifulSoup(get_client().get_text(url), 'html.parser')
 
         # 查找文章链接
         article_links = []
@@ -108,75 +109,39 @@ def get_articles_list(max_count: int = 50):
     ]
     
 def get_page_content(url):
-    """获取页面内容"""
+    """获取页面内容（SEO 标签都在 <head> 中，只下载到 </head> 为止）"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        return get_client().get_text(url, head_only=True)
     except Exception as e:
         print(f"❌ 获取页面失败 {url}: {e}")
         return None
 
+SEO_DATA_FIELDS = BASIC_FIELDS + ("og_type", "author")
+
 def extract_seo_tags(html_content):
-    """提取 SEO 相关标签"""
-    if not html_content:
-        return None
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 提取 canonical 标签
-    canonical = soup.find('link', {'rel': 'canonical'})
-    canonical_url = canonical.get('href') if canonical else None
-    
-    # 提取 hreflang 标签
-    hreflang_tags = soup.find_all('link', {'rel': 'alternate', 'hreflang': True})
-    hreflang_data = []
-    for tag in hreflang_tags:
-        hreflang_data.append({
-            'hreflang': tag.get('hreflang'),
-            'href': tag.get('href')
-        })
-    
-    # 提取基本 meta 标签
-    title = soup.find('title')
-    title_text = title.get_text().strip() if title else None
-    
-    meta_description = soup.find('meta', {'name': 'description'})
-    description = meta_description.get('content') if meta_description else None
-    
-    # 提取 Open Graph 标签
-    og_url = soup.find('meta', {'property': 'og:url'})
-    og_url_content = og_url.get('content') if og_url else None
-    
-    # 提取文章特定的 meta 标签
-    og_type = soup.find('meta', {'property': 'og:type'})
-    og_type_content = og_type.get('content') if og_type else None
-    
-    article_author = soup.find('meta', {'name': 'author'})
-    author = article_author.get('content') if article_author else None
-    
-    return {
-        'canonical': canonical_url,
-        'hreflang': hreflang_data,
-        'title': title_text,
-        'description': description,
-        'og_url': og_url_content,
-        'og_type': og_type_content,
-        'author': author
-    }
+    """提取 SEO 相关标签（解析为 PageSeo 后输出与原 BeautifulSoup 版本一致的 dict）"""
+    page = PageSeo.parse(html_content)
+    return page.as_dict(SEO_DATA_FIELDS) if page else None
 
-def check_article_seo(article_url):
-    """检查单篇文章的 SEO 配置"""
+def get_sitemap_lastmods(urls):
+    """增量模式：从 sitemap.xml 读取这些文章的 lastmod（读取失败时只按验证器与内容哈希判断）"""
+    try:
+        return sitemap_lastmods(f"{PRODUCTION_BASE_URL}/sitemap.xml", urls)
+    except Exception as e:
+        print(f"⚠️ 读取 sitemap lastmod 失败，将只按内容哈希判断: {e}")
+        return {}
+
+def check_article_seo(article_url, revision=None):
+    """检查单篇文章的 SEO 配置（增量模式下 revision 为已抓取、解析的结果）"""
     print(f"\n🔍 检查文章: {article_url}")
     
-    html_content = get_page_content(article_url)
-    if not html_content:
-        return None
-    
-    seo_data = extract_seo_tags(html_content)
+    if revision is not None:
+        seo_data = revision.page.as_dict(SEO_DATA_FIELDS) if revision.page else None
+    else:
+        html_content = get_page_content(article_url)
+        if not html_content:
+            return None
+        seo_data = extract_seo_tags(html_content)
     if not seo_data:
         print("❌ 无法提取 SEO 标签")
         return None
@@ -224,6 +189,36 @@ def check_article_seo(article_url):
     
     return seo_data
 
+def check_article_result(article_url, store=None, lastmods=None, revisions=None):
+    """单篇文章的结果条目（报告中的一项）；增量模式下未变化的文章直接复用上次的结果"""
+    try:
+        revision = None
+        if store is not None:
+            revision = check_revision(article_url, store, lastmods.get(article_url))
+            revisions.append(revision)
+            if not revision.changed:
+                print(f"\n⏭️  未变化，跳过: {article_url} [{revision.reason}]")
+                return {
+                    'seo_data': revision.page.as_dict(SEO_DATA_FIELDS),
+                    'status': 'success',
+                    'unchanged': revision.reason
+                }
+        seo_data = check_article_seo(article_url, revision)
+        if seo_data:
+            return {
+                'seo_data': seo_data,
+                'status': 'success'
+            }
+        return {
+            'status': 'failed'
+        }
+    except Exception as e:
+        print(f"❌ 检查文章 {article_url} 时出错: {e}")
+        return {
+            'status': 'error',
+            'error': str(e)
+        }
+
 def main():
     """主函数"""
     print("🚀 开始检查生产环境文章页面 SEO 标签配置")
@@ -235,7 +230,15 @@ def main():
     parser.add_argument('urls', nargs='*', help='要检查的文章 URL 列表（可选）')
     parser.add_argument('--limit', type=int, default=10, help='最多检查的文章数量（默认 10）')
     parser.add_argument('--source', choices=['auto', 'sitemap', 'list', 'local'], default='auto', help='文章来源（默认自动）')
+    parser.add_argument('--parser', choices=PARSER_CHOICES, default=None, help='SEO 标签解析后端（默认 auto：已安装的最快后端）')
+    parser.add_argument('--incremental', action='store_true', help='增量模式：只重新检查 lastmod 或内容哈希发生变化的文章')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help=f'增量模式的状态文件（默认 {DEFAULT_STATE_PATH}）')
+    add_latency_arguments(parser)
+    add_profile_arguments(parser)
     args = parser.parse_args()
+    profiler_from_args(args)
+    if args.parser:
+        set_default_backend(args.parser)
 
     # 如果提供了命令行 URL，优先使用
     if args.urls:
@@ -256,42 +259,43 @@ def main():
         print("❌ 无法获取文章列表")
         return
     
-    results = {}
+    store = StateStore(args.state) if args.incremental else None
+    revisions = []
+    lastmods = get_sitemap_lastmods(article_urls) if store is not None else {}
     
-    for article_url in article_urls:
-        try:
-            seo_data = check_article_seo(article_url)
-            if seo_data:
-                results[article_url] = {
-                    'seo_data': seo_data,
-                    'status': 'success'
-                }
-            else:
-                results[article_url] = {
-                    'status': 'failed'
-                }
-        except Exception as e:
-            print(f"❌ 检查文章 {article_url} 时出错: {e}")
-            results[article_url] = {
-                'status': 'error',
-                'error': str(e)
-            }
-    
-    # 保存结果到文件
-    output_file = f"production_articles_seo_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    # 结果逐条写入 JSONL，摘要按运行中的计数累加；报告按 URL 建索引，重复的 URL 只检查一次
+    sink = ResultSink(f"production_articles_seo_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    total_checks = 0
+    successful_checks = 0
+    try:
+        for article_url in dict.fromkeys(article_urls):
+            result = check_article_result(article_url, store, lastmods, revisions)
+            sink.write(article_url, result)
+            total_checks += 1
+            if result['status'] == 'success':
+                successful_checks += 1
+        sink.close({'total_checks': total_checks, 'successful_checks': successful_checks})
+    finally:
+        # 中途出错时也关闭文件，已写入的逐条结果不丢失（不写摘要）
+        sink.close()
     
-    print(f"\n📊 检查完成，结果已保存到: {output_file}")
+    # 保存结果到文件（由 JSONL 生成原格式的 JSON 报告）
+    output_file, _, _ = write_report(sink.path)
+    note_report(output_file)
     
-    # 生成摘要
-    successful_checks = sum(1 for r in results.values() if r['status'] == 'success')
-    total_checks = len(results)
+    print(f"\n📊 检查完成，结果已保存到: {output_file}（逐条结果: {sink.path}）")
     
     print(f"\n📈 检查摘要:")
     print(f"   - 总文章数: {total_checks}")
     print(f"   - 成功检查: {successful_checks}")
     print(f"   - 失败检查: {total_checks - successful_checks}")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
+    if store is not None:
+        print(f"   - {describe_revisions(revisions)}")
+        store.close()
     
     if successful_checks == total_checks:
         print("🎉 所有文章检查完成！")
@@ -2,14 +2,22 @@
 """
 生产环境 SEO 标签验证脚本
 检查 https://www.yhflexiblebusbar.com 的 hreflang 和 canonical 标签
+每个页面检查完即追加到 .jsonl（中途中断不丢失已完成的结果），结束时由它生成原格式的 .json 报告
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
+import argparse
 from datetime import datetime
 import sys
 
+from seo_audit.client import get_client
+from seo_audit.extract import BASIC_FIELDS
+from seo_audit.latency import add_latency_arguments, latency_report_from_args
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, note_report, profiler_from_args
+from seo_audit.results import ResultSink, write_report
+from seo_audit.sitemap import sitemap_lastmods
+from seo_audit.state import DEFAULT_STATE_PATH, StateStore, check_revision, describe_revisions
+
 # 生产环境配置
 PRODUCTION_BASE_URL = "https://www.yhflexiblebusbar.com"
 
@@ -24,67 +32,38 @@ PAGES_TO_CHECK = [
 ]
 
 def get_page_content(url):
-    """获取页面内容"""
+    """获取页面内容（SEO 标签都在 <head> 中，只下载到 </head> 为止）"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        return get_client().get_text(url, head_only=True)
     except Exception as e:
         print(f"❌ 获取页面失败 {url}: {e}")
         return None
 
 def extract_seo_tags(html_content):
-    """提取 SEO 相关标签"""
-    if not html_content:
-        return None
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 提取 canonical 标签
-    canonical = soup.find('link', {'rel': 'canonical'})
-    canonical_url = canonical.get('href') if canonical else None
-    
-    # 提取 hreflang 标签
-    hreflang_tags = soup.find_all('link', {'rel': 'alternate', 'hreflang': True})
-    hreflang_data = []
-    for tag in hreflang_tags:
-        hreflang_data.append({
-            'hreflang': tag.get('hreflang'),
-            'href': tag.get('href')
-        })
-    
-    # 提取基本 meta 标签
-    title = soup.find('title')
-    title_text = title.get_text().strip() if title else None
-    
-    meta_description = soup.find('meta', {'name': 'description'})
-    description = meta_description.get('content') if meta_description else None
-    
-    # 提取 Open Graph 标签
-    og_url = soup.find('meta', {'property': 'og:url'})
-    og_url_content = og_url.get('content') if og_url else None
-    
-    return {
-        'canonical': canonical_url,
-        'hreflang': hreflang_data,
-        'title': title_text,
-        'description': description,
-        'og_url': og_url_content
-    }
+    """提取 SEO 相关标签（解析为 PageSeo 后输出与原 BeautifulSoup 版本一致的 dict）"""
+    page = PageSeo.parse(html_content)
+    return page.as_dict(BASIC_FIELDS) if page else None
 
-def check_page_seo(page_info):
-    """检查单个页面的 SEO 配置"""
+def get_sitemap_lastmods(urls):
+    """增量模式：从 sitemap.xml 读取这些页面的 lastmod（读取失败时只按验证器与内容哈希判断）"""
+    try:
+        return sitemap_lastmods(f"{PRODUCTION_BASE_URL}/sitemap.xml", urls)
+    except Exception as e:
+        print(f"⚠️ 读取 sitemap lastmod 失败，将只按内容哈希判断: {e}")
+        return {}
+
+def check_page_seo(page_info, revision=None):
+    """检查单个页面的 SEO 配置（增量模式下 revision 为已抓取、解析的结果）"""
     url = f"{PRODUCTION_BASE_URL}{page_info['path']}"
     print(f"\n🔍 检查页面: {page_info['name']} ({url})")
     
-    html_content = get_page_content(url)
-    if not html_content:
-        return None
-    
-    seo_data = extract_seo_tags(html_content)
+    if revision is not None:
+        seo_data = revision.page.as_dict(BASIC_FIELDS) if revision.page else None
+    else:
+        html_content = get_page_content(url)
+        if not html_content:
+            return None
+        seo_data = extract_seo_tags(html_content)
     if not seo_data:
         print("❌ 无法提取 SEO 标签")
         return None
@@ -124,51 +103,92 @@ def check_page_seo(page_info):
     
     return seo_data
 
+def check_page_result(page_info, store=None, lastmods=None, revisions=None):
+    """单个页面的结果条目（报告中的一项）；增量模式下未变化的页面直接复用上次的结果"""
+    try:
+        revision = None
+        if store is not None:
+            url = f"{PRODUCTION_BASE_URL}{page_info['path']}"
+            revision = check_revision(url, store, lastmods.get(url))
+            revisions.append(revision)
+            if not revision.changed:
+                print(f"\n⏭️  未变化，跳过: {page_info['name']} ({url}) [{revision.reason}]")
+                return {
+                    'name': page_info['name'],
+                    'seo_data': revision.page.as_dict(BASIC_FIELDS),
+                    'status': 'success',
+                    'unchanged': revision.reason
+                }
+        seo_data = check_page_seo(page_info, revision)
+        if seo_data:
+            return {
+                'name': page_info['name'],
+                'seo_data': seo_data,
+                'status': 'success'
+            }
+        return {
+            'name': page_info['name'],
+            'status': 'failed'
+        }
+    except Exception as e:
+        print(f"❌ 检查页面 {page_info['name']} 时出错: {e}")
+        return {
+            'name': page_info['name'],
+            'status': 'error',
+            'error': str(e)
+        }
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='生产环境 SEO 标签检查')
+    parser.add_argument('--incremental', action='store_true', help='增量模式：只重新检查 lastmod 或内容哈希发生变化的页面')
+    parser.add_argument('--state', default=DEFAULT_STATE_PATH, help=f'增量模式的状态文件（默认 {DEFAULT_STATE_PATH}）')
+    add_latency_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
     print("🚀 开始检查生产环境 SEO 标签配置")
     print(f"🌐 生产环境: {PRODUCTION_BASE_URL}")
     print(f"⏰ 检查时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    results = {}
-    
-    for page_info in PAGES_TO_CHECK:
-        try:
-            seo_data = check_page_seo(page_info)
-            if seo_data:
-                results[page_info['path']] = {
-                    'name': page_info['name'],
-                    'seo_data': seo_data,
-                    'status': 'success'
-                }
-            else:
-                results[page_info['path']] = {
-                    'name': page_info['name'],
-                    'status': 'failed'
-                }
-        except Exception as e:
-            print(f"❌ 检查页面 {page_info['name']} 时出错: {e}")
-            results[page_info['path']] = {
-                'name': page_info['name'],
-                'status': 'error',
-                'error': str(e)
-            }
-    
-    # 保存结果到文件
-    output_file = f"production_seo_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    store = StateStore(args.state) if args.incremental else None
+    revisions = []
+    lastmods = get_sitemap_lastmods([f"{PRODUCTION_BASE_URL}{p['path']}" for p in PAGES_TO_CHECK]) if store is not None else {}
     
-    print(f"\n📊 检查完成，结果已保存到: {output_file}")
-    
-    # 生成摘要
-    successful_checks = sum(1 for r in results.values() if r['status'] == 'success')
-    total_checks = len(results)
+    # 结果逐条写入 JSONL，摘要按运行中的计数累加
+    sink = ResultSink(f"production_seo_check_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl")
+    total_checks = 0
+    successful_checks = 0
+    try:
+        for page_info in PAGES_TO_CHECK:
+            result = check_page_result(page_info, store, lastmods, revisions)
+            sink.write(page_info['path'], result)
+            total_checks += 1
+            if result['status'] == 'success':
+                successful_checks += 1
+        sink.close({'total_checks': total_checks, 'successful_checks': successful_checks})
+    finally:
+        # 中途出错时也关闭文件，已写入的逐条结果不丢失（不写摘要）
+        sink.close()
+    
+    # 保存结果到文件（由 JSONL 生成原格式的 JSON 报告）
+    output_file, _, _ = write_report(sink.path)
+    note_report(output_file)
+    
+    print(f"\n📊 检查完成，结果已保存到: {output_file}（逐条结果: {sink.path}）")
     
     print(f"\n📈 检查摘要:")
     print(f"   - 总页面数: {total_checks}")
     print(f"   - 成功检查: {successful_checks}")
     print(f"   - 失败检查: {total_checks - successful_checks}")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
+    if store is not None:
+        print(f"   - {describe_revisions(revisions)}")
+        store.close()
     
     if successful_checks == total_checks:
         print("🎉 所有页面检查完成！")
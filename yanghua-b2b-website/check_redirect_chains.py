@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+重定向链检查
+对 seo-pages.config.json 中的每个页面，逐跳解析常见 URL 变体（末尾斜杠、http、裸域 / www）
+以及页面 <head> 中 canonical / hreflang / og:url 目标的重定向链，记录每一跳的状态码、Location 与耗时。
+页面本身与 head 中的目标都应该一跳直达（200），变体最多一跳到达规范地址。
+
+用法示例：
+  python3 check_redirect_chains.py
+  python3 check_redirect_chains.py --base-url http://localhost:3000 --no-variants
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit, urlunsplit
+
+from seo_audit.crawl import seeds_from_config
+from seo_audit.fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, adaptive_from_args, add_adaptive_arguments
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, note_report, phase, profiler_from_args
+from seo_audit.redirects import DEFAULT_MAX_HOPS, RedirectResolver, head_targets, redirect_findings
+
+DEFAULT_BASE_URL = "https://www.yhflexiblebusbar.com"
+DEFAULT_CONFIG = "seo-pages.config.json"
+
+
+def url_variants(url):
+    """同一页面的常见写法：末尾斜杠、http、裸域 / www 互换"""
+    parts = urlsplit(url)
+    path = parts.path.rstrip('/')
+    variants = [urlunsplit((parts.scheme, parts.netloc, path + '/', parts.query, ''))]
+    if parts.scheme == 'https':
+        variants.append(urlunsplit(('http', parts.netloc, parts.path, parts.query, '')))
+    host = parts.netloc
+    if host.startswith('www.'):
+        variants.append(urlunsplit((parts.scheme, host[4:], parts.path, parts.query, '')))
+    elif host.count('.') == 1:
+        variants.append(urlunsplit((parts.scheme, 'www.' + host, parts.path, parts.query, '')))
+    return [v for v in variants if v != url]
+
+
+def page_of(resolver, chain):
+    """终点为 200 时再抓取一次 <head> 并解析"""
+    if chain.final_status != 200:
+        return None
+    try:
+        response = resolver.client.get(chain.final_url, allow_redirects=False, head_only=True)
+    except Exception:
+        return None
+    return PageSeo.parse(response.content, chain.final_url)
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='重定向链检查')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'站点地址（默认 {DEFAULT_BASE_URL}）')
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help='页面路径配置文件，默认 seo-pages.config.json')
+    parser.add_argument('--no-variants', action='store_true', help='不检查末尾斜杠 / http / www 变体')
+    parser.add_argument('--max-hops', type=int, default=DEFAULT_MAX_HOPS, help='单条链的最大跳数')
+    parser.add_argument('--delay', type=float, default=0.0, help='同一主机相邻请求之间的最小间隔秒数（默认不限）')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_IN_FLIGHT, help='全局最大并发请求数')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='单个主机的最大并发请求数')
+    add_adaptive_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    adaptive_from_args(args)
+
+    print("↪️  开始检查重定向链")
+    print(f"🌐 站点: {args.base_url}")
+    print(f"⏰ 检查时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    urls = seeds_from_config(args.config, args.base_url)
+    resolver = RedirectResolver(max_hops=args.max_hops)
+    results = []
+    pages_redirected = 0
+    targets_redirected = 0
+
+    ordered = resolver.resolve_all(urls, args.concurrency, args.per_host, args.delay)
+    for i, (url, chain) in enumerate(ordered, 1):
+        print(f"\n[{i}/{len(urls)}] {url}")
+        entry = {'url': url, 'chain': chain.as_dict(), 'variants': [], 'head_targets': []}
+        if chain.redirects or chain.final_status != 200:
+            pages_redirected += 1
+            print(f"   ⚠️  {chain.describe()}")
+        else:
+            print(f"   ✅ {chain.final_status} ({chain.elapsed * 1000:.0f} ms)")
+
+        if not args.no_variants:
+            for variant in url_variants(url):
+                vchain = resolver.resolve(variant)
+                entry['variants'].append(vchain.as_dict())
+                if vchain.redirects > 1 or vchain.final_url != chain.final_url:
+                    print(f"   ⚠️  变体 {vchain.redirects} 跳: {vchain.describe()}")
+
+        page = page_of(resolver, chain)
+        if page is not None:
+            for label, target in head_targets(page):
+                entry['head_targets'].append({'label': label, **resolver.resolve(target).as_dict()})
+            findings = redirect_findings(page, resolver)
+            targets_redirected += len(findings)
+            for finding in findings:
+                print(f"   ⚠️  {finding.message}")
+        results.append(entry)
+
+    summary = {
+        'base_url': args.base_url,
+        'timestamp': datetime.now().isoformat(),
+        'pages': len(results),
+        'pages_redirected': pages_redirected,
+        'head_targets_redirected': targets_redirected,
+    }
+    output_file = f"redirect_chains_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with phase('report'), open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'results': results}, f, ensure_ascii=False, indent=2)
+    note_report(output_file)
+
+    print(f"\n📊 检查完成，结果已保存到: {output_file}")
+    print(f"\n📈 检查摘要:")
+    print(f"   - 总页面数: {len(results)}")
+    print(f"   - 页面本身需要重定向或非 200: {pages_redirected}")
+    print(f"   - head 中需要额外往返的目标: {targets_redirected}")
+    print(f"   - {resolver.describe_stats()}")
+    print(f"   - {resolver.client.describe_stats()}")
+
+    return 0 if pages_redirected == 0 and targets_redirected == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
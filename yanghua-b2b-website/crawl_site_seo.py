@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+全站爬取 SEO 检查
+从 sitemap 与 seo-pages.config.json 出发广度优先爬取站内页面，对每个发现的页面执行统一的 SEO 检查
+（canonical、hreflang、x-default、双斜杠、title/description 长度），不再依赖手工维护的 URL 列表。
+爬取结束后再做全站 hreflang 互链检查（回链缺失、集群不一致、alternate 指向非 200 页面）
+与 canonical 链解析（链、循环、指向重定向 / 404、离开 hreflang 集群），
+并逐跳解析 canonical / hreflang 目标的重定向链，标记需要额外往返的目标。
+给出 --routes（npm run export:localized-paths 的输出）时，还会用 en↔es 路由索引检查 hreflang 目标
+是否指向正确的本地化路径（例如 /en/projects 对应 /es/proyectos 而不是 /es/projects）。
+
+用法示例：
+  python3 crawl_site_seo.py --base-url https://www.yhflexiblebusbar.com
+  python3 crawl_site_seo.py --base-url http://localhost:3000 --sitemap https://www.yhflexiblebusbar.com/sitemap.xml --max-depth 2
+  npm run -s export:localized-paths > localized-paths.json && python3 crawl_site_seo.py --routes localized-paths.json
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from seo_audit.cache import add_cache_arguments, cache_from_args
+from seo_audit.canonical_graph import CanonicalResolver
+from seo_audit.cassette import add_cassette_arguments, cassette_from_args
+from seo_audit.checks import ERROR, run_checks
+from seo_audit.client import configure_client, get_client
+from seo_audit.crawl import (DEFAULT_MAX_DEPTH, DEFAULT_MAX_PAGES, DEFAULT_MAX_SECONDS, CrawlBudget, Crawler,
+                             seeds_from_config, seeds_from_sitemap)
+from seo_audit.extract import BASIC_FIELDS
+from seo_audit.fetch import (DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, adaptive_from_args, add_adaptive_arguments,
+                             iter_ordered)
+from seo_audit.hreflang_graph import HreflangGraph, path_key, url_key
+from seo_audit.latency import add_latency_arguments, latency_report_from_args
+from seo_audit.profiling import add_profile_arguments, note_report, phase, profiler_from_args
+from seo_audit.redirects import RedirectResolver, head_targets, redirect_findings
+from seo_audit.routes import RouteIndex, audit_sitemap_pairs, check_localized_alternates
+from seo_audit.sitemap import iter_sitemap
+from seo_audit.snapshots import add_snapshot_arguments, snapshots_from_args
+from seo_audit.warc import add_warc_arguments, warc_from_args
+from seo_audit.parsers import PARSER_CHOICES, set_default_backend
+
+DEFAULT_BASE_URL = "https://www.yhflexiblebusbar.com"
+DEFAULT_CONFIG = "seo-pages.config.json"
+SITE_LANGS = ("en", "es")
+
+_BUDGET_REASONS = {"pages": "页面数", "time": "运行时间", "depth": "深度"}
+
+
+def page_lang(url):
+    """URL 第一段路径为语言代码时返回该语言"""
+    segment = urlsplit(url).path.strip("/").split("/", 1)[0]
+    return segment if segment in SITE_LANGS else None
+
+
+def collect_seeds(args):
+    """sitemap + 配置文件中的页面；sitemap 读取失败时只用配置文件"""
+    seeds = []
+    if not args.no_sitemap:
+        sitemap = args.sitemap or f"{args.base_url.rstrip('/')}/sitemap.xml"
+        try:
+            seeds.extend(seeds_from_sitemap(sitemap, args.base_url))
+        except Exception as e:
+            print(f"⚠️ 读取 sitemap 失败，将只使用配置文件中的页面: {e}")
+    if args.config:
+        try:
+            seeds.extend(seeds_from_config(args.config, args.base_url))
+        except FileNotFoundError as e:
+            print(f"⚠️ {e}")
+    return seeds
+
+
+def check_result(result):
+    """对一个爬取结果执行 SEO 检查，返回报告中的条目"""
+    entry = {
+        'url': result.url,
+        'depth': result.depth,
+        'status_code': result.status_code,
+    }
+    if result.final_url and result.final_url != result.url:
+        entry['final_url'] = result.final_url
+    if result.error:
+        entry['status'] = 'error'
+        entry['error'] = result.error
+        return entry
+    if result.page is None:
+        entry['status'] = 'skipped'
+        return entry
+    findings = run_checks(result.page, lang=page_lang(result.url))
+    entry['status'] = 'failed' if any(f.severity == ERROR for f in findings) else 'success'
+    entry['links'] = result.links
+    entry['seo_data'] = result.page.as_dict(BASIC_FIELDS)
+    entry['findings'] = [f._asdict() for f in findings]
+    return entry
+
+
+def key_to_url(base_url, key):
+    """--graph-by-path 时图中的键只有路径，抓取前补上站点地址"""
+    return base_url.rstrip('/') + key if key.startswith('/') else key
+
+
+def merge_findings(results, findings_by_url):
+    """把全站检查的结果并入各页面条目；有 ERROR 的页面标记为 failed"""
+    by_url = {r['url']: r for r in results}
+    by_url.update({r['final_url']: r for r in results if 'final_url' in r})
+    for url, findings in findings_by_url.items():
+        entry = by_url.get(url)
+        if entry is None:
+            continue
+        entry.setdefault('findings', []).extend(f._asdict() for f in findings)
+        if entry['status'] == 'success' and any(f.severity == ERROR for f in findings):
+            entry['status'] = 'failed'
+
+
+def verify_alternate_targets(graph, base_url, args):
+    """抓取被 alternate 引用但未爬到的页面的状态（不跟随重定向，只下载 <head>）"""
+    targets = graph.unknown_targets()
+    if not targets:
+        return
+    print(f"\n🔎 验证 {len(targets)} 个未爬取的 hreflang 目标...")
+
+    def status_of(target):
+        url = key_to_url(base_url, target)
+        try:
+            response = get_client().get(url, allow_redirects=False, head_only=True)
+        except Exception:
+            return None, None
+        return response.status_code, response.headers.get('Location')
+
+    ordered = iter_ordered(targets, status_of, url_of=lambda t: key_to_url(base_url, t),
+                           max_in_flight=args.concurrency, per_host=args.per_host, min_interval=args.delay)
+    for target, (code, location) in ordered:
+        graph.set_status(target, code, location)
+
+
+def check_graph(graph, results, base_url, args):
+    """全站 hreflang 互链检查，结果并入各页面的 findings，返回汇总"""
+    if not args.no_verify_targets:
+        verify_alternate_targets(graph, base_url, args)
+    merge_findings(results, graph.findings())
+    summary = graph.summary()
+    summary['inconsistent'] = graph.inconsistent_clusters()
+    return summary
+
+
+def check_canonicals(resolver, graph, results, args):
+    """canonical 链解析，结果并入各页面的 findings，返回各类问题的计数"""
+    if not args.no_verify_targets:
+        fetched = resolver.fetch_unknown(args.concurrency, args.per_host, args.delay)
+        if fetched:
+            print(f"🔎 已抓取 {fetched} 个未爬取的 canonical 目标")
+    merge_findings(results, resolver.findings(graph))
+    return resolver.summary(graph)
+
+
+def check_redirects(pages, results, args):
+    """逐跳解析全部 canonical / hreflang 目标（相同目标只解析一次），返回需要额外往返的目标数"""
+    resolver = RedirectResolver()
+    targets = [target for page in pages for _, target in head_targets(page)]
+    for _ in resolver.resolve_all(targets, args.concurrency, args.per_host, args.delay):
+        pass
+    findings = {}
+    for page in pages:
+        page_findings = redirect_findings(page, resolver)
+        if page_findings:
+            findings[page.url] = page_findings
+    merge_findings(results, findings)
+    print(resolver.describe_stats())
+    return sum(len(f) for f in findings.values())
+
+
+def check_routes(rules, pages, results, args):
+    """路由规则 + sitemap 精确映射构建索引，检查各页面的 hreflang 目标与 sitemap 中的成对 URL；返回汇总"""
+    index = RouteIndex(rules.langs)
+    index.merge(rules)
+    sitemap_problems = []
+    if not args.no_sitemap:
+        sitemap = args.sitemap or f"{args.base_url.rstrip('/')}/sitemap.xml"
+        try:
+            entries = list(iter_sitemap(sitemap))
+        except Exception as e:
+            print(f"⚠️ 读取 sitemap 失败，路由检查只使用导出的规则: {e}")
+            entries = []
+        for entry in entries:
+            index.add_sitemap_entry(entry)
+        sitemap_problems = audit_sitemap_pairs(entries, rules)
+    findings = {}
+    for page in pages:
+        page_findings = check_localized_alternates(page, page.url, index)
+        if page_findings:
+            findings[page.url] = page_findings
+    merge_findings(results, findings)
+    return {
+        'rules': rules.rules,
+        'exact_pairs': len(index),
+        'pages_with_issues': len(findings),
+        'sitemap_problems': sitemap_problems,
+    }
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='全站爬取 SEO 检查')
+    parser.add_argument('--base-url', default=DEFAULT_BASE_URL, help=f'要爬取的站点（默认 {DEFAULT_BASE_URL}）')
+    parser.add_argument('--sitemap', default=None, help='sitemap 地址或本地路径（默认 <base-url>/sitemap.xml）；loc 会换成 base-url 的主机')
+    parser.add_argument('--no-sitemap', action='store_true', help='不使用 sitemap 作为种子')
+    parser.add_argument('--config', default=DEFAULT_CONFIG, help='页面路径配置文件，默认 seo-pages.config.json；传空字符串则不使用')
+    parser.add_argument('--max-depth', type=int, default=DEFAULT_MAX_DEPTH, help='从种子出发最多跟随的链接层数')
+    parser.add_argument('--max-pages', type=int, default=DEFAULT_MAX_PAGES, help='最多抓取的页面数')
+    parser.add_argument('--max-time', type=float, default=DEFAULT_MAX_SECONDS, help='最长爬取时间（秒）')
+    parser.add_argument('--delay', type=float, default=0.0, help='同一主机相邻请求之间的最小间隔秒数（默认不限）')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_IN_FLIGHT, help='全局最大并发请求数')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='单个主机的最大并发请求数')
+    add_adaptive_arguments(parser)
+    parser.add_argument('--parser', choices=PARSER_CHOICES, default=None, help='HTML 解析后端（默认 auto：已安装的最快后端）')
+    parser.add_argument('--graph-by-path', action='store_true', help='互链检查只按路径匹配 URL（在本地环境爬取、hreflang 写的是生产域名时使用）')
+    parser.add_argument('--no-verify-targets', action='store_true', help='不抓取未爬到的 hreflang / canonical 目标，也不解析重定向链（只检查已爬取页面之间的关系）')
+    parser.add_argument('--routes', default=None, help='npm run export:localized-paths 导出的路由 JSON；给出时检查 hreflang 目标的本地化路径')
+    add_cache_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_warc_arguments(parser)
+    add_cassette_arguments(parser)
+    add_latency_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    adaptive_from_args(args)
+    if args.parser:
+        set_default_backend(args.parser)
+    configure_client(cache=cache_from_args(args), snapshots=snapshots_from_args(args), warc=warc_from_args(args),
+                     cassette=cassette_from_args(args))
+
+    print("🕷️  开始全站爬取 SEO 检查")
+    print(f"🌐 站点: {args.base_url}")
+    print(f"⏰ 开始时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    routes = None
+    if args.routes:
+        try:
+            routes = RouteIndex.from_export(args.routes)
+        except FileNotFoundError as e:
+            print(f"❌ {e}")
+            return 1
+        print(f"🗺️  路由规则: {routes.rules} 条")
+
+    seeds = collect_seeds(args)
+    if not seeds:
+        print("❌ 没有可用的种子页面")
+        return 1
+    budget = CrawlBudget(max_depth=args.max_depth, max_pages=args.max_pages, max_seconds=args.max_time)
+    crawler = Crawler(seeds, budget)
+    print(f"🌱 种子页面: {len(crawler.frontier)} 个（去重后）")
+    print(f"📏 预算: 深度 {budget.max_depth}, 页面 {budget.max_pages}, 时间 {budget.max_seconds:.0f}s")
+
+    results = []
+    pages = []
+    key = path_key if args.graph_by_path else url_key
+    graph = HreflangGraph(key)
+    resolver = CanonicalResolver(key, url_of_key=lambda k: key_to_url(args.base_url, k))
+    for i, result in enumerate(crawler.iter(args.concurrency, args.per_host, args.delay), 1):
+        entry = check_result(result)
+        results.append(entry)
+        graph.add_page(result.url, result.page, result.status_code, result.final_url)
+        resolver.add_page(result.url, result.page, result.status_code, result.final_url)
+        if result.page is not None:
+            pages.append(result.page)
+        marker = {'success': '✅', 'failed': '❌', 'error': '💥', 'skipped': '⏭️ '}[entry['status']]
+        print(f"[{i}] {marker} d={result.depth} {result.url} -> {result.status_code or '-'}")
+        for finding in entry.get('findings', []):
+            if finding['severity'] == ERROR:
+                print(f"      - {finding['message']}")
+        if entry['status'] == 'error':
+            print(f"      - {entry['error']}")
+
+    graph_summary = check_graph(graph, results, args.base_url, args)
+    canonical_summary = check_canonicals(resolver, graph, results, args)
+    redirected_targets = 0 if args.no_verify_targets else check_redirects(pages, results, args)
+    route_summary = check_routes(routes, pages, results, args) if routes is not None else None
+
+    counts = {status: sum(1 for r in results if r['status'] == status)
+              for status in ('success', 'failed', 'error', 'skipped')}
+    summary = {
+        'base_url': args.base_url,
+        'timestamp': datetime.now().isoformat(),
+        'seeds': len(seeds),
+        'pages_crawled': len(results),
+        'urls_discovered': len(crawler.visited),
+        'budget': budget._asdict(),
+        'budget_exhausted': crawler.budget_exhausted,
+        **counts,
+        'hreflang_graph': graph_summary,
+        'canonical_graph': canonical_summary,
+        'redirected_targets': redirected_targets,
+        'localized_routes': route_summary,
+    }
+
+    output_file = f"site_crawl_seo_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with phase('report'), open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'results': results}, f, ensure_ascii=False, indent=2)
+    note_report(output_file)
+
+    print(f"\n📊 爬取完成，结果已保存到: {output_file}")
+    print(f"\n📈 检查摘要:")
+    print(f"   - 抓取页面: {len(results)}（发现 URL {len(crawler.visited)} 个）")
+    print(f"   - 通过: {counts['success']}  有错误: {counts['failed']}  抓取失败: {counts['error']}  非 HTML: {counts['skipped']}")
+    print(f"   - 🌐 hreflang 集群: {graph_summary['clusters']} 个（不一致 {graph_summary['inconsistent_clusters']}）, "
+          f"缺少回链 {graph_summary['missing_return_links']} 条, 目标非 200 {graph_summary['broken_alternates']} 条, "
+          f"缺少自引用 {graph_summary['missing_self_references']} 页")
+    print(f"   - 🔗 canonical: 链 {canonical_summary.get('canonical_chain', 0)}, 循环 {canonical_summary.get('canonical_loop', 0)}, "
+          f"指向重定向/非 200 {canonical_summary.get('canonical_target', 0)}, 离开 hreflang 集群 {canonical_summary.get('canonical_cluster', 0)}")
+    print(f"   - ↪️  需要额外往返的 canonical / hreflang 目标: {redirected_targets} 个")
+    if route_summary is not None:
+        print(f"   - 🗺️  本地化路径: {route_summary['pages_with_issues']} 个页面的 hreflang 目标有问题, "
+              f"sitemap 成对 URL 问题 {len(route_summary['sitemap_problems'])} 条")
+    if crawler.budget_exhausted:
+        print(f"   - ⚠️  {_BUDGET_REASONS[crawler.budget_exhausted]}预算已用尽，仍有页面未抓取")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
+
+    return 0 if counts['failed'] == 0 and counts['error'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,8 +2,12 @@
 """
 邮件服务503错误诊断脚本
 用于检查生产环境的邮件API和SMTP配置问题
+
+--record-cassette 把本次诊断的全部请求（含 CSRF cookie 流程）与 SMTP 连接结果录制到磁带，
+--replay-cassette 从磁带重跑诊断，不访问生产环境，结果每次一致。
 """
 
+import argparse
 import requests
 import json
 import time
@@ -11,10 +15,17 @@ from datetime import datetime
 import smtplib
 import ssl
 
+from seo_audit.cassette import CassetteMissError, Exchange, add_cassette_arguments, cassette_from_args, mount_session
+from seo_audit.profiling import add_profile_arguments, note_report, profiler_from_args
+
 class EmailServiceDiagnostic:
-    def __init__(self):
+    def __init__(self, cassette=None):
         self.base_url = "https://www.yhflexiblebusbar.com"
         self.session = requests.Session()  # 使用session来保持cookies
+        # seo_audit.cassette 的录制器 / 回放器；None 表示直接访问网络
+        self.cassette = cassette
+        if cassette is not None:
+            mount_session(self.session, cassette)
         self.results = {
             "timestamp": datetime.now().isoformat(),
             "api_tests": {},
@@ -185,7 +196,7 @@ class EmailServiceDiagnostic:
         
         for config in configs:
             print(f"   测试 {config['name']}...")
-            result = self.test_smtp_connection(config)
+            result = self.probe_smtp(config)
             self.results["smtp_tests"][config["name"]] = result
             
             if result["can_connect"]:
@@ -193,6 +204,32 @@ class EmailServiceDiagnostic:
             else:
                 print(f"   ❌ {config['name']} 连接失败: {result.get('error', 'Unknown error')}")
     
+    def probe_smtp(self, config):
+        """测试SMTP连接；使用磁带时录制连接结果，回放时直接返回录制的结果而不发起连接"""
+        if self.cassette is None:
+            return self.test_smtp_connection(config)
+        probe_url = f"smtp://{config['host']}:{config['port']}"
+        if self.cassette.replaying:
+            try:
+                return json.loads(self.cassette.exchange("NOOP", probe_url).content)
+            except CassetteMissError as e:
+                return {
+                    "can_connect": False,
+                    "error": str(e),
+                    "error_type": "磁带中没有录制",
+                    "host": config["host"],
+                    "port": config["port"]
+                }
+        result = self.test_smtp_connection(config)
+        self.cassette.record(Exchange(
+            method="NOOP",
+            url=probe_url,
+            status_code=250 if result["can_connect"] else 421,
+            headers=[("Content-Type", "application/json")],
+            content=json.dumps(result, ensure_ascii=False).encode("utf-8")
+        ))
+        return result
+    
     def test_smtp_connection(self, config):
         """测试SMTP连接"""
         try:
@@ -350,8 +387,17 @@ class EmailServiceDiagnostic:
         return report_file
 
 def main():
-    diagnostic = EmailServiceDiagnostic()
+    parser = argparse.ArgumentParser(description="诊断生产环境邮件API的503错误与SMTP配置")
+    add_cassette_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
+    diagnostic = EmailServiceDiagnostic(cassette_from_args(args))
     report_file = diagnostic.run_diagnosis()
+    note_report(report_file)
+    if diagnostic.cassette is not None:
+        print(diagnostic.cassette.describe_stats())
     
     print(f"\n🎯 诊断完成！详细报告: {report_file}")
     print("\n下一步:")
@@ -2,14 +2,28 @@
 """
 扩展页面 SEO 验证脚本
 验证 projects、solutions、services、contact 页面的 hreflang 和 canonical 标签配置
+生产环境与本地环境的请求并行发出；需要对比更多环境时使用 production_seo_comparison.py --env
+每个页面对比完即追加到 .jsonl（中途中断不丢失已完成的结果），结束时由它生成原格式的 .json 报告
 """
 
-import requests
-from bs4 import BeautifulSoup
-import json
+import argparse
 from datetime import datetime
 import sys
 
+from seo_audit.cassette import add_cassette_arguments, cassette_from_args
+from seo_audit.checks import meta_length_warnings, missing_langs, relative_alternates
+from seo_audit.cache import add_cache_arguments, cache_from_args
+from seo_audit.client import configure_client, get_client
+from seo_audit.environments import Environment, iter_environments
+from seo_audit.extract import BASIC_FIELDS
+from seo_audit.fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, adaptive_from_args, add_adaptive_arguments
+from seo_audit.latency import add_latency_arguments, latency_report_from_args
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, note_report, profiler_from_args
+from seo_audit.snapshots import add_snapshot_arguments, snapshots_from_args
+from seo_audit.warc import add_warc_arguments, warc_from_args
+from seo_audit.results import ResultSink, write_report
+
 # 环境配置
 PRODUCTION_BASE_URL = "https://www.yhflexiblebusbar.com"
 LOCAL_BASE_URL = "http://localhost:3003"
@@ -27,139 +41,97 @@ EXTENDED_PAGES = [
 ]
 
 def get_page_content(url):
-    """获取页面内容"""
+    """获取页面内容（SEO 标签都在 <head> 中，只下载到 </head> 为止）；返回 (内容, 错误信息)，
+    错误信息由调用方与该页面的其他输出一起打印"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        return get_client().get_text(url, head_only=True), None
     except Exception as e:
-        print(f"❌ 获取页面失败 {url}: {e}")
-        return None
+        return None, f"❌ 获取页面失败 {url}: {e}"
 
-def extract_seo_tags(html_content):
-    """提取 SEO 相关标签"""
-    if not html_content:
-        return None
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 提取 canonical 标签
-    canonical = soup.find('link', {'rel': 'canonical'})
-    canonical_url = canonical.get('href') if canonical else None
-    
-    # 提取 hreflang 标签
-    hreflang_tags = soup.find_all('link', {'rel': 'alternate', 'hreflang': True})
-    hreflang_data = []
-    for tag in hreflang_tags:
-        hreflang_data.append({
-            'hreflang': tag.get('hreflang'),
-            'href': tag.get('href')
-        })
-    
-    # 提取基本 meta 标签
-    title = soup.find('title')
-    title_text = title.get_text().strip() if title else None
-    
-    meta_description = soup.find('meta', {'name': 'description'})
-    description = meta_description.get('content') if meta_description else None
-    
-    # 提取 Open Graph 标签
-    og_url = soup.find('meta', {'property': 'og:url'})
-    og_url_content = og_url.get('content') if og_url else None
-    
-    og_title = soup.find('meta', {'property': 'og:title'})
-    og_title_content = og_title.get('content') if og_title else None
-    
-    return {
-        'canonical': canonical_url,
-        'hreflang': hreflang_data,
-        'title': title_text,
-        'description': description,
-        'og_url': og_url_content,
-        'og_title': og_title_content
-    }
+SEO_DATA_FIELDS = BASIC_FIELDS + ("og_title",)
+
+def extract_seo_tags(html_content, url=None):
+    """提取 SEO 相关标签，返回 PageSeo（html_content 为空时返回 None）"""
+    return PageSeo.parse(html_content, url)
 
-def validate_seo_tags(seo_data, page_info, base_url):
-    """验证 SEO 标签的正确性"""
+def validate_seo_tags(page, page_info, base_url):
+    """验证 SEO 标签的正确性（所有检查读取同一条 PageSeo）"""
     issues = []
     warnings = []
     
-    if not seo_data:
+    if not page:
         issues.append("无法提取 SEO 数据")
         return issues, warnings
     
     # 验证 canonical URL
     expected_canonical = f"{base_url}{page_info['path']}"
-    if not seo_data['canonical']:
+    if not page.canonical:
         issues.append("缺少 canonical 标签")
-    elif seo_data['canonical'] != expected_canonical:
-        issues.append(f"Canonical URL 不正确: 期望 {expected_canonical}, 实际 {seo_data['canonical']}")
+    elif page.canonical != expected_canonical:
+        issues.append(f"Canonical URL 不正确: 期望 {expected_canonical}, 实际 {page.canonical}")
     
     # 验证 hreflang 标签
-    if not seo_data['hreflang']:
+    if not page.alternates:
         issues.append("缺少 hreflang 标签")
     else:
-        hreflang_langs = [tag['hreflang'] for tag in seo_data['hreflang']]
-        
         # 检查必需的语言标签
-        required_langs = ['en', 'es', 'x-default']
-        missing_langs = [lang for lang in required_langs if lang not in hreflang_langs]
-        if missing_langs:
-            issues.append(f"缺少 hreflang 语言标签: {', '.join(missing_langs)}")
+        missing = missing_langs(page)
+        if missing:
+            issues.append(f"缺少 hreflang 语言标签: {', '.join(missing)}")
         
         # 检查 hreflang URL 格式
-        for tag in seo_data['hreflang']:
-            if not tag['href'].startswith('http'):
-                issues.append(f"Hreflang URL 不是绝对路径: {tag['hreflang']} -> {tag['href']}")
-    
-    # 验证页面标题
-    if not seo_data['title']:
-        warnings.append("缺少页面标题")
-    elif len(seo_data['title']) < 30:
-        warnings.append("页面标题可能过短")
-    elif len(seo_data['title']) > 60:
-        warnings.append("页面标题可能过长")
+        for tag in relative_alternates(page):
+            issues.append(f"Hreflang URL 不是绝对路径: {tag.hreflang} -> {tag.href}")
     
-    # 验证 meta 描述
-    if not seo_data['description']:
-        warnings.append("缺少 meta 描述")
-    elif len(seo_data['description']) < 120:
-        warnings.append("Meta 描述可能过短")
-    elif len(seo_data['description']) > 160:
-        warnings.append("Meta 描述可能过长")
+    # 验证页面标题与 meta 描述长度
+    warnings.extend(meta_length_warnings(page))
     
     return issues, warnings
 
 def check_page_seo(base_url, page_info):
-    """检查单个页面的 SEO 配置"""
+    """检查单个页面的 SEO 配置（不输出），返回 (结果, 抓取错误信息)"""
     url = f"{base_url}{page_info['path']}"
-    print(f"   🔍 检查: {url}")
-    
-    html_content = get_page_content(url)
-    seo_data = extract_seo_tags(html_content)
-    issues, warnings = validate_seo_tags(seo_data, page_info, base_url)
+    html_content, fetch_error = get_page_content(url)
+    page = extract_seo_tags(html_content, url)
+    issues, warnings = validate_seo_tags(page, page_info, base_url)
     
     return {
         'url': url,
         'page_info': page_info,
-        'seo_data': seo_data,
+        'seo_data': page.as_dict(SEO_DATA_FIELDS) if page else None,
         'issues': issues,
         'warnings': warnings,
         'status': 'success' if not issues else 'failed'
-    }
+    }, fetch_error
+
+def check_page_seo_quietly(base_url, page_info):
+    """并行抓取用：出错时返回异常对象，交给该页面的 try 记录为错误结果"""
+    try:
+        return check_page_seo(base_url, page_info)
+    except Exception as e:
+        return e
 
-def compare_environments(page_info):
-    """对比生产环境和本地环境的 SEO 配置"""
+def prefetched_result(base_url, page_info, checked):
+    """取用并行抓取的结果（未传入时在这里检查）：按页面顺序输出检查行与抓取错误，抓取时的异常在这里重新抛出"""
+    print(f"   🔍 检查: {base_url}{page_info['path']}")
+    if checked is None:
+        checked = check_page_seo_quietly(base_url, page_info)
+    if isinstance(checked, Exception):
+        raise checked
+    result, fetch_error = checked
+    if fetch_error:
+        print(fetch_error)
+    return result
+
+def compare_environments(page_info, prod_result=None, local_result=None):
+    """对比生产环境和本地环境的 SEO 配置；未传入的环境结果在这里抓取"""
     print(f"🔄 对比环境: {page_info['name']}")
     
     # 检查生产环境
-    prod_result = check_page_seo(PRODUCTION_BASE_URL, page_info)
+    prod_result = prefetched_result(PRODUCTION_BASE_URL, page_info, prod_result)
     
     # 检查本地环境
-    local_result = check_page_seo(LOCAL_BASE_URL, page_info)
+    local_result = prefetched_result(LOCAL_BASE_URL, page_info, local_result)
     
     # 对比结果
     comparison = {
@@ -205,78 +177,108 @@ def compare_environments(page_info):
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="扩展页面 SEO 验证（生产环境与本地环境）")
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_IN_FLIGHT, help='全局最大并发请求数')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='单个主机（环境）的最大并发请求数')
+    add_adaptive_arguments(parser)
+    add_cache_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_warc_arguments(parser)
+    add_cassette_arguments(parser)
+    add_latency_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    adaptive_from_args(args)
+    configure_client(cache=cache_from_args(args), snapshots=snapshots_from_args(args), warc=warc_from_args(args),
+                     cassette=cassette_from_args(args))
+
     print("🚀 开始扩展页面 SEO 验证")
     print(f"🌐 生产环境: {PRODUCTION_BASE_URL}")
     print(f"🏠 本地环境: {LOCAL_BASE_URL}")
     print(f"⏰ 验证时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     print(f"📄 验证页面数: {len(EXTENDED_PAGES)}")
     
-    results = {
+    # 结果逐条写入 JSONL，摘要与按类型统计按运行中的计数累加
+    sink = ResultSink(f"extended_seo_verification_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl", meta={
         'timestamp': datetime.now().isoformat(),
         'production_base_url': PRODUCTION_BASE_URL,
         'local_base_url': LOCAL_BASE_URL,
         'pages_checked': len(EXTENDED_PAGES),
-        'results': {},
-        'summary': {
-            'total_pages': len(EXTENDED_PAGES),
-            'successful_checks': 0,
-            'failed_checks': 0,
-            'pages_with_issues': 0,
-            'pages_with_warnings': 0,
-            'environment_differences': 0
-        }
+    }, results_key='results')
+    summary = {
+        'total_pages': len(EXTENDED_PAGES),
+        'successful_checks': 0,
+        'failed_checks': 0,
+        'pages_with_issues': 0,
+        'pages_with_warnings': 0,
+        'environment_differences': 0
     }
-    
-    # 检查每个页面
+    page_types = {}
     for page_info in EXTENDED_PAGES:
-        print(f"\n📋 检查页面: {page_info['name']} ({page_info['path']})")
+        page_types.setdefault(page_info['type'], {'total': 0, 'success': 0})['total'] += 1
+    
+    # 两个环境、所有页面的请求并行发出，结果按页面顺序处理
+    environments = [Environment('production', PRODUCTION_BASE_URL), Environment('local', LOCAL_BASE_URL)]
+    pages = {page_info['path']: page_info for page_info in EXTENDED_PAGES}
+    fetched = iter_environments(pages, environments, lambda env, path: check_page_seo_quietly(env.base_url, pages[path]),
+                                max_in_flight=args.concurrency, per_host=args.per_host)
+    
+    try:
+        # 检查每个页面
+        for path, env_results in fetched:
+            page_info = pages[path]
+            print(f"\n📋 检查页面: {page_info['name']} ({page_info['path']})")
         
-        try:
-            # 对比两个环境
-            comparison = compare_environments(page_info)
-            results['results'][page_info['path']] = comparison
+            try:
+                # 对比两个环境
+                comparison = compare_environments(page_info, env_results['production'], env_results['local'])
+                sink.write(page_info['path'], comparison)
             
-            # 更新统计
-            if comparison['production']['status'] == 'success' and comparison['local']['status'] == 'success':
-                results['summary']['successful_checks'] += 1
+                # 更新统计
+                if comparison['production']['status'] == 'success' and comparison['local']['status'] == 'success':
+                    summary['successful_checks'] += 1
+                    page_types[page_info['type']]['success'] += 1
                 
-                if comparison['differences']:
-                    results['summary']['environment_differences'] += 1
-                    print(f"   ⚠️  发现 {len(comparison['differences'])} 个环境差异")
+                    if comparison['differences']:
+                        summary['environment_differences'] += 1
+                        print(f"   ⚠️  发现 {len(comparison['differences'])} 个环境差异")
+                    else:
+                        print("   ✅ 两个环境配置一致")
                 else:
-                    print("   ✅ 两个环境配置一致")
-            else:
-                results['summary']['failed_checks'] += 1
-                print("   ❌ 检查失败")
+                    summary['failed_checks'] += 1
+                    print("   ❌ 检查失败")
             
-            # 统计问题和警告
-            prod_issues = len(comparison['production'].get('issues', []))
-            local_issues = len(comparison['local'].get('issues', []))
-            if prod_issues > 0 or local_issues > 0:
-                results['summary']['pages_with_issues'] += 1
+                # 统计问题和警告
+                prod_issues = len(comparison['production'].get('issues', []))
+                local_issues = len(comparison['local'].get('issues', []))
+                if prod_issues > 0 or local_issues > 0:
+                    summary['pages_with_issues'] += 1
             
-            prod_warnings = len(comparison['production'].get('warnings', []))
-            local_warnings = len(comparison['local'].get('warnings', []))
-            if prod_warnings > 0 or local_warnings > 0:
-                results['summary']['pages_with_warnings'] += 1
+                prod_warnings = len(comparison['production'].get('warnings', []))
+                local_warnings = len(comparison['local'].get('warnings', []))
+                if prod_warnings > 0 or local_warnings > 0:
+                    summary['pages_with_warnings'] += 1
                 
-        except Exception as e:
-            print(f"❌ 检查页面 {page_info['name']} 时出错: {e}")
-            results['results'][page_info['path']] = {
-                'page_name': page_info['name'],
-                'error': str(e)
-            }
-            results['summary']['failed_checks'] += 1
+            except Exception as e:
+                print(f"❌ 检查页面 {page_info['name']} 时出错: {e}")
+                sink.write(page_info['path'], {
+                    'page_name': page_info['name'],
+                    'error': str(e)
+                })
+                summary['failed_checks'] += 1
+        sink.close(summary)
+    finally:
+        # 中途出错时也关闭文件，已写入的逐条结果不丢失（不写摘要）
+        sink.close()
     
-    # 保存结果到文件
-    output_file = f"extended_seo_verification_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(results, f, ensure_ascii=False, indent=2)
+    # 保存结果到文件（由 JSONL 生成原格式的 JSON 报告）
+    output_file, _, _ = write_report(sink.path)
+    note_report(output_file)
     
-    print(f"\n📊 验证完成，结果已保存到: {output_file}")
+    print(f"\n📊 验证完成，结果已保存到: {output_file}（逐条结果: {sink.path}）")
     
     # 生成摘要报告
-    summary = results['summary']
     print(f"\n📈 验证摘要:")
     print(f"   - 总页面数: {summary['total_pages']}")
     print(f"   - 成功检查: {summary['successful_checks']}")
@@ -284,19 +286,12 @@ def main():
     print(f"   - 有问题的页面: {summary['pages_with_issues']}")
     print(f"   - 有警告的页面: {summary['pages_with_warnings']}")
     print(f"   - 环境差异页面: {summary['environment_differences']}")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
     
     # 按页面类型分组统计
-    page_types = {}
-    for page_info in EXTENDED_PAGES:
-        page_type = page_info['type']
-        if page_type not in page_types:
-            page_types[page_type] = {'total': 0, 'success': 0}
-        page_types[page_type]['total'] += 1
-        
-        result = results['results'].get(page_info['path'])
-        if result and result.get('production', {}).get('status') == 'success' and result.get('local', {}).get('status') == 'success':
-            page_types[page_type]['success'] += 1
-    
     print(f"\n📊 按页面类型统计:")
     for page_type, stats in page_types.items():
         success_rate = (stats['success'] / stats['total']) * 100 if stats['total'] > 0 else 0
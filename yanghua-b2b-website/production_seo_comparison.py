@@ -1,14 +1,33 @@
 #!/usr/bin/env python3
 """
 生产环境与本地开发环境 SEO 标签对比脚本
-对比两个环境的 hreflang 和 canonical 标签配置差异
+对比两个环境的 hreflang 和 canonical 标签配置差异；两个环境的请求同时发出。
+用 --env 给出任意数量的环境（生产 / Vercel 预览 / staging / 本地）时，改为多环境对比：
+各环境并行抓取，输出按字段展开的差异矩阵（seo_environment_matrix_*.json）。
+
+用法示例：
+  python3 production_seo_comparison.py
+  python3 production_seo_comparison.py --env prod=https://www.yhflexiblebusbar.com \
+      --env preview=https://yanghua-git-main.vercel.app --env local=http://localhost:3003 --relative-urls
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
 from datetime import datetime
 import sys
+import time
+
+from seo_audit.cache import add_cache_arguments, cache_from_args
+from seo_audit.cassette import add_cassette_arguments, cassette_from_args
+from seo_audit.client import configure_client, get_client
+from seo_audit.environments import Environment, baseline_differences, diff_matrix, iter_environments, parse_environment
+from seo_audit.extract import BASIC_FIELDS
+from seo_audit.fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, adaptive_from_args, add_adaptive_arguments
+from seo_audit.latency import add_latency_arguments, latency_report_from_args
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, note_report, phase, profiler_from_args
+from seo_audit.snapshots import add_snapshot_arguments, snapshots_from_args
+from seo_audit.warc import add_warc_arguments, warc_from_args
 
 # 环境配置
 PRODUCTION_BASE_URL = "https://www.yhflexiblebusbar.com"
@@ -25,56 +44,17 @@ PAGES_TO_COMPARE = [
 ]
 
 def get_page_content(url):
-    """获取页面内容"""
+    """获取页面内容（SEO 标签都在 <head> 中，只下载到 </head> 为止）；返回 (内容, 错误信息)，
+    错误信息由调用方与该页面的其他输出一起打印"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        return get_client().get_text(url, head_only=True), None
     except Exception as e:
-        print(f"❌ 获取页面失败 {url}: {e}")
-        return None
+        return None, f"❌ 获取页面失败 {url}: {e}"
 
 def extract_seo_tags(html_content):
-    """提取 SEO 相关标签"""
-    if not html_content:
-        return None
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    
-    # 提取 canonical 标签
-    canonical = soup.find('link', {'rel': 'canonical'})
-    canonical_url = canonical.get('href') if canonical else None
-    
-    # 提取 hreflang 标签
-    hreflang_tags = soup.find_all('link', {'rel': 'alternate', 'hreflang': True})
-    hreflang_data = []
-    for tag in hreflang_tags:
-        hreflang_data.append({
-            'hreflang': tag.get('hreflang'),
-            'href': tag.get('href')
-        })
-    
-    # 提取基本 meta 标签
-    title = soup.find('title')
-    title_text = title.get_text().strip() if title else None
-    
-    meta_description = soup.find('meta', {'name': 'description'})
-    description = meta_description.get('content') if meta_description else None
-    
-    # 提取 Open Graph 标签
-    og_url = soup.find('meta', {'property': 'og:url'})
-    og_url_content = og_url.get('content') if og_url else None
-    
-    return {
-        'canonical': canonical_url,
-        'hreflang': hreflang_data,
-        'title': title_text,
-        'description': description,
-        'og_url': og_url_content
-    }
+    """提取 SEO 相关标签（解析为 PageSeo 后输出与原 BeautifulSoup 版本一致的 dict）"""
+    page = PageSeo.parse(html_content)
+    return page.as_dict(BASIC_FIELDS) if page else None
 
 def compare_seo_data(prod_data, local_data, page_name):
     """对比两个环境的 SEO 数据"""
@@ -153,34 +133,147 @@ def compare_seo_data(prod_data, local_data, page_name):
     return comparison
 
 def check_environment_seo(base_url, page_info):
-    """检查指定环境的 SEO 配置"""
+    """检查指定环境的 SEO 配置，返回 (SEO 数据, 抓取错误信息)"""
     url = f"{base_url}{page_info['path']}"
-    html_content = get_page_content(url)
-    return extract_seo_tags(html_content)
+    html_content, fetch_error = get_page_content(url)
+    return extract_seo_tags(html_content), fetch_error
+
+def check_environment_seo_quietly(base_url, page_info):
+    """并行抓取用：出错时返回异常对象，由该页面的 try 记录为错误结果，不中断其余页面"""
+    try:
+        return check_environment_seo(base_url, page_info)
+    except Exception as e:
+        return e
+
+def compare_environment_matrix(environments, args):
+    """多环境对比：所有环境并行抓取，每个页面输出 {字段: {环境: 值}} 差异矩阵；第一个环境为基准"""
+    baseline = environments[0].name
+    print(f"🚀 开始多环境 SEO 标签对比（{len(environments)} 个环境，基准: {baseline}）")
+    for env in environments:
+        print(f"🌐 {env.name}: {env.base_url}")
+    print(f"⏰ 对比时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+
+    started = time.perf_counter()
+    env_time = {env.name: 0.0 for env in environments}
+    results = {}
+    paths = [page_info['path'] for page_info in PAGES_TO_COMPARE]
+    names = {page_info['path']: page_info['name'] for page_info in PAGES_TO_COMPARE}
+    for path, fetched in iter_environments(paths, environments, max_in_flight=args.concurrency, per_host=args.per_host):
+        print(f"\n🔍 对比页面: {names[path]} ({path})")
+        for name, result in fetched.items():
+            env_time[name] += result.elapsed
+            if result.error:
+                print(f"   ❌ {name}: {result.error}")
+            elif result.status_code != 200:
+                print(f"   ❌ {name}: HTTP {result.status_code}")
+        matrix = diff_matrix(fetched, environments, relative=args.relative_urls)
+        differences = baseline_differences(matrix, baseline)
+        results[path] = {
+            'page_name': names[path],
+            'urls': {name: result.url for name, result in fetched.items()},
+            'status_codes': {name: result.status_code for name, result in fetched.items()},
+            'errors': {name: result.error for name, result in fetched.items() if result.error},
+            'matrix': matrix,
+            'differs_from_baseline': differences,
+        }
+        if matrix:
+            print(f"   ⚠️  {len(matrix)} 个字段在各环境中不一致:")
+            for field, row in matrix.items():
+                print(f"      - {field}: " + " | ".join(f"{name}={value}" for name, value in row.items()))
+        else:
+            print("   ✅ 所有环境一致")
+    wall_time = time.perf_counter() - started
+
+    summary = {
+        'timestamp': datetime.now().isoformat(),
+        'environments': [env._asdict() for env in environments],
+        'baseline': baseline,
+        'relative_urls': args.relative_urls,
+        'total_pages': len(results),
+        'pages_with_differences': sum(1 for r in results.values() if r['matrix']),
+        'fields_differing': {name: sum(len(r['differs_from_baseline'].get(name, [])) for r in results.values())
+                             for name in env_time if name != baseline},
+        'wall_time_seconds': round(wall_time, 3),
+        'environment_request_seconds': {name: round(t, 3) for name, t in env_time.items()},
+    }
+    output_file = f"seo_environment_matrix_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with phase('report'), open(output_file, 'w', encoding='utf-8') as f:
+        json.dump({'summary': summary, 'results': results}, f, ensure_ascii=False, indent=2)
+    note_report(output_file)
+
+    print(f"\n📊 对比完成，结果已保存到: {output_file}")
+    print(f"\n📈 对比摘要:")
+    print(f"   - 总页面数: {summary['total_pages']}")
+    print(f"   - 有差异的页面: {summary['pages_with_differences']}")
+    for name, count in summary['fields_differing'].items():
+        print(f"   - {name} 与 {baseline} 不一致的字段: {count} 个")
+    print(f"   - ⏱️  总耗时 {wall_time:.2f}s（各环境请求耗时: "
+          + ", ".join(f"{name} {t:.2f}s" for name, t in env_time.items()) + "）")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
+    return 0 if summary['pages_with_differences'] == 0 else 1
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="对比生产环境与本地开发环境的 SEO 标签配置")
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=URL',
+                        help='参与对比的环境，可重复；第一个为基准（例如 --env prod=https://www.yhflexiblebusbar.com --env local=http://localhost:3003）')
+    parser.add_argument('--relative-urls', action='store_true', help='多环境对比时去掉各环境自身的域名，只比较 URL 路径')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_MAX_IN_FLIGHT, help='全局最大并发请求数')
+    parser.add_argument('--per-host', type=int, default=DEFAULT_PER_HOST, help='单个主机（环境）的最大并发请求数')
+    add_adaptive_arguments(parser)
+    add_cache_arguments(parser)
+    add_snapshot_arguments(parser)
+    add_warc_arguments(parser)
+    add_cassette_arguments(parser)
+    add_latency_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    adaptive_from_args(args)
+    configure_client(cache=cache_from_args(args), snapshots=snapshots_from_args(args), warc=warc_from_args(args),
+                     cassette=cassette_from_args(args))
+
+    if args.env:
+        try:
+            environments = [parse_environment(spec) for spec in args.env]
+        except ValueError as e:
+            parser.error(str(e))
+        if len(environments) < 2:
+            parser.error('多环境对比至少需要两个 --env')
+        if len({env.name for env in environments}) != len(environments):
+            parser.error('--env 的环境名称不能重复')
+        return compare_environment_matrix(environments, args)
+
     print("🚀 开始对比生产环境与本地开发环境的 SEO 标签配置")
     print(f"🌐 生产环境: {PRODUCTION_BASE_URL}")
     print(f"🏠 本地环境: {LOCAL_BASE_URL}")
     print(f"⏰ 对比时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
     comparison_results = {}
+    environments = [Environment('production', PRODUCTION_BASE_URL), Environment('local', LOCAL_BASE_URL)]
+    pages = {page_info['path']: page_info for page_info in PAGES_TO_COMPARE}
+    fetched = iter_environments(pages, environments, lambda env, path: check_environment_seo_quietly(env.base_url, pages[path]),
+                                max_in_flight=args.concurrency, per_host=args.per_host)
     
-    for page_info in PAGES_TO_COMPARE:
+    for path, data in fetched:
+        page_info = pages[path]
         print(f"\n🔍 对比页面: {page_info['name']} ({page_info['path']})")
         
         try:
-            # 获取生产环境数据
-            print("   📡 获取生产环境数据...")
-            prod_data = check_environment_seo(PRODUCTION_BASE_URL, page_info)
-            
-            # 获取本地环境数据
-            print("   🏠 获取本地环境数据...")
-            local_data = check_environment_seo(LOCAL_BASE_URL, page_info)
+            # 抓取错误按页面顺序在这里输出；抓取时的异常重新抛出，记录为该页面的错误结果
+            seo_data = {}
+            for name in ('production', 'local'):
+                if isinstance(data[name], Exception):
+                    raise data[name]
+                seo_data[name], fetch_error = data[name]
+                if fetch_error:
+                    print(fetch_error)
             
-            # 对比数据
-            comparison = compare_seo_data(prod_data, local_data, page_info['name'])
+            # 对比数据（两个环境已并行获取）
+            comparison = compare_seo_data(seo_data['production'], seo_data['local'], page_info['name'])
             comparison_results[page_info['path']] = comparison
             
             # 显示对比结果
@@ -204,8 +297,9 @@ def main():
     
     # 保存结果到文件
     output_file = f"seo_environment_comparison_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, 'w', encoding='utf-8') as f:
+    with phase('report'), open(output_file, 'w', encoding='utf-8') as f:
         json.dump(comparison_results, f, ensure_ascii=False, indent=2)
+    note_report(output_file)
     
     print(f"\n📊 对比完成，结果已保存到: {output_file}")
     
@@ -221,6 +315,10 @@ def main():
     print(f"   - 有差异的页面: {pages_with_differences}")
     print(f"   - 检查失败的页面: {pages_with_errors}")
     print(f"   - 完全一致的页面: {total_pages - pages_with_differences - pages_with_errors}")
+    print(f"   - {get_client().describe_stats()}")
+    latency_file = latency_report_from_args(args, get_client().latency)
+    if latency_file:
+        print(f"   - ⏱️  延迟分布已保存到: {latency_file}")
     
     if pages_with_differences == 0 and pages_with_errors == 0:
         print("🎉 所有页面的 SEO 配置在两个环境中完全一致！")
@@ -231,4 +329,4 @@ def main():
         print("❌ 部分页面检查失败，可能是本地环境未启动或网络问题")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+从逐条结果（.jsonl）重建 JSON 报告
+check_production_seo.py、check_production_articles.py、extended_seo_verification.py 运行时把每个页面的结果
+追加写入 .jsonl，正常结束时自动生成同名 .json；运行中途中断时用本脚本把已完成的部分重建为原格式的报告。
+
+用法示例：
+  python3 rebuild_report.py production_seo_check_20251028_101948.jsonl
+  python3 rebuild_report.py extended_seo_verification_*.jsonl
+  python3 rebuild_report.py results.jsonl -o results.json
+"""
+
+import argparse
+import glob
+import sys
+
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+from seo_audit.results import write_report
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='从逐条结果 .jsonl 重建 JSON 报告')
+    parser.add_argument('files', nargs='+', help='.jsonl 文件（支持通配符）')
+    parser.add_argument('-o', '--output', default=None, help='输出文件（只给出一个输入时可用，默认同名 .json）')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
+    paths = [path for spec in args.files for path in (sorted(glob.glob(spec)) or [spec])]
+    if args.output and len(paths) > 1:
+        print("❌ 多个输入文件时不能指定 --output")
+        return 1
+
+    failed = 0
+    for path in paths:
+        try:
+            output_file, count, complete = write_report(path, args.output)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ {path}: {e}")
+            failed += 1
+            continue
+        print(f"✅ {path} -> {output_file}（{count} 条结果）")
+        if not complete:
+            print("   ⚠️  运行未正常结束，报告只包含已完成的结果（没有 summary）")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,35 @@
+#!/usr/bin/env tsx
+/**
+ * 导出多语言路径映射（src/lib/url-localization 的 LOCALIZED_PATHS）为 JSON，
+ * 供 Python 审计工具（seo_audit.routes）构建 en↔es 路由索引。
+ * 路径经 buildLocalizedUrl 生成，与站点实际输出的 URL 规则一致。
+ *
+ * 用法: npm run export:localized-paths > localized-paths.json
+ */
+
+import { LOCALIZED_PATHS, buildLocalizedUrl } from '../src/lib/url-localization';
+
+const locales = Array.from(
+  new Set(Object.values(LOCALIZED_PATHS).flatMap((paths) => Object.keys(paths)))
+) as Array<keyof (typeof LOCALIZED_PATHS)[string]>;
+
+const routes: Record<string, Record<string, string>> = {};
+for (const key of Object.keys(LOCALIZED_PATHS)) {
+  routes[key] = {};
+  for (const locale of locales) {
+    routes[key][locale] = buildLocalizedUrl(key, locale);
+  }
+}
+
+console.log(
+  JSON.stringify(
+    {
+      generatedAt: new Date().toISOString(),
+      source: 'src/lib/url-localization.ts',
+      locales,
+      routes,
+    },
+    null,
+    2
+  )
+);
@@ -0,0 +1,4 @@
+"""
+SEO 审计脚本共用的基础库
+各 check_*.py / verify_*.py 脚本从这里导入抓取、解析与校验能力
+"""
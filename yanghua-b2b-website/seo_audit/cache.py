@@ -0,0 +1,257 @@
+"""
+磁盘 HTTP 缓存（条件请求）
+- 按 URL（head_only 抓取单独存放）保存响应正文、响应头与验证器（ETag / Last-Modified）
+- 再次请求时发送 If-None-Match / If-Modified-Since，服务器返回 304 时直接使用磁盘上的正文
+- 只有显式开启 trust_max_age（--cache-max-age）时，Cache-Control: max-age 仍在有效期内的响应才直接使用、不发请求；
+  默认每次都向服务器重新验证，审计看到的始终是生产环境当前的页面（no-cache / no-store 不缓存）
+- 总大小超过上限时按最近最少使用（LRU）淘汰
+- 统计命中 / 未命中 / 304 重新验证次数
+
+缓存保存在一个 SQLite 文件中（默认 .cache/seo-audit/http-cache.sqlite3），可在多个工作线程之间共享。
+缓存默认关闭：通过 HttpClient(cache=HttpCache()) 或 configure_client(cache=...) 启用，
+脚本可用 add_cache_arguments / cache_from_args 提供 --cache、--cache-max-age、--cache-path、--cache-size 参数；
+也可以设置环境变量 SEO_AUDIT_HTTP_CACHE=<缓存文件路径> 让所有脚本的共享客户端启用缓存。
+"""
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Callable, Dict, Mapping, NamedTuple, Optional
+
+from requests.structures import CaseInsensitiveDict
+
+from .client import Response
+
+DEFAULT_CACHE_PATH = os.path.join(".cache", "seo-audit", "http-cache.sqlite3")
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# 正文已解码，这些传输层响应头不再适用，不写入缓存
+_TRANSPORT_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding", "connection"))
+
+_MAX_AGE = re.compile(r"max-age\s*=\s*(\d+)", re.IGNORECASE)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS http_cache (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    status_code INTEGER NOT NULL,
+    headers TEXT NOT NULL,
+    content BLOB NOT NULL,
+    encoding TEXT,
+    http_version TEXT,
+    truncated INTEGER NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    expires_at REAL,
+    size INTEGER NOT NULL,
+    last_access REAL NOT NULL
+)
+"""
+
+
+class CacheEntry(NamedTuple):
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    content: bytes
+    encoding: Optional[str]
+    http_version: Optional[str]
+    truncated: bool
+    etag: Optional[str]
+    last_modified: Optional[str]
+    expires_at: Optional[float]
+
+    def is_fresh(self, now: float) -> bool:
+        return self.expires_at is not None and now < self.expires_at
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+    def response(self, elapsed: float) -> Response:
+        return Response(url=self.url, status_code=self.status_code, headers=CaseInsensitiveDict(self.headers),
+                        content=self.content, encoding=self.encoding, elapsed=elapsed,
+                        http_version=self.http_version or "HTTP/1.1", truncated=self.truncated)
+
+
+def _expires_at(headers: Mapping[str, str], now: float) -> Optional[float]:
+    """按 Cache-Control: max-age 计算过期时间；no-cache 或没有 max-age 时每次都要重新验证"""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-cache" in cache_control.lower():
+        return None
+    match = _MAX_AGE.search(cache_control)
+    return now + int(match.group(1)) if match else None
+
+
+def _storable(response: Response, trust_max_age: bool) -> bool:
+    if response.status_code != 200:
+        return False
+    if "no-store" in response.headers.get("Cache-Control", "").lower():
+        return False
+    # 没有验证器（且不信任 max-age 或没有有效期）的响应下次无法复用
+    return bool(response.headers.get("ETag") or response.headers.get("Last-Modified")
+                or (trust_max_age and _expires_at(response.headers, 0.0)))
+
+
+class HttpCache:
+    """容量受限的 LRU 磁盘缓存（线程安全）；trust_max_age 为 False 时只做条件请求，不跳过网络请求"""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_bytes: int = DEFAULT_MAX_BYTES,
+                 trust_max_age: bool = False):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.trust_max_age = trust_max_age
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS http_cache_lru ON http_cache (last_access)")
+        self._conn.commit()
+        self._hits = 0
+        self._revalidated = 0
+        self._misses = 0
+        self._evictions = 0
+
+    # ---- 与 HttpClient 的接口 ----
+
+    def get(self, send: Callable[[Dict[str, str]], Response], url: str, head_only: bool) -> Response:
+        """send(额外请求头) 负责真正发出请求；返回缓存或网络的响应"""
+        key = self.key(url, head_only)
+        started = time.perf_counter()
+        entry = self.lookup(key)
+        now = time.time()
+        if entry is not None and self.trust_max_age and entry.is_fresh(now):
+            self._count("_hits")
+            return entry.response(time.perf_counter() - started)
+
+        response = send(entry.conditional_headers() if entry is not None else {})
+        if entry is not None and response.status_code == 304:
+            self._count("_revalidated")
+            self._refresh(key, response.headers, now)
+            return entry.response(response.elapsed)
+
+        self._count("_misses")
+        if _storable(response, self.trust_max_age):
+            self.store(key, response, now)
+        return response
+
+    @staticmethod
+    def key(url: str, head_only: bool) -> str:
+        return f"{url}#head" if head_only else url
+
+    # ---- 存取 ----
+
+    def lookup(self, key: str) -> Optional[CacheEntry]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, status_code, headers, content, encoding, http_version, truncated, etag, "
+                "last_modified, expires_at FROM http_cache WHERE key = ?",
+                (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE http_cache SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._conn.commit()
+        return CacheEntry(row[0], row[1], json.loads(row[2]), bytes(row[3]), row[4], row[5], bool(row[6]),
+                          row[7], row[8], row[9])
+
+    def store(self, key: str, response: Response, now: Optional[float] = None) -> None:
+        now = time.time() if now is None else now
+        size = len(response.content)
+        if size > self.max_bytes:
+            return
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _TRANSPORT_HEADERS}
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO http_cache (key, url, status_code, headers, content, encoding, http_version, "
+                "truncated, etag, last_modified, expires_at, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(headers), response.content,
+                 response.encoding, response.http_version, int(response.truncated), response.headers.get("ETag"),
+                 response.headers.get("Last-Modified"), _expires_at(response.headers, now), size, now),
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _refresh(self, key: str, headers: Mapping[str, str], now: float) -> None:
+        """304 响应可能带来新的有效期与验证器"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE http_cache SET expires_at = ?, etag = COALESCE(?, etag), "
+                "last_modified = COALESCE(?, last_modified), last_access = ? WHERE key = ?",
+                (_expires_at(headers, now), headers.get("ETag"), headers.get("Last-Modified"), now, key),
+            )
+            self._conn.commit()
+
+    def _evict(self) -> None:
+        """调用方持有锁：按 last_access 从旧到新淘汰，直到总大小不超过上限"""
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM http_cache").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in self._conn.execute("SELECT key, size FROM http_cache ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+            self._evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM http_cache")
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    # ---- 统计 ----
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def stats(self) -> Dict[str, int]:
+        """返回 {'hits', 'revalidated', 'misses', 'evictions', 'entries', 'bytes'}"""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM http_cache").fetchone()
+            return {
+                "hits": self._hits,
+                "revalidated": self._revalidated,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "entries": entries,
+                "bytes": size,
+            }
+
+    def describe_stats(self) -> str:
+        s = self.stats()
+        return (f"💾 缓存统计: 命中 {s['hits']} 次, 304 重新验证 {s['revalidated']} 次, 未命中 {s['misses']} 次, "
+                f"淘汰 {s['evictions']} 条, 当前 {s['entries']} 条 / {s['bytes'] / 1024 / 1024:.1f} MB")
+
+
+def add_cache_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --cache / --cache-max-age / --cache-path / --cache-size 参数"""
+    parser.add_argument("--cache", action="store_true",
+                        help="启用磁盘 HTTP 缓存：每次仍向服务器发条件请求，304 时复用磁盘上的正文")
+    parser.add_argument("--cache-max-age", action="store_true",
+                        help="（配合 --cache）Cache-Control: max-age 有效期内的响应直接使用、不发请求；"
+                             "有效期内生产环境的改动不会被发现")
+    parser.add_argument("--cache-path", default=DEFAULT_CACHE_PATH, help=f"缓存文件路径（默认 {DEFAULT_CACHE_PATH}）")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_BYTES // 1024 // 1024,
+                        help="缓存容量上限（MB），超出后按 LRU 淘汰")
+
+
+def cache_from_args(args: argparse.Namespace) -> Optional[HttpCache]:
+    """按 add_cache_arguments 解析出的参数创建缓存；没有 --cache 时返回 None"""
+    if not args.cache:
+        return None
+    return HttpCache(args.cache_path, args.cache_size * 1024 * 1024, trust_max_age=args.cache_max_age)
@@ -0,0 +1,231 @@
+"""
+全站 canonical 链解析
+沿 "页面 -> canonical 目标 -> 目标自己的 canonical -> ..." 一直追到终点，检查：
+
+- canonical 链：目标页面的 canonical 又指向别处（A -> B -> C）
+- canonical 循环：A -> B -> A
+- canonical 指向重定向（3xx）或非 200 页面（404 等）
+- canonical 离开 hreflang 集群：目标既不是本页的 alternate，也不在同一个 hreflang 集群中
+
+每个节点只抓取一次、只解析一次：已爬取的页面直接加入，未知目标按层批量并发抓取（head-only，不跟随重定向），
+解析结果按节点缓存，成千上万个页面指向同一个目标时也只沿链走一遍。
+
+用法示例：
+  resolver = CanonicalResolver()
+  for result in crawl(seeds):
+      resolver.add_page(result.url, result.page, result.status_code, result.final_url)
+  resolver.fetch_unknown()
+  for url, findings in resolver.findings(hreflang_graph).items():
+      ...
+"""
+
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .checks import ERROR, WARNING, Finding
+from .client import HttpClient, get_client
+from .fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, iter_ordered
+from .hreflang_graph import HreflangGraph, url_key
+from .page import PageSeo
+
+# Resolution.issue 的取值
+ISSUE_LOOP = "loop"
+ISSUE_REDIRECT = "redirect"
+ISSUE_STATUS = "status"
+ISSUE_UNRESOLVED = "unresolved"
+
+# 链上超过这么多跳仍未到终点时按循环处理（防御性上限，正常情况下由循环检测先发现）
+MAX_HOPS = 50
+
+
+class CanonicalNode(NamedTuple):
+    """一个 URL 的抓取结果；redirect 为 3xx 的 Location，canonical 为规范化后的目标键"""
+    status_code: Optional[int]
+    redirect: Optional[str] = None
+    canonical: Optional[str] = None
+
+
+class Resolution(NamedTuple):
+    """从某个节点出发沿 canonical 走到终点的结果
+
+    final 为终点键；chain 为经过的节点（含起点与终点）；issue 为终点的问题（None 表示终点是正常的 200 页面）。
+    """
+    final: str
+    chain: Tuple[str, ...]
+    issue: Optional[str] = None
+
+
+def fetch_canonical_node(url: str, client: Optional[HttpClient] = None) -> CanonicalNode:
+    """抓取 URL 的状态与 canonical（只下载 <head>，不跟随重定向）"""
+    try:
+        response = (client or get_client()).get(url, allow_redirects=False, head_only=True)
+    except Exception:
+        return CanonicalNode(None)
+    if 300 <= response.status_code < 400:
+        return CanonicalNode(response.status_code, response.headers.get("Location"))
+    if response.status_code != 200:
+        return CanonicalNode(response.status_code)
+    page = PageSeo.parse(response.content, url)
+    return CanonicalNode(200, canonical=page.canonical if page else None)
+
+
+class CanonicalResolver:
+    """canonical 有向图；节点键与 HreflangGraph 使用同一个 key 函数，两张图可以互相查询"""
+
+    def __init__(self, key: Callable[[str], str] = url_key, url_of_key: Callable[[str], str] = lambda k: k,
+                 fetch: Callable[[str], CanonicalNode] = fetch_canonical_node):
+        self._key = key
+        self._keys: Dict[str, str] = {}
+        # 键 -> 可抓取的 URL（例如 path_key 时补上站点域名）
+        self.url_of_key = url_of_key
+        self.fetch = fetch
+        self.nodes: Dict[str, CanonicalNode] = {}
+        # 已加入的页面键 -> 原始 URL（只对这些页面输出结果）
+        self.pages: Dict[str, str] = {}
+        self._resolved: Dict[str, Resolution] = {}
+
+    def key(self, url: str) -> str:
+        cached = self._keys.get(url)
+        if cached is None:
+            cached = self._keys[url] = self._key(url)
+        return cached
+
+    def add_page(self, url: str, page: Optional[PageSeo], status_code: Optional[int] = 200,
+                 final_url: Optional[str] = None) -> None:
+        """加入已抓取的页面；final_url 与 url 不同时 url 记为重定向，页面归到 final_url 名下"""
+        key = self.key(url)
+        if final_url and self.key(final_url) != key:
+            self.nodes.setdefault(key, CanonicalNode(status_code, final_url))
+            url, key = final_url, self.key(final_url)
+        canonical = self.key(page.canonical.strip()) if page is not None and page.canonical else None
+        self.nodes[key] = CanonicalNode(status_code, canonical=canonical)
+        if page is not None:
+            self.pages[key] = url
+        self._resolved.clear()
+
+    def add_node(self, url: str, node: CanonicalNode) -> None:
+        node = node._replace(canonical=self.key(node.canonical.strip()) if node.canonical else None)
+        self.nodes[self.key(url)] = node
+        self._resolved.clear()
+
+    def unknown(self) -> List[str]:
+        """被 canonical 引用但尚未抓取的键"""
+        unknown = []
+        seen = set()
+        for node in self.nodes.values():
+            target = node.canonical
+            if target is not None and target not in self.nodes and target not in seen:
+                seen.add(target)
+                unknown.append(target)
+        return unknown
+
+    def fetch_unknown(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+                      min_interval: float = 0.0) -> int:
+        """逐层并发抓取未知目标，直到所有 canonical 目标都已知；返回抓取的节点数"""
+        fetched = 0
+        unknown = self.unknown()
+        while unknown:
+            ordered = iter_ordered(unknown, lambda k: self.fetch(self.url_of_key(k)), url_of=self.url_of_key,
+                                   max_in_flight=max_in_flight, per_host=per_host, min_interval=min_interval)
+            for target, node in ordered:
+                self.add_node(target, node)
+                fetched += 1
+            unknown = self.unknown()
+        return fetched
+
+    # ---- 解析 ----
+
+    def resolve(self, key: str) -> Resolution:
+        """沿 canonical 走到终点；路径上每个节点的结果都会缓存"""
+        path: List[str] = []
+        on_path: Dict[str, int] = {}
+        current = key
+        while True:
+            cached = self._resolved.get(current)
+            if cached is not None:
+                tail = cached
+                break
+            if current in on_path or len(path) >= MAX_HOPS:
+                # 循环：环上每个节点的链都从自身出发绕环一周
+                start = on_path.get(current, 0)
+                cycle = path[start:]
+                for i, member in enumerate(cycle):
+                    ring = tuple(cycle[i:] + cycle[:i]) + (member,)
+                    self._resolved[member] = Resolution(member, ring, ISSUE_LOOP)
+                path = path[:start]
+                tail = self._resolved.setdefault(current, Resolution(current, tuple(cycle) + (current,), ISSUE_LOOP))
+                break
+            node = self.nodes.get(current)
+            if node is None or node.status_code is None:
+                tail = Resolution(current, (current,), ISSUE_UNRESOLVED)
+            elif node.redirect:
+                tail = Resolution(current, (current,), ISSUE_REDIRECT)
+            elif node.status_code != 200:
+                tail = Resolution(current, (current,), ISSUE_STATUS)
+            elif node.canonical is None or node.canonical == current:
+                tail = Resolution(current, (current,))
+            else:
+                on_path[current] = len(path)
+                path.append(current)
+                current = node.canonical
+                continue
+            self._resolved[current] = tail
+            break
+        for member in reversed(path):
+            tail = Resolution(tail.final, (member,) + tail.chain, tail.issue)
+            self._resolved[member] = tail
+        return self._resolved[key]
+
+    def findings(self, hreflang: Optional[HreflangGraph] = None) -> Dict[str, List[Finding]]:
+        """按页面 URL 汇总的检查结果，格式与 run_checks 一致；给出 hreflang 图时检查 canonical 是否离开集群"""
+        cluster_of = hreflang.cluster_ids() if hreflang is not None else {}
+        findings: Dict[str, List[Finding]] = {}
+        for key, url in self.pages.items():
+            node = self.nodes[key]
+            target = node.canonical
+            if target is None or target == key:
+                continue
+            page_findings = []
+            resolution = self.resolve(key)
+            # chain[0] 是页面自身，chain[1] 是 canonical 目标
+            hops = resolution.chain[1:]
+            target_node = self.nodes.get(target)
+            if resolution.issue == ISSUE_LOOP:
+                page_findings.append(Finding("canonical_loop", ERROR,
+                                             f"canonical 循环: {' -> '.join(resolution.chain)}"))
+            elif target_node is not None and target_node.redirect:
+                page_findings.append(Finding("canonical_target", ERROR,
+                                             f"canonical 指向重定向: {target} -> {target_node.redirect}"))
+            elif target_node is not None and target_node.status_code not in (None, 200):
+                page_findings.append(Finding("canonical_target", ERROR,
+                                             f"canonical 指向 {target_node.status_code} 页面: {target}"))
+            elif len(hops) > 1:
+                severity = ERROR if resolution.issue else WARNING
+                page_findings.append(Finding("canonical_chain", severity,
+                                             f"canonical 链（{len(hops)} 跳）: {' -> '.join(resolution.chain)}"))
+            # 只检查声明了 hreflang 集群的页面；没有 alternates 的页面（分页、带参数的变体等）可以指向别处
+            declared = hreflang.targets.get(key) if hreflang is not None else None
+            if declared:
+                in_cluster = target in declared or (
+                    key in cluster_of and cluster_of.get(target) == cluster_of[key])
+                if not in_cluster:
+                    page_findings.append(Finding("canonical_cluster", ERROR,
+                                                 f"canonical 目标不在本页的 hreflang 集群中: {target}"))
+            if page_findings:
+                findings[url] = page_findings
+        return findings
+
+    def summary(self, hreflang: Optional[HreflangGraph] = None) -> Dict[str, int]:
+        counts: Dict[str, int] = {"pages": len(self.pages), "nodes": len(self.nodes)}
+        for page_findings in self.findings(hreflang).values():
+            for finding in page_findings:
+                counts[finding.check] = counts.get(finding.check, 0) + 1
+        return counts
+
+
+def build_resolver(pages: Iterable[Tuple[str, Optional[PageSeo]]], key: Callable[[str], str] = url_key,
+                   **kwargs) -> CanonicalResolver:
+    """由 (url, PageSeo) 构建解析器（页面都视为 200）"""
+    resolver = CanonicalResolver(key, **kwargs)
+    for url, page in pages:
+        resolver.add_page(url, page)
+    return resolver
@@ -0,0 +1,462 @@
+"""
+HTTP 录制 / 回放磁带（cassette）
+让只能对着生产环境运行的诊断与对比脚本可以离线、确定性地重跑：
+
+- 录制：CassetteRecorder 把每次请求与响应（方法、URL、请求头与请求体摘要、状态码、完整响应头、解码后的正文、耗时）
+  追加写入磁带文件。响应头按原始顺序保存为 (名称, 值) 列表，多条 Set-Cookie（CSRF 流程）与 Link 都不会合并丢失
+- 索引：每条记录在文件中的偏移与长度写入 <磁带>.idx（每行一个 JSON），
+  索引缺失或旧于磁带时顺序扫描一遍重建（记录头写明正文长度，扫描时直接跳过正文）
+- 回放：CassettePlayer 用 mmap 映射磁带文件，按索引直接切出记录，不读入整个文件，也不访问网络；
+  同一请求录制了多次时按录制顺序依次回放，用完后重复最后一次
+
+磁带文件格式：首行为 SEO-AUDIT-CASSETTE/1，之后每条记录为一行 JSON 记录头 + 正文 + 换行。
+
+共享客户端：configure_client(cassette=CassetteRecorder("audit.cassette")) 录制，
+configure_client(cassette=CassettePlayer("audit.cassette")) 回放；脚本可用 add_cassette_arguments / cassette_from_args
+提供 --record-cassette / --replay-cassette 参数，也可以设置环境变量
+SEO_AUDIT_RECORD_CASSETTE / SEO_AUDIT_REPLAY_CASSETTE=<磁带路径> 让所有脚本的共享客户端录制或回放。
+直接使用 requests.Session 的脚本（例如 diagnose_email_503 的 CSRF cookie 流程）用 mount_session 接入，
+cookie 按回放的 Set-Cookie 正常写入会话。
+
+用法示例：
+  player = CassettePlayer("email_503.cassette")
+  response = player.replay("GET", "https://www.yhflexiblebusbar.com/api/csrf")
+  print(response.status_code, response.headers.get("Set-Cookie"))
+"""
+
+import argparse
+import atexit
+import email.parser
+import hashlib
+import http.client
+import io
+import json
+import mmap
+import os
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from http.client import responses as HTTP_REASONS
+from typing import Any, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+
+from requests.adapters import HTTPAdapter
+from urllib3._collections import HTTPHeaderDict
+from urllib3.response import HTTPResponse
+
+from .client import CASSETTE_RECORD_ENV, CASSETTE_REPLAY_ENV, HEAD_END, STREAM_CHUNK_SIZE, Response
+
+CASSETTE_MAGIC = b"SEO-AUDIT-CASSETTE/1\n"
+INDEX_SUFFIX = ".idx"
+# 正文已解码，这些传输层响应头不写入磁带，Content-Length 按实际长度改写
+_TRANSPORT_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding", "connection"))
+
+
+class CassetteMissError(LookupError):
+    """回放时磁带中没有对应请求的录制"""
+
+
+class Exchange(NamedTuple):
+    """一次请求与响应；headers / request_headers 为 (名称, 值) 列表，保留重复的响应头"""
+    method: str
+    url: str
+    status_code: int
+    headers: List[Tuple[str, str]]
+    content: bytes
+    final_url: Optional[str] = None
+    reason: str = ""
+    http_version: str = "HTTP/1.1"
+    encoding: Optional[str] = None
+    elapsed: float = 0.0
+    truncated: bool = False
+    request_headers: List[Tuple[str, str]] = []
+    request_body: bytes = b""
+    follow_redirects: bool = True
+
+    @property
+    def key(self) -> str:
+        return exchange_key(self.method, self.url, self.request_body, self.follow_redirects)
+
+
+def exchange_key(method: str, url: str, body: bytes = b"", follow_redirects: bool = True) -> str:
+    """请求的匹配键：方法 + URL，有请求体时加上其摘要，不跟随重定向的请求单独区分"""
+    parts = [method.upper(), url]
+    if body:
+        parts.append("sha1:" + hashlib.sha1(body).hexdigest())
+    if not follow_redirects:
+        parts.append("no-redirects")
+    return " ".join(parts)
+
+
+def header_items(headers: Any) -> List[Tuple[str, str]]:
+    """响应头 -> (名称, 值) 列表；httpx.Headers 与 urllib3 的 HTTPHeaderDict 会逐条给出重复的头"""
+    if hasattr(headers, "multi_items"):
+        return [(k, v) for k, v in headers.multi_items()]
+    return [(k, v) for k, v in headers.items()]
+
+
+def _payload_headers(headers: Any, content: bytes) -> List[Tuple[str, str]]:
+    items = [(k, v) for k, v in header_items(headers) if k.lower() not in _TRANSPORT_HEADERS]
+    items.append(("Content-Length", str(len(content))))
+    return items
+
+
+def _head_part(content: bytes) -> Optional[int]:
+    """</head> 结束位置；没有 </head> 时返回 None"""
+    pos = content.lower().find(HEAD_END)
+    return None if pos == -1 else pos + len(HEAD_END)
+
+
+# ---- 索引 ----
+
+class IndexEntry(NamedTuple):
+    """一条记录的位置：offset 为记录头的起点，正文紧跟在 header_length 字节的记录头之后"""
+    key: str
+    offset: int
+    header_length: int
+    body_length: int
+
+    @property
+    def body_offset(self) -> int:
+        return self.offset + self.header_length
+
+    def to_line(self) -> str:
+        return json.dumps(self._asdict(), ensure_ascii=False)
+
+    @classmethod
+    def from_line(cls, line: str) -> "IndexEntry":
+        return cls(**json.loads(line))
+
+
+def scan_index(path: str) -> Iterator[IndexEntry]:
+    """顺序扫描磁带，产出每条记录的索引项；末尾写了一半的记录（录制进程被中断）忽略"""
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        if f.readline() != CASSETTE_MAGIC:
+            raise ValueError(f"不是录制磁带: {path}")
+        while True:
+            offset = f.tell()
+            line = f.readline()
+            if not line.endswith(b"\n"):
+                return
+            header = json.loads(line)
+            end = offset + len(line) + header["body_length"] + 1
+            if end > size:
+                return
+            yield IndexEntry(header["key"], offset, len(line), header["body_length"])
+            f.seek(end)
+
+
+class CassetteIndex:
+    """磁带的记录索引；同一匹配键按录制顺序保存全部记录"""
+
+    def __init__(self, path: str, entries: List[IndexEntry]):
+        self.path = path
+        self.entries = entries
+        self.by_key: Dict[str, List[IndexEntry]] = {}
+        for entry in entries:
+            self.by_key.setdefault(entry.key, []).append(entry)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, path: str) -> "CassetteIndex":
+        return cls(path, list(scan_index(path)))
+
+    @classmethod
+    def load(cls, path: str, index_path: Optional[str] = None) -> "CassetteIndex":
+        with open(index_path or path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            return cls(path, [IndexEntry.from_line(line) for line in f if line.strip()])
+
+    @classmethod
+    def load_or_build(cls, path: str, save: bool = True) -> "CassetteIndex":
+        """索引文件存在且不旧于磁带时直接读取，否则扫描一遍并（可写时）保存"""
+        index_path = path + INDEX_SUFFIX
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+            return cls.load(path, index_path)
+        index = cls.build(path)
+        if save:
+            try:
+                index.save(index_path)
+            except OSError:
+                pass
+        return index
+
+    def save(self, index_path: Optional[str] = None) -> None:
+        with open(index_path or self.path + INDEX_SUFFIX, "w", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(entry.to_line() + "\n")
+
+
+# ---- 录制 ----
+
+class CassetteRecorder:
+    """线程安全的磁带录制器；追加写入已有磁带。进程退出时自动关闭并写出索引"""
+
+    replaying = False
+
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        if self._file.tell() == 0:
+            self._file.write(CASSETTE_MAGIC)
+        self._offset = self._file.tell()
+        # 追加写入已有磁带时，旧记录不在内存索引中
+        self._appended = self._offset > len(CASSETTE_MAGIC)
+        self._lock = threading.Lock()
+        self._index: List[IndexEntry] = []
+        self.exchanges = 0
+        self.bytes_written = 0
+        atexit.register(self.close)
+
+    def record(self, exchange: Exchange) -> None:
+        header = {
+            "key": exchange.key,
+            "method": exchange.method.upper(),
+            "url": exchange.url,
+            "final_url": exchange.final_url or exchange.url,
+            "status_code": exchange.status_code,
+            "reason": exchange.reason or HTTP_REASONS.get(exchange.status_code, ""),
+            "http_version": exchange.http_version,
+            "headers": exchange.headers,
+            "encoding": exchange.encoding,
+            "elapsed": round(exchange.elapsed, 6),
+            "truncated": exchange.truncated,
+            "follow_redirects": exchange.follow_redirects,
+            "request_headers": exchange.request_headers,
+            "request_body_length": len(exchange.request_body),
+            "recorded_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "body_length": len(exchange.content),
+        }
+        line = (json.dumps(header, ensure_ascii=False) + "\n").encode("utf-8")
+        with self._lock:
+            if self._file.closed:
+                raise ValueError(f"磁带已关闭: {self.path}")
+            offset = self._offset
+            self._file.write(line)
+            self._file.write(exchange.content)
+            self._file.write(b"\n")
+            self._file.flush()
+            size = len(line) + len(exchange.content) + 1
+            self._offset += size
+            self.bytes_written += size
+            self.exchanges += 1
+            self._index.append(IndexEntry(header["key"], offset, len(line), len(exchange.content)))
+
+    def record_response(self, method: str, url: str, request_headers: Mapping[str, str], response: Response,
+                        follow_redirects: bool = True) -> None:
+        """记录共享客户端（seo_audit.client）返回给调用方的响应"""
+        self.record(Exchange(
+            method=method, url=url, status_code=response.status_code,
+            headers=_payload_headers(response.headers, response.content), content=response.content,
+            final_url=response.url, http_version=response.http_version, encoding=response.encoding,
+            elapsed=response.elapsed, truncated=response.truncated,
+            request_headers=list(request_headers.items()), follow_redirects=follow_redirects,
+        ))
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            entries = list(self._index)
+        index = CassetteIndex.build(self.path) if self._appended else CassetteIndex(self.path, entries)
+        index.save()
+
+    def describe_stats(self) -> str:
+        return f"📼 磁带录制 {self.path}: 录制 {self.exchanges} 次请求, 写入 {self.bytes_written / 1024:.0f} KB"
+
+
+# ---- 回放 ----
+
+class CassettePlayer:
+    """从 mmap 映射的磁带回放响应；线程安全"""
+
+    replaying = True
+
+    def __init__(self, path: str, index: Optional[CassetteIndex] = None):
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"未找到录制磁带: {path}")
+        self.path = path
+        self.index = index or CassetteIndex.load_or_build(path)
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(CASSETTE_MAGIC)] != CASSETTE_MAGIC:
+            self.close()
+            raise ValueError(f"不是录制磁带: {path}")
+        self._lock = threading.Lock()
+        self._cursors: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _entry(self, key: str) -> IndexEntry:
+        entries = self.index.by_key.get(key)
+        with self._lock:
+            if not entries:
+                self.misses += 1
+                raise CassetteMissError(f"磁带 {self.path} 中没有 {key} 的录制")
+            position = self._cursors.get(key, 0)
+            self._cursors[key] = position + 1
+            self.hits += 1
+        return entries[min(position, len(entries) - 1)]
+
+    def _header(self, entry: IndexEntry) -> Dict[str, Any]:
+        return json.loads(self._map[entry.offset:entry.body_offset])
+
+    def exchange(self, method: str, url: str, body: bytes = b"", follow_redirects: bool = True) -> Exchange:
+        """取出下一条匹配的录制；没有录制时抛出 CassetteMissError"""
+        entry = self._entry(exchange_key(method, url, body, follow_redirects))
+        header = self._header(entry)
+        content = self._map[entry.body_offset:entry.body_offset + entry.body_length]
+        return Exchange(
+            method=header["method"], url=header["url"], status_code=header["status_code"],
+            headers=[(k, v) for k, v in header["headers"]], content=content, final_url=header["final_url"],
+            reason=header["reason"], http_version=header["http_version"], encoding=header["encoding"],
+            elapsed=header["elapsed"], truncated=header["truncated"],
+            request_headers=[(k, v) for k, v in header["request_headers"]],
+            follow_redirects=header["follow_redirects"],
+        )
+
+    def replay(self, method: str, url: str, body: bytes = b"", follow_redirects: bool = True,
+               head_only: bool = False) -> Response:
+        """回放为共享客户端的 Response；head_only 时 HTML 正文在 </head> 处截断（与在线抓取一致），
+        录制时就是 head_only 抓取的响应在完整抓取时原样返回（truncated=True）"""
+        exchange = self.exchange(method, url, body, follow_redirects)
+        headers = HTTPHeaderDict(exchange.headers)
+        content, truncated = exchange.content, exchange.truncated
+        if head_only and not truncated and "html" in headers.get("Content-Type", "").lower():
+            end = _head_part(content)
+            if end is not None:
+                content, truncated = content[:end], True
+        return Response(url=exchange.final_url or url, status_code=exchange.status_code, headers=headers,
+                        content=content, encoding=exchange.encoding, elapsed=exchange.elapsed,
+                        http_version=exchange.http_version, truncated=truncated)
+
+    def stream(self, url: str, chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """与 HttpClient.stream 一致：非 2xx/3xx 抛出 HTTPStatusError，否则直接从映射中逐块切出正文"""
+        entry = self._entry(exchange_key("GET", url))
+        header = self._header(entry)
+        Response(url=header["final_url"] or url, status_code=header["status_code"],
+                 headers=HTTPHeaderDict(header["headers"]), content=b"").raise_for_status()
+        end = entry.body_offset + entry.body_length
+        for start in range(entry.body_offset, end, chunk_size):
+            yield self._map[start:min(start + chunk_size, end)]
+
+    def close(self) -> None:
+        if not self._map.closed:
+            self._map.close()
+        self._file.close()
+
+    def describe_stats(self) -> str:
+        return (f"📼 磁带回放 {self.path}: 命中 {self.hits} 次, 未录制 {self.misses} 次"
+                f"（共 {len(self.index)} 条录制）")
+
+
+# ---- requests.Session ----
+
+class _OriginalResponse:
+    """requests 从 raw._original_response.msg 读取 Set-Cookie 写入 cookie jar，回放时用解析出的头部代替"""
+
+    def __init__(self, headers: List[Tuple[str, str]]):
+        text = "".join(f"{k}: {v}\r\n" for k, v in headers) + "\r\n"
+        self.msg = email.parser.Parser(_class=http.client.HTTPMessage).parsestr(text)
+
+    def isclosed(self) -> bool:
+        return True
+
+    def close(self) -> None:
+        pass
+
+
+class CassetteAdapter(HTTPAdapter):
+    """requests 的传输适配器：录制时照常发送并记录每一跳（重定向由 Session 逐跳处理），回放时不访问网络"""
+
+    def __init__(self, cassette: Any, **kwargs: Any):
+        self.cassette = cassette
+        super().__init__(**kwargs)
+
+    def send(self, request: Any, **kwargs: Any) -> Any:
+        body = request.body or b""
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        if self.cassette.replaying:
+            exchange = self.cassette.exchange(request.method, request.url, body, follow_redirects=False)
+            raw = HTTPResponse(body=io.BytesIO(exchange.content), headers=HTTPHeaderDict(exchange.headers),
+                               status=exchange.status_code, reason=exchange.reason, preload_content=False,
+                               decode_content=False, original_response=_OriginalResponse(exchange.headers))
+            response = self.build_response(request, raw)
+            response._cassette_elapsed = exchange.elapsed
+            return response
+        started = time.perf_counter()
+        response = super().send(request, **kwargs)
+        content = response.content
+        self.cassette.record(Exchange(
+            method=request.method, url=request.url, status_code=response.status_code,
+            headers=_payload_headers(response.raw.headers, content), content=content, final_url=response.url,
+            reason=response.reason or "", encoding=response.encoding, elapsed=time.perf_counter() - started,
+            request_headers=list(request.headers.items()), request_body=body, follow_redirects=False,
+        ))
+        return response
+
+
+def _restore_elapsed(response: Any, *args: Any, **kwargs: Any) -> Any:
+    # Session.send 在适配器返回后才写入 elapsed，回放时改回录制时的耗时
+    elapsed = getattr(response, "_cassette_elapsed", None)
+    if elapsed is not None:
+        response.elapsed = timedelta(seconds=elapsed)
+    return response
+
+
+def mount_session(session: Any, cassette: Any) -> Any:
+    """让 requests.Session 的 http / https 请求经过磁带录制或回放"""
+    adapter = CassetteAdapter(cassette)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.hooks.setdefault("response", []).append(_restore_elapsed)
+    return session
+
+
+# ---- 命令行 ----
+
+def add_cassette_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --record-cassette / --replay-cassette 参数"""
+    group = parser.add_mutually_exclusive_group()
+    group.add_argument("--record-cassette", default=None, metavar="PATH",
+                       help="把本次运行的全部请求与响应录制到磁带文件（同时生成 .idx 索引）")
+    group.add_argument("--replay-cassette", default=None, metavar="PATH",
+                       help="从磁带文件回放响应，不访问网络；磁带中没有的请求视为失败")
+
+
+_cassettes: Dict[Tuple[str, bool], Any] = {}
+_cassettes_lock = threading.Lock()
+
+
+def open_cassette(path: str, replay: bool = False) -> Any:
+    """同一进程内同一磁带只打开一次（环境变量与命令行参数指向同一文件时共用）"""
+    key = (os.path.abspath(path), replay)
+    with _cassettes_lock:
+        cassette = _cassettes.get(key)
+        if cassette is None:
+            cassette = _cassettes[key] = CassettePlayer(path) if replay else CassetteRecorder(path)
+        return cassette
+
+
+def cassette_from_env() -> Any:
+    """SEO_AUDIT_REPLAY_CASSETTE 优先于 SEO_AUDIT_RECORD_CASSETTE"""
+    if os.environ.get(CASSETTE_REPLAY_ENV):
+        return open_cassette(os.environ[CASSETTE_REPLAY_ENV], replay=True)
+    if os.environ.get(CASSETTE_RECORD_ENV):
+        return open_cassette(os.environ[CASSETTE_RECORD_ENV])
+    return None
+
+
+def cassette_from_args(args: argparse.Namespace) -> Any:
+    """按 add_cassette_arguments 解析出的参数打开磁带；两个参数都未指定时按环境变量决定"""
+    if args.replay_cassette:
+        return open_cassette(args.replay_cassette, replay=True)
+    if args.record_cassette:
+        return open_cassette(args.record_cassette)
+    return cassette_from_env()
@@ -0,0 +1,180 @@
+"""
+基于 PageSeo 的 SEO 检查
+每个检查都是只读 PageSeo 的纯函数，脚本按需组合；run_checks() 一次执行全部检查。
+消息文案与各脚本原有输出保持一致。
+"""
+
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from .page import Alternate, PageSeo
+from .profiling import profiled
+
+# 每个页面都应包含的 hreflang
+REQUIRED_LANGS = ("en", "es", "x-default")
+# 建议长度范围（与 src/lib/seo-config.ts 的 validateMetadata 一致）
+TITLE_LENGTH = (30, 60)
+DESCRIPTION_LENGTH = (120, 160)
+
+ERROR = "error"
+WARNING = "warning"
+
+
+class Finding(NamedTuple):
+    """一条检查结果；check 为检查名称，severity 为 ERROR 或 WARNING"""
+    check: str
+    severity: str
+    message: str
+
+
+# ---- canonical ----
+
+def has_double_slash(url: Optional[str]) -> bool:
+    """协议之外的路径中是否出现 //"""
+    return bool(url) and "//" in url.replace("https://", "").replace("http://", "")
+
+
+def double_slash_issues(page: PageSeo) -> List[str]:
+    issues = []
+    if has_double_slash(page.canonical):
+        issues.append(f"Canonical: {page.canonical}")
+    for a in page.alternates:
+        if has_double_slash(a.href):
+            issues.append(f"Hreflang ({a.hreflang}): {a.href}")
+    return issues
+
+
+def canonical_mismatches(page: PageSeo, lang: str) -> List[Optional[str]]:
+    """lang 语言的 hreflang 中与 canonical 不一致的 href；页面没有 canonical 时不检查"""
+    if not page.canonical:
+        return []
+    return [href for href in page.alternates_for(lang) if href != page.canonical]
+
+
+# ---- hreflang ----
+
+def missing_langs(page: PageSeo, required: Sequence[str] = REQUIRED_LANGS) -> List[str]:
+    langs = set(page.languages)
+    return [lang for lang in required if lang not in langs]
+
+
+def relative_alternates(page: PageSeo) -> List[Alternate]:
+    """href 不是绝对 URL 的 hreflang"""
+    return [a for a in page.alternates if not (a.href or "").startswith("http")]
+
+
+def alternate_pairs(page: PageSeo) -> List[Tuple[str, str]]:
+    """规范化后的 (hreflang, href)：语言小写、去空白，忽略空的 hreflang"""
+    pairs = []
+    for a in page.alternates:
+        hreflang = (a.hreflang or "").strip().lower()
+        if hreflang:
+            pairs.append((hreflang, (a.href or "").strip()))
+    return pairs
+
+
+def detect_duplicates(entries: Iterable[Tuple[str, str]]) -> Dict[str, Dict]:
+    """同一语言出现多条不同 href 即为重复
+
+    返回 {lang: {"all": [...], "unique": [...], "is_duplicate": bool}}；
+    entries 可以来自 HTML（alternate_pairs）也可以来自 Link 响应头。
+    """
+    mapping: Dict[str, List[str]] = {}
+    for lang, href in entries:
+        mapping.setdefault(lang, []).append(href)
+    result: Dict[str, Dict] = {}
+    for lang, hrefs in mapping.items():
+        normalized = [h.rstrip("/") for h in hrefs if h]
+        uniq = sorted(set(normalized))
+        result[lang] = {"all": hrefs, "unique": uniq, "is_duplicate": len(hrefs) > 1 and len(uniq) > 1}
+    return result
+
+
+# ---- x-default ----
+
+def x_default_alternates(page: PageSeo) -> List[Alternate]:
+    return [a for a in page.alternates if a.hreflang == "x-default" and a.href]
+
+
+def x_default_points_to_english(x_default: Sequence[Alternate]) -> Tuple[bool, str]:
+    """x-default 是否指向英文版本，返回 (是否正确, 说明)"""
+    if not x_default:
+        return False, "No x-default tag found"
+    for a in x_default:
+        href = a.href
+        # 包含 /en/、以 /en 结尾，或是带 en 的根地址
+        if "/en/" in href or href.endswith("/en") or (href.count("/") <= 3 and "en" in href):
+            return True, f"x-default points to English version: {href}"
+    return False, f"x-default does not point to English version: {[a.href for a in x_default]}"
+
+
+# ---- meta 长度 ----
+
+def title_warning(page: PageSeo) -> Optional[str]:
+    if not page.title:
+        return "缺少页面标题"
+    if len(page.title) < TITLE_LENGTH[0]:
+        return "页面标题可能过短"
+    if len(page.title) > TITLE_LENGTH[1]:
+        return "页面标题可能过长"
+    return None
+
+
+def description_warning(page: PageSeo) -> Optional[str]:
+    if not page.description:
+        return "缺少 meta 描述"
+    if len(page.description) < DESCRIPTION_LENGTH[0]:
+        return "Meta 描述可能过短"
+    if len(page.description) > DESCRIPTION_LENGTH[1]:
+        return "Meta 描述可能过长"
+    return None
+
+
+def meta_length_warnings(page: PageSeo) -> List[str]:
+    return [w for w in (title_warning(page), description_warning(page)) if w]
+
+
+# ---- 汇总 ----
+
+@profiled("validate")
+def run_checks(page: PageSeo, expected_canonical: Optional[str] = None, lang: Optional[str] = None,
+               required_langs: Sequence[str] = REQUIRED_LANGS) -> List[Finding]:
+    """对一条 PageSeo 执行全部检查
+
+    expected_canonical 为空时只检查 canonical 是否存在；
+    lang 为页面自身语言，给出时检查该语言的 hreflang 是否与 canonical 一致。
+    """
+    findings: List[Finding] = []
+
+    if not page.canonical:
+        findings.append(Finding("canonical", ERROR, "缺少 canonical 标签"))
+    elif expected_canonical and page.canonical != expected_canonical:
+        findings.append(Finding("canonical", ERROR,
+                                f"Canonical URL 不正确: 期望 {expected_canonical}, 实际 {page.canonical}"))
+
+    if not page.alternates:
+        findings.append(Finding("hreflang", ERROR, "缺少 hreflang 标签"))
+    else:
+        missing = missing_langs(page, required_langs)
+        if missing:
+            findings.append(Finding("hreflang", ERROR, f"缺少 hreflang 语言标签: {', '.join(missing)}"))
+        for a in relative_alternates(page):
+            findings.append(Finding("hreflang", ERROR, f"Hreflang URL 不是绝对路径: {a.hreflang} -> {a.href}"))
+        if lang and canonical_mismatches(page, lang):
+            findings.append(Finding("hreflang", ERROR, f"{lang} hreflang URL 与 canonical URL 不一致"))
+        for dup_lang, detail in detect_duplicates(alternate_pairs(page)).items():
+            if detail["is_duplicate"]:
+                findings.append(Finding("duplicate", ERROR, f"hreflang {dup_lang} 存在多条不同条目: {detail['unique']}"))
+
+    x_default = x_default_alternates(page)
+    if x_default:
+        is_correct, message = x_default_points_to_english(x_default)
+        if not is_correct:
+            findings.append(Finding("x_default", WARNING, message))
+
+    for issue in double_slash_issues(page):
+        findings.append(Finding("double_slash", ERROR, f"双斜杠问题: {issue}"))
+
+    for warning in meta_length_warnings(page):
+        findings.append(Finding("meta_length", WARNING, warning))
+
+    return findings
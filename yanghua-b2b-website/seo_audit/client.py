@@ -0,0 +1,579 @@
+"""
+共享 HTTP 客户端
+- 长连接池：同一主机的请求复用 TCP+TLS 连接
+- 安装了 httpx 与 h2 时自动使用 HTTP/2，否则使用 requests 连接池
+- 统一的 User-Agent、超时与重试策略
+- 统计新建连接数与复用次数
+- head_only 模式：流式读取到 </head> 即停止下载，只返回 <head> 部分
+- stream()：逐块返回正文，不在内存中保留整个响应
+- 可选的磁盘缓存（seo_audit.cache）：条件请求 + 304 复用
+- 可选的快照记录（seo_audit.snapshots）：每次抓取的正文写入内容寻址存储，供离线回放
+- 可选的 WARC 记录（seo_audit.warc）：每次抓取写一对 request / response 记录，供标准工具与离线分析使用
+- 可选的录制 / 回放磁带（seo_audit.cassette）：录制全部请求与响应，之后不访问网络、确定性地重跑
+- 每个请求记录 DNS / 建连 / TLS / TTFB / 传输耗时（seo_audit.latency），按主机、语言与页面类别统计分布
+- 每个响应报告给按主机的拥塞控制（seo_audit.throttle）：遵守 Retry-After，并为 FetchEngine 的自适应并发提供信号
+
+用法示例：
+  from seo_audit.client import get_client
+  html = get_client().get_text("https://www.yhflexiblebusbar.com/en")
+  print(get_client().describe_stats())
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, Mapping, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+from .latency import LatencyStats, PhaseTimer, Timings, current_timer, resolve
+from .profiling import profiled
+from .throttle import HostThrottle
+
+try:
+    import h2  # noqa: F401  仅用于判断 HTTP/2 是否可用
+    import httpcore
+    import httpx
+except ImportError:  # pragma: no cover - 可选依赖
+    httpx = None
+
+DEFAULT_USER_AGENT = "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 2
+DEFAULT_BACKOFF = 0.5
+# 可重试的状态码：限流与网关类错误
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+# 连接池：最多缓存的主机数 / 单主机最多保持的连接数
+DEFAULT_POOL_HOSTS = 32
+DEFAULT_POOL_SIZE = 16
+# head_only 模式的流式读取块大小；HTTP/1.1 下找到 </head> 后，
+# 剩余正文不超过 HEAD_DRAIN_LIMIT 时读完以保留连接，否则直接断开
+HEAD_CHUNK_SIZE = 16 * 1024
+HEAD_DRAIN_LIMIT = 64 * 1024
+HEAD_END = b"</head>"
+# stream() 逐块读取正文（sitemap 等大文件）时的块大小
+STREAM_CHUNK_SIZE = 64 * 1024
+
+HTTP2_AVAILABLE = httpx is not None
+
+# 设置后共享客户端启用磁盘缓存（值为缓存文件路径，见 seo_audit.cache）
+CACHE_ENV = "SEO_AUDIT_HTTP_CACHE"
+# 调用方自己发送这些请求头时绕过缓存（例如 state.check_revision 的条件请求）
+CONDITIONAL_HEADERS = frozenset(("if-none-match", "if-modified-since"))
+# 设置后共享客户端记录快照（值为快照存储目录，见 seo_audit.snapshots）
+SNAPSHOT_ENV = "SEO_AUDIT_SNAPSHOTS"
+# 设置后共享客户端把抓取写入 WARC（值为 .warc / .warc.gz 文件路径，见 seo_audit.warc）
+WARC_ENV = "SEO_AUDIT_WARC"
+# 设置后共享客户端录制到 / 从磁带回放（值为磁带文件路径，见 seo_audit.cassette）；回放优先
+CASSETTE_RECORD_ENV = "SEO_AUDIT_RECORD_CASSETTE"
+CASSETTE_REPLAY_ENV = "SEO_AUDIT_REPLAY_CASSETTE"
+
+
+class HTTPStatusError(Exception):
+    """响应状态码为 4xx/5xx"""
+
+    def __init__(self, response: "Response"):
+        super().__init__(f"{response.status_code} Error for url: {response.url}")
+        self.response = response
+
+
+@dataclass
+class Response:
+    """与后端无关的响应对象，字段与 requests.Response 的常用属性保持一致"""
+    url: str
+    status_code: int
+    headers: Mapping[str, str]
+    content: bytes
+    encoding: Optional[str] = None
+    elapsed: float = 0.0
+    http_version: str = "HTTP/1.1"
+    # head_only 抓取时，content 是否在 </head> 处被截断
+    truncated: bool = False
+    # 各阶段耗时（缓存命中等未发出请求的响应为 None）
+    timings: Optional[Timings] = None
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    def raise_for_status(self) -> None:
+        if not self.ok:
+            raise HTTPStatusError(self)
+
+
+def _timed_new_conn(conn: HTTPConnection, new_conn: Callable[[], Any]) -> Any:
+    """requests 后端：先计时解析 DNS，再用解析出的地址建连（TLS 的 SNI 与证书校验仍使用原主机名）"""
+    timer = current_timer()
+    if timer is None:
+        return new_conn()
+    address, dns = resolve(conn._dns_host, conn.port)
+    timer.add_dns(dns)
+    original = conn._dns_host
+    started = time.perf_counter()
+    try:
+        if address is not None:
+            conn._dns_host = address
+            try:
+                sock = new_conn()
+            except (NewConnectionError, ConnectTimeoutError, OSError):
+                # 第一个地址不可达（例如失效的 AAAA 记录）时交回 urllib3 按主机名逐个地址尝试
+                conn._dns_host = original
+                sock = new_conn()
+        else:
+            sock = new_conn()
+    finally:
+        conn._dns_host = original
+    timer.add_connect(time.perf_counter() - started)
+    return sock
+
+
+def _timed_connect(connect: Callable[[], None]) -> None:
+    """requests 后端：整个 connect() 扣除其中的 DNS 与 TCP 建连即为 TLS 握手"""
+    timer = current_timer()
+    if timer is None:
+        connect()
+        return
+    before = timer.dns + timer.connect
+    started = time.perf_counter()
+    connect()
+    timer.add_tls(max(0.0, time.perf_counter() - started - (timer.dns + timer.connect - before)))
+
+
+class _TimedNetworkBackend:
+    """httpx 后端：包装 httpcore 的网络后端，新建连接时先计时解析 DNS，再用解析出的地址建连"""
+
+    def __init__(self, backend: Any):
+        self._backend = backend
+
+    def connect_tcp(self, host: str, port: int, timeout: Optional[float] = None,
+                    local_address: Optional[str] = None, socket_options: Any = None) -> Any:
+        timer = current_timer()
+        if timer is not None:
+            address, dns = resolve(host, port)
+            timer.add_dns(dns)
+            if address is not None and address != host:
+                try:
+                    return self._backend.connect_tcp(address, port, timeout, local_address, socket_options)
+                except (httpcore.ConnectError, httpcore.ConnectTimeout):
+                    # 第一个地址不可达时交回 httpcore 按主机名建连（逐个尝试解析出的地址）
+                    pass
+        return self._backend.connect_tcp(host, port, timeout, local_address, socket_options)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._backend, name)
+
+
+class _CountingAdapter(HTTPAdapter):
+    """requests 后端：urllib3 每次真正建立连接（含断开后的重连）时回调 on_connect，并记录建连各阶段耗时"""
+
+    def __init__(self, on_connect: Callable[[], None], **kwargs: Any):
+        self._on_connect = on_connect
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args: Any, **kwargs: Any) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        on_connect = self._on_connect
+
+        class _HTTPConnection(HTTPConnection):
+            def _new_conn(self) -> Any:
+                return _timed_new_conn(self, super()._new_conn)
+
+            def connect(self) -> None:
+                on_connect()
+                super().connect()
+
+        class _HTTPSConnection(HTTPSConnection):
+            def _new_conn(self) -> Any:
+                return _timed_new_conn(self, super()._new_conn)
+
+            def connect(self) -> None:
+                on_connect()
+                _timed_connect(super().connect)
+
+        class _HTTPConnectionPool(HTTPConnectionPool):
+            ConnectionCls = _HTTPConnection
+
+        class _HTTPSConnectionPool(HTTPSConnectionPool):
+            ConnectionCls = _HTTPSConnection
+
+        self.poolmanager.pool_classes_by_scheme = {"http": _HTTPConnectionPool, "https": _HTTPSConnectionPool}
+
+
+class HttpClient:
+    """线程安全的共享客户端，FetchEngine 的各个工作线程共用同一个实例"""
+
+    def __init__(self, user_agent: str = DEFAULT_USER_AGENT, timeout: float = DEFAULT_TIMEOUT,
+                 retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                 pool_size: int = DEFAULT_POOL_SIZE, http2: Optional[bool] = None, cache: Any = None,
+                 snapshots: Any = None, warc: Any = None, cassette: Any = None):
+        self.user_agent = user_agent
+        # seo_audit.cache.HttpCache；None 表示不缓存
+        self.cache = cache
+        # seo_audit.snapshots.SnapshotRun；None 表示不记录快照
+        self.snapshots = snapshots
+        # seo_audit.warc.WarcWriter；None 表示不写 WARC
+        self.warc = warc
+        # seo_audit.cassette.CassetteRecorder / CassettePlayer；None 表示直接访问网络
+        self.cassette = cassette
+        self.timeout = timeout
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        # http2=None 表示“可用就用”
+        self.http2 = HTTP2_AVAILABLE if http2 is None else (http2 and HTTP2_AVAILABLE)
+        self._lock = threading.Lock()
+        self._requests = 0
+        self._connections_opened = 0
+        self._head_truncated = 0
+        # 各阶段耗时分布（seo_audit.latency）
+        self.latency = LatencyStats()
+        # 按主机的 Retry-After 暂停与 AIMD 并发窗口（seo_audit.throttle）
+        self.throttle = HostThrottle()
+
+        if self.http2:
+            transport = httpx.HTTPTransport(
+                http2=True,
+                limits=httpx.Limits(max_connections=DEFAULT_POOL_HOSTS * pool_size,
+                                    max_keepalive_connections=DEFAULT_POOL_HOSTS * pool_size),
+            )
+            pool = getattr(transport, "_pool", None)
+            if pool is not None and hasattr(pool, "_network_backend"):
+                pool._network_backend = _TimedNetworkBackend(pool._network_backend)
+            self._httpx = httpx.Client(http2=True, headers={"User-Agent": user_agent}, transport=transport)
+            self._session = None
+        else:
+            self._httpx = None
+            self._session = requests.Session()
+            self._session.headers["User-Agent"] = user_agent
+            adapter = _CountingAdapter(self._count_connection, pool_connections=DEFAULT_POOL_HOSTS,
+                                       pool_maxsize=pool_size)
+            self._session.mount("http://", adapter)
+            self._session.mount("https://", adapter)
+
+    # ---- 请求 ----
+
+    @profiled("fetch")
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+            allow_redirects: bool = True, head_only: bool = False) -> Response:
+        """GET 请求；连接错误与 RETRY_STATUSES 中的状态码按指数退避重试
+
+        head_only=True 时只下载到 </head> 为止；页面没有 </head> 时会一直读到结尾，
+        即自动退化为完整抓取。
+        启用缓存时自动附加条件请求头；调用方自己带了 If-None-Match / If-Modified-Since 时不走缓存。
+        启用快照 / WARC / 磁带录制时记录最终交给调用方的响应（包括缓存命中的响应）；
+        磁带回放时直接返回录制的响应，不访问网络也不查缓存。
+        """
+        headers = headers or {}
+        if self.replaying:
+            response = self.cassette.replay("GET", url, follow_redirects=allow_redirects, head_only=head_only)
+        elif self.cache is not None and not any(k.lower() in CONDITIONAL_HEADERS for k in headers):
+            response = self.cache.get(
+                lambda extra: self._get(url, {**headers, **extra}, timeout, allow_redirects, head_only),
+                url, head_only)
+        else:
+            response = self._get(url, headers, timeout, allow_redirects, head_only)
+        if self.snapshots is not None:
+            self.snapshots.record(response, head_only, url)
+        if self.warc is not None:
+            self.warc.write_exchange(url, {"User-Agent": self.user_agent, **headers}, response)
+        if self.cassette is not None and not self.replaying:
+            self.cassette.record_response("GET", url, {"User-Agent": self.user_agent, **headers}, response,
+                                          allow_redirects)
+        return response
+
+    @property
+    def replaying(self) -> bool:
+        """是否从磁带回放（脚本据此跳过请求之间的等待）"""
+        return self.cassette is not None and self.cassette.replaying
+
+    def _get(self, url: str, headers: Dict[str, str], timeout: Optional[float], allow_redirects: bool,
+             head_only: bool) -> Response:
+        """主机因 Retry-After 暂停时先等待；重试的间隔按指数退避，且不早于 Retry-After 的截止时间"""
+        host = urlsplit(url).netloc.lower()
+        attempt = 0
+        while True:
+            self.throttle.wait(host)
+            started = time.perf_counter()
+            try:
+                resp = self._send(url, headers, timeout or self.timeout, allow_redirects, head_only)
+            except self._retryable_errors():
+                if attempt >= self.retries:
+                    raise
+            else:
+                self.throttle.observe(url, resp.status_code, resp.timings.ttfb if resp.timings else None, started,
+                                      resp.headers)
+                if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                    return resp
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    def get_text(self, url: str, **kwargs: Any) -> str:
+        """GET 并返回解码后的文本，非 2xx/3xx 状态抛出 HTTPStatusError"""
+        resp = self.get(url, **kwargs)
+        resp.raise_for_status()
+        return resp.text
+
+    def stream(self, url: str, headers: Optional[Dict[str, str]] = None, timeout: Optional[float] = None,
+               chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """流式 GET，逐块返回正文；非 2xx/3xx 状态抛出 HTTPStatusError
+
+        只在收到首个数据块之前重试（连接错误与 RETRY_STATUSES），之后的错误直接抛出。
+        生成器提前关闭时连接随之释放。磁带录制只记录完整读完的响应（以及错误响应）。
+        """
+        if self.replaying:
+            yield from self.cassette.stream(url, chunk_size)
+            return
+        headers = headers or {}
+        recording = self.cassette is not None
+        host = urlsplit(url).netloc.lower()
+        attempt = 0
+        while True:
+            started = False
+            self.throttle.wait(host)
+            try:
+                with self._open_stream(url, headers, timeout or self.timeout, chunk_size) as (resp, chunks):
+                    self.throttle.observe(url, resp.status_code, None, time.perf_counter() - resp.elapsed,
+                                          resp.headers)
+                    if resp.status_code not in RETRY_STATUSES or attempt >= self.retries:
+                        if recording and not resp.ok:
+                            self.cassette.record_response("GET", url, headers, resp)
+                        resp.raise_for_status()
+                        body = []
+                        for chunk in chunks:
+                            started = True
+                            if recording:
+                                body.append(chunk)
+                            yield chunk
+                        if recording:
+                            resp.content = b"".join(body)
+                            self.cassette.record_response("GET", url, headers, resp)
+                        return
+            except self._retryable_errors():
+                if started or attempt >= self.retries:
+                    raise
+            time.sleep(self.backoff * (2 ** attempt))
+            attempt += 1
+
+    @contextmanager
+    def _open_stream(self, url: str, headers: Dict[str, str], timeout: float,
+                     chunk_size: int) -> Iterator[Tuple[Response, Iterator[bytes]]]:
+        """打开流式响应，产出 (不含正文的 Response, 正文块迭代器)"""
+        with self._lock:
+            self._requests += 1
+        started = time.perf_counter()
+        if self._httpx is not None:
+            with self._httpx.stream("GET", url, headers=headers, timeout=timeout, follow_redirects=True,
+                                    extensions={"trace": self._trace}) as r:
+                yield (Response(url=str(r.url), status_code=r.status_code, headers=r.headers, content=b"",
+                                encoding=r.encoding, elapsed=time.perf_counter() - started,
+                                http_version=r.http_version),
+                       r.iter_bytes(chunk_size))
+            return
+        r = self._session.get(url, headers=headers, timeout=timeout, stream=True)
+        try:
+            yield (Response(url=r.url, status_code=r.status_code, headers=r.headers, content=b"",
+                            encoding=r.encoding, elapsed=time.perf_counter() - started),
+                   r.iter_content(chunk_size))
+        finally:
+            r.close()
+
+    def _retryable_errors(self) -> tuple:
+        if self._httpx is not None:
+            return (httpx.TransportError,)
+        return (requests.ConnectionError, requests.Timeout)
+
+    def _send(self, url: str, headers: Dict[str, str], timeout: float, allow_redirects: bool,
+              head_only: bool = False) -> Response:
+        """发出一次请求并记录各阶段耗时（按请求的 URL 归类，跟随重定向的耗时计入同一请求）"""
+        with self._lock:
+            self._requests += 1
+        with PhaseTimer() as timer:
+            response = self._send_timed(url, headers, timeout, allow_redirects, head_only, timer)
+        response.timings = timer.timings()
+        self.latency.record(url, response.timings)
+        return response
+
+    def _send_timed(self, url: str, headers: Dict[str, str], timeout: float, allow_redirects: bool,
+                    head_only: bool, timer: PhaseTimer) -> Response:
+        started = timer.started
+        if self._httpx is not None:
+            with self._httpx.stream("GET", url, headers=headers, timeout=timeout,
+                                    follow_redirects=allow_redirects, extensions={"trace": self._trace}) as r:
+                chunks = r.iter_bytes(HEAD_CHUNK_SIZE)
+                content, truncated = self._read_body(chunks, r.headers, head_only)
+                # HTTP/2 下提前关闭只会重置当前 stream，连接仍可复用
+                if truncated and r.http_version != "HTTP/2":
+                    self._drain(chunks, r.headers, len(content))
+                return Response(url=str(r.url), status_code=r.status_code, headers=r.headers, content=content,
+                                encoding=r.encoding, elapsed=time.perf_counter() - started,
+                                http_version=r.http_version, truncated=truncated)
+        # 始终流式请求：get 返回时刚收到响应头，之后读取正文的时间计为传输
+        r = self._session.get(url, headers=headers, timeout=timeout, allow_redirects=allow_redirects, stream=True)
+        timer.mark_headers()
+        if not head_only:
+            return Response(url=r.url, status_code=r.status_code, headers=r.headers, content=r.content,
+                            encoding=r.encoding, elapsed=time.perf_counter() - started)
+        try:
+            chunks = r.iter_content(HEAD_CHUNK_SIZE)
+            content, truncated = self._read_body(chunks, r.headers, head_only)
+            if truncated:
+                self._drain(chunks, r.headers, len(content))
+        finally:
+            r.close()
+        return Response(url=r.url, status_code=r.status_code, headers=r.headers, content=content,
+                        encoding=r.encoding, elapsed=time.perf_counter() - started, truncated=truncated)
+
+    def _read_body(self, chunks: Iterator[bytes], headers: Mapping[str, str], head_only: bool) -> Tuple[bytes, bool]:
+        """读取响应正文；head_only 且为 HTML 时读到 </head> 即返回 (head 部分, True)"""
+        if not head_only or "html" not in headers.get("Content-Type", "").lower():
+            return b"".join(chunks), False
+        buf = bytearray()
+        for chunk in chunks:
+            # 只在新数据及其前 len(HEAD_END) 字节内查找，避免重复扫描
+            scan_from = max(0, len(buf) - len(HEAD_END))
+            buf += chunk
+            pos = bytes(buf[scan_from:]).lower().find(HEAD_END)
+            if pos != -1:
+                with self._lock:
+                    self._head_truncated += 1
+                return bytes(buf[:scan_from + pos + len(HEAD_END)]), True
+        return bytes(buf), False
+
+    def _drain(self, chunks: Iterator[bytes], headers: Mapping[str, str], received: int) -> None:
+        """HTTP/1.1 下剩余正文较小时读完，让连接回到连接池；否则放弃该连接"""
+        try:
+            remaining = int(headers.get("Content-Length", "")) - received
+        except ValueError:
+            return
+        if 0 < remaining <= HEAD_DRAIN_LIMIT:
+            for _ in chunks:
+                pass
+
+    def _trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        # httpcore 只在新建连接时触发 connect_tcp 事件
+        if event_name == "connection.connect_tcp.complete":
+            self._count_connection()
+        timer = current_timer()
+        if timer is not None:
+            timer.trace(event_name, info)
+
+    def _count_connection(self) -> None:
+        with self._lock:
+            self._connections_opened += 1
+
+    # ---- 统计 ----
+
+    def stats(self) -> Dict[str, int]:
+        """返回 {'requests', 'connections_opened', 'connections_reused', 'head_only_truncated'}"""
+        with self._lock:
+            total, opened = self._requests, self._connections_opened
+        return {
+            "requests": total,
+            "connections_opened": opened,
+            "connections_reused": max(0, total - opened),
+            "head_only_truncated": self._head_truncated,
+        }
+
+    def describe_stats(self) -> str:
+        s = self.stats()
+        backend = "httpx + HTTP/2" if self._httpx is not None else "requests 连接池"
+        text = (f"🔌 连接统计（{backend}）: 请求 {s['requests']} 次, "
+                f"新建连接 {s['connections_opened']} 个, 复用 {s['connections_reused']} 次, "
+                f"</head> 处提前结束 {s['head_only_truncated']} 次")
+        if self.cache is not None:
+            text += "\n" + self.cache.describe_stats()
+        if self.snapshots is not None:
+            text += "\n" + self.snapshots.describe_stats()
+        if self.warc is not None:
+            text += "\n" + self.warc.describe_stats()
+        if self.cassette is not None:
+            text += "\n" + self.cassette.describe_stats()
+        if self.latency.requests:
+            text += "\n" + self.latency.describe_stats()
+        throttle = self.throttle.describe_stats()
+        if throttle:
+            text += "\n" + throttle
+        return text
+
+    def close(self) -> None:
+        if self._httpx is not None:
+            self._httpx.close()
+        else:
+            self._session.close()
+        if self.cache is not None:
+            self.cache.close()
+
+
+_shared_client: Optional[HttpClient] = None
+_shared_lock = threading.Lock()
+
+
+def _snapshots_from_env() -> Any:
+    if not os.environ.get(SNAPSHOT_ENV):
+        return None
+    from .snapshots import snapshots_from_env
+    return snapshots_from_env()
+
+
+def _warc_from_env() -> Any:
+    if not os.environ.get(WARC_ENV):
+        return None
+    from .warc import warc_from_env
+    return warc_from_env()
+
+
+def _cassette_from_env() -> Any:
+    if not (os.environ.get(CASSETTE_RECORD_ENV) or os.environ.get(CASSETTE_REPLAY_ENV)):
+        return None
+    from .cassette import cassette_from_env
+    return cassette_from_env()
+
+
+def get_client() -> HttpClient:
+    """进程内共享的客户端实例（懒加载）；设置了 SEO_AUDIT_HTTP_CACHE 时启用磁盘缓存，
+    设置了 SEO_AUDIT_SNAPSHOTS 时记录快照，设置了 SEO_AUDIT_WARC 时写入 WARC，
+    设置了 SEO_AUDIT_RECORD_CASSETTE / SEO_AUDIT_REPLAY_CASSETTE 时录制或回放磁带"""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_lock:
+            if _shared_client is None:
+                cache = None
+                if os.environ.get(CACHE_ENV):
+                    from .cache import HttpCache
+                    cache = HttpCache(os.environ[CACHE_ENV])
+                _shared_client = HttpClient(cache=cache, snapshots=_snapshots_from_env(), warc=_warc_from_env(),
+                                            cassette=_cassette_from_env())
+    return _shared_client
+
+
+def configure_client(**kwargs: Any) -> HttpClient:
+    """用指定参数（见 HttpClient）重建共享客户端，脚本在 main() 开头根据命令行参数调用
+
+    未指定 snapshots 时沿用原客户端的快照运行（或按 SEO_AUDIT_SNAPSHOTS 开始一次新的运行），
+    同一进程的抓取始终记录在同一份清单中；warc 与 cassette 同理。
+    """
+    global _shared_client
+    with _shared_lock:
+        if "snapshots" not in kwargs:
+            previous = _shared_client.snapshots if _shared_client is not None else None
+            kwargs["snapshots"] = previous if previous is not None else _snapshots_from_env()
+        if "warc" not in kwargs:
+            previous = _shared_client.warc if _shared_client is not None else None
+            kwargs["warc"] = previous if previous is not None else _warc_from_env()
+        if "cassette" not in kwargs:
+            previous = _shared_client.cassette if _shared_client is not None else None
+            kwargs["cassette"] = previous if previous is not None else _cassette_from_env()
+        if _shared_client is not None:
+            _shared_client.close()
+        _shared_client = HttpClient(**kwargs)
+    return _shared_client
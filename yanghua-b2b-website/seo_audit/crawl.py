@@ -0,0 +1,289 @@
+"""
+全站 BFS 爬虫
+- 种子来自 sitemap 与 seo-pages.config.json，按广度优先逐层发现站内链接
+- 异步 frontier：在 FetchEngine 的全局 / 单主机并发限制下抓取，页面完成即产出结果
+- URL 规范化后去重；已访问集合只保存 64 位摘要，十万级页面也只占几 MB
+- 深度、页面数、运行时间三种预算，任一用尽即停止调度新页面
+
+用法示例：
+  from seo_audit.crawl import CrawlBudget, crawl
+  for result in crawl(["https://www.yhflexiblebusbar.com/en"], CrawlBudget(max_pages=200)):
+      print(result.depth, result.url, result.status_code)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from html.parser import HTMLParser
+from typing import AsyncIterator, Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+from urllib.parse import parse_qsl, urlencode, urljoin, urlsplit, urlunsplit
+
+from .client import HttpClient, Response, get_client
+from .fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, FetchEngine
+from .page import PageSeo
+from .profiling import profiled
+from .sitemap import iter_sitemap
+
+DEFAULT_MAX_DEPTH = 3
+DEFAULT_MAX_PAGES = 500
+DEFAULT_MAX_SECONDS = 600.0
+
+# 这些扩展名与路径前缀不是 HTML 页面，不进入 frontier
+_SKIP_EXTENSIONS = (
+    ".pdf", ".jpg", ".jpeg", ".png", ".gif", ".webp", ".svg", ".ico", ".css", ".js", ".json", ".xml",
+    ".zip", ".rar", ".doc", ".docx", ".xls", ".xlsx", ".mp4", ".webm", ".woff", ".woff2",
+)
+_SKIP_PREFIXES = ("/_next/", "/api/", "/admin")
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+class CrawlBudget(NamedTuple):
+    """max_depth 为种子之外的链接层数；max_seconds 从开始抓取计时"""
+    max_depth: int = DEFAULT_MAX_DEPTH
+    max_pages: int = DEFAULT_MAX_PAGES
+    max_seconds: float = DEFAULT_MAX_SECONDS
+
+
+class CrawlResult(NamedTuple):
+    """一个页面的抓取结果；非 HTML 或抓取失败时 page 为 None"""
+    url: str
+    depth: int
+    status_code: Optional[int]
+    final_url: Optional[str]
+    page: Optional[PageSeo]
+    links: int
+    error: Optional[str] = None
+
+
+def normalize_url(url: str, base: Optional[str] = None) -> Optional[str]:
+    """用于去重的规范化：补全相对地址、去掉 fragment、小写 scheme/host、去掉默认端口、
+    去掉末尾斜杠、按键排序 query。非 http(s) 链接返回 None。
+
+    路径中的双斜杠保持原样，这样 double_slash 检查仍能发现它们。
+    """
+    if base:
+        url = urljoin(base, url)
+    try:
+        parts = urlsplit(url.strip())
+        port = parts.port
+    except ValueError:
+        return None
+    scheme = parts.scheme.lower()
+    if scheme not in _DEFAULT_PORTS or not parts.hostname:
+        return None
+    netloc = parts.hostname.lower()
+    if port and port != _DEFAULT_PORTS[scheme]:
+        netloc = f"{netloc}:{port}"
+    path = parts.path or "/"
+    if len(path) > 1:
+        path = path.rstrip("/") or "/"
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True))) if parts.query else ""
+    return urlunsplit((scheme, netloc, path, query, ""))
+
+
+class VisitedSet:
+    """只保存 URL 的 64 位 blake2b 摘要（小整数），比保存完整字符串节省一个数量级的内存"""
+
+    def __init__(self) -> None:
+        self._digests: Set[int] = set()
+
+    @staticmethod
+    def _digest(url: str) -> int:
+        return int.from_bytes(hashlib.blake2b(url.encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, url: str) -> bool:
+        """加入集合；已存在时返回 False"""
+        digest = self._digest(url)
+        if digest in self._digests:
+            return False
+        self._digests.add(digest)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return self._digest(url) in self._digests
+
+    def __len__(self) -> int:
+        return len(self._digests)
+
+
+class _LinkCollector(HTMLParser):
+    """收集 <a href> 与 <base href>；rel="nofollow" 的链接不跟随"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.base: Optional[str] = None
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag == "a":
+            attr = dict(attrs)
+            href = attr.get("href")
+            if href and "nofollow" not in (attr.get("rel") or "").split():
+                self.hrefs.append(href)
+        elif tag == "base" and self.base is None:
+            self.base = dict(attrs).get("href")
+
+
+@profiled("parse")
+def extract_links(html: str, url: str) -> List[str]:
+    """返回页面中的链接（已按页面地址补全并规范化，保持出现顺序，未去重）"""
+    collector = _LinkCollector()
+    collector.feed(html)
+    collector.close()
+    base = urljoin(url, collector.base) if collector.base else url
+    links = []
+    for href in collector.hrefs:
+        normalized = normalize_url(href, base)
+        if normalized:
+            links.append(normalized)
+    return links
+
+
+@profiled("discover")
+def seeds_from_config(config_path: str, base_url: str) -> List[str]:
+    """seo-pages.config.json 中的全部 path，拼接到 base_url 之后"""
+    if not os.path.exists(config_path):
+        raise FileNotFoundError(f"未找到配置文件: {config_path}")
+    with open(config_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    return [base_url.rstrip("/") + p["path"] for p in data.get("pages", []) if p.get("path")]
+
+
+def seeds_from_sitemap(location: str, base_url: Optional[str] = None,
+                       client: Optional[HttpClient] = None) -> Iterator[str]:
+    """sitemap 中的全部 <loc>；给出 base_url 时把 loc 的 scheme/host 换成 base_url 的（例如在本地环境爬取）"""
+    base = urlsplit(base_url) if base_url else None
+    for entry in iter_sitemap(location, client):
+        if base is None:
+            yield entry.loc
+        else:
+            parts = urlsplit(entry.loc)
+            yield urlunsplit((base.scheme, base.netloc, parts.path, parts.query, ""))
+
+
+class Crawler:
+    """BFS 爬虫；只跟随与种子同主机的链接"""
+
+    def __init__(self, seeds: Iterable[str], budget: CrawlBudget = CrawlBudget(),
+                 client: Optional[HttpClient] = None, allowed_hosts: Optional[Iterable[str]] = None):
+        self.budget = budget
+        self.client = client or get_client()
+        self.visited = VisitedSet()
+        self.frontier: deque = deque()
+        self.scheduled = 0
+        self.budget_exhausted: Optional[str] = None
+        for seed in seeds:
+            self._enqueue(normalize_url(seed), 0)
+        hosts = allowed_hosts or (urlsplit(url).netloc for url, _ in self.frontier)
+        self.allowed_hosts = {h.lower() for h in hosts}
+
+    def _enqueue(self, url: Optional[str], depth: int) -> None:
+        if url and self.visited.add(url):
+            self.frontier.append((url, depth))
+
+    def _follow(self, url: str) -> bool:
+        parts = urlsplit(url)
+        if parts.netloc not in self.allowed_hosts:
+            return False
+        path = parts.path.lower()
+        return not path.endswith(_SKIP_EXTENSIONS) and not path.startswith(_SKIP_PREFIXES)
+
+    def fetch(self, url: str, depth: int) -> Tuple[CrawlResult, List[str]]:
+        """在工作线程中执行：抓取完整页面（需要 <body> 中的链接），解析 SEO 标签并提取链接"""
+        try:
+            response: Response = self.client.get(url)
+        except Exception as e:
+            return CrawlResult(url, depth, None, None, None, 0, str(e)), []
+        content_type = response.headers.get("Content-Type", "")
+        if not response.ok or "html" not in content_type.lower():
+            error = None if response.ok else f"HTTP {response.status_code}"
+            return CrawlResult(url, depth, response.status_code, response.url, None, 0, error), []
+        html = response.text
+        page = PageSeo.parse(html, url)
+        links = extract_links(html, response.url or url)
+        return CrawlResult(url, depth, response.status_code, response.url, page, len(links)), links
+
+    def _next(self, deadline: float) -> Optional[Tuple[str, int]]:
+        """取出下一个待抓取页面；预算用尽时记录原因并返回 None"""
+        if not self.frontier:
+            return None
+        if self.scheduled >= self.budget.max_pages:
+            self.budget_exhausted = self.budget_exhausted or "pages"
+            return None
+        if time.monotonic() >= deadline:
+            self.budget_exhausted = self.budget_exhausted or "time"
+            return None
+        self.scheduled += 1
+        return self.frontier.popleft()
+
+    async def run(self, engine: FetchEngine) -> AsyncIterator[CrawlResult]:
+        """按完成顺序产出结果；frontier 为 FIFO，因此页面按层级顺序调度"""
+        deadline = time.monotonic() + self.budget.max_seconds
+        # 预先调度的页面数：保证 engine 的并发名额一直有活可干，又不会一次创建过多任务
+        window = engine.max_in_flight * 2
+        running: Set[asyncio.Future] = set()
+        try:
+            while True:
+                while len(running) < window:
+                    item = self._next(deadline)
+                    if item is None:
+                        break
+                    url, depth = item
+                    running.add(asyncio.ensure_future(engine.run(url, self.fetch, url, depth)))
+                if not running:
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    self.budget_exhausted = self.budget_exhausted or "time"
+                    return
+                done, running = await asyncio.wait(running, timeout=remaining,
+                                                   return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    result, links = task.result()
+                    if result.final_url:
+                        # 重定向的目标也算已访问，避免再次抓取
+                        self.visited.add(normalize_url(result.final_url) or result.final_url)
+                    if result.depth < self.budget.max_depth:
+                        for link in links:
+                            if self._follow(link):
+                                self._enqueue(link, result.depth + 1)
+                    elif links and any(self._follow(link) and link not in self.visited for link in links):
+                        self.budget_exhausted = self.budget_exhausted or "depth"
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+            if running:
+                await asyncio.gather(*running, return_exceptions=True)
+
+
+    def iter(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+             min_interval: float = 0.0) -> Iterator[CrawlResult]:
+        """同步版本，供脚本的 for 循环直接使用"""
+        loop = asyncio.new_event_loop()
+        engine = FetchEngine(max_in_flight=max_in_flight, per_host=per_host, min_interval=min_interval,
+                             throttle=self.client.throttle)
+        agen = None
+        try:
+            loop.run_until_complete(engine.__aenter__())
+            agen = self.run(engine)
+            while True:
+                try:
+                    yield loop.run_until_complete(agen.__anext__())
+                except StopAsyncIteration:
+                    break
+        finally:
+            if agen is not None:
+                loop.run_until_complete(agen.aclose())
+            loop.run_until_complete(engine.__aexit__(None, None, None))
+            loop.close()
+
+
+def crawl(seeds: Iterable[str], budget: CrawlBudget = CrawlBudget(), client: Optional[HttpClient] = None,
+          max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+          min_interval: float = 0.0) -> Iterator[CrawlResult]:
+    """从 seeds 开始 BFS 爬取；需要读取 budget_exhausted 等状态时直接使用 Crawler"""
+    return Crawler(seeds, budget, client).iter(max_in_flight, per_host, min_interval)
@@ -0,0 +1,146 @@
+"""
+多环境并行对比
+原来的对比脚本先抓生产环境、再抓 LOCAL_BASE_URL，逐页串行，而且只支持这两个地址。
+这里接受任意数量的环境（生产 / Vercel 预览 / staging / localhost:3003 ...），
+同一页面在各环境的请求同时发出（不同主机各占一组并发名额），总耗时取决于最慢的环境而不是各环境之和；
+结果按字段展开成差异矩阵：每个有差异的字段一行，每个环境一列。
+
+用法示例：
+  envs = [parse_environment("prod=https://www.yhflexiblebusbar.com"), parse_environment("http://localhost:3003")]
+  for path, pages in iter_environments(["/en", "/es"], envs):
+      print(path, diff_matrix(pages, envs))
+"""
+
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from .client import HttpClient, get_client
+from .fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, iter_ordered
+from .page import PageSeo
+
+# 参与对比的 PageSeo 字段（另有 status_code）；hreflang 按语言展开为 hreflang:<lang>
+COMPARED_FIELDS = ("canonical", "title", "description", "og_url", "og_title")
+
+
+class Environment(NamedTuple):
+    name: str
+    base_url: str
+
+    def url(self, path: str) -> str:
+        return self.base_url.rstrip("/") + path
+
+
+class EnvPage(NamedTuple):
+    """某个环境中一个页面的抓取结果；elapsed 为秒"""
+    env: str
+    url: str
+    status_code: Optional[int]
+    page: Optional[PageSeo]
+    error: Optional[str] = None
+    elapsed: float = 0.0
+
+
+def parse_environment(spec: str) -> Environment:
+    """"名称=地址" 或只给地址（名称取主机名，例如 localhost:3003）"""
+    name, sep, url = spec.partition("=")
+    if not sep:
+        name, url = urlsplit(spec).netloc or spec, spec
+    url = url.strip().rstrip("/")
+    if not url.startswith(("http://", "https://")):
+        raise ValueError(f"环境地址必须以 http:// 或 https:// 开头: {spec}")
+    return Environment(name.strip(), url)
+
+
+def fetch_env_page(env: Environment, path: str, client: Optional[HttpClient] = None) -> EnvPage:
+    """head-only 抓取并解析；请求失败记录在 error 中而不是抛出"""
+    url = env.url(path)
+    started = time.perf_counter()
+    try:
+        response = (client or get_client()).get(url, head_only=True)
+    except Exception as e:
+        return EnvPage(env.name, url, None, None, str(e), time.perf_counter() - started)
+    page = PageSeo.parse(response.content, url) if response.status_code == 200 else None
+    return EnvPage(env.name, url, response.status_code, page, None, response.elapsed)
+
+
+def iter_environments(paths: Iterable[str], environments: Sequence[Environment],
+                      fetch: Callable[[Environment, str], Any] = fetch_env_page,
+                      max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+                      min_interval: float = 0.0) -> Iterator[Tuple[str, Dict[str, Any]]]:
+    """所有 (页面, 环境) 组合并发执行 fetch(env, path)，按页面顺序产出 (path, {环境名: 结果})
+
+    限流按主机计算，后面页面的请求在前面页面输出期间就已经发出。
+    max_in_flight 是硬上限：不够每个环境各 per_host 个时平均分给各环境（每个至少 1 个），
+    这样一个慢环境不会占满全部名额，也不会为了凑齐各环境的名额而超出 --concurrency。
+    """
+    items = [(path, env) for path in paths for env in environments]
+    per_host = min(per_host, max(1, max_in_flight // max(1, len(environments))))
+    ordered = iter_ordered(items, lambda item: fetch(item[1], item[0]), url_of=lambda item: item[1].url(item[0]),
+                           max_in_flight=max_in_flight, per_host=per_host, min_interval=min_interval)
+    current: Optional[str] = None
+    row: Dict[str, Any] = {}
+    for (path, env), result in ordered:
+        if path != current and current is not None:
+            yield current, row
+            row = {}
+        current = path
+        row[env.name] = result
+    if current is not None:
+        yield current, row
+
+
+def _strip_origin(value: Any, base_url: str) -> Any:
+    if isinstance(value, str) and value.startswith(base_url):
+        return value[len(base_url):] or "/"
+    return value
+
+
+def field_values(result: EnvPage, base_url: Optional[str] = None) -> Dict[str, Any]:
+    """对比用的扁平字段；给出 base_url 时去掉该环境自身的域名，只比较路径"""
+    values: Dict[str, Any] = {"status_code": result.status_code}
+    page = result.page
+    if page is not None:
+        for field in COMPARED_FIELDS:
+            values[field] = getattr(page, field)
+        for alternate in page.alternates:
+            if alternate.hreflang:
+                key = f"hreflang:{alternate.hreflang.strip().lower()}"
+                # 同一语言出现多次时合并为列表，重复条目本身也是差异
+                if key in values:
+                    previous = values[key]
+                    values[key] = (previous if isinstance(previous, list) else [previous]) + [alternate.href]
+                else:
+                    values[key] = alternate.href
+    if base_url:
+        origin = base_url.rstrip("/")
+        values = {k: ([_strip_origin(v, origin) for v in value] if isinstance(value, list)
+                      else _strip_origin(value, origin)) for k, value in values.items()}
+    return values
+
+
+def diff_matrix(results: Dict[str, EnvPage], environments: Sequence[Environment],
+                relative: bool = False) -> Dict[str, Dict[str, Any]]:
+    """{字段: {环境名: 值}}，只包含各环境取值不一致的字段；环境缺少某字段时值为 None"""
+    values = {env.name: field_values(results[env.name], env.base_url if relative else None)
+              for env in environments if env.name in results}
+    fields: List[str] = []
+    for env_values in values.values():
+        fields.extend(field for field in env_values if field not in fields)
+    matrix = {}
+    for field in fields:
+        row = {name: env_values.get(field) for name, env_values in values.items()}
+        first = next(iter(row.values()))
+        if any(value != first for value in row.values()):
+            matrix[field] = row
+    return matrix
+
+
+def baseline_differences(matrix: Dict[str, Dict[str, Any]], baseline: str) -> Dict[str, List[str]]:
+    """每个环境与基准环境（通常是生产环境）不一致的字段"""
+    differences: Dict[str, List[str]] = {}
+    for field, row in matrix.items():
+        for name, value in row.items():
+            if name != baseline and value != row.get(baseline):
+                differences.setdefault(name, []).append(field)
+    return differences
@@ -0,0 +1,140 @@
+"""
+单遍、事件驱动的 <head> SEO 标签提取器
+基于标准库 html.parser：不建 DOM 树，一次扫描收集全部字段，遇到 </head> 或 <body> 即停止。
+返回结构与各脚本原来的 extract_seo_tags（BeautifulSoup 版本）一致，
+匹配规则也保持一致：rel 按空白分词匹配、同名标签取第一个、title 取文本并 strip。
+唯一的差别是只看 <head>：写在 <body> 里的 link/meta 不计入（BeautifulSoup 会计入）。
+"""
+
+import codecs
+from html.parser import HTMLParser
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Union
+
+# extract_seo_tags 可以返回的全部字段，顺序即输出 dict 的键顺序
+SEO_FIELDS = ("canonical", "hreflang", "title", "description", "og_url", "og_title", "og_type", "author")
+# 各脚本原 extract_seo_tags 的基础字段集合
+BASIC_FIELDS = ("canonical", "hreflang", "title", "description", "og_url")
+
+# <meta> 的匹配方式：字段 -> (属性名, 属性值)
+_META_FIELDS = {
+    "description": ("name", "description"),
+    "author": ("name", "author"),
+    "og_url": ("property", "og:url"),
+    "og_title": ("property", "og:title"),
+    "og_type": ("property", "og:type"),
+}
+
+
+class _HeadDone(Exception):
+    """<head> 已结束，停止解析"""
+
+
+class HeadExtractor(HTMLParser):
+    """可分块 feed 的提取器；done 为 True 后不再需要更多输入"""
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self.canonical: Optional[str] = None
+        self.hreflang: List[Dict[str, Optional[str]]] = []
+        self.meta: Dict[str, Optional[str]] = {}
+        self.title: Optional[str] = None
+        self.done = False
+        self._title_parts: Optional[List[str]] = None
+        self._seen_canonical = False
+
+    def feed(self, data: str) -> None:
+        if self.done:
+            return
+        try:
+            super().feed(data)
+        except _HeadDone:
+            self.done = True
+
+    def handle_starttag(self, tag: str, attrs: List[tuple]) -> None:
+        if tag == "body":
+            self._finish()
+        # 与 BeautifulSoup 一致：无值属性视为空字符串，重复属性取最后一个
+        attr = {k: ("" if v is None else v) for k, v in attrs}
+        if tag == "link":
+            rel = attr.get("rel", "").split()
+            if "canonical" in rel and not self._seen_canonical:
+                self._seen_canonical = True
+                self.canonical = attr.get("href")
+            if "alternate" in rel and "hreflang" in attr:
+                self.hreflang.append({"hreflang": attr.get("hreflang"), "href": attr.get("href")})
+        elif tag == "meta":
+            for field, (key, value) in _META_FIELDS.items():
+                if field not in self.meta and attr.get(key) == value:
+                    self.meta[field] = attr.get("content")
+        elif tag == "title" and self.title is None and self._title_parts is None:
+            self._title_parts = []
+
+    def close_quietly(self) -> None:
+        """输入耗尽时冲刷缓冲区中未完成的标签；已提前结束则无需处理"""
+        if not self.done:
+            try:
+                self.close()
+            except _HeadDone:
+                self.done = True
+
+    def handle_startendtag(self, tag: str, attrs: List[tuple]) -> None:
+        self.handle_starttag(tag, attrs)
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag == "title" and self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        elif tag == "head":
+            self._finish()
+
+    def handle_data(self, data: str) -> None:
+        if self._title_parts is not None:
+            self._title_parts.append(data)
+
+    def _finish(self) -> None:
+        if self._title_parts is not None:
+            self.title = "".join(self._title_parts).strip()
+            self._title_parts = None
+        raise _HeadDone()
+
+    def result(self, fields: Sequence[str] = SEO_FIELDS) -> Dict[str, Any]:
+        # 文档在 <title> 内截断时，与 BeautifulSoup 一样取已读到的文本
+        title = self.title
+        if title is None and self._title_parts is not None:
+            title = "".join(self._title_parts).strip()
+        values = {
+            "canonical": self.canonical,
+            "hreflang": self.hreflang,
+            "title": title,
+        }
+        values.update({field: self.meta.get(field) for field in _META_FIELDS})
+        return {field: values[field] for field in fields}
+
+
+def _decode(html: Union[str, bytes]) -> str:
+    if isinstance(html, bytes):
+        return html.decode("utf-8", errors="replace")
+    return html
+
+
+def extract_seo_tags(html_content: Union[str, bytes, None], fields: Sequence[str] = SEO_FIELDS) -> Optional[Dict[str, Any]]:
+    """提取 SEO 相关标签，返回 {field: value}；html_content 为空时返回 None"""
+    if not html_content:
+        return None
+    extractor = HeadExtractor()
+    extractor.feed(_decode(html_content))
+    extractor.close_quietly()
+    return extractor.result(fields)
+
+
+def extract_seo_tags_from_chunks(chunks: Iterable[Union[str, bytes]], fields: Sequence[str] = SEO_FIELDS) -> Dict[str, Any]:
+    """边读边解析，<head> 结束后不再消费后续分块"""
+    extractor = HeadExtractor()
+    # 增量解码，避免多字节字符被分块边界截断
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    for chunk in chunks:
+        extractor.feed(decoder.decode(chunk) if isinstance(chunk, bytes) else chunk)
+        if extractor.done:
+            break
+    extractor.close_quietly()
+    return extractor.result(fields)
@@ -0,0 +1,214 @@
+"""
+异步并发抓取引擎
+- 全局在途请求上限（max_in_flight）+ 单主机并发上限（per_host）
+- 可选的单主机请求间隔（min_interval），替代原来的固定 time.sleep
+- 主机因 Retry-After 暂停时不调度该主机的新请求（seo_audit.throttle）
+- 可选的自适应并发（adaptive）：单主机上限从 per_host 开始按 AIMD 调整，最高 max_per_host
+- 结果按输入顺序交付，脚本可以保持原有的逐条输出格式
+
+脚本可用 add_adaptive_arguments / adaptive_from_args 提供 --adaptive、--max-per-host 参数；
+也可以设置环境变量 SEO_AUDIT_ADAPTIVE=1 让所有脚本的抓取引擎默认开启自适应并发。
+
+用法示例：
+  for url, result in iter_ordered(urls, check_url):
+      print(url, result)
+"""
+
+import argparse
+import asyncio
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .client import get_client
+from .throttle import HostThrottle
+
+DEFAULT_MAX_IN_FLIGHT = 16
+DEFAULT_PER_HOST = 4
+# 设置为 1 时抓取引擎默认开启自适应并发
+ADAPTIVE_ENV = "SEO_AUDIT_ADAPTIVE"
+
+# adaptive / max_per_host 未显式传入时的默认值（adaptive_from_args 设置）
+_default_adaptive = os.environ.get(ADAPTIVE_ENV, "").lower() in ("1", "true", "yes")
+_default_max_per_host: Optional[int] = None
+
+
+def host_of(url: str) -> str:
+    return urlsplit(url).netloc.lower()
+
+
+def set_adaptive_default(enabled: bool, max_per_host: Optional[int] = None) -> None:
+    """设置之后创建的 FetchEngine 默认是否开启自适应并发"""
+    global _default_adaptive, _default_max_per_host
+    _default_adaptive = enabled
+    _default_max_per_host = max_per_host
+
+
+class FetchEngine:
+    """在线程池中执行阻塞的抓取函数，并按主机/全局两级限流
+
+    adaptive=True 时单主机上限由 throttle（默认为共享客户端的 HostThrottle）按 AIMD 调整，
+    max_per_host 为上限（默认 max_in_flight）；per_host 为起始值。
+    """
+
+    def __init__(self, max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+                 min_interval: float = 0.0, adaptive: Optional[bool] = None, max_per_host: Optional[int] = None,
+                 throttle: Optional[HostThrottle] = None):
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_host = max(1, per_host)
+        # 同一主机相邻两个请求开始之间的最小间隔（秒）
+        self.min_interval = max(0.0, min_interval)
+        self.adaptive = _default_adaptive if adaptive is None else adaptive
+        self.max_per_host = max(1, max_per_host or _default_max_per_host or self.max_in_flight)
+        self.throttle = throttle
+        self._global: Optional[asyncio.Semaphore] = None
+        self._hosts: Dict[str, asyncio.Condition] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._next_start: Dict[str, float] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    async def __aenter__(self) -> "FetchEngine":
+        self._global = asyncio.Semaphore(self.max_in_flight)
+        if self.throttle is None:
+            self.throttle = get_client().throttle
+        self._executor = ThreadPoolExecutor(max_workers=self.max_in_flight, thread_name_prefix="seo-fetch")
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._executor:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def _host_condition(self, host: str) -> asyncio.Condition:
+        condition = self._hosts.get(host)
+        if condition is None:
+            condition = self._hosts[host] = asyncio.Condition()
+        return condition
+
+    def _host_limit(self, host: str) -> int:
+        if not self.adaptive:
+            return self.per_host
+        return self.throttle.window(host, self.per_host, self.max_per_host)
+
+    async def _acquire_host(self, host: str) -> None:
+        """等到主机不在 Retry-After 暂停期、且在途请求数低于当前上限时占用一个名额"""
+        condition = self._host_condition(host)
+        async with condition:
+            while True:
+                delay = self.throttle.delay(host)
+                if delay > 0:
+                    try:
+                        await asyncio.wait_for(condition.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                if self._in_flight.get(host, 0) < self._host_limit(host):
+                    self._in_flight[host] = self._in_flight.get(host, 0) + 1
+                    return
+                await condition.wait()
+
+    async def _release_host(self, host: str) -> None:
+        # 自适应窗口可能在这个请求完成时变大，唤醒全部等待者重新检查
+        condition = self._host_condition(host)
+        async with condition:
+            self._in_flight[host] -= 1
+            condition.notify_all()
+
+    async def _pace(self, host: str) -> None:
+        if not self.min_interval:
+            return
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        start = max(now, self._next_start.get(host, now))
+        self._next_start[host] = start + self.min_interval
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    async def run(self, url: str, func: Callable[..., Any], *args: Any) -> Any:
+        """在 url 所属主机与全局的并发限制下，于线程池中执行 func(*args)"""
+        if self._executor is None:
+            raise RuntimeError("FetchEngine 需要在 async with 中使用")
+        host = host_of(url)
+        # 先占主机名额再占全局名额，避免排队等待某个主机的任务占用全局名额
+        await self._acquire_host(host)
+        try:
+            await self._pace(host)
+            async with self._global:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+        finally:
+            await self._release_host(host)
+
+    async def map_ordered(self, items: Iterable[Any], func: Callable[[Any], Any],
+                          url_of: Optional[Callable[[Any], str]] = None,
+                          window: Optional[int] = None) -> AsyncIterator[Tuple[Any, Any]]:
+        """并发执行 func(item)，按输入顺序逐个产出 (item, result)
+
+        func 抛出的异常会在对应条目的位置重新抛出；window 限制预先调度的条目数，
+        保证超长 URL 列表也不会一次性创建全部任务。
+        """
+        url_of = url_of or (lambda item: item)
+        window = window or self.max_in_flight * 4
+        source = iter(items)
+        pending: deque = deque()
+
+        def fill() -> None:
+            while len(pending) < window:
+                try:
+                    item = next(source)
+                except StopIteration:
+                    return
+                task = asyncio.ensure_future(self.run(url_of(item), func, item))
+                pending.append((item, task))
+
+        try:
+            fill()
+            while pending:
+                item, task = pending.popleft()
+                result = await task
+                fill()
+                yield item, result
+        finally:
+            for _, task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+
+def iter_ordered(items: Iterable[Any], func: Callable[[Any], Any],
+                 url_of: Optional[Callable[[Any], str]] = None,
+                 max_in_flight: int = DEFAULT_MAX_IN_FLIGHT, per_host: int = DEFAULT_PER_HOST,
+                 min_interval: float = 0.0) -> Iterator[Tuple[Any, Any]]:
+    """同步版本的 map_ordered，供同步脚本的 for 循环直接使用"""
+    loop = asyncio.new_event_loop()
+    engine = FetchEngine(max_in_flight=max_in_flight, per_host=per_host, min_interval=min_interval)
+    agen = None
+    try:
+        loop.run_until_complete(engine.__aenter__())
+        agen = engine.map_ordered(items, func, url_of=url_of)
+        while True:
+            try:
+                yield loop.run_until_complete(agen.__anext__())
+            except StopAsyncIteration:
+                break
+    finally:
+        if agen is not None:
+            loop.run_until_complete(agen.aclose())
+        loop.run_until_complete(engine.__aexit__(None, None, None))
+        loop.close()
+
+
+def add_adaptive_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --adaptive / --max-per-host 参数（与脚本已有的 --concurrency、--per-host 配合使用）"""
+    parser.add_argument("--adaptive", action="store_true",
+                        help="按主机自适应并发：从 --per-host 开始，响应健康时逐步增加，429/503 或 TTFB 上升时减半"
+                             "（也可设置 SEO_AUDIT_ADAPTIVE=1）")
+    parser.add_argument("--max-per-host", type=int, default=None,
+                        help="自适应并发时单个主机的并发上限（默认等于 --concurrency）")
+
+
+def adaptive_from_args(args: argparse.Namespace) -> None:
+    """按 add_adaptive_arguments 解析出的参数设置之后创建的 FetchEngine 的默认值"""
+    set_adaptive_default(args.adaptive or _default_adaptive, args.max_per_host)
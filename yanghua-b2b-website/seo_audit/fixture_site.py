@@ -0,0 +1,362 @@
+"""
+合成站点（基准测试用的本地 HTTP 服务）
+按页面数生成一个结构与生产站点相近的多语言站点，不需要访问生产环境就能测量各审计流程的吞吐：
+
+- 每个 hreflang 集群一对页面：/en/<栏目>/item-<n> 与 /es/<本地化栏目>/item-<n>（集群 0 为 /en 与 /es 首页），
+  en / es / x-default 互相指向，canonical 为自身的绝对 URL
+- <head> 按 Next.js App Router 的输出生成（样式表、十几个 chunk 脚本、OG / Twitter 标签、JSON-LD，约 4 KB），
+  正文按 body_kb 填充，包含指向子集群的链接，可以从首页爬到全部页面
+- /sitemap.xml 为 sitemapindex，子 sitemap 每个最多 SITEMAP_CHUNK 个 URL
+- 按 defect_rate 向部分集群注入缺陷（见 DEFECT_KINDS），site.defects() 给出注入的真实情况
+
+页面在请求时由集群编号确定性地生成（同一 seed 每次结果相同），内存占用与页面数无关；
+FixtureServer 可在多个进程中监听同一端口（SO_REUSEPORT），避免服务端成为瓶颈。
+
+用法示例：
+  site = SyntheticSite(pages=10000, defect_rate=0.05)
+  with FixtureServer(site, workers=4) as server:
+      print(server.base_url)          # http://127.0.0.1:<port>
+  site.write_tarball("pages.tar.gz")  # 离线分析用的页面包
+"""
+
+import io
+import itertools
+import multiprocessing
+import re
+import socket
+import tarfile
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LANGS = ("en", "es")
+# 栏目：英文路径 -> 西班牙语本地化路径
+SECTIONS = (("products", "productos"), ("solutions", "soluciones"), ("projects", "proyectos"),
+            ("articles", "articulos"), ("services", "servicios"))
+DEFECT_KINDS = (
+    "missing_canonical",     # 没有 canonical
+    "wrong_canonical",       # canonical 指向另一个集群的页面
+    "double_slash",          # canonical 路径中有 //
+    "missing_x_default",     # 没有 x-default
+    "missing_return_link",   # 缺少另一语言的 alternate（对方的 alternate 没有回链）
+    "relative_hreflang",     # alternate 使用相对路径
+    "redirected_alternate",  # 另一语言的 alternate 指向 301 跳转
+    "broken_alternate",      # 另一语言的 alternate 指向 404
+    "long_title",            # title 超长
+    "missing_description",   # 没有 meta description
+)
+# 每个子 sitemap 的最大 URL 数（sitemaps.org 的上限为 50000）
+SITEMAP_CHUNK = 50000
+DEFAULT_BODY_KB = 40
+LASTMOD = "2025-10-01"
+# 每个页面链接的子集群数：从首页出发 log8(N) 层即可爬到全部页面
+FANOUT = 8
+
+_PAGE_PATH = re.compile(r"^/(en|es)(?:/([a-z]+)/item-(\d+)(-old|-missing)?)?/?$")
+_SITEMAP_PATH = re.compile(r"^/sitemap-(\d+)\.xml$")
+_FILLER = ("Yanghua flexible busbars and cable assemblies are engineered for data centers, new energy "
+           "and heavy manufacturing, combining low impedance with high current capacity. ")
+
+
+def _hash(seed: int, cluster: int) -> int:
+    return zlib.crc32(f"{seed}:{cluster}".encode("ascii"))
+
+
+class SyntheticSite:
+    """确定性生成的站点；pages 为 HTML 页面总数（每个集群两页）"""
+
+    def __init__(self, pages: int = 1000, defect_rate: float = 0.05, seed: int = 1,
+                 body_kb: int = DEFAULT_BODY_KB, latency: float = 0.0):
+        self.clusters = max(1, pages // 2)
+        self.pages = self.clusters * 2
+        self.defect_rate = defect_rate
+        self.seed = seed
+        self.body_kb = body_kb
+        # 每个请求额外等待的秒数（模拟 SSR 耗时）
+        self.latency = latency
+        self._filler = (_FILLER * (body_kb * 1024 // len(_FILLER) + 1))[:body_kb * 1024]
+
+    # ---- 站点结构 ----
+
+    def path(self, lang: str, cluster: int, variant: str = "") -> str:
+        if cluster == 0 and not variant:
+            return f"/{lang}"
+        section = SECTIONS[cluster % len(SECTIONS)][LANGS.index(lang)]
+        return f"/{lang}/{section}/item-{cluster}{variant}"
+
+    def paths(self) -> Iterator[str]:
+        """全部页面路径（按集群顺序，每个集群先 en 后 es）"""
+        for cluster in range(self.clusters):
+            for lang in LANGS:
+                yield self.path(lang, cluster)
+
+    def defect(self, cluster: int) -> Optional[Tuple[str, str]]:
+        """集群注入的缺陷：(缺陷类型, 出现缺陷的页面语言)；首页不注入"""
+        if cluster == 0 or self.defect_rate <= 0:
+            return None
+        h = _hash(self.seed, cluster)
+        if (h % 10000) >= self.defect_rate * 10000:
+            return None
+        return DEFECT_KINDS[(h >> 16) % len(DEFECT_KINDS)], LANGS[(h >> 8) & 1]
+
+    def defects(self) -> Dict[str, List[str]]:
+        """{缺陷类型: [出现缺陷的页面路径]}"""
+        result: Dict[str, List[str]] = {}
+        for cluster in range(self.clusters):
+            found = self.defect(cluster)
+            if found is not None:
+                kind, lang = found
+                result.setdefault(kind, []).append(self.path(lang, cluster))
+        return result
+
+    def defect_counts(self) -> Dict[str, int]:
+        return {kind: len(paths) for kind, paths in sorted(self.defects().items())}
+
+    def parse_path(self, path: str) -> Optional[Tuple[str, int, str]]:
+        """页面路径 -> (语言, 集群, 变体)；不属于站点时返回 None"""
+        m = _PAGE_PATH.match(path)
+        if m is None:
+            return None
+        lang, section, cluster, variant = m.group(1), m.group(2), m.group(3), m.group(4) or ""
+        if section is None:
+            return lang, 0, ""
+        cluster_id = int(cluster)
+        if not 0 < cluster_id < self.clusters or self.path(lang, cluster_id, variant) != path:
+            return None
+        return lang, cluster_id, variant
+
+    # ---- 页面 ----
+
+    def render(self, lang: str, cluster: int, base_url: str) -> str:
+        """生成页面 HTML；base_url 为客户端访问时使用的站点地址（canonical / hreflang 使用该地址）"""
+        defect = self.defect(cluster)
+        kind = defect[0] if defect is not None and defect[1] == lang else None
+        other = LANGS[1 - LANGS.index(lang)]
+        own_url = base_url + self.path(lang, cluster)
+        alternates = {code: base_url + self.path(code, cluster) for code in LANGS}
+        alternates["x-default"] = alternates["en"]
+        canonical: Optional[str] = own_url
+        if kind == "missing_canonical":
+            canonical = None
+        elif kind == "wrong_canonical":
+            canonical = base_url + self.path(lang, (cluster + 1) % self.clusters or 1)
+        elif kind == "double_slash":
+            canonical = base_url + "/" + self.path(lang, cluster)
+        elif kind == "missing_x_default":
+            del alternates["x-default"]
+        elif kind == "missing_return_link":
+            del alternates[other]
+        elif kind == "relative_hreflang":
+            alternates = {code: href[len(base_url):] for code, href in alternates.items()}
+        elif kind == "redirected_alternate":
+            alternates[other] = base_url + self.path(other, cluster, "-old")
+        elif kind == "broken_alternate":
+            alternates[other] = base_url + self.path(other, cluster, "-missing")
+
+        section = SECTIONS[cluster % len(SECTIONS)][LANGS.index(lang)]
+        name = "Home" if cluster == 0 else f"{section.capitalize()} item {cluster}"
+        title = f"{name} | Yanghua Cable - Flexible Busbar Solutions"
+        if kind == "long_title":
+            title = f"{name} | Yanghua Cable - Flexible Busbar, Copper Busbar and Cable Assembly Solutions for Industry"
+        description = (f"{name}: flexible busbar and cable solutions by Yanghua for data centers, "
+                       f"new energy and manufacturing. Request a quote today.")
+        chunk = f"{cluster:08x}"
+
+        head = [
+            f'<!DOCTYPE html><html lang="{lang}"><head><meta charSet="utf-8"/>',
+            '<meta name="viewport" content="width=device-width, initial-scale=1"/>',
+            f'<link rel="stylesheet" href="/_next/static/css/app/layout.css?v={chunk}" data-precedence="next"/>',
+            f'<link rel="stylesheet" href="/_next/static/css/app/%5Blocale%5D/page.css?v={chunk}" data-precedence="next"/>',
+            '<link rel="preload" as="script" fetchPriority="low" href="/_next/static/chunks/webpack.js"/>',
+        ]
+        head.extend(f'<script src="/_next/static/chunks/{script}.js" async=""></script>'
+                    for script in ("main-app", "app-pages-internals", "app/layout", "app/error", "app/not-found",
+                                  "app/global-error", "app/%5Blocale%5D/layout", f"app/%5Blocale%5D/{section}/page",
+                                  f"app/%5Blocale%5D/{section}/not-found", "framework", "1dd3208c", "845-2d6b"))
+        head.append(f"<title>{title}</title>")
+        if kind != "missing_description":
+            head.append(f'<meta name="description" content="{description}"/>')
+        head.append('<meta name="keywords" content="flexible busbar, copper busbar, cable assembly, Yanghua"/>')
+        head.append('<meta name="robots" content="index, follow"/>')
+        if canonical is not None:
+            head.append(f'<link rel="canonical" href="{canonical}"/>')
+        head.extend(f'<link rel="alternate" hrefLang="{code}" href="{href}"/>' for code, href in alternates.items())
+        head.extend([
+            f'<meta property="og:title" content="{title}"/>',
+            f'<meta property="og:description" content="{description}"/>',
+            f'<meta property="og:url" content="{own_url}"/>',
+            '<meta property="og:site_name" content="Yanghua Cable"/>',
+            f'<meta property="og:locale" content="{lang}_{"US" if lang == "en" else "ES"}"/>',
+            f'<meta property="og:image" content="{base_url}/images/og/{section}.jpg"/>',
+            '<meta property="og:image:width" content="1200"/><meta property="og:image:height" content="630"/>',
+            '<meta property="og:type" content="website"/>',
+            '<meta name="twitter:card" content="summary_large_image"/>',
+            f'<meta name="twitter:title" content="{title}"/>',
+            f'<meta name="twitter:description" content="{description}"/>',
+            f'<meta name="twitter:image" content="{base_url}/images/og/{section}.jpg"/>',
+            '<link rel="icon" href="/favicon.ico" type="image/x-icon" sizes="16x16"/>',
+            '<script type="application/ld+json">{"@context":"https://schema.org","@type":"Organization",'
+            f'"name":"Yanghua Cable","url":"{base_url}","logo":"{base_url}/images/logo.png",'
+            '"contactPoint":{"@type":"ContactPoint","contactType":"sales","availableLanguage":["English","Spanish"]},'
+            f'"sameAs":["https://www.linkedin.com/company/yanghua"],"description":"{description}"}}</script>',
+            '<script src="/_next/static/chunks/polyfills.js" noModule=""></script></head>',
+        ])
+
+        links = [f'<a href="{self.path(lang, 0)}">Home</a>']
+        links.extend(f'<a href="/{lang}/{pair[LANGS.index(lang)]}">{pair[0]}</a>' for pair in SECTIONS)
+        first = cluster * FANOUT + 1
+        links.extend(f'<a href="{self.path(lang, child)}">Item {child}</a>'
+                     for child in range(first, min(first + FANOUT, self.clusters)))
+        links.append(f'<a href="{self.path(other, cluster)}" hrefLang="{other}">{other.upper()}</a>')
+        body = (f'<body><header class="bg-white shadow-sm sticky top-0 z-50"><nav>{"".join(links)}</nav></header>'
+                f'<main><h1>{name}</h1><p>{self._filler}</p></main>'
+                f'<script>self.__next_f.push([1,"{chunk}:{section}"])</script></body></html>')
+        return "".join(head) + body
+
+    def sitemap_index(self, base_url: str) -> str:
+        chunks = (self.pages + SITEMAP_CHUNK - 1) // SITEMAP_CHUNK
+        entries = "".join(f"<sitemap><loc>{base_url}/sitemap-{i}.xml</loc><lastmod>{LASTMOD}</lastmod></sitemap>"
+                          for i in range(chunks))
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</sitemapindex>')
+
+    def sitemap(self, index: int, base_url: str) -> Optional[str]:
+        start = index * SITEMAP_CHUNK
+        if not 0 <= start < self.pages:
+            return None
+        paths = itertools.islice(self.paths(), start, start + SITEMAP_CHUNK)
+        entries = "".join(f"<url><loc>{base_url}{path}</loc><lastmod>{LASTMOD}</lastmod></url>" for path in paths)
+        return ('<?xml version="1.0" encoding="UTF-8"?>'
+                f'<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{entries}</urlset>')
+
+    def respond(self, path: str, base_url: str) -> Tuple[int, Dict[str, str], bytes]:
+        """(状态码, 响应头, 正文)"""
+        if self.latency:
+            time.sleep(self.latency)
+        path = path.split("?", 1)[0].split("#", 1)[0]
+        if path == "/sitemap.xml":
+            return 200, {"Content-Type": "application/xml"}, self.sitemap_index(base_url).encode("utf-8")
+        m = _SITEMAP_PATH.match(path)
+        if m is not None:
+            xml = self.sitemap(int(m.group(1)), base_url)
+            if xml is not None:
+                return 200, {"Content-Type": "application/xml"}, xml.encode("utf-8")
+        parsed = self.parse_path(path)
+        if parsed is not None:
+            lang, cluster, variant = parsed
+            if variant == "-old":
+                return 301, {"Location": base_url + self.path(lang, cluster)}, b""
+            if not variant:
+                html = self.render(lang, cluster, base_url)
+                return 200, {"Content-Type": "text/html; charset=utf-8"}, html.encode("utf-8")
+        return 404, {"Content-Type": "text/html; charset=utf-8"}, b"<html><head><title>404</title></head></html>"
+
+    def write_tarball(self, path: str, base_url: str = "http://127.0.0.1") -> int:
+        """把全部页面写成 tar.gz（成员名 en/products/item-1.html，首页为 en.html），返回页面数"""
+        count = 0
+        with tarfile.open(path, "w:gz", compresslevel=1) as archive:
+            for cluster in range(self.clusters):
+                for lang in LANGS:
+                    data = self.render(lang, cluster, base_url).encode("utf-8")
+                    info = tarfile.TarInfo(self.path(lang, cluster).lstrip("/") + ".html")
+                    info.size = len(data)
+                    archive.addfile(info, io.BytesIO(data))
+                    count += 1
+        return count
+
+
+# ---- HTTP 服务 ----
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # 响应头与正文分两次写出，关闭 Nagle 避免与延迟 ACK 叠加出 40ms 的等待
+    disable_nagle_algorithm = True
+
+    def do_GET(self) -> None:
+        base_url = f"http://{self.headers.get('Host') or '%s:%d' % self.server.server_address[:2]}"
+        status, headers, body = self.server.site.respond(self.path, base_url)
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256
+
+    def __init__(self, address: Tuple[str, int], site: SyntheticSite, reuse_port: bool):
+        self.site = site
+        self.reuse_port = reuse_port
+        super().__init__(address, _Handler)
+
+    def server_bind(self) -> None:
+        if self.reuse_port:
+            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
+
+
+def _serve(site: SyntheticSite, host: str, port: int, reuse_port: bool, ready: Any) -> None:
+    server = _Server((host, port), site, reuse_port)
+    ready.put(server.server_address[1])
+    server.serve_forever()
+
+
+class FixtureServer:
+    """在后台进程中运行合成站点；workers > 1 且系统支持 SO_REUSEPORT 时多个进程共同监听同一端口"""
+
+    def __init__(self, site: SyntheticSite, host: str = "127.0.0.1", workers: int = 1):
+        self.site = site
+        self.host = host
+        self.workers = max(1, workers) if hasattr(socket, "SO_REUSEPORT") else 1
+        self.port = 0
+        self._processes: List[multiprocessing.Process] = []
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def start(self) -> "FixtureServer":
+        ctx = multiprocessing.get_context("spawn")
+        ready = ctx.Queue()
+        reuse_port = self.workers > 1
+        placeholder = None
+        if reuse_port:
+            # 先绑定（不监听）一个端口占位，各进程再以 SO_REUSEPORT 绑定同一端口
+            placeholder = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            placeholder.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            placeholder.bind((self.host, 0))
+            self.port = placeholder.getsockname()[1]
+        try:
+            for _ in range(self.workers):
+                process = ctx.Process(target=_serve, args=(self.site, self.host, self.port, reuse_port, ready),
+                                      daemon=True)
+                process.start()
+                self._processes.append(process)
+                self.port = ready.get(timeout=30)
+        except Exception:
+            self.close()
+            raise
+        finally:
+            if placeholder is not None:
+                placeholder.close()
+        return self
+
+    def close(self) -> None:
+        for process in self._processes:
+            process.terminate()
+        for process in self._processes:
+            process.join()
+        self._processes = []
+
+    def __enter__(self) -> "FixtureServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
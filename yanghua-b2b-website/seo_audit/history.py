@@ -0,0 +1,472 @@
+"""
+历史结果仓库
+把各脚本生成的带时间戳的报告（production_seo_check_*.json、x_default_verification_*.json、
+seo-reports/hreflang-audit-*.json 等）导入同一个 SQLite 数据库，按规范化的表结构保存：
+
+- runs      每个报告文件一次运行（类型、来源文件、运行时间、被检查的站点、摘要）
+- pages     某次运行中检查的一个页面（URL、路径、状态）
+- fields    页面的扁平字段（canonical、title、hreflang:<lang>、x_default_found ...）
+- findings  页面的检查结果（检查名称、级别、消息）
+
+字段缺失即不写入 fields，因此“某个字段从有到无”可以直接用 LEFT JOIN 查出；
+按 (url, run)、(path, run)、(page, name) 建立索引，单个 URL 的历史与两次运行之间的回归都是索引查询。
+回归只在同一站点（runs.origin，运行中最常见的 scheme://host）的运行之间对比，
+localhost:3000 与 localhost:3003 的两次检查不会互相当作上一次运行。
+导入按文件大小与修改时间判断是否变化，重复执行只导入新增或改动的报告。
+
+用法示例：
+  with HistoryStore() as store:
+      store.ingest_paths(discover_reports())
+      for row in store.history("/es/soluciones", field="hreflang:x-default"):
+          print(row)
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import re
+import sqlite3
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+from urllib.parse import urlsplit
+
+from .checks import ERROR, WARNING, Finding
+
+DEFAULT_HISTORY_PATH = os.path.join(".cache", "seo-audit", "history.sqlite3")
+# production_seo_check 等报告以路径为键，补全为生产环境 URL
+PRODUCTION_BASE_URL = "https://www.yhflexiblebusbar.com"
+
+# 参与对比的 seo_data 字段（hreflang 另外按语言展开）
+SEO_FIELDS = ("canonical", "title", "description", "og_url", "og_title", "og_type", "author")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    kind TEXT NOT NULL,
+    source TEXT NOT NULL UNIQUE,
+    started_at TEXT NOT NULL,
+    file_size INTEGER NOT NULL,
+    file_mtime REAL NOT NULL,
+    page_count INTEGER NOT NULL,
+    summary TEXT,
+    origin TEXT
+);
+CREATE INDEX IF NOT EXISTS runs_kind ON runs (kind, started_at);
+CREATE TABLE IF NOT EXISTS pages (
+    id INTEGER PRIMARY KEY,
+    run_id INTEGER NOT NULL REFERENCES runs (id) ON DELETE CASCADE,
+    url TEXT NOT NULL,
+    path TEXT NOT NULL,
+    status TEXT,
+    UNIQUE (run_id, url)
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url, run_id);
+CREATE INDEX IF NOT EXISTS pages_path ON pages (path, run_id);
+CREATE TABLE IF NOT EXISTS fields (
+    page_id INTEGER NOT NULL REFERENCES pages (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (page_id, name)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS fields_name ON fields (name, value);
+CREATE TABLE IF NOT EXISTS findings (
+    page_id INTEGER NOT NULL REFERENCES pages (id) ON DELETE CASCADE,
+    check_name TEXT NOT NULL,
+    severity TEXT NOT NULL,
+    message TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS findings_page ON findings (page_id);
+CREATE INDEX IF NOT EXISTS findings_check ON findings (check_name, severity);
+"""
+_RUN_COLUMNS = "SELECT id, kind, source, started_at, page_count, origin FROM runs"
+
+
+class PageRecord(NamedTuple):
+    """报告中的一个页面（导入前的规范化形式）；fields 中值为 None 的字段不写入"""
+    url: str
+    status: Optional[str]
+    fields: Dict[str, Any]
+    findings: List[Finding]
+
+
+class Run(NamedTuple):
+    id: int
+    kind: str
+    source: str
+    started_at: str
+    page_count: int
+    origin: Optional[str] = None
+
+
+class HistoryRow(NamedTuple):
+    """某个 URL 在一次运行中的状态；value 为 --field 指定字段的值"""
+    run: Run
+    url: str
+    status: Optional[str]
+    value: Optional[str]
+    findings: int
+
+
+class Regression(NamedTuple):
+    """两次运行之间的一处退化；kind 为 lost / changed / status / new_finding / missing_page"""
+    url: str
+    kind: str
+    name: str
+    before: Optional[str]
+    after: Optional[str]
+
+
+# ---- 报告解析 ----
+
+def url_path(url: str) -> str:
+    """用于跨主机匹配的路径：去掉查询串与末尾斜杠（根路径保留 /）"""
+    path = urlsplit(url).path if "://" in url else url.split("?", 1)[0]
+    return path.rstrip("/") or "/"
+
+
+def url_origin(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+def run_origin(urls: Iterable[str]) -> Optional[str]:
+    """一次运行检查的站点：页面 URL 中最常见的 scheme://host（多环境报告取页面最多的那个）"""
+    counts = Counter(url_origin(url) for url in urls)
+    return counts.most_common(1)[0][0] if counts else None
+
+
+def _absolute(key: str) -> str:
+    return key if "://" in key else PRODUCTION_BASE_URL + key
+
+
+def seo_fields(seo_data: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """seo_data（PageSeo.as_dict 的输出）-> 扁平字段；同一语言出现多次时保存为列表"""
+    fields: Dict[str, Any] = {}
+    if not seo_data:
+        return fields
+    for name in SEO_FIELDS:
+        if seo_data.get(name):
+            fields[name] = seo_data[name]
+    for tag in seo_data.get("hreflang") or []:
+        _add_alternate(fields, f"hreflang:{str(tag.get('hreflang', '')).strip().lower()}", tag.get("href"))
+    return fields
+
+
+def _add_alternate(fields: Dict[str, Any], key: str, href: Any) -> None:
+    if key in fields:
+        previous = fields[key]
+        fields[key] = (previous if isinstance(previous, list) else [previous]) + [href]
+    else:
+        fields[key] = href
+
+
+def _status_findings(entry: Dict[str, Any]) -> List[Finding]:
+    if entry.get("status") == "error":
+        return [Finding("fetch", ERROR, entry.get("error") or "检查出错")]
+    if entry.get("status") == "failed" and not entry.get("seo_data"):
+        return [Finding("fetch", ERROR, "无法提取 SEO 标签")]
+    return []
+
+
+def parse_page_check(data: Dict[str, Any]) -> Iterator[PageRecord]:
+    """production_seo_check / production_articles_seo_check：{路径或 URL: {seo_data, status}}"""
+    for key, entry in data.items():
+        # 增量模式的 unchanged（lastmod / 304 / 哈希）只是本次跳过的原因，不作为页面字段导入
+        fields = seo_fields(entry.get("seo_data"))
+        yield PageRecord(_absolute(key), entry.get("status"), fields, _status_findings(entry))
+
+
+def parse_x_default(data: Dict[str, Any]) -> Iterator[PageRecord]:
+    """x_default_verification：{summary, results: [{url, hreflang_tags, x_default_found, x_default_correct}]}"""
+    for entry in data.get("results", []):
+        fields = seo_fields({"hreflang": entry.get("hreflang_tags")})
+        findings = _status_findings(entry)
+        if entry.get("status") == "success":
+            fields["x_default_found"] = bool(entry.get("x_default_found"))
+            fields["x_default_correct"] = bool(entry.get("x_default_correct"))
+            if not entry.get("x_default_found"):
+                findings.append(Finding("x_default", ERROR, "缺少 x-default 标签"))
+            elif not entry.get("x_default_correct"):
+                findings.append(Finding("x_default", ERROR, "x-default 未指向英文版本"))
+        yield PageRecord(entry["url"], entry.get("status"), fields, findings)
+
+
+def parse_hreflang_audit(data: List[Dict[str, Any]]) -> Iterator[PageRecord]:
+    """scripts/hreflang-audit.ts：[{url, status, canonical, htmlAlternates, httpAlternates, issues, success}]"""
+    for entry in data:
+        fields: Dict[str, Any] = {"status_code": entry.get("status")}
+        if entry.get("canonical"):
+            fields["canonical"] = entry["canonical"]
+        for lang, href in (entry.get("htmlAlternates") or {}).items():
+            fields[f"hreflang:{lang.lower()}"] = href
+        for lang, href in (entry.get("httpAlternates") or {}).items():
+            fields[f"http_hreflang:{lang.lower()}"] = href
+        findings = [Finding("hreflang_audit", ERROR, issue) for issue in entry.get("issues") or []]
+        yield PageRecord(entry["url"], "success" if entry.get("success") else "failed", fields, findings)
+
+
+def parse_extended(data: Dict[str, Any]) -> Iterator[PageRecord]:
+    """extended_seo_verification：每个路径的 production / local 两个环境各算一个页面"""
+    for comparison in data.get("results", {}).values():
+        for env in ("production", "local"):
+            entry = comparison.get(env)
+            if not entry:
+                continue
+            findings = [Finding("extended", ERROR, issue) for issue in entry.get("issues") or []]
+            findings += [Finding("extended", WARNING, warning) for warning in entry.get("warnings") or []]
+            yield PageRecord(entry["url"], entry.get("status"), seo_fields(entry.get("seo_data")), findings)
+
+
+def parse_site_crawl(data: Dict[str, Any]) -> Iterator[PageRecord]:
+    """site_crawl_seo：{summary, results: [{url, status_code, status, seo_data, findings}]}"""
+    for entry in data.get("results", []):
+        fields = seo_fields(entry.get("seo_data"))
+        fields["status_code"] = entry.get("status_code")
+        if entry.get("final_url"):
+            fields["final_url"] = entry["final_url"]
+        findings = [Finding(f["check"], f["severity"], f["message"]) for f in entry.get("findings", [])]
+        if entry.get("status") == "error":
+            findings.append(Finding("fetch", ERROR, entry.get("error") or "抓取失败"))
+        yield PageRecord(entry["url"], entry.get("status"), fields, findings)
+
+
+class ReportKind(NamedTuple):
+    name: str
+    pattern: str
+    parse: Callable[[Any], Iterator[PageRecord]]
+
+
+# 按文件名识别报告类型；新的报告类型在这里登记即可被 ingest 识别
+REPORT_KINDS = (
+    ReportKind("production_seo_check", "production_seo_check_*.json", parse_page_check),
+    ReportKind("production_articles_seo_check", "production_articles_seo_check_*.json", parse_page_check),
+    ReportKind("x_default_verification", "x_default_verification_*.json", parse_x_default),
+    ReportKind("extended_seo_verification", "extended_seo_verification_*.json", parse_extended),
+    ReportKind("site_crawl_seo", "site_crawl_seo_*.json", parse_site_crawl),
+    ReportKind("hreflang_audit", os.path.join("seo-reports", "hreflang-audit-*.json"), parse_hreflang_audit),
+)
+
+
+def report_kind(path: str) -> Optional[ReportKind]:
+    name = os.path.basename(path)
+    for kind in REPORT_KINDS:
+        if fnmatch.fnmatch(name, os.path.basename(kind.pattern)):
+            return kind
+    return None
+
+
+def discover_reports(root: str = ".") -> List[str]:
+    """root 下所有已知类型的报告文件（按路径排序）"""
+    paths = set()
+    for kind in REPORT_KINDS:
+        paths.update(glob.glob(os.path.join(root, kind.pattern)))
+    return sorted(paths)
+
+
+_FILE_TIMESTAMP = re.compile(r"(\d{8})_(\d{6})")
+_ISO_TIMESTAMP = re.compile(r"(\d{4}-\d{2}-\d{2})T(\d{2})[:-](\d{2})[:-](\d{2})")
+
+
+def report_time(path: str) -> str:
+    """运行时间：取文件名中的时间戳（20251028_101948 或 2025-10-27T15:45:09），没有时取修改时间"""
+    name = os.path.basename(path)
+    match = _FILE_TIMESTAMP.search(name)
+    if match:
+        return datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S").isoformat()
+    match = _ISO_TIMESTAMP.search(name)
+    if match:
+        return f"{match.group(1)}T{match.group(2)}:{match.group(3)}:{match.group(4)}"
+    return datetime.fromtimestamp(os.path.getmtime(path)).isoformat(timespec="seconds")
+
+
+def _value(value: Any) -> str:
+    return value if isinstance(value, str) else json.dumps(value, ensure_ascii=False)
+
+
+# ---- 存储 ----
+
+class HistoryStore:
+    """历史结果的 SQLite 仓库（线程安全）"""
+
+    def __init__(self, path: str = DEFAULT_HISTORY_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA foreign_keys = ON")
+        self._conn.executescript(_SCHEMA)
+        self._migrate()
+        self._conn.commit()
+
+    def _migrate(self) -> None:
+        """旧版本的仓库没有 runs.origin：补上该列并按已导入的页面回填"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        if "origin" not in columns:
+            self._conn.execute("ALTER TABLE runs ADD COLUMN origin TEXT")
+            for (run_id,) in self._conn.execute("SELECT id FROM runs").fetchall():
+                urls = (url for (url,) in self._conn.execute("SELECT url FROM pages WHERE run_id = ?", (run_id,)))
+                self._conn.execute("UPDATE runs SET origin = ? WHERE id = ?", (run_origin(urls), run_id))
+        self._conn.execute("CREATE INDEX IF NOT EXISTS runs_origin ON runs (kind, origin, started_at)")
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._conn.close()
+
+    # ---- 导入 ----
+
+    def ingest(self, path: str, kind: Optional[ReportKind] = None) -> Optional[int]:
+        """导入一个报告文件，返回导入的页面数；文件未变化（大小与修改时间相同）时返回 None
+
+        同一文件内容变化后重新导入会替换原来的运行。
+        """
+        kind = kind or report_kind(path)
+        if kind is None:
+            raise ValueError(f"无法识别的报告类型: {path}")
+        source = os.path.abspath(path)
+        stat = os.stat(path)
+        with self._lock:
+            row = self._conn.execute("SELECT id, file_size, file_mtime FROM runs WHERE source = ?",
+                                     (source,)).fetchone()
+        if row is not None and row[1] == stat.st_size and row[2] == stat.st_mtime:
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        records = list(kind.parse(data))
+        summary = data.get("summary") if isinstance(data, dict) else None
+        with self._lock, self._conn:
+            if row is not None:
+                self._conn.execute("DELETE FROM runs WHERE id = ?", (row[0],))
+            run_id = self._conn.execute(
+                "INSERT INTO runs (kind, source, started_at, file_size, file_mtime, page_count, summary, origin) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (kind.name, source, report_time(path), stat.st_size, stat.st_mtime, len(records),
+                 json.dumps(summary, ensure_ascii=False) if summary is not None else None,
+                 run_origin(record.url for record in records)),
+            ).lastrowid
+            for record in records:
+                page_id = self._conn.execute(
+                    "INSERT OR REPLACE INTO pages (run_id, url, path, status) VALUES (?, ?, ?, ?)",
+                    (run_id, record.url, url_path(record.url), record.status),
+                ).lastrowid
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO fields (page_id, name, value) VALUES (?, ?, ?)",
+                    [(page_id, name, _value(value)) for name, value in record.fields.items() if value is not None],
+                )
+                self._conn.executemany(
+                    "INSERT INTO findings (page_id, check_name, severity, message) VALUES (?, ?, ?, ?)",
+                    [(page_id, f.check, f.severity, f.message) for f in record.findings],
+                )
+        return len(records)
+
+    def ingest_paths(self, paths: Iterable[str]) -> Dict[str, Optional[int]]:
+        """逐个导入，返回 {文件: 页面数或 None（未变化）}；无法解析的文件记为 -1 并继续"""
+        results: Dict[str, Optional[int]] = {}
+        for path in paths:
+            try:
+                results[path] = self.ingest(path)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                results[path] = -1
+        return results
+
+    # ---- 查询 ----
+
+    def _query(self, sql: str, params: Sequence[Any] = ()) -> List[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def runs(self, kind: Optional[str] = None, limit: Optional[int] = None) -> List[Run]:
+        """按运行时间从新到旧"""
+        sql = _RUN_COLUMNS
+        params: List[Any] = []
+        if kind:
+            sql += " WHERE kind = ?"
+            params.append(kind)
+        sql += " ORDER BY started_at DESC, id DESC"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [Run(*row) for row in self._query(sql, params)]
+
+    def run(self, run_id: int) -> Optional[Run]:
+        rows = self._query(_RUN_COLUMNS + " WHERE id = ?", (run_id,))
+        return Run(*rows[0]) if rows else None
+
+    def history(self, target: str, field: Optional[str] = None, kind: Optional[str] = None) -> List[HistoryRow]:
+        """某个页面在各次运行中的状态（按时间从旧到新）；target 为完整 URL 时精确匹配，为路径时匹配所有主机"""
+        column, value = ("url", target) if "://" in target else ("path", url_path(target))
+        sql = (f"SELECT r.id, r.kind, r.source, r.started_at, r.page_count, r.origin, p.url, p.status, f.value, "
+               f"(SELECT COUNT(*) FROM findings x WHERE x.page_id = p.id) "
+               f"FROM pages p JOIN runs r ON r.id = p.run_id "
+               f"LEFT JOIN fields f ON f.page_id = p.id AND f.name = ? "
+               f"WHERE p.{column} = ?")
+        params: List[Any] = [field or "", value]
+        if kind:
+            sql += " AND r.kind = ?"
+            params.append(kind)
+        sql += " ORDER BY r.started_at, r.id"
+        return [HistoryRow(Run(*row[:6]), row[6], row[7], row[8], row[9]) for row in self._query(sql, params)]
+
+    def page_fields(self, run_id: int, url: str) -> Dict[str, str]:
+        rows = self._query("SELECT f.name, f.value FROM fields f JOIN pages p ON p.id = f.page_id "
+                           "WHERE p.run_id = ? AND p.url = ?", (run_id, url))
+        return dict(rows)
+
+    def page_findings(self, run_id: int, url: str) -> List[Finding]:
+        rows = self._query("SELECT x.check_name, x.severity, x.message FROM findings x JOIN pages p ON p.id = x.page_id "
+                           "WHERE p.run_id = ? AND p.url = ?", (run_id, url))
+        return [Finding(*row) for row in rows]
+
+    def previous_run(self, run: Run) -> Optional[Run]:
+        """同类型、同站点（origin）的上一次运行"""
+        rows = self._query(_RUN_COLUMNS + " WHERE kind = ? AND origin IS ? "
+                           "AND (started_at < ? OR (started_at = ? AND id < ?)) ORDER BY started_at DESC, id DESC LIMIT 1",
+                           (run.kind, run.origin, run.started_at, run.started_at, run.id))
+        return Run(*rows[0]) if rows else None
+
+    def regressions(self, before: int, after: int) -> List[Regression]:
+        """after 相对 before 的退化：字段丢失、字段取值变化、状态从 success 变差、新增 ERROR 检查结果、页面消失
+
+        只比较两次运行中都出现的页面（按 URL 匹配），before 中有而 after 中没有的页面记为 missing_page；
+        after 中抓取失败（没有任何字段）的页面不逐个列出丢失的字段。
+        """
+        pairs = "FROM pages a JOIN pages b ON b.url = a.url AND b.run_id = ? "
+        params = (after, before)
+        regressions = []
+        for url, name, value in self._query(
+                "SELECT a.url, fa.name, fa.value " + pairs +
+                "JOIN fields fa ON fa.page_id = a.id "
+                "LEFT JOIN fields fb ON fb.page_id = b.id AND fb.name = fa.name "
+                "WHERE a.run_id = ? AND fb.name IS NULL "
+                # 之后的运行中没能抓取到页面（没有任何字段）时只按状态与检查结果报告，不逐个字段列出
+                "AND EXISTS (SELECT 1 FROM fields fx WHERE fx.page_id = b.id)", params):
+            regressions.append(Regression(url, "lost", name, value, None))
+        for url, name, old, new in self._query(
+                "SELECT a.url, fa.name, fa.value, fb.value " + pairs +
+                "JOIN fields fa ON fa.page_id = a.id "
+                "JOIN fields fb ON fb.page_id = b.id AND fb.name = fa.name "
+                "WHERE a.run_id = ? AND fa.value != fb.value", params):
+            regressions.append(Regression(url, "changed", name, old, new))
+        for url, old, new in self._query(
+                "SELECT a.url, a.status, b.status " + pairs +
+                "WHERE a.run_id = ? AND a.status = 'success' AND b.status != 'success'", params):
+            regressions.append(Regression(url, "status", "status", old, new))
+        for url, check, message in self._query(
+                "SELECT b.url, xb.check_name, xb.message " + pairs +
+                "JOIN findings xb ON xb.page_id = b.id AND xb.severity = ? "
+                "WHERE a.run_id = ? AND NOT EXISTS (SELECT 1 FROM findings xa WHERE xa.page_id = a.id "
+                "AND xa.check_name = xb.check_name AND xa.message = xb.message)", (after, ERROR, before)):
+            regressions.append(Regression(url, "new_finding", check, None, message))
+        for (url,) in self._query(
+                "SELECT a.url FROM pages a WHERE a.run_id = ? AND NOT EXISTS "
+                "(SELECT 1 FROM pages b WHERE b.run_id = ? AND b.url = a.url)", (before, after)):
+            regressions.append(Regression(url, "missing_page", "page", url, None))
+        return regressions
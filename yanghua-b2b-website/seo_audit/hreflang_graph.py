@@ -0,0 +1,311 @@
+"""
+全站 hreflang 互链图
+单页检查（checks.run_checks）看不到页面之间的关系；这里把全站的 PageSeo 汇总成以 URL 为键的邻接表，检查：
+
+- 回链缺失：A 声明 hreflang 指向 B，但 B 的 alternates 中没有 A
+- 自引用缺失：页面的 alternates 中没有指向自身的条目
+- 集群不一致：同一个 hreflang 集群（互相通过 alternate 连通的页面）中，各成员声明的 alternates 集合不同
+- 目标不可用：alternate 指向非 200（404、重定向等）的页面
+
+所有检查都只遍历每条 alternate 常数次（集群用并查集划分），总耗时与页面数 + alternate 数成线性关系。
+
+节点按 alternate 的原始 href 区分（只小写 scheme / host、去掉 fragment），/en/ 与 /en 是两个节点：
+指向 /en/、实际 301 到 /en 的 alternate 会作为目标不可用报告出来。只有抓取确认两种写法都直接返回 200 时，
+才把末尾斜杠不同的两个节点视为同一页面。
+
+用法示例：
+  graph = HreflangGraph()
+  for result in crawl(seeds):
+      graph.add_page(result.url, result.page, result.status_code, result.final_url)
+  for url, findings in graph.findings().items():
+      ...
+"""
+
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit
+
+from .checks import ERROR, WARNING, Finding
+from .page import PageSeo
+
+# (hreflang, 目标键)
+Edge = Tuple[str, str]
+
+
+def url_key(url: str) -> str:
+    """按完整 URL 匹配（默认）：小写 scheme / host、去掉 fragment，路径（含末尾斜杠）与 query 保持原样"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    if not parts.scheme or not parts.netloc:
+        return url
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", parts.query, ""))
+
+
+def path_key(url: str) -> str:
+    """只按路径匹配：在本地 / 预览环境爬取、而 alternates 写的是生产域名时使用"""
+    try:
+        parts = urlsplit(url.strip())
+    except ValueError:
+        return url
+    return urlunsplit(("", "", parts.path or "/", parts.query, ""))
+
+
+def _slash_variant(key: str) -> Optional[str]:
+    """末尾斜杠不同的另一种写法（/en <-> /en/）；根路径没有"""
+    parts = urlsplit(key)
+    path = parts.path
+    if path in ("", "/"):
+        return None
+    path = path[:-1] if path.endswith("/") else path + "/"
+    return urlunsplit((parts.scheme, parts.netloc, path, parts.query, ""))
+
+
+class _DisjointSet:
+    """并查集（路径压缩 + 按大小合并）"""
+
+    def __init__(self) -> None:
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def find(self, key: str) -> str:
+        parent = self.parent.setdefault(key, key)
+        if parent == key:
+            self.size.setdefault(key, 1)
+            return key
+        root = key
+        while self.parent[root] != root:
+            root = self.parent[root]
+        while self.parent[key] != root:
+            self.parent[key], key = root, self.parent[key]
+        return root
+
+    def union(self, a: str, b: str) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra == rb:
+            return
+        if self.size[ra] < self.size[rb]:
+            ra, rb = rb, ra
+        self.parent[rb] = ra
+        self.size[ra] += self.size.pop(rb)
+
+
+class HreflangGraph:
+    """页面键 -> alternates 的邻接表，以及每个 URL 的抓取状态"""
+
+    def __init__(self, key: Callable[[str], str] = url_key):
+        self._key = key
+        # 同一个 href 会出现在集群内每个页面上，规范化结果缓存起来
+        self._keys: Dict[str, str] = {}
+        # 页面键 -> 原始 URL（输出用）
+        self.urls: Dict[str, str] = {}
+        # 页面键 -> {(hreflang, 目标键)}
+        self.edges: Dict[str, FrozenSet[Edge]] = {}
+        # 页面键 -> 目标键集合（回链检查用）
+        self.targets: Dict[str, Set[str]] = {}
+        # URL 键 -> (状态码, 重定向后的 URL)
+        self.status: Dict[str, Tuple[Optional[int], Optional[str]]] = {}
+        # 末尾斜杠写法 -> 已抓取页面的键（两种写法都直接返回 200 时才合并）
+        self.aliases: Dict[str, str] = {}
+
+    def add_page(self, url: str, page: Optional[PageSeo], status_code: Optional[int] = 200,
+                 final_url: Optional[str] = None) -> None:
+        """加入一个已抓取的页面；page 为 None（抓取失败或非 HTML）时只记录状态
+
+        final_url 与 url 不同时视为重定向：url 记为重定向，页面内容归到 final_url 名下。
+        """
+        key = self.key(url)
+        final_key = self.key(final_url) if final_url else key
+        if final_key != key:
+            self.set_status(url, status_code, final_url)
+            key, url = final_key, final_url
+        self.set_status(url, status_code)
+        if page is None or key in self.edges:
+            return
+        edges = set()
+        for alternate in page.alternates:
+            if alternate.hreflang and alternate.href:
+                edges.add((alternate.hreflang.strip().lower(), self.key(alternate.href.strip())))
+        self.urls[key] = url
+        self.edges[key] = frozenset(edges)
+        self.targets[key] = {target for _, target in edges}
+        self._fold(key)
+
+    def key(self, url: str) -> str:
+        cached = self._keys.get(url)
+        if cached is None:
+            cached = self._keys[url] = self._key(url)
+        return cached
+
+    def set_status(self, url: str, status_code: Optional[int], final_url: Optional[str] = None) -> None:
+        """记录 URL 的抓取状态；final_url 表示该 URL 会重定向到别处"""
+        key = self.key(url)
+        self.status[key] = (status_code, final_url)
+        self._fold(key)
+
+    def _fold(self, key: str) -> None:
+        """key 与其末尾斜杠写法一个是已抓取的页面、另一个直接返回 200 时，后者作为前者的别名"""
+        variant = _slash_variant(key)
+        if variant is None:
+            return
+        for page, other in ((key, variant), (variant, key)):
+            if page in self.edges and other not in self.edges and self.status.get(other) == (200, None):
+                self.aliases[other] = page
+
+    def resolve(self, key: str) -> str:
+        return self.aliases.get(key, key)
+
+    def resolved_targets(self) -> Dict[str, Set[str]]:
+        """页面键 -> 目标键集合（别名已替换为页面键）"""
+        if not self.aliases:
+            return self.targets
+        return {key: {self.resolve(target) for target in targets} for key, targets in self.targets.items()}
+
+    def _signature(self, key: str) -> FrozenSet[Edge]:
+        edges = self.edges[key]
+        if not self.aliases:
+            return edges
+        return frozenset((lang, self.resolve(target)) for lang, target in edges)
+
+    def __len__(self) -> int:
+        return len(self.edges)
+
+    def unknown_targets(self) -> List[str]:
+        """被 alternate 引用但状态未知的目标键，调用方可抓取后用 set_status 补充"""
+        unknown = []
+        seen = set()
+        for targets in self.targets.values():
+            for target in targets:
+                if target not in self.status and target not in seen:
+                    seen.add(target)
+                    unknown.append(target)
+        return unknown
+
+    # ---- 检查 ----
+
+    def missing_return_links(self) -> Dict[str, List[Edge]]:
+        """页面键 -> 没有回链的 (hreflang, 目标键)；同一目标有多个 hreflang（如 en 与 x-default）时合并为
+        "en/x-default"。目标未抓取时无法判断，不计入"""
+        missing: Dict[str, List[Edge]] = {}
+        resolved = self.resolved_targets()
+        for key in self.edges:
+            langs: Dict[str, List[str]] = {}
+            for lang, target in self._signature(key):
+                if target == key:
+                    continue
+                back = resolved.get(target)
+                if back is not None and key not in back:
+                    langs.setdefault(target, []).append(lang)
+            if langs:
+                missing[key] = [("/".join(sorted(ls)), target) for target, ls in langs.items()]
+        return missing
+
+    def missing_self_references(self) -> List[str]:
+        return [key for key, targets in self.resolved_targets().items() if targets and key not in targets]
+
+    def cluster_ids(self) -> Dict[str, str]:
+        """页面键 -> 所属集群的代表键（按 alternate 连通关系划分，只包含已抓取的页面）"""
+        sets = _DisjointSet()
+        for key, targets in self.resolved_targets().items():
+            sets.find(key)
+            for target in targets:
+                if target in self.edges:
+                    sets.union(key, target)
+        return {key: sets.find(key) for key in self.edges}
+
+    def clusters(self) -> List[List[str]]:
+        """集群成员列表（单页集群不返回）"""
+        groups: Dict[str, List[str]] = {}
+        for key, root in self.cluster_ids().items():
+            groups.setdefault(root, []).append(key)
+        return [members for members in groups.values() if len(members) > 1]
+
+    def inconsistent_clusters(self, clusters: Optional[List[List[str]]] = None) -> List[Dict]:
+        """alternates 集合不一致的集群：以成员中最常见的集合为准，列出偏离的成员及差异"""
+        problems = []
+        for members in self.clusters() if clusters is None else clusters:
+            signatures: Dict[FrozenSet[Edge], List[str]] = {}
+            for key in members:
+                signatures.setdefault(self._signature(key), []).append(key)
+            if len(signatures) == 1:
+                continue
+            expected = max(signatures, key=lambda s: len(signatures[s]))
+            deviations = []
+            for signature, keys in signatures.items():
+                if signature == expected:
+                    continue
+                for key in keys:
+                    deviations.append({
+                        "url": self.urls[key],
+                        "missing": sorted(expected - signature),
+                        "extra": sorted(signature - expected),
+                    })
+            problems.append({
+                "members": sorted(self.urls[key] for key in members),
+                "expected": sorted(expected),
+                "deviations": deviations,
+            })
+        return problems
+
+    def broken_alternates(self) -> Dict[str, List[Tuple[str, str, Optional[int], Optional[str]]]]:
+        """页面键 -> [(hreflang, 目标键, 状态码, 重定向目标)]，目标不是 200 的 alternate"""
+        broken: Dict[str, List[Tuple[str, str, Optional[int], Optional[str]]]] = {}
+        for key, edges in self.edges.items():
+            for lang, target in edges:
+                status = self.status.get(target)
+                if status is None:
+                    continue
+                code, redirect = status
+                if code != 200 or redirect:
+                    broken.setdefault(key, []).append((lang, target, code, redirect))
+        return broken
+
+    def findings(self) -> Dict[str, List[Finding]]:
+        """全部检查结果，按页面 URL 汇总，格式与 run_checks 一致"""
+        findings: Dict[str, List[Finding]] = {}
+
+        def add(key: str, finding: Finding) -> None:
+            findings.setdefault(self.urls.get(key, key), []).append(finding)
+
+        for key, edges in self.missing_return_links().items():
+            for lang, target in sorted(edges):
+                add(key, Finding("hreflang_return", ERROR, f"{lang} -> {target} 没有回链到本页"))
+        for key in self.missing_self_references():
+            add(key, Finding("hreflang_self", WARNING, "hreflang 中缺少指向自身的条目"))
+        for cluster in self.inconsistent_clusters():
+            for deviation in cluster["deviations"]:
+                parts = []
+                if deviation["missing"]:
+                    parts.append("缺少 " + ", ".join(f"{lang}:{t}" for lang, t in deviation["missing"]))
+                if deviation["extra"]:
+                    parts.append("多出 " + ", ".join(f"{lang}:{t}" for lang, t in deviation["extra"]))
+                findings.setdefault(deviation["url"], []).append(
+                    Finding("hreflang_cluster", ERROR, f"与集群中其他页面的 hreflang 不一致: {'; '.join(parts)}"))
+        for key, edges in self.broken_alternates().items():
+            for lang, target, code, redirect in sorted(edges, key=lambda e: (e[0], e[1])):
+                if redirect:
+                    message = f"{lang} -> {target} 重定向到 {redirect}"
+                else:
+                    message = f"{lang} -> {target} 返回 {code if code is not None else '请求失败'}"
+                add(key, Finding("hreflang_target", ERROR, message))
+        return findings
+
+    def summary(self) -> Dict[str, int]:
+        """各项检查的计数"""
+        clusters = self.clusters()
+        return {
+            "pages": len(self.edges),
+            "clusters": len(clusters),
+            "inconsistent_clusters": len(self.inconsistent_clusters(clusters)),
+            "missing_return_links": sum(len(v) for v in self.missing_return_links().values()),
+            "missing_self_references": len(self.missing_self_references()),
+            "broken_alternates": sum(len(v) for v in self.broken_alternates().values()),
+        }
+
+
+def build_graph(pages: Iterable[Tuple[str, Optional[PageSeo]]], key: Callable[[str], str] = url_key) -> HreflangGraph:
+    """由 (url, PageSeo) 构建互链图（页面都视为 200）"""
+    graph = HreflangGraph(key)
+    for url, page in pages:
+        graph.add_page(url, page)
+    return graph
@@ -0,0 +1,312 @@
+"""
+请求延迟分解与分布统计
+HttpClient 为每个真正发出的请求记录各阶段耗时（Timings）：
+
+- dns       域名解析（只在新建连接时出现）
+- connect   TCP 建连（同上）
+- tls       TLS 握手（同上，仅 https）
+- ttfb      发出请求到收到响应头（服务器处理时间，SSR 慢的路由主要体现在这里）
+- transfer  读取正文（head_only 时只到 </head>）
+- total     整个请求
+
+复用连接的请求没有 dns / connect / tls 三项。各阶段按主机、语言（/en、/es）与页面类别（seo-pages.config.json 的
+category，按最长路径前缀匹配）分组，写入对数分桶直方图（相对误差约 5%）。分组数只取决于主机、语言与类别的个数，
+不按单个 URL 分组，因此内存与抓取的页面数无关；输出 p50 / p90 / p99。审计脚本的 --latency-report 把分布写入 JSON 报告。
+
+用法示例：
+  client = get_client()
+  client.get("https://www.yhflexiblebusbar.com/es/proyectos")
+  print(client.latency.describe_stats())
+  client.latency.summary()["category"]["business"]["ttfb"]["p90"]
+"""
+
+import argparse
+import json
+import math
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+DEFAULT_CONFIG = "seo-pages.config.json"
+DEFAULT_LANGS = ("en", "es")
+PHASES = ("dns", "connect", "tls", "ttfb", "transfer", "total")
+DIMENSIONS = ("host", "locale", "category")
+PERCENTILES = (50, 90, 99)
+UNCATEGORIZED = "other"
+
+# 直方图：最小分辨率 0.1ms，相邻桶的上界相差 5%
+HISTOGRAM_MIN = 1e-4
+HISTOGRAM_GROWTH = 1.05
+# describe_stats 列出的最慢页面类别数
+SLOWEST_GROUPS = 3
+
+
+class Timings(NamedTuple):
+    """一个请求各阶段的耗时（秒）；复用连接时 dns / connect / tls 为 None"""
+    dns: Optional[float]
+    connect: Optional[float]
+    tls: Optional[float]
+    ttfb: Optional[float]
+    transfer: Optional[float]
+    total: float
+
+    @property
+    def reused(self) -> bool:
+        return self.connect is None
+
+
+# ---- 单个请求的计时 ----
+
+_current = threading.local()
+
+
+def current_timer() -> Optional["PhaseTimer"]:
+    """当前线程正在计时的请求（连接层的钩子在请求所在线程中执行）"""
+    return getattr(_current, "timer", None)
+
+
+class PhaseTimer:
+    """记录一个请求的各阶段时间点；httpx 后端通过 trace 回调，requests 后端通过连接钩子写入"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.dns = 0.0
+        self.connect = 0.0
+        self.tls = 0.0
+        self.new_connection = False
+        # httpx 后端：DNS 在 connect_tcp 事件内部完成，建连耗时要扣除这部分
+        self._dns_in_connect = 0.0
+        self.request_sent: Optional[float] = None
+        self.headers_received: Optional[float] = None
+        self._marks: Dict[str, float] = {}
+
+    def __enter__(self) -> "PhaseTimer":
+        _current.timer = self
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        _current.timer = None
+
+    def add_dns(self, seconds: float) -> None:
+        self.dns += seconds
+        self._dns_in_connect += seconds
+
+    def add_connect(self, seconds: float) -> None:
+        """TCP 建连耗时（调用方已扣除其中的 DNS 解析）"""
+        self.new_connection = True
+        self.connect += seconds
+
+    def add_tls(self, seconds: float) -> None:
+        self.tls += seconds
+
+    def trace(self, event_name: str, info: Dict[str, Any]) -> None:
+        """httpcore trace 回调；跟随重定向时以最后一跳的请求与响应头为准"""
+        now = time.perf_counter()
+        if event_name.endswith(".started"):
+            self._marks[event_name[:-len(".started")]] = now
+            if event_name.endswith("send_request_headers.started"):
+                self.request_sent = now
+            return
+        if not event_name.endswith(".complete"):
+            return
+        started = self._marks.pop(event_name[:-len(".complete")], now)
+        if event_name == "connection.connect_tcp.complete":
+            self.add_connect(max(0.0, now - started - self._dns_in_connect))
+            self._dns_in_connect = 0.0
+        elif event_name == "connection.start_tls.complete":
+            self.add_tls(now - started)
+        elif event_name.endswith("receive_response_headers.complete"):
+            self.headers_received = now
+
+    def mark_headers(self) -> None:
+        """requests 后端：响应头已收到（stream=True 的 get 返回时）"""
+        self.headers_received = time.perf_counter()
+
+    def timings(self, finished: Optional[float] = None) -> Timings:
+        finished = finished or time.perf_counter()
+        headers = self.headers_received
+        ttfb = transfer = None
+        if headers is not None:
+            # requests 后端拿不到发出请求的时刻，以开始时间加上建连各阶段近似
+            sent = self.request_sent or (self.started + self.dns + self.connect + self.tls)
+            ttfb = max(0.0, headers - sent)
+            transfer = max(0.0, finished - headers)
+        if not self.new_connection:
+            return Timings(None, None, None, ttfb, transfer, finished - self.started)
+        return Timings(self.dns, self.connect, self.tls, ttfb, transfer, finished - self.started)
+
+
+def resolve(host: str, port: int) -> Tuple[Optional[str], float]:
+    """计时的 DNS 解析，返回 (第一个地址, 耗时)；解析失败时地址为 None，由原有连接逻辑报告错误"""
+    started = time.perf_counter()
+    try:
+        address = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0][4][0]
+    except OSError:
+        address = None
+    return address, time.perf_counter() - started
+
+
+# ---- 分布统计 ----
+
+class Histogram:
+    """对数分桶直方图；百分位取所在桶的上界（不超过实际最大值）"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, value: float) -> None:
+        bucket = 0 if value <= HISTOGRAM_MIN else int(math.log(value / HISTOGRAM_MIN, HISTOGRAM_GROWTH)) + 1
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.max = max(self.max, value)
+
+    def percentile(self, p: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                return min(self.max, HISTOGRAM_MIN * HISTOGRAM_GROWTH ** bucket)
+        return self.max
+
+    def as_dict(self) -> Dict[str, Any]:
+        """毫秒"""
+        data: Dict[str, Any] = {"count": self.count}
+        for p in PERCENTILES:
+            data[f"p{p}"] = round(self.percentile(p) * 1000, 1)
+        data["mean"] = round(self.total / self.count * 1000, 1) if self.count else 0.0
+        data["max"] = round(self.max * 1000, 1)
+        return data
+
+
+def load_categories(config_path: str = DEFAULT_CONFIG) -> Tuple[List[Tuple[str, str]], Sequence[str]]:
+    """seo-pages.config.json -> ([(路径, 类别)]（最长路径在前）, 语言列表)；文件不存在时两者为空 / 默认"""
+    if not os.path.exists(config_path):
+        return [], DEFAULT_LANGS
+    with open(config_path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+    pages = [(p["path"].rstrip("/") or "/", p.get("category") or UNCATEGORIZED)
+             for p in config.get("pages", []) if p.get("path")]
+    pages.sort(key=lambda item: -len(item[0]))
+    return pages, tuple(config.get("languages") or DEFAULT_LANGS)
+
+
+class LatencyStats:
+    """按主机 / 语言 / 页面类别分组的各阶段延迟分布（线程安全）"""
+
+    def __init__(self, config_path: str = DEFAULT_CONFIG):
+        self.config_path = config_path
+        self._categories: Optional[List[Tuple[str, str]]] = None
+        self._langs: Sequence[str] = DEFAULT_LANGS
+        self._lock = threading.Lock()
+        self._groups: Dict[Tuple[str, str], Dict[str, Histogram]] = {}
+        self.requests = 0
+        self.new_connections = 0
+
+    def _load(self) -> None:
+        if self._categories is None:
+            self._categories, self._langs = load_categories(self.config_path)
+
+    def category(self, path: str) -> str:
+        """按最长路径前缀匹配 seo-pages.config.json 中的页面类别（/en/products/x -> /en/products 的类别）"""
+        self._load()
+        for prefix, category in self._categories:
+            if path == prefix or path.startswith(prefix.rstrip("/") + "/"):
+                return category
+        return UNCATEGORIZED
+
+    def keys(self, url: str) -> List[Tuple[str, str]]:
+        self._load()
+        parts = urlsplit(url)
+        path = parts.path.rstrip("/") or "/"
+        segment = path.split("/", 2)[1] if path != "/" else ""
+        locale = segment if segment in self._langs else "-"
+        return [("host", parts.netloc), ("locale", locale), ("category", self.category(path))]
+
+    def record(self, url: str, timings: Timings) -> None:
+        keys = self.keys(url)
+        with self._lock:
+            self.requests += 1
+            if not timings.reused:
+                self.new_connections += 1
+            for key in [("all", "all")] + keys:
+                group = self._groups.get(key)
+                if group is None:
+                    group = self._groups[key] = {}
+                for phase in PHASES:
+                    value = getattr(timings, phase)
+                    if value is not None:
+                        histogram = group.get(phase)
+                        if histogram is None:
+                            histogram = group[phase] = Histogram()
+                        histogram.add(value)
+
+    def summary(self) -> Dict[str, Any]:
+        """{"all": {阶段: 分布}, "host" / "locale" / "category": {分组: {阶段: 分布}}}（毫秒）"""
+        with self._lock:
+            result: Dict[str, Any] = {"requests": self.requests, "new_connections": self.new_connections,
+                                      "all": {}}
+            result.update({dimension: {} for dimension in DIMENSIONS})
+            for (dimension, name), group in sorted(self._groups.items()):
+                phases = {phase: group[phase].as_dict() for phase in PHASES if phase in group}
+                if dimension == "all":
+                    result["all"] = phases
+                else:
+                    result[dimension][name] = phases
+        return result
+
+    def slowest(self, dimension: str = "category", phase: str = "ttfb", percentile: int = 90,
+                limit: int = SLOWEST_GROUPS) -> List[Tuple[str, float, int]]:
+        """某个维度中指定阶段百分位最高的分组：[(分组, 秒, 请求数)]"""
+        with self._lock:
+            rows = [(name, group[phase].percentile(percentile), group[phase].count)
+                    for (dim, name), group in self._groups.items() if dim == dimension and phase in group]
+        rows.sort(key=lambda row: -row[1])
+        return rows[:limit]
+
+    def describe_stats(self) -> str:
+        with self._lock:
+            overall = self._groups.get(("all", "all"), {})
+            ttfb = overall.get("ttfb")
+            total = overall.get("total")
+        if ttfb is None or total is None:
+            return "⏱️  延迟: 没有网络请求"
+        text = ("⏱️  延迟（ms, p50/p90/p99）: TTFB " + "/".join(f"{ttfb.percentile(p) * 1000:.0f}" for p in PERCENTILES)
+                + ", 总计 " + "/".join(f"{total.percentile(p) * 1000:.0f}" for p in PERCENTILES))
+        slowest = self.slowest()
+        if slowest:
+            text += "；TTFB p90 最慢的类别: " + ", ".join(f"{name} {seconds * 1000:.0f}ms×{count}"
+                                                       for name, seconds, count in slowest)
+        return text
+
+
+def add_latency_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --latency-report 参数"""
+    parser.add_argument("--latency-report", action="store_true",
+                        help="把各请求的 DNS / 建连 / TLS / TTFB / 传输耗时分布（按主机、语言、页面类别）"
+                             "写入 latency_report_<时间戳>.json")
+
+
+def write_latency_report(stats: LatencyStats, prefix: str = "latency_report") -> str:
+    output_file = f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    with open(output_file, "w", encoding="utf-8") as f:
+        json.dump({"timestamp": datetime.now().isoformat(), "unit": "ms", **stats.summary()},
+                  f, ensure_ascii=False, indent=2)
+    return output_file
+
+
+def latency_report_from_args(args: argparse.Namespace, stats: LatencyStats) -> Optional[str]:
+    """给出 --latency-report 时写出报告并返回文件名"""
+    return write_latency_report(stats) if args.latency_report else None
@@ -0,0 +1,269 @@
+"""
+离线批量分析
+对保存下来的页面（目录、通配符、tar 包、WARC 或快照运行）批量执行 SEO 检查，不访问网络：
+
+- iter_saved_pages(spec) 按来源类型流式读出 SavedPage(source, url, content)，不一次性载入全部页面
+- 页面 URL 来自 WARC / 快照本身，或由 --url-map（{文件路径: URL}）/ --base-url + 相对路径推导
+  （en/contact.html -> <base-url>/en/contact，en/index.html -> <base-url>/en）
+- analyze_pages() 把解析与检查分发到进程池，按块提交、限制在途块数，结果按输入顺序逐条产出
+- WARC 来源先读取（或建立）.cdxj 索引，主进程只分发记录位置，由各工作进程自行 seek 读取并解压记录
+- 启用 --profile 时工作进程记录 parse / validate 阶段计时，随每个任务块返回并入父进程的剖析报告
+
+用法示例：
+  pages = iter_saved_pages("archive.tar.gz", base_url="https://www.yhflexiblebusbar.com")
+  for result in analyze_pages(pages, workers=8):
+      print(result["url"], result["status"])
+"""
+
+import fnmatch
+import glob
+import json
+import os
+import tarfile
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .checks import ERROR, run_checks
+from .extract import SEO_FIELDS
+from .page import PageSeo
+from .parsers import set_default_backend
+from .profiling import active_profiler, merge_phases, start_worker_phases, take_phases
+
+HTML_PATTERNS = ("*.html", "*.htm")
+SNAPSHOT_PREFIX = "snapshot:"
+# 每个任务块包含的页面数：页面很小时单页提交的进程间通信开销会超过解析本身
+DEFAULT_CHUNK_SIZE = 32
+SITE_LANGS = ("en", "es")
+
+
+class SavedPage(NamedTuple):
+    """一个已保存的页面；source 为来源中的位置（文件路径、tar 成员、WARC 记录序号等）
+
+    ref 为 WARC 记录位置 (文件, 偏移, 长度, 成员内序号)：此时 content 为空，在分析时才读取
+    """
+    source: str
+    url: Optional[str]
+    content: bytes
+    status_code: Optional[int] = None
+    ref: Optional[Tuple[str, int, int, int]] = None
+
+    def load(self) -> bytes:
+        if self.ref is None:
+            return self.content
+        from .warc import read_at, record_response
+        return record_response(read_at(*self.ref)).content
+
+
+# ---- URL 推导 ----
+
+def load_url_map(path: Optional[str]) -> Dict[str, str]:
+    """{文件路径或文件名: URL}；path 为空时返回空映射"""
+    if not path:
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def url_for(relpath: str, base_url: Optional[str] = None, url_map: Optional[Dict[str, str]] = None) -> Optional[str]:
+    """已保存文件的 URL：先查 url_map（完整相对路径，再按文件名），否则由 base_url + 路径推导"""
+    relpath = relpath.replace(os.sep, "/")
+    if relpath.startswith("./"):
+        relpath = relpath[2:]
+    if url_map:
+        url = url_map.get(relpath) or url_map.get(os.path.basename(relpath))
+        if url:
+            return url
+    if not base_url:
+        return None
+    path, ext = os.path.splitext(relpath)
+    if ext.lower() not in (".html", ".htm"):
+        path = relpath
+    if path == "index" or path.endswith("/index"):
+        path = path[:-len("index")].rstrip("/")
+    return f"{base_url.rstrip('/')}/{path}" if path else base_url.rstrip("/")
+
+
+# ---- 来源 ----
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def iter_files(paths: Iterable[str], root: str, base_url: Optional[str] = None,
+               url_map: Optional[Dict[str, str]] = None) -> Iterator[SavedPage]:
+    for path in paths:
+        relpath = os.path.relpath(path, root)
+        yield SavedPage(path, url_for(relpath, base_url, url_map), _read(path))
+
+
+def iter_directory(root: str, base_url: Optional[str] = None,
+                   url_map: Optional[Dict[str, str]] = None) -> Iterator[SavedPage]:
+    """递归读取目录下的 .html / .htm（按路径排序，结果可复现）"""
+    paths = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        paths.extend(os.path.join(dirpath, name) for name in sorted(filenames)
+                     if any(fnmatch.fnmatch(name.lower(), pattern) for pattern in HTML_PATTERNS))
+    return iter_files(paths, root, base_url, url_map)
+
+
+def iter_tarball(path: str, base_url: Optional[str] = None,
+                 url_map: Optional[Dict[str, str]] = None) -> Iterator[SavedPage]:
+    """流式读取 tar / tar.gz / tar.bz2 / tar.xz 中的 HTML 成员"""
+    with tarfile.open(path, "r|*") as archive:
+        for member in archive:
+            name = member.name.lower()
+            if not member.isfile() or not any(fnmatch.fnmatch(name, pattern) for pattern in HTML_PATTERNS):
+                continue
+            f = archive.extractfile(member)
+            if f is None:
+                continue
+            yield SavedPage(f"{path}:{member.name}", url_for(member.name, base_url, url_map), f.read())
+
+
+def _is_html(headers: Dict[str, str]) -> bool:
+    """响应头不区分大小写地查找 Content-Type；没有该头时按 HTML 处理"""
+    for name, value in headers.items():
+        if name.lower() == "content-type":
+            return "html" in value.lower()
+    return True
+
+
+def iter_warc(path: str) -> Iterator[SavedPage]:
+    """WARC 中的 HTML response 记录，URL 取 WARC-Target-URI；只产出记录位置，正文由工作进程读取
+
+    索引在调用时立即加载，文件不存在时直接抛出 FileNotFoundError，而不是等到开始迭代。
+    """
+    from .warc import WarcIndex
+    return _warc_pages(path, WarcIndex.load_or_build(path))
+
+
+def _warc_pages(path: str, index: Any) -> Iterator[SavedPage]:
+    for i, entry in enumerate(index.responses()):
+        if entry.mime is None or "html" in entry.mime.lower():
+            yield SavedPage(f"{path}#{i}", entry.url, b"", entry.status, (path, entry.offset, entry.length, entry.n))
+
+
+def iter_snapshot(run_id: str, root: Optional[str] = None) -> Iterator[SavedPage]:
+    """快照运行中的全部页面（见 seo_audit.snapshots）；运行不存在时在调用时抛出 FileNotFoundError"""
+    from .snapshots import DEFAULT_SNAPSHOT_DIR, SnapshotStore
+    return _snapshot_pages(SnapshotStore(root or DEFAULT_SNAPSHOT_DIR).open_run(run_id))
+
+
+def _snapshot_pages(replay: Any) -> Iterator[SavedPage]:
+    for url in replay.urls():
+        entry = replay.entry(url, head_only=True)
+        if entry is not None and _is_html(entry.headers):
+            yield SavedPage(f"{replay.run_id}:{url}", url, replay.store.get(entry.digest), entry.status_code)
+
+
+def iter_saved_pages(spec: str, base_url: Optional[str] = None, url_map: Optional[Dict[str, str]] = None,
+                     snapshot_dir: Optional[str] = None) -> Iterator[SavedPage]:
+    """按来源类型读取：snapshot:<运行 ID>、*.warc(.gz)、tar 包、目录，其余按通配符展开"""
+    if spec.startswith(SNAPSHOT_PREFIX):
+        return iter_snapshot(spec[len(SNAPSHOT_PREFIX):] or "latest", snapshot_dir)
+    if spec.endswith((".warc", ".warc.gz")):
+        return iter_warc(spec)
+    if os.path.isdir(spec):
+        return iter_directory(spec, base_url, url_map)
+    if os.path.isfile(spec) and tarfile.is_tarfile(spec):
+        return iter_tarball(spec, base_url, url_map)
+    paths = sorted(glob.glob(spec, recursive=True))
+    if not paths:
+        raise FileNotFoundError(f"没有匹配的页面: {spec}")
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(p)) for p in paths])
+    return iter_files(paths, root, base_url, url_map)
+
+
+# ---- 分析 ----
+
+def page_lang(url: Optional[str]) -> Optional[str]:
+    if not url:
+        return None
+    segment = url.split("://", 1)[-1].split("/", 2)[1:2]
+    return segment[0] if segment and segment[0] in SITE_LANGS else None
+
+
+def analyze_page(page: SavedPage, check_canonical: bool = False) -> Dict[str, Any]:
+    """解析一个页面并执行 run_checks；check_canonical 时要求 canonical 等于页面 URL"""
+    entry: Dict[str, Any] = {"source": page.source, "url": page.url}
+    if page.status_code is not None:
+        entry["status_code"] = page.status_code
+        if page.status_code != 200:
+            entry["status"] = "skipped"
+            return entry
+    seo = PageSeo.parse(page.load(), page.url)
+    if seo is None:
+        entry["status"] = "skipped"
+        return entry
+    findings = run_checks(seo, expected_canonical=page.url if check_canonical else None, lang=page_lang(page.url))
+    entry["status"] = "failed" if any(f.severity == ERROR for f in findings) else "success"
+    entry["seo_data"] = seo.as_dict(SEO_FIELDS)
+    entry["findings"] = [f._asdict() for f in findings]
+    return entry
+
+
+def _analyze_chunk(chunk: List[SavedPage], check_canonical: bool) -> List[Dict[str, Any]]:
+    results = []
+    for page in chunk:
+        try:
+            results.append(analyze_page(page, check_canonical))
+        except Exception as e:
+            results.append({"source": page.source, "url": page.url, "status": "error", "error": str(e)})
+    return results
+
+
+def _analyze_chunk_in_worker(chunk: List[SavedPage], check_canonical: bool) -> Tuple[List[Dict[str, Any]], Dict]:
+    """工作进程：结果与本块的阶段计时（未启用剖析时为空）一起返回"""
+    return _analyze_chunk(chunk, check_canonical), take_phases()
+
+
+def _chunk_results(future: Any) -> List[Dict[str, Any]]:
+    results, phases = future.result()
+    merge_phases(phases)
+    return results
+
+
+def _init_worker(parser: Optional[str], profile: bool = False) -> None:
+    if parser:
+        set_default_backend(parser)
+    if profile:
+        start_worker_phases()
+
+
+def _chunks(pages: Iterable[SavedPage], size: int) -> Iterator[List[SavedPage]]:
+    chunk: List[SavedPage] = []
+    for page in pages:
+        chunk.append(page)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def analyze_pages(pages: Iterable[SavedPage], workers: Optional[int] = None, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                  check_canonical: bool = False, parser: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+    """在进程池中分析页面，按输入顺序逐条产出结果
+
+    在途任务块不超过 workers * 2，读取来源、分析、消费结果三者流水线进行，内存占用与页面总数无关。
+    workers <= 1 时在当前进程中执行（便于调试，也省去进程启动开销）。
+    """
+    workers = workers or os.cpu_count() or 1
+    chunks = _chunks(pages, max(1, chunk_size))
+    if workers <= 1:
+        _init_worker(parser)
+        for chunk in chunks:
+            yield from _analyze_chunk(chunk, check_canonical)
+        return
+    profile = active_profiler() is not None
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(parser, profile)) as executor:
+        pending: deque = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_analyze_chunk_in_worker, chunk, check_canonical))
+            if len(pending) >= workers * 2:
+                yield from _chunk_results(pending.popleft())
+        while pending:
+            yield from _chunk_results(pending.popleft())
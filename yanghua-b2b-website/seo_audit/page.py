@@ -0,0 +1,100 @@
+"""
+页面 SEO 记录
+一次抓取、一次解析得到 PageSeo，canonical / hreflang / x-default / 重复条目 / meta 长度等检查
+都只读取这条记录（见 seo_audit.checks），不再各自重新解析页面。
+
+PageSeo 是不可变的 NamedTuple：占用小、可哈希，可以安全地在线程之间共享与缓存。
+
+用法示例：
+  from seo_audit.page import fetch_page_seo
+  response, page = fetch_page_seo("https://www.yhflexiblebusbar.com/en")
+  print(page.canonical, page.alternate("es"))
+"""
+
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+from .client import HttpClient, Response, get_client
+from .extract import SEO_FIELDS
+from .parsers import Html, ParserBackend, get_backend
+from .profiling import profiled
+
+
+class Alternate(NamedTuple):
+    """<link rel="alternate" hreflang="..." href="...">，保留原始属性值（未 strip/小写化）"""
+    hreflang: Optional[str]
+    href: Optional[str]
+
+
+class PageSeo(NamedTuple):
+    """单个页面的全部 SEO 字段"""
+    url: Optional[str] = None
+    canonical: Optional[str] = None
+    alternates: Tuple[Alternate, ...] = ()
+    title: Optional[str] = None
+    description: Optional[str] = None
+    og_url: Optional[str] = None
+    og_title: Optional[str] = None
+    og_type: Optional[str] = None
+    author: Optional[str] = None
+
+    @classmethod
+    def from_tags(cls, tags: Dict[str, Any], url: Optional[str] = None) -> "PageSeo":
+        """由 extract_seo_tags 结构的 dict 构造（缺少的字段视为 None）"""
+        return cls(
+            url=url,
+            canonical=tags.get("canonical"),
+            alternates=tuple(Alternate(t.get("hreflang"), t.get("href")) for t in tags.get("hreflang") or ()),
+            title=tags.get("title"),
+            description=tags.get("description"),
+            og_url=tags.get("og_url"),
+            og_title=tags.get("og_title"),
+            og_type=tags.get("og_type"),
+            author=tags.get("author"),
+        )
+
+    @classmethod
+    @profiled("parse")
+    def parse(cls, html_content: Optional[Html], url: Optional[str] = None,
+              backend: Optional[ParserBackend] = None) -> Optional["PageSeo"]:
+        """解析页面（完整页面或 head-only 内容均可）；html_content 为空时返回 None"""
+        tags = (backend or get_backend()).extract(html_content, SEO_FIELDS)
+        if tags is None:
+            return None
+        return cls.from_tags(tags, url)
+
+    # ---- hreflang ----
+
+    @property
+    def hreflang(self) -> List[Dict[str, Optional[str]]]:
+        """与 extract_seo_tags()['hreflang'] 相同的结构"""
+        return [{"hreflang": a.hreflang, "href": a.href} for a in self.alternates]
+
+    @property
+    def languages(self) -> List[Optional[str]]:
+        return [a.hreflang for a in self.alternates]
+
+    def alternates_for(self, lang: str) -> List[Optional[str]]:
+        """指定语言的全部 href（按出现顺序）"""
+        return [a.href for a in self.alternates if a.hreflang == lang]
+
+    def alternate(self, lang: str) -> Optional[str]:
+        """指定语言的第一条 href"""
+        for a in self.alternates:
+            if a.hreflang == lang:
+                return a.href
+        return None
+
+    # ---- 输出 ----
+
+    def as_dict(self, fields: Sequence[str] = SEO_FIELDS) -> Dict[str, Any]:
+        """转换回 extract_seo_tags 的 dict 结构（写入 JSON 报告）"""
+        values = self._asdict()
+        values["hreflang"] = self.hreflang
+        return {field: values[field] for field in fields}
+
+
+def fetch_page_seo(url: str, client: Optional[HttpClient] = None) -> Tuple[Response, Optional[PageSeo]]:
+    """head-only 抓取并解析；非 2xx/3xx 状态抛出 HTTPStatusError"""
+    response = (client or get_client()).get(url, head_only=True)
+    response.raise_for_status()
+    return response, PageSeo.parse(response.content, url)
@@ -0,0 +1,221 @@
+"""
+可插拔的解析后端
+- head：单遍 <head> 提取器（标准库，始终可用）
+- html.parser：BeautifulSoup + html.parser（原实现，作为对照基准）
+- lxml：lxml.html + XPath（需要安装 lxml）
+- selectolax：lexbor/modest 引擎 + CSS 选择器（需要安装 selectolax）
+
+所有后端的 extract() 返回与 extract_seo_tags 相同结构的 dict（一致性见 check_extractor_parity.py）。
+对畸形标记（<title> 内嵌标签、重复属性）lxml/selectolax 遵循 HTML5 规范，结果可能与 html.parser 不同。
+默认后端由环境变量 SEO_AUDIT_PARSER 指定，未指定（或为 auto）时选择已安装的最快后端，
+优先级来自 benchmark_parsers.py 的测量结果。
+"""
+
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Union
+
+from .extract import SEO_FIELDS, extract_seo_tags
+
+PARSER_ENV = "SEO_AUDIT_PARSER"
+# auto 模式下的优先级（快 -> 慢）：脚本默认使用 head-only 抓取，
+# 只解析 <head> 时 C 实现的 selectolax/lxml 明显快于纯 Python 的 head 提取器
+AUTO_ORDER = ("selectolax", "lxml", "head", "html.parser")
+
+Html = Union[str, bytes]
+
+
+class ParserBackend:
+    """解析后端接口"""
+    name = ""
+
+    def extract(self, html_content: Optional[Html], fields: Sequence[str] = SEO_FIELDS) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+
+class HeadBackend(ParserBackend):
+    name = "head"
+
+    def extract(self, html_content, fields=SEO_FIELDS):
+        return extract_seo_tags(html_content, fields)
+
+
+class BeautifulSoupBackend(ParserBackend):
+    name = "html.parser"
+
+    def __init__(self) -> None:
+        from bs4 import BeautifulSoup
+        self._soup = BeautifulSoup
+
+    def extract(self, html_content, fields=SEO_FIELDS):
+        if not html_content:
+            return None
+        soup = self._soup(html_content, 'html.parser')
+
+        def meta_content(attrs):
+            tag = soup.find('meta', attrs)
+            return tag.get('content') if tag else None
+
+        canonical = soup.find('link', {'rel': 'canonical'})
+        title = soup.find('title')
+        values = {
+            'canonical': canonical.get('href') if canonical else None,
+            'hreflang': [{'hreflang': tag.get('hreflang'), 'href': tag.get('href')}
+                         for tag in soup.find_all('link', {'rel': 'alternate', 'hreflang': True})],
+            'title': title.get_text().strip() if title else None,
+            'description': meta_content({'name': 'description'}),
+            'og_url': meta_content({'property': 'og:url'}),
+            'og_title': meta_content({'property': 'og:title'}),
+            'og_type': meta_content({'property': 'og:type'}),
+            'author': meta_content({'name': 'author'}),
+        }
+        return {field: values[field] for field in fields}
+
+
+class LxmlBackend(ParserBackend):
+    name = "lxml"
+
+    # rel 按空白分词匹配，与 BeautifulSoup 的多值属性规则一致
+    _REL = "contains(concat(' ', normalize-space(@rel), ' '), ' {} ')"
+
+    _META = {
+        "description": ("name", "description"),
+        "author": ("name", "author"),
+        "og_url": ("property", "og:url"),
+        "og_title": ("property", "og:title"),
+        "og_type": ("property", "og:type"),
+    }
+
+    def __init__(self) -> None:
+        import lxml.html
+        from lxml import etree
+        self._etree = etree
+        self._fromstring = lxml.html.document_fromstring
+        # 编译后的 XPath 对象不能跨线程共享，FetchEngine 的每个工作线程各编译一份
+        self._local = threading.local()
+
+    def _xpaths(self) -> Dict[str, Any]:
+        xpaths = getattr(self._local, "xpaths", None)
+        if xpaths is None:
+            XPath = self._etree.XPath
+            xpaths = {
+                "canonical": XPath("//link[{}]".format(self._REL.format("canonical"))),
+                "hreflang": XPath("//link[{}][@hreflang]".format(self._REL.format("alternate"))),
+                "title": XPath("//title"),
+            }
+            xpaths.update({field: XPath("//meta[@{}=$value]".format(key)) for field, (key, _) in self._META.items()})
+            self._local.xpaths = xpaths
+        return xpaths
+
+    def extract(self, html_content, fields=SEO_FIELDS):
+        if not html_content:
+            return None
+        xpaths = self._xpaths()
+        doc = self._fromstring(html_content)
+        canonical = xpaths["canonical"](doc)
+        title = xpaths["title"](doc)
+        values = {
+            "canonical": canonical[0].get("href") if canonical else None,
+            "hreflang": [{"hreflang": tag.get("hreflang"), "href": tag.get("href")} for tag in xpaths["hreflang"](doc)],
+            "title": title[0].text_content().strip() if title else None,
+        }
+        for field, (_, value) in self._META.items():
+            found = xpaths[field](doc, value=value)
+            values[field] = found[0].get("content") if found else None
+        return {field: values[field] for field in fields}
+
+
+class SelectolaxBackend(ParserBackend):
+    name = "selectolax"
+
+    _META = {
+        "description": 'meta[name="description"]',
+        "author": 'meta[name="author"]',
+        "og_url": 'meta[property="og:url"]',
+        "og_title": 'meta[property="og:title"]',
+        "og_type": 'meta[property="og:type"]',
+    }
+
+    def __init__(self) -> None:
+        try:
+            from selectolax.lexbor import LexborHTMLParser as parser_cls
+        except ImportError:
+            from selectolax.parser import HTMLParser as parser_cls
+        self._parser_cls = parser_cls
+
+    @staticmethod
+    def _attr(node, name: str) -> Optional[str]:
+        attrs = node.attributes
+        if name not in attrs:
+            return None
+        # 无值属性与 BeautifulSoup 一致视为空字符串
+        value = attrs[name]
+        return "" if value is None else value
+
+    def extract(self, html_content, fields=SEO_FIELDS):
+        if not html_content:
+            return None
+        tree = self._parser_cls(html_content)
+        canonical = tree.css_first('link[rel~="canonical"]')
+        title = tree.css_first("title")
+        values = {
+            "canonical": self._attr(canonical, "href") if canonical else None,
+            "hreflang": [{"hreflang": self._attr(tag, "hreflang"), "href": self._attr(tag, "href")}
+                         for tag in tree.css('link[rel~="alternate"][hreflang]')],
+            "title": title.text(deep=True).strip() if title else None,
+        }
+        for field, selector in self._META.items():
+            node = tree.css_first(selector)
+            values[field] = self._attr(node, "content") if node else None
+        return {field: values[field] for field in fields}
+
+
+BACKENDS: Dict[str, Callable[[], ParserBackend]] = {
+    "head": HeadBackend,
+    "html.parser": BeautifulSoupBackend,
+    "lxml": LxmlBackend,
+    "selectolax": SelectolaxBackend,
+}
+
+# 脚本 --parser 参数的可选值
+PARSER_CHOICES = ("auto",) + tuple(BACKENDS)
+
+_instances: Dict[str, ParserBackend] = {}
+_default_name: Optional[str] = None
+
+
+def available_backends() -> List[str]:
+    """返回当前环境已安装依赖的后端名称"""
+    names = []
+    for name in BACKENDS:
+        try:
+            get_backend(name)
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def set_default_backend(name: str) -> ParserBackend:
+    """设置本进程 get_backend() 的默认后端（脚本的 --parser 参数），返回该后端"""
+    global _default_name
+    backend = get_backend(name)
+    _default_name = name
+    return backend
+
+
+def get_backend(name: Optional[str] = None) -> ParserBackend:
+    """按名称获取后端；name 为空时依次使用 --parser、SEO_AUDIT_PARSER，auto 表示选择已安装的最快后端"""
+    name = name or _default_name or os.environ.get(PARSER_ENV) or "auto"
+    if name == "auto":
+        for candidate in AUTO_ORDER:
+            try:
+                return get_backend(candidate)
+            except ImportError:
+                continue
+    if name not in BACKENDS:
+        raise ValueError(f"未知的解析后端: {name}（可选: auto, {', '.join(BACKENDS)}）")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
+
@@ -0,0 +1,424 @@
+"""
+性能剖析（--profile）
+批量检查变慢时，用来区分时间花在网络、解析、校验还是写报告上。脚本在解析命令行参数后调用 profiler_from_args()，
+共享库在各阶段入口用 phase() 标记：
+
+- discover  读取 sitemap / 配置，确定要检查的页面
+- fetch     HttpClient.get（含重试、缓存与重定向）
+- parse     提取 SEO 标签与链接
+- validate  执行检查规则
+- report    写出结果与报告
+
+每个阶段记录调用次数、墙钟时间（含嵌套的子阶段 / 仅自身）与所在线程的 CPU 时间；没有启用剖析时 phase()
+是空操作。同时后台线程按固定间隔对所有线程做墙钟采样，写出 flamegraph.pl / speedscope 可直接读取的
+折叠栈（每行 "phase;文件:函数;... 次数"，栈底是所在阶段）。可选 cProfile（所有线程，.pstats）与
+tracemalloc（峰值与分配最多的代码行）。进程池中的工作进程用 start_worker_phases() 只记录阶段计时，
+每个任务块结束时 take_phases() 取出、随结果返回，父进程用 merge_phases() 并入报告
+（采样、cProfile 与 tracemalloc 只覆盖父进程）。
+
+输出在 JSON 报告旁边（脚本用 note_report() 告知报告路径，未告知时按脚本名加时间戳命名）：
+  profile_<报告名>.json      各阶段耗时与汇总
+  profile_<报告名>.folded    折叠栈
+  profile_<报告名>.pstats    cProfile 统计（--profile-cprofile）
+
+用法示例：
+  python3 check_production_articles.py --limit 50 --profile
+  python3 crawl_site_seo.py --profile-cprofile --profile-tracemalloc
+  flamegraph.pl profile_production_articles_seo_check_20251028_101948.folded > flame.svg
+"""
+
+import argparse
+import atexit
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # pragma: no cover - Windows 没有 resource
+    resource = None
+
+PHASES = ("discover", "fetch", "parse", "validate", "report")
+PROFILE_PREFIX = "profile_"
+# 墙钟采样间隔（秒）；环境变量 SEO_AUDIT_PROFILE_INTERVAL 可覆盖，0 表示只计时不采样（基准测试使用）
+DEFAULT_SAMPLE_INTERVAL = 0.005
+SAMPLE_INTERVAL_ENV = "SEO_AUDIT_PROFILE_INTERVAL"
+# JSON 中列出的 cProfile 函数数 / tracemalloc 代码行数
+TOP_FUNCTIONS = 25
+TOP_ALLOCATIONS = 15
+
+_NULL_PHASE = contextlib.nullcontext()
+_active: Optional["Profiler"] = None
+
+
+def phase(name: str) -> Any:
+    """标记一个阶段：with phase("parse"): ...；没有启用剖析时不做任何事"""
+    profiler = _active
+    return profiler.phase(name) if profiler is not None else _NULL_PHASE
+
+
+def profiled(name: str) -> Callable[[Callable[..., Any]], Callable[..., Any]]:
+    """把整个函数标记为一个阶段的装饰器"""
+    def decorate(func: Callable[..., Any]) -> Callable[..., Any]:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with phase(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def active_profiler() -> Optional["Profiler"]:
+    return _active
+
+
+def start_worker_phases() -> None:
+    """进程池工作进程的初始化函数中调用：只记录阶段计时（不采样、不写文件）"""
+    global _active
+    _active = Profiler("worker", sample_interval=0)
+
+
+def take_phases() -> Dict[str, List[float]]:
+    """工作进程：取出并清空本进程累计的阶段计时，随任务结果返回给父进程"""
+    return _active.take_phases() if _active is not None else {}
+
+
+def merge_phases(phases: Dict[str, List[float]]) -> None:
+    """父进程：把工作进程返回的阶段计时并入当前剖析器"""
+    if _active is not None and phases:
+        _active.merge_phases(phases)
+
+
+def note_report(path: str) -> None:
+    """脚本写出 JSON 报告后调用，剖析结果写在报告旁边"""
+    if _active is not None:
+        _active.report_path = path
+
+
+def _rss_kb() -> Optional[int]:
+    """进程峰值 RSS（KB）。Linux 上优先读 /proc/self/status 的 VmHWM：ru_maxrss 在 exec 后仍保留
+    fork 时父进程的峰值，会把父进程的内存算进来；macOS 的 ru_maxrss 单位是字节"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss // 1024 if sys.platform == "darwin" else rss
+
+
+class _Phase:
+    __slots__ = ("profiler", "name")
+
+    def __init__(self, profiler: "Profiler", name: str):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self) -> None:
+        self.profiler._enter(self.name)
+
+    def __exit__(self, *exc: Any) -> None:
+        self.profiler._exit()
+
+
+class Profiler:
+    """阶段计时 + 墙钟采样，可选 cProfile 与 tracemalloc（线程安全）"""
+
+    def __init__(self, name: str, cprofile: bool = False, trace_memory: bool = False,
+                 sample_interval: float = DEFAULT_SAMPLE_INTERVAL):
+        self.name = name
+        self.cprofile = cprofile
+        self.trace_memory = trace_memory
+        self.sample_interval = sample_interval
+        self.report_path: Optional[str] = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        # 线程 ID -> 该线程的阶段栈，采样线程据此给调用栈加上阶段前缀
+        self._stacks: Dict[int, List[List[Any]]] = {}
+        # 阶段 -> [调用次数, 墙钟, 自身墙钟, 自身 CPU, 内存增量]
+        self._phases: Dict[str, List[float]] = {}
+        # 主线程位于最外层阶段内的墙钟总和，用于计算未归类的时间
+        self._main_in_phases = 0.0
+        self._main_thread = threading.main_thread().ident
+        self._samples: Counter = Counter()
+        self._sample_count = 0
+        self._stop = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._profiles: List[cProfile.Profile] = []
+        self._started_wall = 0.0
+        self._started_cpu = 0.0
+        self._finished: Optional[Dict[str, Any]] = None
+
+    # ---- 生命周期 ----
+
+    def start(self) -> "Profiler":
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        # 采样线程先于 cProfile 启动，不计入剖析结果
+        if self.sample_interval > 0:
+            self._sampler = threading.Thread(target=self._sample, name="seo-audit-profiler", daemon=True)
+            self._sampler.start()
+        if self.cprofile:
+            # 之后新建的线程在第一次触发 profile 事件时各自启用一个 cProfile
+            threading.setprofile(self._start_thread_profile)
+            profile = cProfile.Profile()
+            self._profiles.append(profile)
+            profile.enable()
+        self._started_wall = time.perf_counter()
+        self._started_cpu = time.process_time()
+        return self
+
+    def _start_thread_profile(self, frame: Any, event: str, arg: Any) -> None:
+        profile = cProfile.Profile()
+        with self._lock:
+            self._profiles.append(profile)
+        profile.enable()
+
+    def stop(self) -> Dict[str, Any]:
+        """停止采样与剖析，返回汇总（重复调用返回同一结果）"""
+        if self._finished is not None:
+            return self._finished
+        wall = time.perf_counter() - self._started_wall
+        cpu = time.process_time() - self._started_cpu
+        self._stop.set()
+        if self._sampler is not None:
+            self._sampler.join()
+        if self.cprofile:
+            threading.setprofile(None)
+            self._profiles[0].disable()
+        summary: Dict[str, Any] = {
+            "script": self.name,
+            "timestamp": datetime.now().isoformat(),
+            "wall_s": round(wall, 4),
+            "cpu_s": round(cpu, 4),
+            "max_rss_kb": _rss_kb(),
+            "phases": self._phase_summary(),
+            "unattributed_main_wall_s": round(max(0.0, wall - self._main_in_phases), 4),
+            "samples": self._sample_count,
+            "sample_interval_s": self.sample_interval,
+        }
+        if self.cprofile:
+            summary["cprofile_top"] = self._cprofile_top()
+        if self.trace_memory:
+            summary["tracemalloc"] = self._memory_summary()
+            tracemalloc.stop()
+        self._finished = summary
+        return summary
+
+    # ---- 阶段 ----
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def _stack(self) -> List[List[Any]]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+            with self._lock:
+                self._stacks[threading.get_ident()] = stack
+        return stack
+
+    def _enter(self, name: str) -> None:
+        memory = tracemalloc.get_traced_memory()[0] if self.trace_memory else 0
+        # [阶段, 开始墙钟, 开始 CPU, 子阶段墙钟, 子阶段 CPU, 开始时已分配内存]
+        self._stack().append([name, time.perf_counter(), time.thread_time(), 0.0, 0.0, memory])
+
+    def _exit(self) -> None:
+        wall_end, cpu_end = time.perf_counter(), time.thread_time()
+        stack = self._stack()
+        name, wall_start, cpu_start, child_wall, child_cpu, memory = stack.pop()
+        wall, cpu = wall_end - wall_start, cpu_end - cpu_start
+        memory_delta = tracemalloc.get_traced_memory()[0] - memory if self.trace_memory else 0
+        # 同名阶段嵌套时（例如 fetch 内部再次 fetch）墙钟只计最外层
+        outermost = all(frame[0] != name for frame in stack)
+        with self._lock:
+            stats = self._phases.get(name)
+            if stats is None:
+                stats = self._phases[name] = [0, 0.0, 0.0, 0.0, 0]
+            stats[0] += 1
+            if outermost:
+                stats[1] += wall
+            stats[2] += wall - child_wall
+            stats[3] += cpu - child_cpu
+            stats[4] += memory_delta
+            if not stack and threading.get_ident() == self._main_thread:
+                self._main_in_phases += wall
+        if stack:
+            stack[-1][3] += wall
+            stack[-1][4] += cpu
+
+    def take_phases(self) -> Dict[str, List[float]]:
+        """取出并清空累计的阶段计时"""
+        with self._lock:
+            phases, self._phases = self._phases, {}
+        return phases
+
+    def merge_phases(self, phases: Dict[str, List[float]]) -> None:
+        """并入其他进程的阶段计时（各项累加）"""
+        with self._lock:
+            for name, other in phases.items():
+                stats = self._phases.get(name)
+                if stats is None:
+                    stats = self._phases[name] = [0, 0.0, 0.0, 0.0, 0]
+                for i, value in enumerate(other):
+                    stats[i] += value
+
+    def _phase_summary(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            items = dict(self._phases)
+        order = [name for name in PHASES if name in items] + sorted(set(items) - set(PHASES))
+        result = {}
+        for name in order:
+            calls, wall, self_wall, cpu, memory = items[name]
+            data: Dict[str, Any] = {"calls": int(calls), "wall_s": round(wall, 4),
+                                    "self_wall_s": round(self_wall, 4), "cpu_s": round(cpu, 4)}
+            if self.trace_memory:
+                data["mem_delta_kb"] = round(memory / 1024, 1)
+            result[name] = data
+        return result
+
+    # ---- 墙钟采样（折叠栈） ----
+
+    def _sample(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.sample_interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                names = []
+                while frame is not None:
+                    code = frame.f_code
+                    # 装饰器自身的栈帧不画进火焰图
+                    if code.co_filename != __file__:
+                        names.append(f"{os.path.basename(code.co_filename)}:{code.co_name}".replace(" ", "_"))
+                    frame = frame.f_back
+                names.reverse()
+                phases = self._stacks.get(ident)
+                if phases:
+                    names = [entry[0] for entry in list(phases)] + names
+                self._samples[";".join(names)] += 1
+            self._sample_count += 1
+
+    def folded(self) -> str:
+        """flamegraph.pl 的折叠栈格式，按次数从多到少"""
+        return "".join(f"{stack} {count}\n" for stack, count in self._samples.most_common())
+
+    # ---- cProfile / tracemalloc ----
+
+    def _cprofile_stats(self) -> pstats.Stats:
+        stats = pstats.Stats(self._profiles[0], stream=io.StringIO())
+        for profile in self._profiles[1:]:
+            stats.add(profile)
+        return stats
+
+    def _cprofile_top(self) -> List[Dict[str, Any]]:
+        stats = self._cprofile_stats()
+        rows = []
+        for (filename, line, function), (_, ncalls, tottime, cumtime, _) in stats.stats.items():
+            rows.append({"function": f"{filename}:{line}({function})", "calls": ncalls,
+                         "tottime_s": round(tottime, 4), "cumtime_s": round(cumtime, 4)})
+        rows.sort(key=lambda row: -row["cumtime_s"])
+        return rows[:TOP_FUNCTIONS]
+
+    def _memory_summary(self) -> Dict[str, Any]:
+        current, peak = tracemalloc.get_traced_memory()
+        top = tracemalloc.take_snapshot().statistics("lineno")[:TOP_ALLOCATIONS]
+        return {
+            "current_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "top": [{"location": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                     "size_kb": round(stat.size / 1024, 1), "count": stat.count} for stat in top],
+        }
+
+    # ---- 输出 ----
+
+    def output_base(self) -> str:
+        """profile_<报告名>，与报告在同一目录；没有报告时为 profile_<脚本名>_<时间戳>"""
+        if self.report_path:
+            directory, name = os.path.split(self.report_path)
+            for suffix in (".jsonl", ".json"):
+                if name.endswith(suffix):
+                    name = name[:-len(suffix)]
+                    break
+            return os.path.join(directory, PROFILE_PREFIX + name)
+        return f"{PROFILE_PREFIX}{self.name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+
+    def write(self) -> List[str]:
+        """停止剖析并写出各输出文件，返回文件名列表"""
+        summary = self.stop()
+        base = self.output_base()
+        files = [base + ".json", base + ".folded"]
+        if self.cprofile:
+            files.append(base + ".pstats")
+            self._cprofile_stats().dump_stats(base + ".pstats")
+        with open(base + ".folded", "w", encoding="utf-8") as f:
+            f.write(self.folded())
+        with open(base + ".json", "w", encoding="utf-8") as f:
+            json.dump({**summary, "files": files[1:]}, f, ensure_ascii=False, indent=2)
+        return files
+
+    def describe(self) -> str:
+        summary = self.stop()
+        lines = [f"🧭 性能剖析: 墙钟 {summary['wall_s']:.2f}s, CPU {summary['cpu_s']:.2f}s"
+                 + (f", 峰值 RSS {summary['max_rss_kb'] / 1024:.0f} MB" if summary["max_rss_kb"] else "")]
+        for name, data in summary["phases"].items():
+            line = (f"   - {name:<9} {data['calls']:>6} 次, 墙钟 {data['wall_s']:.2f}s"
+                    f"（自身 {data['self_wall_s']:.2f}s）, CPU {data['cpu_s']:.2f}s")
+            if "mem_delta_kb" in data:
+                line += f", 内存增量 {data['mem_delta_kb'] / 1024:.1f} MB"
+            lines.append(line)
+        lines.append(f"   - 主线程未归类 {summary['unattributed_main_wall_s']:.2f}s；"
+                     f"采样 {summary['samples']} 次（各阶段在多个线程中的时间会重叠）")
+        if "tracemalloc" in summary:
+            lines.append(f"   - tracemalloc 峰值 {summary['tracemalloc']['peak_kb'] / 1024:.1f} MB")
+        return "\n".join(lines)
+
+
+def add_profile_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --profile / --profile-cprofile / --profile-tracemalloc 参数"""
+    parser.add_argument("--profile", action="store_true",
+                        help="按阶段（discover / fetch / parse / validate / report）统计墙钟与 CPU 时间，"
+                             "并写出折叠栈（flamegraph），输出在 JSON 报告旁边的 profile_* 文件")
+    parser.add_argument("--profile-cprofile", action="store_true", help="同时用 cProfile 剖析所有线程（隐含 --profile）")
+    parser.add_argument("--profile-tracemalloc", action="store_true",
+                        help="同时用 tracemalloc 统计各阶段的内存增量与分配最多的代码行（隐含 --profile）")
+
+
+def _finish(profiler: Profiler) -> None:
+    global _active
+    files = profiler.write()
+    _active = None
+    print("\n" + profiler.describe())
+    print(f"   - 剖析结果已保存到: {', '.join(files)}")
+
+
+def start_profiler(name: Optional[str] = None, cprofile: bool = False, trace_memory: bool = False) -> Profiler:
+    """开始剖析并设为当前剖析器，进程退出时输出结果"""
+    global _active
+    name = name or os.path.splitext(os.path.basename(sys.argv[0]))[0] or "python"
+    interval = float(os.environ.get(SAMPLE_INTERVAL_ENV) or DEFAULT_SAMPLE_INTERVAL)
+    _active = Profiler(name, cprofile=cprofile, trace_memory=trace_memory, sample_interval=interval).start()
+    atexit.register(_finish, _active)
+    return _active
+
+
+def profiler_from_args(args: argparse.Namespace, name: Optional[str] = None) -> Optional[Profiler]:
+    """根据 add_profile_arguments() 的参数开始剖析；未启用时返回 None"""
+    if not (args.profile or args.profile_cprofile or args.profile_tracemalloc):
+        return None
+    return start_profiler(name, cprofile=args.profile_cprofile, trace_memory=args.profile_tracemalloc)
@@ -0,0 +1,187 @@
+"""
+重定向链分析
+各脚本抓取时默认自动跟随重定向，/en 与 /en/、http 与 https、裸域与 www 之间的跳转都看不到。
+这里逐跳请求（不跟随重定向、只下载 <head>），记录每一跳的状态码、Location 与耗时：
+
+- RedirectResolver.resolve(url) 返回完整的 RedirectChain
+- 已解析的链按 URL 缓存：A -> B -> C 解析过之后，D -> B 只需请求 D 这一跳，后缀直接复用
+- redirect_findings(page, resolver) 标记 canonical / hreflang 目标需要额外往返的情况
+
+用法示例：
+  resolver = RedirectResolver()
+  chain = resolver.resolve("https://www.yhflexiblebusbar.com/en/")
+  print(chain.redirects, chain.final_url, f"{chain.elapsed * 1000:.0f} ms")
+"""
+
+import threading
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin
+
+from .checks import WARNING, Finding
+from .client import HttpClient, get_client
+from .fetch import DEFAULT_MAX_IN_FLIGHT, DEFAULT_PER_HOST, iter_ordered
+from .page import PageSeo
+
+# 超过这么多跳仍未结束时停止（浏览器与搜索引擎爬虫的上限通常在 5~20 跳之间）
+DEFAULT_MAX_HOPS = 10
+
+REDIRECT_STATUSES = frozenset((301, 302, 303, 307, 308))
+
+
+class Hop(NamedTuple):
+    """一次请求；location 为已补全为绝对地址的 Location（非重定向时为 None），elapsed 为秒"""
+    url: str
+    status_code: Optional[int]
+    location: Optional[str]
+    elapsed: float
+
+
+class RedirectChain(NamedTuple):
+    """从 url 出发的全部请求；最后一跳是终点（非重定向、请求失败、循环或超过跳数上限）"""
+    url: str
+    hops: Tuple[Hop, ...]
+    error: Optional[str] = None
+
+    @property
+    def redirects(self) -> int:
+        """额外的往返次数"""
+        return sum(1 for hop in self.hops if hop.location)
+
+    @property
+    def final_url(self) -> str:
+        return self.hops[-1].url if self.hops else self.url
+
+    @property
+    def final_status(self) -> Optional[int]:
+        return self.hops[-1].status_code if self.hops else None
+
+    @property
+    def elapsed(self) -> float:
+        return sum(hop.elapsed for hop in self.hops)
+
+    @property
+    def redirect_elapsed(self) -> float:
+        """花在重定向跳上的时间（不含终点这一跳）"""
+        return sum(hop.elapsed for hop in self.hops if hop.location)
+
+    def describe(self) -> str:
+        steps = [f"{hop.url} [{hop.status_code or '失败'}, {hop.elapsed * 1000:.0f} ms]" for hop in self.hops]
+        text = " -> ".join(steps)
+        return f"{text} ({self.error})" if self.error else text
+
+    def as_dict(self) -> Dict:
+        return {
+            "url": self.url,
+            "final_url": self.final_url,
+            "final_status": self.final_status,
+            "redirects": self.redirects,
+            "elapsed_ms": round(self.elapsed * 1000, 1),
+            "hops": [hop._asdict() for hop in self.hops],
+            "error": self.error,
+        }
+
+
+class RedirectResolver:
+    """逐跳解析重定向链，结果按 URL 缓存（线程安全，可在 FetchEngine 的工作线程中共享）"""
+
+    def __init__(self, client: Optional[HttpClient] = None, max_hops: int = DEFAULT_MAX_HOPS):
+        self.client = client or get_client()
+        self.max_hops = max_hops
+        self._chains: Dict[str, RedirectChain] = {}
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.reused = 0
+
+    def _request(self, url: str) -> Hop:
+        response = self.client.get(url, allow_redirects=False, head_only=True)
+        location = response.headers.get("Location")
+        if response.status_code in REDIRECT_STATUSES and location:
+            return Hop(url, response.status_code, urljoin(url, location), response.elapsed)
+        return Hop(url, response.status_code, None, response.elapsed)
+
+    def cached(self, url: str) -> Optional[RedirectChain]:
+        with self._lock:
+            return self._chains.get(url)
+
+    def resolve(self, url: str) -> RedirectChain:
+        if not url.startswith(("http://", "https://")):
+            return RedirectChain(url, (), "不是绝对 URL")
+        hops: List[Hop] = []
+        seen = set()
+        current = url
+        suffix: Optional[RedirectChain] = None
+        error = None
+        while True:
+            suffix = self.cached(current)
+            if suffix is not None:
+                if hops:
+                    with self._lock:
+                        self.reused += 1
+                break
+            if current in seen:
+                error = "重定向循环"
+                break
+            if len(hops) >= self.max_hops:
+                error = f"超过 {self.max_hops} 跳"
+                break
+            seen.add(current)
+            try:
+                hop = self._request(current)
+            except Exception as e:
+                hops.append(Hop(current, None, None, 0.0))
+                error = str(e)
+                break
+            with self._lock:
+                self.requests += 1
+            hops.append(hop)
+            if not hop.location:
+                break
+            current = hop.location
+
+        tail_hops = suffix.hops if suffix is not None else ()
+        error = suffix.error if suffix is not None else error
+        # 缓存路径上每个 URL 出发的链（后缀），之后经过这些 URL 的链都可以直接复用
+        chains = []
+        for i in range(len(hops)):
+            chains.append(RedirectChain(hops[i].url, tuple(hops[i:]) + tail_hops, error))
+        with self._lock:
+            for chain in chains:
+                # 循环或超限的链只缓存起点，避免把截断的后缀当成完整结果
+                if error is None or chain.url == url:
+                    self._chains.setdefault(chain.url, chain)
+            return self._chains.get(url) or RedirectChain(url, tail_hops, error)
+
+    def resolve_all(self, urls: Iterable[str], max_in_flight: int = DEFAULT_MAX_IN_FLIGHT,
+                    per_host: int = DEFAULT_PER_HOST, min_interval: float = 0.0) -> Iterator[Tuple[str, RedirectChain]]:
+        """并发解析，按输入顺序产出 (url, chain)；重复的 URL 只解析、产出一次"""
+        return iter_ordered(list(dict.fromkeys(urls)), self.resolve, max_in_flight=max_in_flight, per_host=per_host,
+                            min_interval=min_interval)
+
+    def describe_stats(self) -> str:
+        with self._lock:
+            return f"↪️  重定向解析: 缓存 {len(self._chains)} 条链, 请求 {self.requests} 次, 复用已解析的后缀 {self.reused} 次"
+
+
+def head_targets(page: PageSeo) -> List[Tuple[str, str]]:
+    """页面 <head> 中引用的 (标签, 目标 URL)：canonical、各 hreflang、og:url"""
+    targets = []
+    if page.canonical:
+        targets.append(("canonical", page.canonical.strip()))
+    for alternate in page.alternates:
+        if alternate.hreflang and alternate.href:
+            targets.append((f"hreflang {alternate.hreflang}", alternate.href.strip()))
+    if page.og_url:
+        targets.append(("og:url", page.og_url.strip()))
+    return targets
+
+
+def redirect_findings(page: PageSeo, resolver: RedirectResolver) -> List[Finding]:
+    """canonical / hreflang / og:url 目标需要额外往返时给出警告（目标应直接写最终地址）"""
+    findings = []
+    for label, target in head_targets(page):
+        chain = resolver.resolve(target)
+        if chain.redirects:
+            findings.append(Finding("redirect", WARNING,
+                                    f"{label} 目标需要 {chain.redirects} 次额外往返"
+                                    f"（{chain.redirect_elapsed * 1000:.0f} ms）: {target} -> {chain.final_url}"))
+    return findings
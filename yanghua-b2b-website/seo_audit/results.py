@@ -0,0 +1,157 @@
+"""
+流式结果输出
+检查脚本原来把所有页面结果累积在一个 dict 里，最后才 json.dump(indent=2)：中途崩溃时前面的结果全部丢失，
+内存也随页面数增长。ResultSink 在每个页面检查完成后立即追加一行 JSON Lines，并定期 flush；
+摘要由脚本按运行中的计数累加，结束时写入最后一行。
+
+JSONL 格式：
+  {"meta": {...报告顶层字段...}, "results_key": "results" 或 null}   第一行
+  {"key": "/en", "result": {...}}                                 每个页面一行
+  {"summary": {...}}                                              正常结束时的最后一行
+
+write_report() 从 JSONL 逐条重建原来的 JSON 报告（与 json.dump(indent=2, ensure_ascii=False) 的输出逐字节一致），
+不需要把全部结果载入内存；运行中断时同样可以重建已完成的部分（见 rebuild_report.py）。
+
+用法示例：
+  with ResultSink("production_seo_check_20251028_101948.jsonl") as sink:
+      sink.write("/en", {"status": "success"})
+  write_report("production_seo_check_20251028_101948.jsonl")   # -> production_seo_check_20251028_101948.json
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, Iterator, Optional, TextIO, Tuple
+
+from .profiling import profiled
+
+# 每写入这么多条结果或距上次 flush 超过这么多秒时 flush 一次
+DEFAULT_FLUSH_EVERY = 20
+DEFAULT_FLUSH_SECONDS = 5.0
+
+JSONL_SUFFIX = ".jsonl"
+
+
+class ResultSink:
+    """追加写入的 JSONL 结果流
+
+    meta 为报告中结果之前的顶层字段；results_key 为 None 时报告本身就是 {key: result}，
+    否则结果嵌套在 meta 之后的 results_key 字段中，summary 放在最后。
+    """
+
+    def __init__(self, path: str, meta: Optional[Dict[str, Any]] = None, results_key: Optional[str] = None,
+                 flush_every: int = DEFAULT_FLUSH_EVERY, flush_seconds: float = DEFAULT_FLUSH_SECONDS):
+        self.path = path
+        self.count = 0
+        self.flush_every = max(1, flush_every)
+        self.flush_seconds = flush_seconds
+        self._file: TextIO = open(path, "w", encoding="utf-8")
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        self._write_line({"meta": meta or {}, "results_key": results_key})
+        self._file.flush()
+
+    def __enter__(self) -> "ResultSink":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def _write_line(self, data: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(data, ensure_ascii=False) + "\n")
+
+    @profiled("report")
+    def write(self, key: str, result: Any) -> None:
+        self._write_line({"key": key, "result": result})
+        self.count += 1
+        self._pending += 1
+        if self._pending >= self.flush_every or time.monotonic() - self._last_flush >= self.flush_seconds:
+            self.flush()
+
+    def flush(self) -> None:
+        self._file.flush()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def close(self, summary: Optional[Dict[str, Any]] = None) -> None:
+        """结束写入；给出 summary 时写入最后一行"""
+        if self._file.closed:
+            return
+        if summary is not None:
+            self._write_line({"summary": summary})
+        self._file.close()
+
+
+def report_path(jsonl_path: str) -> str:
+    """results.jsonl -> results.json"""
+    base = jsonl_path[:-len(JSONL_SUFFIX)] if jsonl_path.endswith(JSONL_SUFFIX) else jsonl_path
+    return base + ".json"
+
+
+def read_meta(path: str) -> Tuple[Dict[str, Any], Optional[str]]:
+    with open(path, "r", encoding="utf-8") as f:
+        first = json.loads(f.readline())
+    return first["meta"], first.get("results_key")
+
+
+def iter_results(path: str) -> Iterator[Tuple[str, Any]]:
+    """逐条读取 (key, result)；末尾被截断的一行（写入中途崩溃）忽略"""
+    with open(path, "r", encoding="utf-8") as f:
+        f.readline()
+        for line in f:
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                break
+            if "key" in data:
+                yield data["key"], data["result"]
+
+
+def read_summary(path: str) -> Optional[Dict[str, Any]]:
+    """最后一行的 summary；运行未正常结束时返回 None"""
+    summary = None
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.startswith('{"summary"'):
+                summary = json.loads(line)["summary"]
+    return summary
+
+
+def _dump_member(out: TextIO, key: str, value: Any, depth: int, first: bool) -> None:
+    """按 json.dump(indent=2) 的格式写出对象中的一个成员"""
+    indent = "  " * depth
+    body = json.dumps(value, ensure_ascii=False, indent=2).replace("\n", "\n" + indent)
+    out.write(("" if first else ",") + f"\n{indent}{json.dumps(key, ensure_ascii=False)}: {body}")
+
+
+def _dump_results(out: TextIO, path: str, depth: int) -> int:
+    count = 0
+    out.write("{")
+    for key, result in iter_results(path):
+        _dump_member(out, key, result, depth + 1, count == 0)
+        count += 1
+    out.write(f"\n{'  ' * depth}}}" if count else "}")
+    return count
+
+
+@profiled("report")
+def write_report(jsonl_path: str, output_path: Optional[str] = None) -> Tuple[str, int, bool]:
+    """从 JSONL 重建 JSON 报告，返回 (报告路径, 结果条数, 是否完整)；output_path 默认同名 .json"""
+    output_path = output_path or report_path(jsonl_path)
+    meta, results_key = read_meta(jsonl_path)
+    summary = read_summary(jsonl_path)
+    tmp_path = output_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as out:
+        if results_key is None:
+            count = _dump_results(out, jsonl_path, 0)
+        else:
+            out.write("{")
+            for i, (key, value) in enumerate(meta.items()):
+                _dump_member(out, key, value, 1, i == 0)
+            out.write(("," if meta else "") + f"\n  {json.dumps(results_key)}: ")
+            count = _dump_results(out, jsonl_path, 1)
+            if summary is not None:
+                _dump_member(out, "summary", summary, 1, False)
+            out.write("\n}")
+    os.replace(tmp_path, output_path)
+    return output_path, count, summary is not None
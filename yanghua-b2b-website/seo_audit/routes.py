@@ -0,0 +1,237 @@
+"""
+en↔es 路由索引
+站点的多语言路径映射在 src/lib/url-localization.ts（LOCALIZED_PATHS / getLocalizedPath）中维护，
+各脚本却手工配对 /en/projects 与 /es/proyectos。这里一次性构建双向索引，之后每次查询都是常数次字典查找：
+
+- 精确映射：来自 sitemap 的 <xhtml:link rel="alternate">（每个 URL 的真实对应页面）
+- 路由规则：来自 `npm run export:localized-paths` 导出的 JSON；动态路由（产品 / 解决方案 / 文章详情）
+  按最长路径前缀匹配，前缀之后的 slug 原样保留（与 translateUrl 的行为一致）
+
+check_localized_alternates() 用索引检查页面 hreflang 目标是否指向正确的本地化路径，
+audit_sitemap_pairs() 用路由规则检查 sitemap 中的成对 URL，找出未翻译或映射错误的路径段。
+
+用法示例：
+  index = RouteIndex.from_export("localized-paths.json")
+  index.translate("/es/proyectos/4", "en")   # RouteMatch(path='/en/projects/4', exact=False)
+"""
+
+import json
+import os
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .checks import ERROR, WARNING, Finding
+from .client import HttpClient
+from .page import PageSeo
+from .sitemap import SitemapEntry, iter_sitemap
+
+DEFAULT_ROUTES_PATH = "localized-paths.json"
+SITE_LANGS = ("en", "es")
+DEFAULT_LANG = "en"
+
+
+class RouteMatch(NamedTuple):
+    """translate 的结果；exact 为 False 表示由路由规则（前缀 + 原样保留的 slug）推导"""
+    path: str
+    exact: bool
+
+
+def path_of(url: str) -> str:
+    """URL 或路径 -> 去掉末尾斜杠的路径"""
+    path = urlsplit(url.strip()).path or "/"
+    return path.rstrip("/") or "/"
+
+
+def lang_of(path: str, langs: Iterable[str] = SITE_LANGS) -> Optional[str]:
+    segment = path.strip("/").split("/", 1)[0]
+    return segment if segment in langs else None
+
+
+class RouteIndex:
+    """双向路由索引：精确映射 + 按语言分组的前缀规则"""
+
+    def __init__(self, langs: Iterable[str] = SITE_LANGS):
+        self.langs = tuple(langs)
+        # 完整路径 -> {语言: 完整路径}；同一组对应页面共享一个 dict
+        self._exact: Dict[str, Dict[str, str]] = {}
+        # (语言, 路由前缀) -> {语言: 路由前缀}
+        self._rules: Dict[Tuple[str, str], Dict[str, str]] = {}
+        # 各语言规则前缀的最大段数，前缀匹配最多尝试这么多次
+        self._max_segments = 0
+
+    def __len__(self) -> int:
+        return len(self._exact)
+
+    @property
+    def rules(self) -> int:
+        return len(self._rules)
+
+    # ---- 构建 ----
+
+    def add_pair(self, paths: Dict[str, str]) -> None:
+        """加入一组互相对应的页面 {语言: URL 或路径}"""
+        group: Dict[str, str] = {}
+        for lang, url in paths.items():
+            if lang in self.langs and url:
+                group[lang] = path_of(url)
+        if len(group) < 2:
+            return
+        for path in group.values():
+            existing = self._exact.get(path)
+            if existing is not None and existing is not group:
+                # 已有的组补充进来（例如 sitemap 中 en、es 条目各自列出了 alternates）
+                for lang, other in existing.items():
+                    group.setdefault(lang, other)
+        for path in group.values():
+            self._exact[path] = group
+
+    def add_rule(self, paths: Dict[str, str]) -> None:
+        """加入一条路由规则 {语言: 带语言前缀的路由路径}，例如 {"en": "/en/projects", "es": "/es/proyectos"}"""
+        rule = {lang: path_of(p) for lang, p in paths.items() if lang in self.langs and p}
+        for lang, path in rule.items():
+            self._rules.setdefault((lang, path), rule)
+            self._max_segments = max(self._max_segments, path.count("/"))
+
+    def add_sitemap_entry(self, entry: SitemapEntry) -> None:
+        pairs = {a.hreflang.lower(): a.href for a in entry.alternates if a.hreflang and a.href}
+        pairs.pop("x-default", None)
+        lang = lang_of(path_of(entry.loc), self.langs)
+        if lang is not None:
+            pairs.setdefault(lang, entry.loc)
+        self.add_pair(pairs)
+
+    @classmethod
+    def from_export(cls, path: str = DEFAULT_ROUTES_PATH) -> "RouteIndex":
+        """读取 scripts/export-localized-paths.ts 的输出；也接受直接的 {key: {语言: 路径}} 映射"""
+        if not os.path.exists(path):
+            raise FileNotFoundError(f"未找到路由导出文件: {path}（先运行 npm run export:localized-paths > {path}）")
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        routes = data.get("routes", data)
+        index = cls(data.get("locales") or SITE_LANGS)
+        for paths in routes.values():
+            # 未带语言前缀的原始 LOCALIZED_PATHS 按 buildLocalizedUrl 的规则补上
+            index.add_rule({lang: p if lang_of(p, index.langs) == lang else f"/{lang}{'' if p == '/' else p}"
+                            for lang, p in paths.items()})
+        return index
+
+    @classmethod
+    def from_sitemap(cls, location: str, client: Optional[HttpClient] = None) -> "RouteIndex":
+        index = cls()
+        for entry in iter_sitemap(location, client):
+            index.add_sitemap_entry(entry)
+        return index
+
+    def merge(self, other: "RouteIndex") -> None:
+        """合并另一个索引的精确映射与规则（例如导出文件的规则 + sitemap 的精确映射）"""
+        for group in {id(g): g for g in other._exact.values()}.values():
+            self.add_pair(group)
+        for rule in {id(r): r for r in other._rules.values()}.values():
+            self.add_rule(rule)
+
+    # ---- 查询 ----
+
+    def translate(self, url: str, lang: str) -> Optional[RouteMatch]:
+        """url 在 lang 语言中对应的路径；精确映射优先，其次按最长前缀匹配路由规则"""
+        path = path_of(url)
+        group = self._exact.get(path)
+        if group is not None and lang in group:
+            return RouteMatch(group[lang], True)
+        source = lang_of(path, self.langs)
+        if source is None:
+            return None
+        if source == lang:
+            return RouteMatch(path, True)
+        segments = path.split("/")
+        # "/es/productos/categoria/x".split("/") -> ["", "es", "productos", "categoria", "x"]
+        for end in range(min(len(segments), self._max_segments + 1), 1, -1):
+            prefix = "/".join(segments[:end])
+            rule = self._rules.get((source, prefix))
+            if rule is not None and lang in rule:
+                rest = "/".join(segments[end:])
+                target = rule[lang]
+                return RouteMatch(f"{target}/{rest}" if rest else target, rest == "")
+        return None
+
+
+def _swapped_lang(path: str, source: str, lang: str) -> str:
+    """只替换语言前缀、其余路径原样保留（未翻译的典型表现）"""
+    return f"/{lang}{path[len(source) + 1:]}"
+
+
+# classify_target 的结果
+KIND_UNKNOWN = "unknown"
+KIND_UNTRANSLATED = "untranslated"
+KIND_MISMAPPED = "mismapped"
+
+
+def classify_target(index: RouteIndex, path: str, lang: str, actual: str) -> Optional[Tuple[str, Optional[str]]]:
+    """path 页面声明的 lang 语言对应页面为 actual 时的问题：(kind, 期望路径)，没有问题时返回 None
+
+    规则推导出的期望值只保证路由前缀：前缀正确、只有 slug 不同视为 slug 已本地化，不算问题。
+    """
+    source = lang_of(path, index.langs)
+    expected = index.translate(path, lang)
+    if expected is None:
+        return KIND_UNKNOWN, None
+    if actual == expected.path:
+        return None
+    if lang != source and actual == _swapped_lang(path, source, lang):
+        return KIND_UNTRANSLATED, expected.path
+    if expected.exact or not actual.startswith(expected.path.rsplit("/", 1)[0] + "/"):
+        return KIND_MISMAPPED, expected.path
+    return None
+
+
+def check_localized_alternates(page: PageSeo, url: str, index: RouteIndex) -> List[Finding]:
+    """页面 hreflang 目标与路由索引对照；x-default 按默认语言（en）检查"""
+    path = path_of(url)
+    if lang_of(path, index.langs) is None:
+        return []
+    findings = []
+    unknown = False
+    for alternate in page.alternates:
+        if not alternate.hreflang or not alternate.href:
+            continue
+        hreflang = alternate.hreflang.strip().lower()
+        lang = DEFAULT_LANG if hreflang == "x-default" else hreflang
+        if lang not in index.langs:
+            continue
+        actual = path_of(alternate.href)
+        problem = classify_target(index, path, lang, actual)
+        if problem is None:
+            continue
+        kind, expected = problem
+        if kind == KIND_UNKNOWN:
+            unknown = True
+        elif kind == KIND_UNTRANSLATED:
+            findings.append(Finding("route", ERROR, f"hreflang {hreflang} 路径未翻译: 期望 {expected}, 实际 {actual}"))
+        else:
+            findings.append(Finding("route", ERROR, f"hreflang {hreflang} 映射错误: 期望 {expected}, 实际 {actual}"))
+    if unknown:
+        findings.append(Finding("route", WARNING, f"路由索引中没有 {path} 的对应关系"))
+    return findings
+
+
+def audit_sitemap_pairs(entries: Iterable[SitemapEntry], rules: RouteIndex) -> List[Dict]:
+    """用路由规则检查 sitemap 中每个 URL 声明的对应页面，返回问题列表
+
+    kind 为 untranslated（对方语言的路由段与本语言相同）、mismapped（路由前缀与规则不符）或 unknown（规则无法匹配）。
+    """
+    problems = []
+    for entry in entries:
+        path = path_of(entry.loc)
+        source = lang_of(path, rules.langs)
+        if source is None:
+            continue
+        for alternate in entry.alternates:
+            lang = (alternate.hreflang or "").strip().lower()
+            if lang not in rules.langs or lang == source or not alternate.href:
+                continue
+            actual = path_of(alternate.href)
+            problem = classify_target(rules, path, lang, actual)
+            if problem is not None:
+                kind, expected = problem
+                problems.append({"url": entry.loc, "hreflang": lang, "actual": actual,
+                                 "expected": expected, "kind": kind})
+    return problems
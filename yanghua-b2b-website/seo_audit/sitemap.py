@@ -0,0 +1,233 @@
+"""
+流式 sitemap 读取
+- 基于 XMLPullParser 增量解析：边下载边解析，处理完的 <url> 立即从树中移除，内存占用与 sitemap 大小无关
+- <sitemapindex> 的子 sitemap 在线程池中并发抓取，同一个子 sitemap 只读取一次
+- 支持 .xml.gz（按 gzip 魔数识别，与扩展名无关）以及本地文件路径
+- 惰性产出 SitemapEntry(loc, lastmod, alternates)，下游检查无需等待整个 sitemap 读完
+
+用法示例：
+  from seo_audit.sitemap import iter_sitemap
+  for entry in iter_sitemap("https://www.yhflexiblebusbar.com/sitemap.xml"):
+      print(entry.loc, entry.lastmod, entry.alternates)
+"""
+
+import queue
+import threading
+import zlib
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .client import STREAM_CHUNK_SIZE, HttpClient, get_client
+from .fetch import DEFAULT_PER_HOST
+from .page import Alternate
+from .profiling import profiled
+
+# 子 sitemap 的并发抓取数；与 FetchEngine 的单主机并发上限一致
+DEFAULT_WORKERS = DEFAULT_PER_HOST
+# 工作线程与消费者之间的缓冲条目数，消费者处理不过来时工作线程会阻塞等待
+DEFAULT_QUEUE_SIZE = 1000
+
+GZIP_MAGIC = b"\x1f\x8b"
+
+
+class SitemapEntry(NamedTuple):
+    """<url> 条目；alternates 来自 <xhtml:link rel="alternate" hreflang="..." href="...">"""
+    loc: str
+    lastmod: Optional[str] = None
+    alternates: Tuple[Alternate, ...] = ()
+
+
+def _local_name(tag: str) -> str:
+    # 与 sitemap 命名空间、xhtml 命名空间无关地匹配标签
+    return tag.rsplit("}", 1)[-1]
+
+
+def _gunzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """首块以 gzip 魔数开头时增量解压，否则原样返回"""
+    decompressor = None
+    first = True
+    for chunk in chunks:
+        if first:
+            first = False
+            if chunk[:2] == GZIP_MAGIC:
+                decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if decompressor is None:
+            yield chunk
+        else:
+            data = decompressor.decompress(chunk)
+            if data:
+                yield data
+    if decompressor is not None:
+        tail = decompressor.flush()
+        if tail:
+            yield tail
+
+
+def parse_sitemap(chunks: Iterable[bytes]) -> Iterator[Union[SitemapEntry, str]]:
+    """增量解析一个 sitemap 文档
+
+    <urlset> 中的每个 <url> 产出 SitemapEntry；<sitemapindex> 中的每个 <sitemap> 产出子 sitemap 的 loc（str）。
+    """
+    parser = ET.XMLPullParser(events=("start", "end"))
+    root = None
+    for chunk in _gunzip(chunks):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            name = _local_name(elem.tag)
+            if name == "url":
+                loc, lastmod, alternates = None, None, []
+                for child in elem:
+                    child_name = _local_name(child.tag)
+                    if child_name == "loc":
+                        loc = (child.text or "").strip()
+                    elif child_name == "lastmod":
+                        lastmod = (child.text or "").strip() or None
+                    elif child_name == "link" and child.get("rel") == "alternate" and child.get("hreflang"):
+                        alternates.append(Alternate(child.get("hreflang"), child.get("href")))
+                if loc:
+                    yield SitemapEntry(loc, lastmod, tuple(alternates))
+            elif name == "sitemap":
+                loc = next((child.text for child in elem if _local_name(child.tag) == "loc"), None)
+                if loc and loc.strip():
+                    yield loc.strip()
+            else:
+                continue
+            # 已处理的条目从根节点移除，保持内存恒定
+            if root is not None:
+                root.clear()
+    parser.close()
+
+
+def _read_local(path: str) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                return
+            yield chunk
+
+
+class _Stopped(Exception):
+    """消费者已关闭生成器"""
+
+
+class _SitemapReader:
+    """在线程池中抓取 sitemap 及其子 sitemap，通过有界队列把条目交给消费者
+
+    队列中除 SitemapEntry 外还有两种标记：子 sitemap 提交前放入 _CHILD，
+    每个 sitemap 读完（或失败）后放入 (_DONE, error)。_CHILD 总是先于该子 sitemap 的任何消息入队，
+    消费者据此计数，计数归零即全部读完。
+    """
+
+    _CHILD = object()
+    _DONE = object()
+
+    def __init__(self, client: HttpClient, max_workers: int, queue_size: int):
+        self.client = client
+        self.max_workers = max(1, max_workers)
+        self.queue: "queue.Queue" = queue.Queue(maxsize=queue_size)
+        self.stop = threading.Event()
+        self.seen = set()
+        self.seen_lock = threading.Lock()
+        self.executor: Optional[ThreadPoolExecutor] = None
+
+    def _chunks(self, location: str) -> Iterator[bytes]:
+        if location.startswith(("http://", "https://")):
+            return self.client.stream(location)
+        return _read_local(location)
+
+    def _put(self, item) -> None:
+        while not self.stop.is_set():
+            try:
+                self.queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Stopped()
+
+    def _claim(self, location: str) -> bool:
+        """同一个 sitemap 只读取一次（防止 sitemapindex 循环引用）"""
+        with self.seen_lock:
+            if location in self.seen:
+                return False
+            self.seen.add(location)
+            return True
+
+    def _work(self, location: str) -> None:
+        error = None
+        try:
+            chunks = self._chunks(location)
+            try:
+                for item in parse_sitemap(chunks):
+                    if isinstance(item, SitemapEntry):
+                        self._put(item)
+                    elif self._claim(item):
+                        self._put(self._CHILD)
+                        self.executor.submit(self._work, item)
+            finally:
+                close = getattr(chunks, "close", None)
+                if close:
+                    close()
+        except _Stopped:
+            return
+        except Exception as e:
+            error = e
+        try:
+            self._put((self._DONE, error))
+        except _Stopped:
+            pass
+
+    def iter(self, location: str) -> Iterator[SitemapEntry]:
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="seo-sitemap")
+        self._claim(location)
+        self.executor.submit(self._work, location)
+        pending = 1
+        try:
+            while pending:
+                item = self.queue.get()
+                if item is self._CHILD:
+                    pending += 1
+                elif isinstance(item, tuple) and item[0] is self._DONE:
+                    pending -= 1
+                    if item[1] is not None:
+                        raise item[1]
+                else:
+                    yield item
+        finally:
+            self.stop.set()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_sitemap(location: str, client: Optional[HttpClient] = None, max_workers: int = DEFAULT_WORKERS,
+                 queue_size: int = DEFAULT_QUEUE_SIZE) -> Iterator[SitemapEntry]:
+    """惰性读取 sitemap（URL 或本地路径），递归展开 sitemapindex
+
+    子 sitemap 并发读取，因此不同子 sitemap 之间的条目顺序不固定；
+    单个子 sitemap 内部保持文档顺序。任一 sitemap 读取失败时抛出对应异常。
+    """
+    return _SitemapReader(client or get_client(), max_workers, queue_size).iter(location)
+
+
+@profiled("discover")
+def sitemap_locs(location: str, client: Optional[HttpClient] = None) -> List[str]:
+    """返回 sitemap（含子 sitemap）中全部 <loc>"""
+    return [entry.loc for entry in iter_sitemap(location, client)]
+
+
+@profiled("discover")
+def sitemap_lastmods(location: str, urls: Optional[Iterable[str]] = None,
+                     client: Optional[HttpClient] = None) -> Dict[str, Optional[str]]:
+    """返回 {loc: lastmod}；给出 urls 时只收集这些 URL，全部找到后立即停止读取"""
+    wanted = set(urls) if urls is not None else None
+    result: Dict[str, Optional[str]] = {}
+    for entry in iter_sitemap(location, client):
+        if wanted is None or entry.loc in wanted:
+            result[entry.loc] = entry.lastmod
+            if wanted is not None and len(result) == len(wanted):
+                break
+    return result
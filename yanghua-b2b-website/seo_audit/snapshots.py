@@ -0,0 +1,315 @@
+"""
+内容寻址的页面快照存储
+离线分析脚本原来依赖手工保存的 contact_page_source.html、production_page_source_latest.html 等文件。
+启用快照后，共享客户端的每次抓取都会把正文写入内容寻址存储，并在本次运行的清单中记一行：
+
+- 正文按 SHA-256 寻址，相同内容只存一份（多次运行、多个 URL 返回相同正文时自动去重）
+- 安装了 zstandard 时用 zstd 压缩，否则退回标准库 zlib（读取时按文件后缀自动识别）
+- 每次运行一个清单（runs/<运行 ID>.jsonl）：URL、状态码、响应头、正文哈希、是否 head-only
+- SnapshotReplay 按清单回放任意一次历史运行，直接从磁盘读取，不再访问生产环境
+
+目录结构（默认 .cache/seo-audit/snapshots）：
+  objects/ab/cdef...zst    正文（文件名为 SHA-256）
+  runs/20251028_101948_check_production_seo.jsonl
+
+启用方式：configure_client(snapshots=SnapshotStore().start_run("label"))，
+脚本可用 add_snapshot_arguments / snapshots_from_args 提供 --snapshot、--snapshot-dir 参数；
+也可以设置环境变量 SEO_AUDIT_SNAPSHOTS=<存储目录> 让所有脚本的共享客户端记录快照。
+
+用法示例：
+  replay = SnapshotStore().open_run("latest")
+  response = replay.get("https://www.yhflexiblebusbar.com/en/contact")
+  page = PageSeo.parse(response.content, response.url)
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Dict, List, Mapping, NamedTuple, Optional
+
+from .client import SNAPSHOT_ENV, Response
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - 可选依赖
+    zstandard = None
+
+DEFAULT_SNAPSHOT_DIR = os.path.join(".cache", "seo-audit", "snapshots")
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+# 新写入正文使用的压缩格式（文件后缀）
+CODEC = "zst" if zstandard is not None else "zz"
+_CODECS = ("zst", "zz")
+
+# 正文已解码，这些传输层响应头不写入清单
+_TRANSPORT_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding", "connection"))
+
+
+def _compress(content: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        return zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(content)
+    return zlib.compress(content, ZLIB_LEVEL)
+
+
+def _decompress(data: bytes, codec: str) -> bytes:
+    if codec == "zst":
+        if zstandard is None:
+            raise RuntimeError("该快照使用 zstd 压缩，需要先安装 zstandard（pip install zstandard）")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return zlib.decompress(data)
+
+
+class SnapshotEntry(NamedTuple):
+    """清单中的一行；url 为请求的地址，final_url 为跟随重定向后的地址，digest 为正文的 SHA-256，size 为压缩前字节数"""
+    url: str
+    status_code: int
+    headers: Dict[str, str]
+    digest: str
+    size: int
+    final_url: Optional[str] = None
+    encoding: Optional[str] = None
+    http_version: str = "HTTP/1.1"
+    truncated: bool = False
+    head_only: bool = False
+    elapsed: float = 0.0
+    fetched_at: float = 0.0
+
+
+class SnapshotStore:
+    """正文对象库 + 运行清单目录；线程安全"""
+
+    def __init__(self, root: str = DEFAULT_SNAPSHOT_DIR):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.runs_dir = os.path.join(root, "runs")
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.runs_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        self._stored = 0
+        self._deduplicated = 0
+        self._bytes_in = 0
+        self._bytes_written = 0
+
+    # ---- 正文 ----
+
+    def _object_path(self, digest: str, codec: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], f"{digest[2:]}.{codec}")
+
+    def _find(self, digest: str) -> Optional[str]:
+        for codec in _CODECS:
+            path = self._object_path(digest, codec)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def put(self, content: bytes) -> str:
+        """写入正文（已存在则跳过），返回 SHA-256"""
+        digest = hashlib.sha256(content).hexdigest()
+        if self._find(digest) is not None:
+            with self._lock:
+                self._deduplicated += 1
+            return digest
+        path = self._object_path(digest, CODEC)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = _compress(content, CODEC)
+        # 先写临时文件再改名：并发写入同一内容、中途中断都不会留下不完整的对象
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._stored += 1
+            self._bytes_in += len(content)
+            self._bytes_written += len(data)
+        return digest
+
+    def get(self, digest: str) -> bytes:
+        path = self._find(digest)
+        if path is None:
+            raise KeyError(f"快照对象不存在: {digest}")
+        with open(path, "rb") as f:
+            data = f.read()
+        return _decompress(data, path.rsplit(".", 1)[1])
+
+    # ---- 运行 ----
+
+    def start_run(self, label: Optional[str] = None) -> "SnapshotRun":
+        run_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+        if label:
+            run_id += "_" + "".join(c if c.isalnum() or c in "-_" else "-" for c in label)
+        return SnapshotRun(self, run_id)
+
+    def runs(self) -> List[str]:
+        """全部运行 ID，按时间从旧到新"""
+        paths = glob.glob(os.path.join(self.runs_dir, "*.jsonl"))
+        return sorted(os.path.basename(p)[:-len(".jsonl")] for p in paths)
+
+    def resolve_run(self, run_id: str) -> str:
+        """"latest" 或运行 ID 前缀 -> 完整运行 ID"""
+        runs = self.runs()
+        if run_id == "latest":
+            if not runs:
+                raise FileNotFoundError(f"{self.runs_dir} 中没有快照运行")
+            return runs[-1]
+        matches = [r for r in runs if r.startswith(run_id)]
+        if not matches:
+            raise FileNotFoundError(f"未找到快照运行: {run_id}（可用: {', '.join(runs[-5:]) or '无'}）")
+        return matches[-1]
+
+    def open_run(self, run_id: str = "latest") -> "SnapshotReplay":
+        return SnapshotReplay(self, self.resolve_run(run_id))
+
+    # ---- 统计 ----
+
+    def stats(self) -> Dict[str, int]:
+        """返回 {'stored', 'deduplicated', 'bytes_in', 'bytes_written'}（本进程写入的部分）"""
+        with self._lock:
+            return {
+                "stored": self._stored,
+                "deduplicated": self._deduplicated,
+                "bytes_in": self._bytes_in,
+                "bytes_written": self._bytes_written,
+            }
+
+    def describe_stats(self) -> str:
+        s = self.stats()
+        ratio = s["bytes_in"] / s["bytes_written"] if s["bytes_written"] else 0
+        return (f"📦 快照统计（{CODEC}）: 新增对象 {s['stored']} 个, 去重 {s['deduplicated']} 次, "
+                f"{s['bytes_in'] / 1024:.0f} KB -> {s['bytes_written'] / 1024:.0f} KB（压缩比 {ratio:.1f}x）")
+
+
+class SnapshotRun:
+    """一次运行的清单（JSON Lines，每次抓取写一行并立即落盘，进程中断也不会丢失已记录的部分）"""
+
+    def __init__(self, store: SnapshotStore, run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self.path = os.path.join(store.runs_dir, f"{run_id}.jsonl")
+        self._lock = threading.Lock()
+        self._file = open(self.path, "a", encoding="utf-8")
+        self.recorded = 0
+        self._write({"run": run_id, "started_at": time.time(), "argv": sys.argv})
+
+    def _write(self, record: Mapping) -> None:
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._file.write(line)
+            self._file.flush()
+
+    def record(self, response: Response, head_only: bool = False, url: Optional[str] = None) -> SnapshotEntry:
+        """记录一次抓取；url 为请求的地址（默认取 response.url）"""
+        digest = self.store.put(response.content)
+        headers = {k: v for k, v in response.headers.items() if k.lower() not in _TRANSPORT_HEADERS}
+        url = url or response.url
+        entry = SnapshotEntry(url, response.status_code, headers, digest, len(response.content),
+                              response.url if response.url != url else None, response.encoding, response.http_version, response.truncated, head_only,
+                              response.elapsed, time.time())
+        self._write(entry._asdict())
+        with self._lock:
+            self.recorded += 1
+        return entry
+
+    def close(self) -> None:
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+
+    def describe_stats(self) -> str:
+        return f"📸 快照运行 {self.run_id}: 记录 {self.recorded} 次抓取\n{self.store.describe_stats()}"
+
+
+class SnapshotReplay:
+    """按清单回放一次历史运行；同一 URL 被抓取多次时以最后一次为准，重定向后的地址也可以查询"""
+
+    def __init__(self, store: SnapshotStore, run_id: str):
+        self.store = store
+        self.run_id = run_id
+        self.meta: Dict = {}
+        self._entries: Dict[tuple, SnapshotEntry] = {}
+        with open(os.path.join(store.runs_dir, f"{run_id}.jsonl"), "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                if "url" not in record:
+                    self.meta = record
+                    continue
+                entry = SnapshotEntry(**record)
+                self._entries[(entry.url, entry.head_only)] = entry
+                if entry.final_url:
+                    self._entries.setdefault((entry.final_url, entry.head_only), entry)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def urls(self) -> List[str]:
+        return list(dict.fromkeys(url for url, _ in self._entries))
+
+    def entry(self, url: str, head_only: bool = False) -> Optional[SnapshotEntry]:
+        """head-only 请求也可以由完整抓取的记录满足，反之不行"""
+        entry = self._entries.get((url, head_only))
+        if entry is None and head_only:
+            entry = self._entries.get((url, False))
+        return entry
+
+    def get(self, url: str, head_only: bool = False) -> Response:
+        entry = self.entry(url, head_only)
+        if entry is None:
+            raise KeyError(f"快照运行 {self.run_id} 中没有 {url}")
+        return Response(url=entry.final_url or entry.url, status_code=entry.status_code, headers=entry.headers,
+                        content=self.store.get(entry.digest), encoding=entry.encoding, elapsed=entry.elapsed,
+                        http_version=entry.http_version, truncated=entry.truncated)
+
+    def get_text(self, url: str, head_only: bool = False) -> str:
+        return self.get(url, head_only).text
+
+
+def add_snapshot_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --snapshot / --snapshot-dir 参数"""
+    parser.add_argument("--snapshot", action="store_true", help="把本次抓取的正文写入快照存储，供之后离线回放")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help=f"快照存储目录（默认 {DEFAULT_SNAPSHOT_DIR}）")
+
+
+def _script_label() -> str:
+    return os.path.splitext(os.path.basename(sys.argv[0]))[0]
+
+
+def snapshots_from_env() -> Optional[SnapshotRun]:
+    """设置了 SEO_AUDIT_SNAPSHOTS 时在该目录开始一次快照运行"""
+    root = os.environ.get(SNAPSHOT_ENV)
+    return SnapshotStore(root).start_run(_script_label()) if root else None
+
+
+def snapshots_from_args(args: argparse.Namespace, label: Optional[str] = None) -> Optional[SnapshotRun]:
+    """按 add_snapshot_arguments 解析出的参数开始一次快照运行；未指定 --snapshot 时按 SEO_AUDIT_SNAPSHOTS 决定"""
+    if not args.snapshot:
+        return snapshots_from_env()
+    return SnapshotStore(args.snapshot_dir).start_run(label or _script_label())
+
+
+def add_replay_arguments(parser: argparse.ArgumentParser) -> None:
+    """离线分析脚本：--from-snapshot 运行 ID（或 latest）从快照读取页面，--from-warc 从 WARC 文件读取，
+    而不是手工保存的 HTML 文件"""
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--from-snapshot", metavar="RUN", default=None,
+                        help="从快照运行读取页面（运行 ID、ID 前缀或 latest）")
+    source.add_argument("--from-warc", metavar="PATH", default=None,
+                        help="从 WARC 文件读取页面（按 .cdxj 索引随机读取，没有索引时先扫描建立）")
+    parser.add_argument("--snapshot-dir", default=DEFAULT_SNAPSHOT_DIR, help=f"快照存储目录（默认 {DEFAULT_SNAPSHOT_DIR}）")
+
+
+def replay_from_args(args: argparse.Namespace) -> Optional[Any]:
+    """SnapshotReplay 或 seo_audit.warc.WarcArchive（两者的 get / get_text 接口一致）；都未指定时返回 None"""
+    if args.from_warc:
+        from .warc import WarcArchive
+        return WarcArchive(args.from_warc)
+    if not args.from_snapshot:
+        return None
+    return SnapshotStore(args.snapshot_dir).open_run(args.from_snapshot)
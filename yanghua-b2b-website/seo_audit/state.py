@@ -0,0 +1,173 @@
+"""
+增量审计的持久化状态
+按 URL 记录上次检查时的 sitemap lastmod、ETag / Last-Modified、正文哈希与 PageSeo，
+下次运行时只重新检查发生变化的页面：
+
+1. sitemap lastmod 与上次相同           -> 不发请求，直接复用上次的 PageSeo
+2. 带 If-None-Match / If-Modified-Since 请求，服务器返回 304 -> 复用
+3. 正文哈希与上次相同                    -> 复用（不重新解析）
+4. 其余情况                              -> 解析并更新状态
+
+正文哈希基于 head-only 抓取到的内容（即 SEO 标签所在的 <head>），正文变化但 <head> 不变的页面视为未变化。
+状态保存在 SQLite 中（默认 .cache/seo-audit/state.sqlite3），可在多个工作线程之间共享。
+
+用法示例：
+  from seo_audit.state import StateStore, check_revision
+  with StateStore() as store:
+      rev = check_revision("https://www.yhflexiblebusbar.com/en", store, lastmod="2025-01-01")
+      if rev.changed:
+          ...
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional
+
+from .client import HttpClient, get_client
+from .page import PageSeo
+
+DEFAULT_STATE_PATH = os.path.join(".cache", "seo-audit", "state.sqlite3")
+
+# Revision.reason 的取值
+REASON_NEW = "new"
+REASON_CHANGED = "changed"
+REASON_LASTMOD = "lastmod-unchanged"
+REASON_NOT_MODIFIED = "not-modified"
+REASON_HASH = "hash-unchanged"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS page_state (
+    url TEXT PRIMARY KEY,
+    lastmod TEXT,
+    etag TEXT,
+    last_modified TEXT,
+    body_hash TEXT,
+    seo TEXT,
+    checked_at TEXT NOT NULL
+)
+"""
+
+
+class PageState(NamedTuple):
+    url: str
+    lastmod: Optional[str]
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body_hash: Optional[str]
+    page: Optional[PageSeo]
+    checked_at: str
+
+
+class Revision(NamedTuple):
+    """check_revision 的结果；changed 为 False 时 page 是上次保存的记录"""
+    url: str
+    changed: bool
+    reason: str
+    page: Optional[PageSeo]
+
+
+def body_hash(content: bytes) -> str:
+    return hashlib.sha256(content).hexdigest()
+
+
+class StateStore:
+    """按 URL 保存页面状态的 SQLite 存储（线程安全）"""
+
+    def __init__(self, path: str = DEFAULT_STATE_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(_SCHEMA)
+        self._conn.commit()
+
+    def __enter__(self) -> "StateStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def get(self, url: str) -> Optional[PageState]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT url, lastmod, etag, last_modified, body_hash, seo, checked_at FROM page_state WHERE url = ?",
+                (url,),
+            ).fetchone()
+        if row is None:
+            return None
+        page = PageSeo.from_tags(json.loads(row[5]), url) if row[5] else None
+        return PageState(row[0], row[1], row[2], row[3], row[4], page, row[6])
+
+    def put(self, url: str, lastmod: Optional[str] = None, etag: Optional[str] = None,
+            last_modified: Optional[str] = None, body_hash: Optional[str] = None,
+            page: Optional[PageSeo] = None) -> None:
+        seo = json.dumps(page.as_dict(), ensure_ascii=False) if page else None
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO page_state (url, lastmod, etag, last_modified, body_hash, seo, checked_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (url, lastmod, etag, last_modified, body_hash, seo, datetime.now().isoformat()),
+            )
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM page_state").fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+def check_revision(url: str, store: StateStore, lastmod: Optional[str] = None,
+                   client: Optional[HttpClient] = None) -> Revision:
+    """判断页面自上次检查以来是否变化，变化时抓取、解析并更新状态
+
+    lastmod 为 sitemap 中该 URL 的 lastmod（没有时传 None，只按验证器和正文哈希判断）。
+    非 2xx/3xx 状态抛出 HTTPStatusError，状态不会被更新。
+    """
+    previous = store.get(url)
+    if previous is not None and previous.page is not None and lastmod and previous.lastmod == lastmod:
+        return Revision(url, False, REASON_LASTMOD, previous.page)
+
+    headers = {}
+    if previous is not None and previous.page is not None:
+        if previous.etag:
+            headers["If-None-Match"] = previous.etag
+        if previous.last_modified:
+            headers["If-Modified-Since"] = previous.last_modified
+    response = (client or get_client()).get(url, headers=headers, head_only=True)
+
+    if response.status_code == 304 and headers:
+        store.put(url, lastmod or previous.lastmod, previous.etag, previous.last_modified,
+                  previous.body_hash, previous.page)
+        return Revision(url, False, REASON_NOT_MODIFIED, previous.page)
+    response.raise_for_status()
+
+    digest = body_hash(response.content)
+    etag = response.headers.get("ETag")
+    last_modified = response.headers.get("Last-Modified")
+    if previous is not None and previous.page is not None and previous.body_hash == digest:
+        store.put(url, lastmod, etag, last_modified, digest, previous.page)
+        return Revision(url, False, REASON_HASH, previous.page)
+
+    page = PageSeo.parse(response.content, url)
+    store.put(url, lastmod, etag, last_modified, digest, page)
+    return Revision(url, True, REASON_NEW if previous is None else REASON_CHANGED, page)
+
+
+def describe_revisions(revisions) -> str:
+    """增量模式的汇总说明"""
+    counts: Dict[str, int] = {}
+    for rev in revisions:
+        counts[rev.reason] = counts.get(rev.reason, 0) + 1
+    rechecked = counts.get(REASON_NEW, 0) + counts.get(REASON_CHANGED, 0)
+    skipped = sum(counts.values()) - rechecked
+    return (f"♻️  增量模式: 重新检查 {rechecked} 个（新页面 {counts.get(REASON_NEW, 0)}）, 跳过 {skipped} 个"
+            f"（lastmod 未变 {counts.get(REASON_LASTMOD, 0)}, 304 未修改 {counts.get(REASON_NOT_MODIFIED, 0)}, "
+            f"内容哈希未变 {counts.get(REASON_HASH, 0)}）")
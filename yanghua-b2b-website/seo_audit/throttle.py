@@ -0,0 +1,173 @@
+"""
+按主机的自适应并发（AIMD）与 Retry-After
+生产环境在负载高时会返回 503，固定的 time.sleep / --delay 要么太慢、要么不够安全。
+共享客户端把每个响应的状态码、TTFB 与 Retry-After 报告给 HostThrottle：
+
+- Retry-After（秒数或 HTTP 日期）：该主机暂停到截止时间为止，FetchEngine 不再调度该主机的新请求，
+  客户端重试 429 / 503 时也至少等到截止时间（始终生效）
+- AIMD 窗口（FetchEngine 开启 adaptive 时）：每个主机的并发上限从 --per-host 开始，
+  响应健康时加性增加（大约每收到一个窗口的响应 +1），遇到 429 / 503 或 TTFB 明显上升时减半；
+  减半之前已经发出的请求再报告拥塞时不重复减半（同一轮拥塞只减半一次）
+- TTFB 上升：TTFB 的指数滑动平均超过基线的 TTFB_RISE 倍且至少高出 TTFB_RISE_FLOOR 秒；
+  基线为最近 BASELINE_SAMPLES 次滑动平均中的最小值，服务器整体变慢后基线随之上移
+
+用法示例：
+  throttle = get_client().throttle
+  print(throttle.delay("www.yhflexiblebusbar.com"), throttle.stats())
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Mapping, Optional
+from urllib.parse import urlsplit
+
+# 视为拥塞的状态码
+CONGESTION_STATUSES = (429, 503)
+MIN_WINDOW = 1
+TTFB_ALPHA = 0.2
+TTFB_RISE = 2.0
+TTFB_RISE_FLOOR = 0.05
+BASELINE_SAMPLES = 100
+# 单次 Retry-After 最长等待（秒），避免异常的响应头让脚本长时间挂起
+MAX_RETRY_AFTER = 300.0
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Retry-After 响应头 -> 需要等待的秒数（不超过 MAX_RETRY_AFTER）；无法解析时返回 None"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        seconds = float(value)
+    else:
+        try:
+            when = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if when.tzinfo is None:
+            when = when.replace(tzinfo=timezone.utc)
+        seconds = (when - (now or datetime.now(timezone.utc))).total_seconds()
+    return min(max(0.0, seconds), MAX_RETRY_AFTER)
+
+
+class _HostState:
+    __slots__ = ("window", "maximum", "peak", "ttfb_avg", "averages", "paused_until", "decreased_at",
+                 "responses", "congested", "ttfb_rises", "decreases", "retry_afters")
+
+    def __init__(self) -> None:
+        # AIMD 窗口；maximum 为 None 表示没有自适应引擎在使用该主机
+        self.window = 0.0
+        self.maximum: Optional[int] = None
+        self.peak = 0
+        self.ttfb_avg: Optional[float] = None
+        self.averages: deque = deque(maxlen=BASELINE_SAMPLES)
+        self.paused_until = 0.0
+        self.decreased_at = 0.0
+        self.responses = 0
+        self.congested = 0
+        self.ttfb_rises = 0
+        self.decreases = 0
+        self.retry_afters = 0
+
+
+class HostThrottle:
+    """线程安全；时间统一使用 time.perf_counter（与 PhaseTimer 一致）"""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostState] = {}
+
+    def _state(self, host: str) -> _HostState:
+        state = self._hosts.get(host)
+        if state is None:
+            state = self._hosts[host] = _HostState()
+        return state
+
+    def observe(self, url: str, status_code: int, ttfb: Optional[float], started: float,
+                headers: Optional[Mapping[str, str]] = None) -> float:
+        """报告一个响应（started 为请求发出的时间）；返回 Retry-After 要求的等待秒数（没有时为 0）"""
+        now = time.perf_counter()
+        retry_after = None
+        if status_code in CONGESTION_STATUSES and headers is not None:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+        with self._lock:
+            state = self._state(urlsplit(url).netloc.lower())
+            state.responses += 1
+            congested = status_code in CONGESTION_STATUSES
+            if congested:
+                state.congested += 1
+            if retry_after:
+                state.retry_afters += 1
+                state.paused_until = max(state.paused_until, now + retry_after)
+            if ttfb is not None and not congested:
+                avg = ttfb if state.ttfb_avg is None else state.ttfb_avg + TTFB_ALPHA * (ttfb - state.ttfb_avg)
+                state.ttfb_avg = avg
+                state.averages.append(avg)
+                baseline = min(state.averages)
+                if avg > baseline * TTFB_RISE and avg - baseline > TTFB_RISE_FLOOR:
+                    state.ttfb_rises += 1
+                    congested = True
+            if state.maximum is not None:
+                if congested:
+                    if started >= state.decreased_at:
+                        state.window = max(float(MIN_WINDOW), state.window / 2)
+                        state.decreased_at = now
+                        state.decreases += 1
+                else:
+                    state.window = min(float(state.maximum), state.window + 1 / state.window)
+                    state.peak = max(state.peak, int(state.window))
+        return retry_after or 0.0
+
+    def delay(self, host: str) -> float:
+        """该主机因 Retry-After 还需暂停的秒数"""
+        with self._lock:
+            state = self._hosts.get(host)
+            return max(0.0, state.paused_until - time.perf_counter()) if state else 0.0
+
+    def wait(self, host: str) -> None:
+        """同步调用方：主机暂停期间阻塞等待"""
+        delay = self.delay(host)
+        if delay > 0:
+            time.sleep(delay)
+
+    def window(self, host: str, initial: int, maximum: int) -> int:
+        """自适应引擎使用的并发上限；第一次调用时以 initial 为起点、maximum 为上限开始调整"""
+        with self._lock:
+            state = self._state(host)
+            if state.maximum is None:
+                state.window = float(max(MIN_WINDOW, min(initial, maximum)))
+                state.peak = int(state.window)
+            state.maximum = max(MIN_WINDOW, maximum)
+            return int(state.window)
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            return {
+                host: {
+                    "responses": s.responses,
+                    "congested": s.congested,
+                    "ttfb_rises": s.ttfb_rises,
+                    "retry_afters": s.retry_afters,
+                    "decreases": s.decreases,
+                    "window": int(s.window) if s.maximum is not None else None,
+                    "peak_window": s.peak if s.maximum is not None else None,
+                    "ttfb_avg_ms": round(s.ttfb_avg * 1000, 1) if s.ttfb_avg is not None else None,
+                }
+                for host, s in self._hosts.items()
+            }
+
+    def describe_stats(self) -> Optional[str]:
+        """只在出现过拥塞信号或使用了自适应窗口时返回说明"""
+        lines = []
+        for host, s in self.stats().items():
+            if s["window"] is None and not (s["congested"] or s["ttfb_rises"]):
+                continue
+            line = (f"   - {host}: 429/503 {s['congested']} 次, TTFB 上升 {s['ttfb_rises']} 次, "
+                    f"Retry-After {s['retry_afters']} 次")
+            if s["window"] is not None:
+                line += f", 减半 {s['decreases']} 次, 并发窗口 {s['window']}（峰值 {s['peak_window']}）"
+            lines.append(line)
+        return "🚦 按主机的拥塞控制:\n" + "\n".join(lines) if lines else None
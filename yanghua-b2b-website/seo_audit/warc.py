@@ -0,0 +1,534 @@
+"""
+WARC 读写
+- 读取：按 WARC 1.0 / 1.1 格式逐条流式读取记录（.warc 或 .warc.gz），
+  response 记录的块是原始 HTTP 响应：这里拆出状态码与响应头，并还原 chunked 传输编码与 gzip / deflate 内容编码，
+  得到与浏览器看到的一致的页面正文
+- 索引：WarcIndex 流式扫描一遍，记录每条记录在文件中的偏移与长度（CDXJ 风格，保存为 <文件>.cdxj），
+  之后 WarcArchive 按 URL 直接 seek 读取单条记录，大文件也不需要整体载入内存
+- 写入：WarcWriter 为每次抓取写一对 request / response 记录（保留 Link 等响应头），
+  逐记录 gzip 压缩（每条记录一个 gzip 成员，可以按偏移单独解压），关闭时写出索引
+
+抓取时写入：configure_client(warc=WarcWriter("audit.warc.gz"))，脚本可用 add_warc_arguments / warc_from_args
+提供 --warc 参数；也可以设置环境变量 SEO_AUDIT_WARC=<文件路径> 让所有脚本的共享客户端写入 WARC。
+
+用法示例：
+  for response in iter_responses("crawl.warc.gz"):
+      print(response.url, response.status_code, len(response.content))
+  archive = WarcArchive("crawl.warc.gz")
+  page = PageSeo.parse(archive.get("https://www.yhflexiblebusbar.com/en").content)
+"""
+
+import argparse
+import atexit
+import base64
+import gzip
+import hashlib
+import io
+import json
+import os
+import sys
+import threading
+import uuid
+import zlib
+from datetime import datetime, timezone
+from http.client import responses as HTTP_REASONS
+from typing import BinaryIO, Dict, Iterator, List, Mapping, NamedTuple, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .client import WARC_ENV, Response
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - 可选依赖
+    brotli = None
+
+
+class WarcRecord(NamedTuple):
+    """一条 WARC 记录；headers 的键保持原样（WARC-Type、WARC-Target-URI ...），block 为记录块"""
+    headers: Dict[str, str]
+    block: bytes
+
+    @property
+    def type(self) -> Optional[str]:
+        return self.headers.get("WARC-Type")
+
+    @property
+    def target_uri(self) -> Optional[str]:
+        uri = self.headers.get("WARC-Target-URI")
+        # WARC 1.0 允许 <...> 包裹
+        return uri.strip("<>") if uri else uri
+
+
+def open_warc(path: str) -> BinaryIO:
+    """.gz 后缀按多成员 gzip 流打开，其余按未压缩文件打开"""
+    if path.endswith(".gz"):
+        return gzip.open(path, "rb")
+    return open(path, "rb")
+
+
+def _read_headers(stream: BinaryIO) -> Optional[Dict[str, str]]:
+    """读取到空行为止的头部；流结束时返回 None"""
+    line = stream.readline()
+    while line in (b"\r\n", b"\n"):
+        line = stream.readline()
+    if not line:
+        return None
+    if not line.startswith(b"WARC/"):
+        raise ValueError(f"不是 WARC 记录: {line[:40]!r}")
+    headers: Dict[str, str] = {}
+    while True:
+        line = stream.readline()
+        if not line or line in (b"\r\n", b"\n"):
+            return headers
+        name, _, value = line.decode("utf-8", errors="replace").partition(":")
+        headers[name.strip()] = value.strip()
+
+
+def read_record(stream: BinaryIO) -> Optional[WarcRecord]:
+    """从当前位置读取一条记录（包括记录后的两个 CRLF）；流结束时返回 None"""
+    headers = _read_headers(stream)
+    if headers is None:
+        return None
+    length = int(headers.get("Content-Length", "0"))
+    block = stream.read(length)
+    if len(block) < length:
+        raise ValueError(f"WARC 记录不完整: 期望 {length} 字节, 实际 {len(block)} 字节")
+    return WarcRecord(headers, block)
+
+
+def iter_records(path: str) -> Iterator[WarcRecord]:
+    with open_warc(path) as stream:
+        while True:
+            record = read_record(stream)
+            if record is None:
+                return
+            yield record
+
+
+# ---- HTTP 响应 ----
+
+def _dechunk(body: bytes) -> bytes:
+    out = bytearray()
+    pos = 0
+    while pos < len(body):
+        end = body.find(b"\r\n", pos)
+        if end == -1:
+            break
+        size = int(body[pos:end].split(b";", 1)[0].strip() or b"0", 16)
+        if size == 0:
+            break
+        out += body[end + 2:end + 2 + size]
+        pos = end + 2 + size + 2
+    return bytes(out)
+
+
+def _decode(body: bytes, encoding: str) -> bytes:
+    encoding = encoding.strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompress(body, 16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    if encoding == "br" and brotli is not None:
+        return brotli.decompress(body)
+    return body
+
+
+def parse_http_response(block: bytes) -> Tuple[int, Dict[str, str], bytes]:
+    """原始 HTTP 响应 -> (状态码, 响应头, 解码后的正文)"""
+    head, _, body = block.partition(b"\r\n\r\n")
+    lines = head.decode("iso-8859-1").split("\r\n")
+    status_code = int(lines[0].split(" ", 2)[1])
+    headers: Dict[str, str] = {}
+    for line in lines[1:]:
+        name, _, value = line.partition(":")
+        if name:
+            headers[name.strip()] = value.strip()
+    lowered = {k.lower(): v for k, v in headers.items()}
+    if "chunked" in lowered.get("transfer-encoding", "").lower():
+        body = _dechunk(body)
+    if lowered.get("content-encoding"):
+        try:
+            for encoding in reversed(lowered["content-encoding"].split(",")):
+                body = _decode(body, encoding)
+        except zlib.error:
+            pass
+    return status_code, headers, body
+
+
+def record_response(record: WarcRecord) -> Response:
+    status_code, headers, body = parse_http_response(record.block)
+    return Response(url=record.target_uri or "", status_code=status_code, headers=headers, content=body,
+                    http_version=record.block.split(b" ", 1)[0].decode("ascii", errors="replace"))
+
+
+def iter_responses(path: str) -> Iterator[Response]:
+    """WARC 中全部 response 记录（按文件顺序）"""
+    for record in iter_records(path):
+        if record.type == "response":
+            yield record_response(record)
+
+
+# ---- 索引 ----
+
+INDEX_SUFFIX = ".cdxj"
+# 建索引时读取 gzip 数据的块大小
+SCAN_CHUNK_SIZE = 1024 * 1024
+# 写入索引的记录类型
+INDEXED_TYPES = frozenset(("response", "request", "revisit", "resource", "metadata"))
+
+
+class IndexEntry(NamedTuple):
+    """一条记录的位置：offset / length 为 gzip 成员（未压缩文件为记录本身）在文件中的字节范围，
+    n 为该成员中的第几条记录（逐记录压缩时总是 0）"""
+    url: str
+    timestamp: str
+    type: str
+    offset: int
+    length: int
+    n: int = 0
+    status: Optional[int] = None
+    mime: Optional[str] = None
+
+    def to_line(self) -> str:
+        fields = {"type": self.type, "offset": self.offset, "length": self.length}
+        if self.n:
+            fields["n"] = self.n
+        if self.status is not None:
+            fields["status"] = self.status
+        if self.mime:
+            fields["mime"] = self.mime
+        return f"{self.url} {self.timestamp} {json.dumps(fields)}"
+
+    @classmethod
+    def from_line(cls, line: str) -> "IndexEntry":
+        url, timestamp, fields = line.rstrip("\n").split(" ", 2)
+        data = json.loads(fields)
+        return cls(url, timestamp, data["type"], data["offset"], data["length"], data.get("n", 0),
+                   data.get("status"), data.get("mime"))
+
+
+def _timestamp(warc_date: Optional[str]) -> str:
+    """WARC-Date（2025-10-28T10:19:48Z）-> 14 位时间戳"""
+    digits = "".join(c for c in (warc_date or "") if c.isdigit())
+    return (digits + "0" * 14)[:14]
+
+
+def _http_summary(record: WarcRecord) -> Tuple[Optional[int], Optional[str]]:
+    """response 记录的状态码与 Content-Type（只解析头部，不解码正文）"""
+    if record.type != "response" or not record.block.startswith(b"HTTP/"):
+        return None, None
+    head = record.block.split(b"\r\n\r\n", 1)[0].decode("iso-8859-1").split("\r\n")
+    try:
+        status = int(head[0].split(" ", 2)[1])
+    except (IndexError, ValueError):
+        status = None
+    mime = None
+    for line in head[1:]:
+        name, _, value = line.partition(":")
+        if name.strip().lower() == "content-type":
+            mime = value.strip().split(";", 1)[0]
+    return status, mime
+
+
+def _index_entries(record: WarcRecord, offset: int, length: int, n: int) -> Iterator[IndexEntry]:
+    if record.type in INDEXED_TYPES and record.target_uri:
+        status, mime = _http_summary(record)
+        yield IndexEntry(record.target_uri, _timestamp(record.headers.get("WARC-Date")), record.type,
+                         offset, length, n, status, mime)
+
+
+def _iter_gzip_members(f: BinaryIO) -> Iterator[Tuple[int, int, bytes]]:
+    """逐个解压 gzip 成员，产出 (偏移, 压缩长度, 解压后的数据)"""
+    offset = 0
+    pending = b""
+    while True:
+        data = pending or f.read(SCAN_CHUNK_SIZE)
+        if not data:
+            return
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        parts = []
+        consumed = 0
+        while True:
+            parts.append(decompressor.decompress(data))
+            if decompressor.eof:
+                pending = decompressor.unused_data
+                consumed += len(data) - len(pending)
+                break
+            consumed += len(data)
+            data = f.read(SCAN_CHUNK_SIZE)
+            if not data:
+                raise ValueError(f"gzip 成员不完整（偏移 {offset}）")
+        yield offset, consumed, b"".join(parts)
+        offset += consumed
+
+
+def scan_index(path: str) -> Iterator[IndexEntry]:
+    """流式扫描 WARC，产出每条记录的索引项；.gz 文件按 gzip 成员定位"""
+    with open(path, "rb") as f:
+        if path.endswith(".gz"):
+            for offset, length, data in _iter_gzip_members(f):
+                stream = io.BytesIO(data)
+                n = 0
+                while True:
+                    record = read_record(stream)
+                    if record is None:
+                        break
+                    yield from _index_entries(record, offset, length, n)
+                    n += 1
+            return
+        offset = 0
+        while True:
+            record = read_record(f)
+            if record is None:
+                return
+            # 记录末尾的空行计入本条记录的长度，下一条的偏移指向 WARC/1.x 版本行
+            end = f.tell()
+            while f.readline() in (b"\r\n", b"\n"):
+                end = f.tell()
+            f.seek(end)
+            yield from _index_entries(record, offset, end - offset, 0)
+            offset = end
+
+
+class WarcIndex:
+    """WARC 文件的记录索引；按 (URL, 类型) 查找时同一 URL 以最后一条为准"""
+
+    def __init__(self, path: str, entries: List[IndexEntry]):
+        self.path = path
+        self.entries = entries
+        self._by_url: Dict[Tuple[str, str], IndexEntry] = {(e.url, e.type): e for e in entries}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @classmethod
+    def build(cls, path: str) -> "WarcIndex":
+        return cls(path, list(scan_index(path)))
+
+    @classmethod
+    def load(cls, path: str, index_path: Optional[str] = None) -> "WarcIndex":
+        with open(index_path or path + INDEX_SUFFIX, "r", encoding="utf-8") as f:
+            return cls(path, [IndexEntry.from_line(line) for line in f if line.strip()])
+
+    @classmethod
+    def load_or_build(cls, path: str, save: bool = True) -> "WarcIndex":
+        """索引文件存在且不旧于 WARC 时直接读取，否则扫描一遍并（可写时）保存"""
+        index_path = path + INDEX_SUFFIX
+        if os.path.exists(index_path) and os.path.getmtime(index_path) >= os.path.getmtime(path):
+            return cls.load(path, index_path)
+        index = cls.build(path)
+        if save:
+            try:
+                index.save(index_path)
+            except OSError:
+                pass
+        return index
+
+    def save(self, index_path: Optional[str] = None) -> None:
+        with open(index_path or self.path + INDEX_SUFFIX, "w", encoding="utf-8") as f:
+            for entry in self.entries:
+                f.write(entry.to_line() + "\n")
+
+    def lookup(self, url: str, record_type: str = "response") -> Optional[IndexEntry]:
+        return self._by_url.get((url, record_type))
+
+    def responses(self) -> List[IndexEntry]:
+        return [e for e in self.entries if e.type == "response"]
+
+
+def read_at(path: str, offset: int, length: int, n: int = 0, f: Optional[BinaryIO] = None) -> WarcRecord:
+    """按索引位置读取一条记录；f 为已打开的文件时复用该句柄"""
+    handle = f or open(path, "rb")
+    try:
+        handle.seek(offset)
+        data = handle.read(length)
+    finally:
+        if f is None:
+            handle.close()
+    if path.endswith(".gz"):
+        data = gzip.decompress(data)
+    stream = io.BytesIO(data)
+    for _ in range(n):
+        read_record(stream)
+    record = read_record(stream)
+    if record is None:
+        raise ValueError(f"{path} 偏移 {offset} 处没有 WARC 记录")
+    return record
+
+
+class WarcArchive:
+    """带索引的 WARC：按 URL 随机读取，或按索引顺序逐条读取 response
+
+    get / get_text 与 seo_audit.snapshots.SnapshotReplay 接口一致，离线分析脚本的 --from-warc 直接替换快照回放。
+    """
+
+    def __init__(self, path: str, index: Optional[WarcIndex] = None):
+        self.path = path
+        self.run_id = path
+        self.index = index or WarcIndex.load_or_build(path)
+
+    def read(self, entry: IndexEntry, f: Optional[BinaryIO] = None) -> WarcRecord:
+        return read_at(self.path, entry.offset, entry.length, entry.n, f)
+
+    def get(self, url: str, head_only: bool = False) -> Response:
+        """head_only 只为与快照回放接口一致：WARC 中每个 URL 只有一条 response，原样返回"""
+        entry = self.index.lookup(url)
+        if entry is None:
+            raise KeyError(f"{self.path} 中没有 {url} 的 response 记录")
+        return record_response(self.read(entry))
+
+    def get_text(self, url: str, head_only: bool = False) -> str:
+        return self.get(url, head_only).text
+
+    def urls(self) -> List[str]:
+        return list(dict.fromkeys(e.url for e in self.index.responses()))
+
+    def iter_responses(self) -> Iterator[Response]:
+        with open(self.path, "rb") as f:
+            for entry in self.index.responses():
+                yield record_response(self.read(entry, f))
+
+
+# ---- 写入 ----
+
+# 正文已解码，这些传输层响应头改写后再写入 response 记录
+_TRANSPORT_HEADERS = frozenset(("content-encoding", "content-length", "transfer-encoding", "connection"))
+
+
+def _digest(data: bytes) -> str:
+    return "sha1:" + base64.b32encode(hashlib.sha1(data).digest()).decode("ascii")
+
+
+def _warc_date() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _header_block(lines: List[str]) -> bytes:
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("utf-8")
+
+
+class WarcWriter:
+    """线程安全的 WARC 写入器；.gz 后缀时逐记录 gzip 压缩。进程退出时自动关闭并写出索引"""
+
+    def __init__(self, path: str, info: Optional[Mapping[str, str]] = None):
+        self.path = path
+        self.compress = path.endswith(".gz")
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        self._offset = self._file.tell()
+        # 追加写入已有文件时，旧记录不在内存索引中
+        self._appended = self._offset > 0
+        self._lock = threading.Lock()
+        self._index: List[IndexEntry] = []
+        self.exchanges = 0
+        self.bytes_written = 0
+        fields = {"software": "seo_audit", "format": "WARC File Format 1.1", "command": " ".join(sys.argv)}
+        fields.update(info or {})
+        self.write_record("warcinfo", None, "".join(f"{k}: {v}\r\n" for k, v in fields.items()).encode("utf-8"),
+                          "application/warc-fields")
+        atexit.register(self.close)
+
+    def write_record(self, record_type: str, target_uri: Optional[str], block: bytes, content_type: str,
+                     extra: Optional[Mapping[str, str]] = None, record_id: Optional[str] = None) -> str:
+        """写入一条记录，返回 WARC-Record-ID"""
+        record_id = record_id or f"<urn:uuid:{uuid.uuid4()}>"
+        date = _warc_date()
+        lines = ["WARC/1.1", f"WARC-Type: {record_type}", f"WARC-Record-ID: {record_id}", f"WARC-Date: {date}"]
+        if target_uri:
+            lines.append(f"WARC-Target-URI: {target_uri}")
+        lines.extend(f"{k}: {v}" for k, v in (extra or {}).items())
+        lines.extend([f"Content-Type: {content_type}", f"WARC-Block-Digest: {_digest(block)}",
+                      f"Content-Length: {len(block)}"])
+        data = _header_block(lines) + block + b"\r\n\r\n"
+        if self.compress:
+            data = gzip.compress(data)
+        with self._lock:
+            if self._file.closed:
+                raise ValueError(f"WARC 文件已关闭: {self.path}")
+            offset = self._offset
+            self._file.write(data)
+            self._file.flush()
+            self._offset += len(data)
+            self.bytes_written += len(data)
+            if target_uri and record_type in INDEXED_TYPES:
+                status, mime = _http_summary(WarcRecord({"WARC-Type": record_type}, block))
+                self._index.append(IndexEntry(target_uri, _timestamp(date), record_type, offset, len(data), 0,
+                                              status, mime))
+        return record_id
+
+    def write_exchange(self, url: str, request_headers: Mapping[str, str], response: Response) -> None:
+        """一次抓取：request 记录 + response 记录（WARC-Concurrent-To 互相关联）
+
+        响应正文是解码后的内容，Content-Encoding / Transfer-Encoding 不再写入，Content-Length 按实际长度改写；
+        head_only 抓取在 </head> 处截断的正文标记 WARC-Truncated: length。
+        """
+        target = response.url or url
+        parts = urlsplit(target)
+        path = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+        request_lines = [f"GET {path} HTTP/1.1", f"Host: {parts.netloc}"]
+        request_lines.extend(f"{k}: {v}" for k, v in request_headers.items())
+        request_id = self.write_record("request", target, _header_block(request_lines),
+                                       "application/http;msgtype=request")
+
+        version = response.http_version if response.http_version.startswith("HTTP/") else "HTTP/1.1"
+        status_line = f"{version} {response.status_code} {HTTP_REASONS.get(response.status_code, '')}".rstrip()
+        response_lines = [status_line]
+        response_lines.extend(f"{k}: {v}" for k, v in response.headers.items() if k.lower() not in _TRANSPORT_HEADERS)
+        response_lines.append(f"Content-Length: {len(response.content)}")
+        extra = {"WARC-Concurrent-To": request_id, "WARC-Payload-Digest": _digest(response.content)}
+        if url != target:
+            # 跟随重定向后的响应：记录最初请求的地址（hop 本身不在 WARC 中）
+            extra["WARC-Refers-To-Target-URI"] = url
+        if response.truncated:
+            extra["WARC-Truncated"] = "length"
+        self.write_record("response", target, _header_block(response_lines) + response.content,
+                          "application/http;msgtype=response", extra)
+        with self._lock:
+            self.exchanges += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file.closed:
+                return
+            self._file.close()
+            entries = list(self._index)
+        index = WarcIndex.build(self.path) if self._appended else WarcIndex(self.path, entries)
+        index.save()
+
+    def describe_stats(self) -> str:
+        return f"🗄️  WARC {self.path}: 记录 {self.exchanges} 次抓取, 写入 {self.bytes_written / 1024:.0f} KB"
+
+
+def add_warc_arguments(parser: argparse.ArgumentParser) -> None:
+    """为脚本添加 --warc 参数"""
+    parser.add_argument("--warc", default=None, metavar="PATH",
+                        help="把本次抓取的请求与响应写入 WARC 文件（.warc 或 .warc.gz），同时生成 .cdxj 索引")
+
+
+_writers: Dict[str, WarcWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def open_writer(path: str) -> WarcWriter:
+    """同一进程内同一文件只打开一个写入器（环境变量与 --warc 指向同一文件时不会交错写入）"""
+    key = os.path.abspath(path)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = WarcWriter(path)
+        return writer
+
+
+def warc_from_env() -> Optional[WarcWriter]:
+    path = os.environ.get(WARC_ENV)
+    return open_writer(path) if path else None
+
+
+def warc_from_args(args: argparse.Namespace) -> Optional[WarcWriter]:
+    """按 add_warc_arguments 解析出的参数创建写入器；未指定 --warc 时按 SEO_AUDIT_WARC 决定"""
+    return open_writer(args.warc) if args.warc else warc_from_env()
@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+SEO 历史结果查询
+把各脚本生成的带时间戳报告导入 SQLite 历史仓库（seo_audit.history），按 URL 查询历史、按运行查询回归，
+不再需要逐个 grep 报告文件。导入是增量的：重复执行只处理新增或改动的报告。
+
+用法示例：
+  python3 seo_history.py ingest                                   # 导入当前目录与 seo-reports/ 下的全部报告
+  python3 seo_history.py runs --kind x_default_verification
+  python3 seo_history.py history /es/soluciones --field hreflang:x-default
+  python3 seo_history.py regressions                              # 每种报告、每个站点：最新一次相对上一次
+  python3 seo_history.py regressions --before 12 --after 15 --json
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from seo_audit.history import DEFAULT_HISTORY_PATH, REPORT_KINDS, HistoryStore, discover_reports
+from seo_audit.profiling import add_profile_arguments, profiler_from_args
+
+# 回归类型的显示方式
+REGRESSION_LABELS = {
+    'lost': '⚠️  字段丢失',
+    'changed': '🔄 字段变化',
+    'status': '❌ 状态变差',
+    'new_finding': '🆕 新增错误',
+    'missing_page': '👻 页面消失',
+}
+
+
+def command_ingest(store, args):
+    paths = args.paths or discover_reports(args.root)
+    started = time.perf_counter()
+    results = store.ingest_paths(paths)
+    imported = {path: count for path, count in results.items() if count is not None and count >= 0}
+    failed = [path for path, count in results.items() if count == -1]
+    for path, count in imported.items():
+        print(f"📥 {path}: {count} 个页面")
+    for path in failed:
+        print(f"❌ 无法解析: {path}")
+    unchanged = len(results) - len(imported) - len(failed)
+    print(f"\n📊 导入 {len(imported)} 个报告，未变化 {unchanged} 个，失败 {len(failed)} 个"
+          f"（{time.perf_counter() - started:.2f}s）")
+    return 1 if failed else 0
+
+
+def command_runs(store, args):
+    runs = store.runs(args.kind, args.limit)
+    if not runs:
+        print("📭 没有运行记录，请先执行 ingest")
+        return 0
+    for run in runs:
+        print(f"#{run.id:<5} {run.started_at}  {run.kind:<30} {run.page_count:>5} 页  {run.origin or '-'}  {run.source}")
+    return 0
+
+
+def command_history(store, args):
+    started = time.perf_counter()
+    rows = store.history(args.target, args.field, args.kind)
+    elapsed = (time.perf_counter() - started) * 1000
+    if not rows:
+        print(f"📭 没有 {args.target} 的记录")
+        return 1
+    if args.json:
+        print(json.dumps([{'run': row.run._asdict(), 'url': row.url, 'status': row.status,
+                           'value': row.value, 'findings': row.findings} for row in rows], ensure_ascii=False, indent=2))
+        return 0
+
+    print(f"📜 {args.target} 的历史" + (f"（字段 {args.field}）" if args.field else ""))
+    previous = {}
+    for row in rows:
+        line = f"   {row.run.started_at}  #{row.run.id:<5} {row.run.kind:<30} {row.status or '-':<8} 问题 {row.findings:<3}"
+        if args.field:
+            key = (row.run.kind, row.url)
+            marker = ''
+            if key in previous and previous[key] != row.value:
+                marker = '⚠️  丢失 ' if row.value is None else '🔄 变化 '
+            previous[key] = row.value
+            line += f" {marker}{row.value if row.value is not None else '(无)'}"
+        print(line + (f"  {row.url}" if '://' not in args.target else ''))
+    print(f"\n⏱️  查询耗时 {elapsed:.1f} ms")
+    return 0
+
+
+def run_pairs(store, args):
+    """要对比的 (之前, 之后) 运行；未指定时每种报告、每个站点取最新一次与同站点的上一次"""
+    if args.after:
+        after = store.run(args.after)
+        if after is None:
+            raise ValueError(f"运行不存在: #{args.after}")
+        before = store.run(args.before) if args.before else store.previous_run(after)
+        if before is None:
+            raise ValueError(f"运行 #{after.id} 之前没有同类型、同站点（{after.origin}）的运行")
+        return [(before, after)]
+    pairs = []
+    for kind in ([args.kind] if args.kind else [k.name for k in REPORT_KINDS]):
+        # 不同站点（例如 localhost:3000 与 localhost:3003）的运行各自对比，不互相当作上一次
+        latest = {}
+        for run in store.runs(kind):
+            latest.setdefault(run.origin, run)
+        for run in latest.values():
+            before = store.previous_run(run)
+            if before is not None:
+                pairs.append((before, run))
+    return pairs
+
+
+def command_regressions(store, args):
+    try:
+        pairs = run_pairs(store, args)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+    started = time.perf_counter()
+    report = []
+    for before, after in pairs:
+        regressions = store.regressions(before.id, after.id)
+        if not args.include_changes:
+            regressions = [r for r in regressions if r.kind != 'changed']
+        report.append((before, after, regressions))
+    elapsed = (time.perf_counter() - started) * 1000
+
+    if args.json:
+        print(json.dumps([{'before': before._asdict(), 'after': after._asdict(),
+                           'regressions': [r._asdict() for r in regressions]}
+                          for before, after, regressions in report], ensure_ascii=False, indent=2))
+    else:
+        if not report:
+            print("📭 没有可对比的运行（每种报告至少需要两次运行）")
+        for before, after, regressions in report:
+            print(f"\n🔍 {after.kind} {after.origin or ''}: #{before.id} ({before.started_at}) -> #{after.id} ({after.started_at})")
+            if not regressions:
+                print("   ✅ 没有回归")
+            for r in regressions:
+                detail = f"{r.before} -> {r.after}" if r.kind in ('changed', 'status') else (r.before or r.after)
+                print(f"   {REGRESSION_LABELS[r.kind]} {r.url} [{r.name}] {detail}")
+        print(f"\n⏱️  查询耗时 {elapsed:.1f} ms")
+    return 1 if any(regressions for _, _, regressions in report) else 0
+
+
+def main():
+    """主函数"""
+    parser = argparse.ArgumentParser(description='SEO 历史结果导入与查询')
+    parser.add_argument('--db', default=DEFAULT_HISTORY_PATH, help=f'历史仓库路径（默认 {DEFAULT_HISTORY_PATH}）')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    ingest = commands.add_parser('ingest', help='导入报告文件（默认自动发现）')
+    ingest.add_argument('paths', nargs='*', help='报告文件；不指定时导入 --root 下所有已知类型的报告')
+    ingest.add_argument('--root', default='.', help='自动发现报告的目录（默认当前目录）')
+
+    kinds = [kind.name for kind in REPORT_KINDS]
+    runs = commands.add_parser('runs', help='列出运行记录')
+    runs.add_argument('--kind', choices=kinds, default=None, help='只列出某种报告')
+    runs.add_argument('--limit', type=int, default=None, help='最多列出的运行数')
+
+    history = commands.add_parser('history', help='某个页面在各次运行中的状态')
+    history.add_argument('target', help='完整 URL，或路径（匹配所有主机，例如 /es/soluciones）')
+    history.add_argument('--field', default=None, help='同时显示某个字段的取值，例如 hreflang:x-default、canonical')
+    history.add_argument('--kind', choices=kinds, default=None, help='只看某种报告')
+    history.add_argument('--json', action='store_true', help='输出 JSON')
+
+    regressions = commands.add_parser('regressions', help='两次运行之间的回归')
+    regressions.add_argument('--kind', choices=kinds, default=None, help='只对比某种报告（默认全部）')
+    regressions.add_argument('--after', type=int, default=None, help='之后的运行 ID（默认每种报告的最新一次）')
+    regressions.add_argument('--before', type=int, default=None, help='之前的运行 ID（默认 --after 的上一次同类型、同站点运行）')
+    regressions.add_argument('--include-changes', action='store_true', help='同时列出取值变化（默认只列出丢失、变差与新增错误）')
+    regressions.add_argument('--json', action='store_true', help='输出 JSON')
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+
+    handlers = {'ingest': command_ingest, 'runs': command_runs, 'history': command_history,
+                'regressions': command_regressions}
+    with HistoryStore(args.db) as store:
+        return handlers[args.command](store, args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,12 +4,17 @@
 检查生产环境中所有页面的 x-default hreflang 标签是否正确实现
 """
 
-import requests
-from bs4 import BeautifulSoup
+import argparse
 import json
 from datetime import datetime
 import time
 
+from seo_audit.cassette import add_cassette_arguments, cassette_from_args
+from seo_audit.checks import x_default_alternates, x_default_points_to_english
+from seo_audit.client import configure_client, get_client
+from seo_audit.page import PageSeo
+from seo_audit.profiling import add_profile_arguments, note_report, phase, profiler_from_args
+
 # 配置
 PRODUCTION_BASE_URL = 'https://www.yhflexiblebusbar.com'
 PAGES_TO_CHECK = [
@@ -26,59 +31,26 @@ PAGES_TO_CHECK = [
 ]
 
 def get_page_content(url):
-    """获取页面内容"""
+    """获取页面内容（SEO 标签都在 <head> 中，只下载到 </head> 为止）"""
     try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        response = requests.get(url, headers=headers, timeout=30)
-        response.raise_for_status()
-        return response.text
+        return get_client().get_text(url, head_only=True)
     except Exception as e:
         print(f"Error fetching {url}: {str(e)}")
         return None
 
-def extract_hreflang_tags(html_content):
-    """提取页面中的 hreflang 标签"""
-    if not html_content:
-        return []
-    
-    soup = BeautifulSoup(html_content, 'html.parser')
-    hreflang_tags = []
-    
-    # 查找所有 hreflang 相关的 link 标签
-    links = soup.find_all('link', {'rel': 'alternate'})
-    for link in links:
-        hreflang = link.get('hreflang')
-        href = link.get('href')
-        if hreflang and href:
-            hreflang_tags.append({
-                'hreflang': hreflang,
-                'href': href
-            })
-    
-    return hreflang_tags
-
-def check_x_default_tag(hreflang_tags):
-    """检查是否存在 x-default 标签"""
-    x_default_tags = [tag for tag in hreflang_tags if tag['hreflang'] == 'x-default']
-    return x_default_tags
-
-def verify_x_default_points_to_english(x_default_tags):
-    """验证 x-default 标签是否指向英文版本"""
-    if not x_default_tags:
-        return False, "No x-default tag found"
-    
-    for tag in x_default_tags:
-        href = tag['href']
-        # 检查是否指向英文版本（包含 /en/ 或以英文域名结尾）
-        if '/en/' in href or href.endswith('/en') or (href.count('/') <= 3 and 'en' in href):
-            return True, f"x-default points to English version: {href}"
-    
-    return False, f"x-default does not point to English version: {[tag['href'] for tag in x_default_tags]}"
+def extract_hreflang_tags(seo):
+    """提取页面中 hreflang 与 href 都不为空的 hreflang 标签"""
+    return [tag for tag in seo.hreflang if tag['hreflang'] and tag['href']]
 
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description="验证生产环境页面的 x-default hreflang 标签")
+    add_cassette_arguments(parser)
+    add_profile_arguments(parser)
+    args = parser.parse_args()
+    profiler_from_args(args)
+    configure_client(cassette=cassette_from_args(args))
+
     print("🔍 验证 x-default 标签实现")
     print("=" * 60)
     
@@ -111,12 +83,14 @@ def main():
             results.append(result)
             continue
         
-        # 提取 hreflang 标签
-        hreflang_tags = extract_hreflang_tags(html_content)
+        # 解析一次，hreflang 与 x-default 检查都读取同一条 PageSeo
+        seo = PageSeo.parse(html_content, url)
+        hreflang_tags = extract_hreflang_tags(seo)
         print(f"   找到 {len(hreflang_tags)} 个 hreflang 标签")
         
         # 检查 x-default 标签
-        x_default_tags = check_x_default_tag(hreflang_tags)
+        x_default = x_default_alternates(seo)
+        x_default_tags = [a._asdict() for a in x_default]
         x_default_found = len(x_default_tags) > 0
         
         if x_default_found:
@@ -124,7 +98,7 @@ def main():
             print(f"   ✅ 找到 x-default 标签: {len(x_default_tags)} 个")
             
             # 验证 x-default 是否指向英文版本
-            is_correct, message = verify_x_default_points_to_english(x_default_tags)
+            is_correct, message = x_default_points_to_english(x_default)
             if is_correct:
                 summary['pages_x_default_correct'] += 1
                 print(f"   ✅ {message}")
@@ -152,8 +126,9 @@ def main():
         }
         results.append(result)
         
-        # 添加延迟避免请求过快
-        time.sleep(1)
+        # 添加延迟避免请求过快（从磁带回放时不访问网络，不需要等待）
+        if not get_client().replaying:
+            time.sleep(1)
     
     # 生成报告
     print("\n" + "=" * 60)
@@ -166,6 +141,7 @@ def main():
     
     success_rate = (summary['pages_x_default_correct'] / summary['total_pages']) * 100
     print(f"成功率: {success_rate:.1f}%")
+    print(get_client().describe_stats())
     
     # 保存详细结果
     report_data = {
@@ -176,8 +152,9 @@ def main():
     timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
     filename = f"x_default_verification_{timestamp}.json"
     
-    with open(filename, 'w', encoding='utf-8') as f:
+    with phase('report'), open(filename, 'w', encoding='utf-8') as f:
         json.dump(report_data, f, indent=2, ensure_ascii=False)
+    note_report(filename)
     
     print(f"\n📄 详细报告已保存到: {filename}")
     